@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""asyncio 루프에서 느린 validate_path가 get_status를 막지 않는지 확인
+
+-help 응답이 느린 가짜 Everything.exe로 validate_path를 먼저 보내고 바로 get_status를 보낸다.
+순차 루프(기본)는 validate_path가 끝나야 get_status 응답이 나가고,
+asyncio 루프(--async)는 get_status 응답이 먼저 도착해야 한다.
+순서가 어긋나거나, get_status가 느린 요청에 막히거나, 응답이 빠지거나, 호스트가 비정상 종료하면
+실패한 확인 이름을 출력하고 종료 코드 1.
+
+사용법: python benchmarks/bench_async.py [--delay 1.0]
+"""
+
+import sys
+import json
+import time
+import argparse
+
+from host_client import encode_message, read_frame, make_stub_everything, host_env, spawn_host
+
+def run_order(args, delay):
+    """validate_path(느림) → get_status 순서로 보내고 응답 도착 순서와 시간 측정"""
+    # 검증 결과가 캐시되므로 실행마다 새 가짜 Everything.exe 사용
+    stub, _ = make_stub_everything()
+    env = host_env(stub, EE_STUB_HELP_DELAY=delay)
+    proc = spawn_host(env, args)
+    proc.stdin.write(encode_message({'action': 'ping', 'id': 0}))
+    proc.stdin.flush()
+    read_frame(proc.stdout)
+    
+    start = time.perf_counter()
+    proc.stdin.write(encode_message({'action': 'validate_path', 'path': stub, 'id': 'validate'}))
+    proc.stdin.write(encode_message({'action': 'get_status', 'id': 'status'}))
+    proc.stdin.flush()
+    
+    arrivals = []
+    responses = {}
+    for _ in range(2):
+        response = read_frame(proc.stdout)
+        if response is None:
+            break
+        arrivals.append(response.get('id'))
+        responses[response.get('id')] = dict(
+            response, elapsed_ms=round((time.perf_counter() - start) * 1000, 1))
+    
+    proc.stdin.close()
+    proc.wait()
+    status = responses.get('status', {})
+    validate = responses.get('validate', {})
+    return {
+        'order': arrivals,
+        'status_ms': status.get('elapsed_ms'),
+        'validate_ms': validate.get('elapsed_ms'),
+        'status_success': bool(status.get('success')),
+        'valid': validate.get('valid'),
+        'exit_code': proc.returncode,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--delay', type=float, default=1.0, help='-help 응답 지연 (초)')
+    args = parser.parse_args()
+    
+    report = {
+        'delay_s': args.delay,
+        'sequential': run_order((), args.delay),
+        'async': run_order(('--async',), args.delay),
+    }
+    print(json.dumps(report, indent=2))
+    
+    sequential = report['sequential']
+    concurrent = report['async']
+    delay_ms = args.delay * 1000
+    checks = {
+        'sequential_in_request_order': sequential['order'] == ['validate', 'status'],
+        'sequential_waits_for_validate': (sequential['status_ms'] or 0) >= delay_ms,
+        'async_status_first': concurrent['order'] == ['status', 'validate'],
+        'async_status_not_blocked': concurrent['status_ms'] is not None
+                                    and concurrent['status_ms'] < delay_ms / 2,
+        'responses_ok': all(run['status_success'] and run['valid'] for run in (sequential, concurrent)),
+        'hosts_exited_cleanly': sequential['exit_code'] == 0 and concurrent['exit_code'] == 0,
+    }
+    failed = [name for name, passed in checks.items() if not passed]
+    for name in failed:
+        print(f"FAIL: {name}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""미리 컴파일한 묶음(native_host.pyz) vs 원본 native_host.py 콜드 스타트 비교
+
+sendNativeMessage처럼 호스트를 새로 띄워 메시지 하나(ping, get_status)를 처리하고 끝날 때까지의 시간:
+- source (no pycache): 원본 실행, __pycache__를 쓸 수 없는 배포 폴더 (매번 컴파일)
+- source (pycache): 원본 실행, __pycache__가 이미 있음 (mtime 확인 후 .pyc 로드)
+- bundle: python -I -S native_host.pyz (installer/host_bundle.py)
+- bundle (no flags): 옵션 없이 묶음만 (옵션의 효과를 나눠 보기 위해)
+
+native-host를 임시 폴더에 복사해서 측정한다 (원본 트리의 __pycache__는 건드리지 않음).
+종류를 번갈아 실행해서 시스템 상태 변화가 한쪽에만 쏠리지 않게 한다.
+
+사용법: python benchmarks/bench_bundle.py [-n 30]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+import argparse
+
+from host_client import PROJECT_DIR, encode_message, read_frame, host_env, summarize
+
+sys.path.insert(0, str(PROJECT_DIR / "installer"))
+import host_bundle
+
+def cold_request(command, message, env):
+    """호스트를 띄워 메시지 하나를 보내고 종료까지 걸린 ms와 응답"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env)
+    proc.stdin.write(encode_message(message))
+    proc.stdin.flush()
+    response = read_frame(proc.stdout)
+    proc.stdin.close()
+    proc.wait()
+    return (time.perf_counter() - start) * 1000, response
+
+def copy_host(workdir, name):
+    target = os.path.join(workdir, name)
+    shutil.copytree(PROJECT_DIR / "native-host", target,
+                    ignore=shutil.ignore_patterns('__pycache__', '*.log*', '*.db*', '*.json', 'metrics',
+                                                  'profiles', '*.pyz', '*.whl', '*.bin'))
+    return target
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=30)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ee_bench_")
+    source_dir = copy_host(workdir, "source")
+    bundle_dir = copy_host(workdir, "bundle")
+    bundle = host_bundle.write_bundle(bundle_dir)
+    # 원본 실행이 __pycache__를 미리 만들어 두도록 한 번 실행
+    cached_dir = copy_host(workdir, "cached")
+    subprocess.run([sys.executable, '-m', 'compileall', '-q', cached_dir], check=True)
+
+    env = host_env(EE_CONFIG_FILE=os.path.join(workdir, "everything_config.json"),
+                   EE_HISTORY_FILE=os.path.join(workdir, "history.db"),
+                   EE_METRICS_DIR=os.path.join(workdir, "metrics"),
+                   EE_LOG_FILE=os.path.join(workdir, "native_host.log"))
+    no_pycache = dict(env, PYTHONDONTWRITEBYTECODE='1')
+    variants = {
+        'source_no_pycache': ([sys.executable, os.path.join(source_dir, "native_host.py")], no_pycache),
+        'source_pycache': ([sys.executable, os.path.join(cached_dir, "native_host.py")], env),
+        'bundle': (host_bundle.host_command(bundle), env),
+        'bundle_no_flags': ([sys.executable, str(bundle)], env),
+    }
+
+    report = {'python': sys.version.split()[0], 'interpreter_flags': list(host_bundle.INTERPRETER_FLAGS),
+              'bundle_kb': round(os.path.getsize(bundle) / 1024, 1)}
+    for action in ('ping', 'get_status'):
+        latencies = {name: [] for name in variants}
+        for i in range(args.count):
+            for name, (command, variant_env) in variants.items():
+                ms, response = cold_request(command, {'action': action, 'id': i}, variant_env)
+                if not response or not response.get('success'):
+                    raise SystemExit(f"{name}: {response}")
+                latencies[name].append(ms)
+        rows = {name: summarize(values) for name, values in latencies.items()}
+        base = rows['source_pycache']['p50_ms']
+        for name, row in rows.items():
+            row['vs_source_pycache_p50'] = round(row['p50_ms'] / base, 3) if base else None
+        report[action] = rows
+
+    ok, detail, elapsed_ms = host_bundle.verify_bundle(bundle)
+    report['verify_bundle'] = {'ok': ok, 'detail': detail, 'ms': elapsed_ms}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
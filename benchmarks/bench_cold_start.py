@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Native Host 콜드 스타트 벤치마크 (프로세스 생성 ~ 첫 응답)
+
+가짜 Everything.exe를 EVERYTHING_PATH로 지정해서 재현 가능하게 측정하고,
+p50이 예산(ms)을 넘으면 종료 코드 1로 실패한다.
+
+사용법: python benchmarks/bench_cold_start.py [-n 30] [--budget-ms 150]
+예산은 EE_COLD_START_BUDGET_MS 환경 변수로도 지정할 수 있다.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+from host_client import (encode_message, read_frame, make_stub_everything,
+                         host_env, spawn_host, summarize)
+
+DEFAULT_BUDGET_MS = 150.0
+
+def measure_interpreter(count):
+    """비교 기준: 아무것도 하지 않는 인터프리터 기동 시간"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return summarize(latencies)
+
+def measure_first_response(message, count, env):
+    """호스트 프로세스 생성부터 첫 응답 프레임 수신까지"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        proc = spawn_host(env)
+        proc.stdin.write(encode_message(message))
+        proc.stdin.flush()
+        response = read_frame(proc.stdout)
+        latencies.append((time.perf_counter() - start) * 1000)
+        proc.stdin.close()
+        proc.wait()
+        if not response or not response.get('success'):
+            raise SystemExit(f"Unexpected response: {response}")
+    return summarize(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=30)
+    parser.add_argument('--budget-ms', type=float,
+                        default=float(os.environ.get('EE_COLD_START_BUDGET_MS', DEFAULT_BUDGET_MS)))
+    args = parser.parse_args()
+    
+    stub, _ = make_stub_everything()
+    env = host_env(stub)
+    
+    results = {
+        'budget_ms': args.budget_ms,
+        'interpreter': measure_interpreter(args.count),
+        'get_status': measure_first_response({'action': 'get_status'}, args.count, env),
+        'search': measure_first_response({'action': 'search', 'query': 'cold start'}, args.count, env),
+    }
+    over_budget = [name for name in ('get_status', 'search')
+                   if results[name]['p50_ms'] > args.budget_ms]
+    results['over_budget'] = over_budget
+    
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    sys.exit(1 if over_budget else 0)
+
+if __name__ == '__main__':
+    main()
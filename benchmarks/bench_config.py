@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""설정 파일(config 모듈) 동시 쓰기 스트레스 테스트와 읽기 비용 측정
+
+- 세션 호스트 여러 개가 동시에 set_path(가짜 Everything 경로 여러 개 중 하나)와 get_status를
+  번갈아 보내는 동안, 벤치마크 프로세스가 설정 파일을 계속 읽어서 반쯤 쓴 파일이 보이는지 확인
+  (모든 set_path 성공, 마지막 경로가 보낸 경로 중 하나, 다른 키 유지, 임시 파일 없음)
+- 프로세스 여러 개가 각자 다른 키를 config.update()로 반복해서 바꿨을 때 잃어버린 쓰기가 없는지
+  (예전 방식: 잠금 없이 읽고 제자리에서 다시 쓰기와 비교)
+- Windows에서 다른 프로세스가 설정 파일을 열고 있을 때 교체/열기가 PermissionError로 실패하는 경우
+  (os.replace와 open을 잠시 실패하게 바꿔서 재현): 재시도 후 저장/읽기, 계속 실패하면 예외와 임시 파일 정리
+- load()의 스냅샷 재사용(stat 한 번)과 매번 파일을 읽어 파싱하는 비용 비교
+
+잃어버린 쓰기, 반쯤 쓴 파일 읽기, 남은 임시 파일, 재시도 실패 중 하나라도 있으면 실패한 확인 이름을
+출력하고 종료 코드 1 (예전 방식 결과는 비교용이라 확인하지 않음).
+
+사용법: python benchmarks/bench_config.py [--hosts 16] [--rounds 40] [--writers 8] [--updates 100]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import subprocess
+import argparse
+
+from host_client import (PROJECT_DIR, encode_message, read_frame, host_env, spawn_host,
+                         make_stub_pe, summarize)
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+
+SENTINEL = {'log_level': 'INFO', 'history_max_entries': 50000}
+
+WRITER = r"""
+import os, sys, json
+sys.path.insert(0, {host_dir!r})
+worker, updates, legacy = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3] == '1'
+path = os.environ['EE_CONFIG_FILE']
+if not legacy:
+    import config
+failures = 0
+for n in range(updates):
+    key = 'counter_%d' % worker
+    if legacy:
+        # 예전 save_everything_path와 같은 방식 (잠금 없이 읽고 제자리에서 다시 쓰기)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data[key] = n
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        except Exception:
+            failures += 1
+    else:
+        config.update({{key: n}})
+print(failures)
+"""
+
+class Watcher(threading.Thread):
+    """설정 파일을 계속 읽으면서 파싱 실패(반쯤 쓴 파일) 횟수를 센다"""
+
+    def __init__(self, path):
+        super().__init__(daemon=True)
+        self.path = path
+        self.reads = 0
+        self.torn = 0
+        self.stop = threading.Event()
+
+    def run(self):
+        while not self.stop.is_set():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    json.load(f)
+            except FileNotFoundError:
+                continue
+            except ValueError:
+                self.torn += 1
+            self.reads += 1
+
+def write_config(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+def leftover_tmp_files(directory):
+    return [name for name in os.listdir(directory) if name.endswith('.tmp')]
+
+def host_stress(workdir, hosts, rounds):
+    """세션 호스트 hosts개가 set_path/get_status를 rounds번씩 동시에 보냄"""
+    config_file = os.path.join(workdir, "everything_config.json")
+    write_config(config_file, SENTINEL)
+    stubs = []
+    for i in range(4):
+        directory = os.path.join(workdir, f"everything{i}")
+        os.makedirs(directory)
+        stubs.append(make_stub_pe(directory))
+    env = host_env(EE_CONFIG_FILE=config_file, EE_HISTORY_FILE=os.path.join(workdir, "history.db"))
+    env.pop('EVERYTHING_PATH', None)
+
+    procs = [spawn_host(env) for _ in range(hosts)]
+    watcher = Watcher(config_file)
+    watcher.start()
+    results = [None] * hosts
+
+    def drive(index, proc):
+        latencies = {'set_path': [], 'get_status': []}
+        failures = []
+        statuses = set()
+        for n in range(rounds):
+            for action in ('set_path', 'get_status'):
+                message = {'action': action, 'id': n}
+                if action == 'set_path':
+                    message['path'] = stubs[(index + n) % len(stubs)]
+                start = time.perf_counter()
+                proc.stdin.write(encode_message(message))
+                proc.stdin.flush()
+                response = read_frame(proc.stdout)
+                latencies[action].append((time.perf_counter() - start) * 1000)
+                if not response or not response.get('success'):
+                    failures.append(response)
+                elif action == 'get_status':
+                    statuses.add(response.get('everything_path'))
+        proc.stdin.close()
+        proc.wait()
+        results[index] = (latencies, failures, statuses)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=drive, args=(i, proc)) for i, proc in enumerate(procs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    watcher.stop.set()
+    watcher.join()
+
+    with open(config_file, 'r', encoding='utf-8') as f:
+        final = json.load(f)
+    latencies = {action: [ms for result in results for ms in result[0][action]]
+                 for action in ('set_path', 'get_status')}
+    failures = [failure for result in results for failure in result[1]]
+    statuses = set().union(*(result[2] for result in results))
+    return {
+        'hosts': hosts,
+        'requests': hosts * rounds * 2,
+        'elapsed_s': round(elapsed, 2),
+        'set_path': summarize(latencies['set_path']),
+        'get_status': summarize(latencies['get_status']),
+        'failures': len(failures),
+        'failure_samples': failures[:3],
+        'status_paths_unknown': sorted(p for p in statuses if p not in stubs),
+        'watcher_reads': watcher.reads,
+        'torn_reads': watcher.torn,
+        'final_path_ok': final.get('everything_path') in stubs,
+        'other_keys_kept': all(final.get(k) == v for k, v in SENTINEL.items()),
+        'leftover_tmp': leftover_tmp_files(workdir),
+    }
+
+def lost_updates(workdir, writers, updates, legacy):
+    """writers개 프로세스가 각자 counter_N 키를 0..updates-1로 바꾼 뒤 남은 값 확인"""
+    directory = os.path.join(workdir, 'legacy' if legacy else 'locked')
+    os.makedirs(directory)
+    config_file = os.path.join(directory, "everything_config.json")
+    write_config(config_file, SENTINEL)
+    env = host_env(EE_CONFIG_FILE=config_file)
+    script = WRITER.format(host_dir=str(PROJECT_DIR / "native-host"))
+
+    watcher = Watcher(config_file)
+    watcher.start()
+    start = time.perf_counter()
+    procs = [subprocess.Popen([sys.executable, '-c', script, str(i), str(updates), '1' if legacy else '0'],
+                              env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+             for i in range(writers)]
+    failures = sum(int(proc.communicate()[0] or 0) for proc in procs)
+    elapsed = time.perf_counter() - start
+    watcher.stop.set()
+    watcher.join()
+
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            final = json.load(f)
+    except ValueError:
+        final = {}
+    lost = [i for i in range(writers) if final.get(f'counter_{i}') != updates - 1]
+    return {
+        'writers': writers,
+        'updates_per_writer': updates,
+        'elapsed_s': round(elapsed, 2),
+        'updates_per_s': round(writers * updates / elapsed),
+        'write_failures': failures,
+        'torn_reads': watcher.torn,
+        'watcher_reads': watcher.reads,
+        'writers_with_lost_updates': len(lost),
+        'other_keys_kept': all(final.get(k) == v for k, v in SENTINEL.items()),
+        'leftover_tmp': leftover_tmp_files(directory),
+    }
+
+def _busy(func, fail, calls):
+    """처음 fail번은 PermissionError(Windows 공유 위반과 같은 errno 13)를 내는 func"""
+    def busy(*args, **kwargs):
+        calls.append(args)
+        if len(calls) <= fail:
+            raise PermissionError(13, 'The process cannot access the file because it is being used', args[-1])
+        return func(*args, **kwargs)
+    return busy
+
+def replace_retry(workdir):
+    """설정 파일 교체/열기가 잠시 PermissionError로 실패할 때 update()/load()가 다시 시도하는지"""
+    import config
+
+    directory = os.path.join(workdir, 'retry')
+    os.makedirs(directory)
+    config_file = os.path.join(directory, "everything_config.json")
+    write_config(config_file, SENTINEL)
+    config.CONFIG_FILE = config_file
+    config.invalidate()
+
+    def final():
+        with open(config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    real_replace = os.replace
+    report = {}
+    calls = []
+    os.replace = _busy(real_replace, 3, calls)
+    try:
+        config.update({'retry_key': 1})
+    finally:
+        os.replace = real_replace
+    report['transient_replace'] = {'attempts': len(calls), 'saved': final() == dict(SENTINEL, retry_key=1)}
+
+    calls = []
+    os.replace = _busy(real_replace, len(config.REPLACE_RETRY_DELAYS) + 1, calls)
+    try:
+        config.update({'retry_key': 2})
+        raised = False
+    except PermissionError:
+        raised = True
+    finally:
+        os.replace = real_replace
+    report['persistent_replace'] = {
+        'attempts': len(calls),
+        'raised': raised,
+        'previous_kept': final().get('retry_key') == 1,
+        'leftover_tmp': leftover_tmp_files(directory),
+    }
+
+    calls = []
+    config.invalidate()
+    config.open = _busy(open, 2, calls)
+    try:
+        loaded = config.load()
+    finally:
+        del config.open
+    report['transient_open'] = {'attempts': len(calls), 'loaded': loaded.get('retry_key') == 1}
+    return report
+
+def read_cost(workdir, count):
+    """load()의 스냅샷 재사용과 매번 읽기+파싱 비교 (설정 키 수십 개)"""
+    import config
+
+    config_file = os.path.join(workdir, "read_cost.json")
+    data = dict(SENTINEL, **{f'key_{i}': f'value_{i}' * 4 for i in range(40)})
+    write_config(config_file, data)
+    config.CONFIG_FILE = config_file
+    config.invalidate()
+
+    def parse():
+        with open(config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    rows = {}
+    for name, func in (('parse_every_call', parse), ('snapshot_load', config.load)):
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            func()
+            latencies.append((time.perf_counter() - start) * 1000)
+        rows[name] = summarize(latencies)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=40)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--updates', type=int, default=100)
+    parser.add_argument('-n', '--count', type=int, default=5000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ee_bench_")
+    report = {
+        'hosts': host_stress(workdir, args.hosts, args.rounds),
+        'locked_update': lost_updates(workdir, args.writers, args.updates, legacy=False),
+        'legacy_in_place': lost_updates(workdir, args.writers, args.updates, legacy=True),
+        'replace_retry': replace_retry(workdir),
+        'read': read_cost(workdir, args.count),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    hosts = report['hosts']
+    locked = report['locked_update']
+    retry = report['replace_retry']
+    checks = {
+        'hosts_requests_succeeded': hosts['failures'] == 0,
+        'hosts_watcher_read': hosts['watcher_reads'] > 0,
+        'hosts_no_torn_reads': hosts['torn_reads'] == 0,
+        'hosts_final_path_sent': hosts['final_path_ok'] and not hosts['status_paths_unknown'],
+        'hosts_other_keys_kept': hosts['other_keys_kept'],
+        'hosts_no_leftover_tmp': not hosts['leftover_tmp'],
+        'update_no_write_failures': locked['write_failures'] == 0,
+        'update_no_lost_updates': locked['writers_with_lost_updates'] == 0,
+        'update_watcher_read': locked['watcher_reads'] > 0,
+        'update_no_torn_reads': locked['torn_reads'] == 0,
+        'update_other_keys_kept': locked['other_keys_kept'],
+        'update_no_leftover_tmp': not locked['leftover_tmp'],
+        'replace_retried_then_saved': retry['transient_replace']['saved']
+                                      and retry['transient_replace']['attempts'] == 4,
+        'replace_gives_up_with_error': retry['persistent_replace']['raised']
+                                       and retry['persistent_replace']['previous_kept'],
+        'replace_failure_no_leftover_tmp': not retry['persistent_replace']['leftover_tmp'],
+        'open_retried_then_loaded': retry['transient_open']['loaded']
+                                    and retry['transient_open']['attempts'] == 3,
+    }
+    failed = [name for name, passed in checks.items() if not passed]
+    for name in failed:
+        print(f"FAIL: {name}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
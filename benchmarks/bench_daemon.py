@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""공유 데몬(--daemon)과 stdio 중계(--relay) 측정
+
+- 세션 왕복: 직접 처리하는 세션 호스트 vs 중계를 거친 세션 (ping, get_status) → 중계 오버헤드
+- 메시지마다 프로세스 (sendNativeMessage): 직접 처리 vs 중계 (데몬이 떠 있을 때, 데몬을 띄울 때)
+- 공유: 동시에 연결한 중계들이 같은 데몬 pid를 받는지
+- 공정성: 한 클라이언트가 큰 query를 스트리밍하는 동안 다른 클라이언트의 ping 지연 시간
+- 유휴 종료: 마지막 클라이언트가 끊긴 뒤 EE_DAEMON_IDLE초 안에 데몬이 끝나고 소켓이 지워지는지
+
+응답 순서(id)가 어긋나거나, 실패 응답, 데몬 공유 실패, 스트림 결과 누락, 끝난 뒤 남은 소켓이나 데몬이 있으면
+실패한 확인 이름을 출력하고 종료 코드 1.
+
+POSIX에서만 실행된다 (Windows named pipe 경로는 같은 코드의 다른 전송).
+
+사용법: python benchmarks/bench_daemon.py [-n 300] [--spawn 20]
+"""
+
+import os
+import sys
+import json
+import time
+import errno
+import tempfile
+import threading
+import argparse
+
+from host_client import (encode_message, read_frame, host_env, spawn_host, request_once,
+                         make_stub_es, summarize)
+
+# 요청 id와 다른 응답, 실패 응답, 빠진 응답
+PROBLEMS = []
+
+def check_response(response, request_id):
+    if not response or response.get('id') != request_id or not response.get('success'):
+        PROBLEMS.append({'expected_id': request_id, 'response': response})
+
+def round_trips(proc, message, count):
+    latencies = []
+    response = None
+    for i in range(count):
+        start = time.perf_counter()
+        proc.stdin.write(encode_message(dict(message, id=i)))
+        proc.stdin.flush()
+        response = read_frame(proc.stdout)
+        latencies.append((time.perf_counter() - start) * 1000)
+        check_response(response, i)
+    return latencies, response
+
+def close(proc):
+    """stdin을 닫고 종료 코드 반환"""
+    proc.stdin.close()
+    return proc.wait()
+
+def session(env, count):
+    proc = spawn_host(env)
+    # 첫 요청(모듈 로드, 데몬 연결)은 제외
+    round_trips(proc, {'action': 'ping'}, 3)
+    rows = {}
+    for action in ('ping', 'get_status'):
+        latencies, response = round_trips(proc, {'action': action}, count)
+        rows[action] = summarize(latencies)
+    return rows, close(proc)
+
+def per_message(env, count):
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        response = request_once({'action': 'get_status', 'id': i}, env)
+        latencies.append((time.perf_counter() - start) * 1000)
+        check_response(response, i)
+    return summarize(latencies)
+
+def shared_pids(env, clients):
+    procs = [spawn_host(env) for _ in range(clients)]
+    pids = set()
+    for proc in procs:
+        proc.stdin.write(encode_message({'action': 'ping', 'id': 1}))
+        proc.stdin.flush()
+    exit_codes = set()
+    for proc in procs:
+        response = read_frame(proc.stdout)
+        check_response(response, 1)
+        pids.add((response or {}).get('pid'))
+        exit_codes.add(close(proc))
+    return pids, exit_codes
+
+def fairness(env, count, limit):
+    """클라이언트 A가 query를 스트리밍하는 동안 클라이언트 B의 ping 지연 시간"""
+    streamer = spawn_host(env)
+    pinger = spawn_host(env)
+    round_trips(pinger, {'action': 'ping'}, 3)
+    idle, _ = round_trips(pinger, {'action': 'ping'}, count)
+
+    chunks = []
+    done = threading.Event()
+
+    def stream():
+        streamer.stdin.write(encode_message({'action': 'query', 'id': 'big', 'query': 'report',
+                                             'limit': limit}))
+        streamer.stdin.flush()
+        while True:
+            response = read_frame(streamer.stdout)
+            if not response or response.get('id') != 'big':
+                PROBLEMS.append({'expected_id': 'big', 'response': response})
+                break
+            chunks.append(len(response.get('results', [])))
+            if not response.get('partial'):
+                break
+        done.set()
+
+    thread = threading.Thread(target=stream)
+    start = time.perf_counter()
+    thread.start()
+    # 스트리밍이 시작된 뒤부터 잰다
+    while not chunks and not done.is_set():
+        time.sleep(0.001)
+    busy = []
+    while not done.is_set() and len(busy) < count:
+        latencies, _ = round_trips(pinger, {'action': 'ping'}, 1)
+        busy.extend(latencies)
+    thread.join()
+    stream_ms = (time.perf_counter() - start) * 1000
+    exit_codes = {close(proc) for proc in (streamer, pinger)}
+    return {
+        'ping_idle': summarize(idle),
+        'ping_during_stream': summarize(busy),
+        'stream': {'chunks': len(chunks), 'results': sum(chunks), 'ms': round(stream_ms, 1)},
+        'exit_codes': sorted(exit_codes),
+    }
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+def idle_shutdown(env, address, idle_seconds):
+    response = request_once({'action': 'ping', 'id': 1}, env)
+    check_response(response, 1)
+    pid = (response or {}).get('pid')
+    start = time.perf_counter()
+    deadline = start + idle_seconds + 5
+    while (os.path.exists(address) or (pid and alive(pid))) and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    directory = os.path.dirname(address)
+    return {'idle_seconds': idle_seconds, 'socket_removed': not os.path.exists(address),
+            'daemon_exited': bool(pid) and not alive(pid),
+            'leftover_sockets': sorted(name for name in os.listdir(directory) if name.endswith('.sock')),
+            'after_s': round(time.perf_counter() - start, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=300)
+    parser.add_argument('--spawn', type=int, default=20, help='메시지마다 프로세스 측정 횟수')
+    parser.add_argument('--limit', type=int, default=100000, help='공정성 측정의 query 결과 수')
+    args = parser.parse_args()
+    if os.name == 'nt':
+        print("POSIX only", file=sys.stderr)
+        return 2
+
+    workdir = tempfile.mkdtemp(prefix="ee_bench_")
+    address = os.path.join(workdir, "host.sock")
+    es = make_stub_es(workdir, hits=args.limit)
+    base = dict(EE_CONFIG_FILE=os.path.join(workdir, "everything_config.json"),
+                EE_HISTORY_FILE=os.path.join(workdir, "history.db"),
+                EE_METRICS_DIR=os.path.join(workdir, "metrics"),
+                EVERYTHING_ES_PATH=es, EE_DAEMON_ADDRESS=address, EE_DAEMON_IDLE=2)
+    direct = host_env(**base)
+    relay = host_env(EE_HOST_LOOP='relay', **base)
+
+    report = {}
+    # 데몬이 없을 때 첫 요청 (중계가 데몬을 띄움)
+    start = time.perf_counter()
+    response = request_once({'action': 'ping', 'id': 0}, relay)
+    report['first_request_starts_daemon_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    check_response(response, 0)
+    started_daemon = bool((response or {}).get('daemon'))
+
+    direct_rows, direct_exit = session(direct, args.count)
+    relay_rows, relay_exit = session(relay, args.count)
+    report['session'] = {'direct': direct_rows, 'relay': relay_rows,
+                         'relay_overhead_p50_ms': {action: round(relay_rows[action]['p50_ms']
+                                                                 - direct_rows[action]['p50_ms'], 3)
+                                                   for action in direct_rows}}
+    report['per_message'] = {'direct': per_message(direct, args.spawn),
+                             'relay_warm_daemon': per_message(relay, args.spawn)}
+    pids, shared_exit = shared_pids(relay, 4)
+    report['shared_daemon'] = {'clients': 4, 'distinct_pids': len(pids)}
+    report['fairness'] = fairness(relay, min(args.count, 200), args.limit)
+    report['idle_shutdown'] = idle_shutdown(relay, address, 2)
+    report['response_problems'] = {'count': len(PROBLEMS), 'samples': PROBLEMS[:3]}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    stream = report['fairness']['stream']
+    idle = report['idle_shutdown']
+    checks = {
+        'relay_started_daemon': started_daemon,
+        'responses_in_order_and_successful': not PROBLEMS,
+        'clients_exited_cleanly': {direct_exit, relay_exit} | shared_exit
+                                  | set(report['fairness']['exit_codes']) == {0},
+        'daemon_shared': report['shared_daemon']['distinct_pids'] == 1,
+        'stream_complete': stream['results'] == args.limit,
+        'pings_answered_during_stream': report['fairness']['ping_during_stream'].get('count', 0) > 0,
+        'idle_socket_removed': idle['socket_removed'] and not idle['leftover_sockets'],
+        'idle_daemon_exited': idle['daemon_exited'],
+    }
+    failed = [name for name, passed in checks.items() if not passed]
+    for name in failed:
+        print(f"FAIL: {name}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
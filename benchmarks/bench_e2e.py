@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Native Messaging 종단 간 벤치마크 / 부하 생성기
+
+실제 4바이트 길이 프레임으로 native_host.py와 통신하고, Everything.exe는 가짜 스크립트로 대신한다.
+액션(search, get_status, set_path, validate_path)마다 메시지 크기와 동시 세션 수를 바꿔 가며
+처리량(msgs/s), 지연 시간 백분위수, 호스트 최대 RSS, 콜드/웜 스타트를 JSON으로 출력한다.
+
+사용법:
+  python benchmarks/bench_e2e.py [-n 200] [--concurrency 1,4] [--sizes 64,4096,65536] [-o result.json]
+  python benchmarks/bench_e2e.py --compare base.json new.json [--threshold 0.15]
+  python benchmarks/bench_e2e.py --commits HEAD~1 HEAD [-o compare.json]
+
+--compare/--commits는 p50/p95가 threshold 이상 느려지거나 처리량이 그만큼 줄면
+회귀로 표시하고 종료 코드 1을 반환한다.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import platform
+import threading
+import subprocess
+
+from host_client import (PROJECT_DIR, NATIVE_HOST, encode_message, read_frame,
+                         make_stub_everything, host_env, spawn_host, peak_rss_kb, summarize)
+
+ACTIONS = ('get_status', 'validate_path', 'set_path', 'search')
+DEFAULT_THRESHOLD = 0.15
+# 회귀 판정에 쓰는 지표: (이름, 클수록 나쁜지)
+COMPARED = (('p50_ms', True), ('p95_ms', True), ('msgs_per_sec', False))
+
+def build_message(action, size, stub):
+    """메시지 크기(JSON 바이트)가 size 근처가 되도록 채운 요청"""
+    if action == 'search':
+        message = {'action': 'search', 'query': ''}
+        field = 'query'
+    else:
+        message = {'action': action}
+        if action in ('set_path', 'validate_path'):
+            message['path'] = stub
+        field = 'pad'
+        message[field] = ''
+    fill = max(1, size - len(json.dumps(message)) - 16)
+    message[field] = ('report ' * (fill // 7 + 1))[:fill]
+    return message
+
+def run_session(host, env, messages, latencies, rss, errors, ready):
+    """세션 하나 (connectNative 방식): 응답을 받은 뒤 다음 요청을 보낸다"""
+    proc = spawn_host(env, host=host)
+    try:
+        proc.stdin.write(encode_message({'action': 'ping', 'id': 0}))
+        proc.stdin.flush()
+        read_frame(proc.stdout)
+        # 모든 세션이 기동을 마친 뒤 함께 시작 (처리량에서 기동 시간 제외)
+        ready.wait()
+        for i, message in enumerate(messages, 1):
+            start = time.perf_counter()
+            proc.stdin.write(encode_message(dict(message, id=i)))
+            proc.stdin.flush()
+            response = read_frame(proc.stdout)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response is None:
+                errors.append('host exited')
+                return
+            if not response.get('success'):
+                errors.append(response.get('error', 'unknown error'))
+        rss.append(peak_rss_kb(proc.pid))
+    finally:
+        proc.stdin.close()
+        proc.wait()
+
+def run_warm(host, env, message, count, concurrency):
+    """동시 세션 concurrency개로 count개 요청 처리"""
+    latencies, rss, errors = [], [], []
+    per_session = [count // concurrency + (1 if i < count % concurrency else 0)
+                   for i in range(concurrency)]
+    per_session = [n for n in per_session if n]
+    ready = threading.Barrier(len(per_session) + 1)
+    threads = [threading.Thread(target=run_session,
+                                args=(host, env, [message] * n, latencies, rss, errors, ready))
+               for n in per_session]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    report = summarize(latencies)
+    report['msgs_per_sec'] = round(len(latencies) / elapsed, 1) if elapsed else 0.0
+    report['peak_rss_kb'] = max((kb for kb in rss if kb), default=None)
+    report['errors'] = len(errors)
+    if errors:
+        report['first_error'] = errors[0]
+    return report
+
+def run_cold(host, env, message, count):
+    """sendNativeMessage 방식: 요청마다 새 프로세스 (생성 ~ 첫 응답)"""
+    latencies = []
+    rss = []
+    for _ in range(count):
+        start = time.perf_counter()
+        proc = spawn_host(env, host=host)
+        proc.stdin.write(encode_message(message))
+        proc.stdin.flush()
+        read_frame(proc.stdout)
+        latencies.append((time.perf_counter() - start) * 1000)
+        rss.append(peak_rss_kb(proc.pid))
+        proc.stdin.close()
+        proc.wait()
+    report = summarize(latencies)
+    report['peak_rss_kb'] = max((kb for kb in rss if kb), default=None)
+    return report
+
+def run_suite(host, actions, sizes, concurrencies, count, cold_count):
+    """host(native_host.py 경로)에 대해 전체 조합 측정"""
+    workdir = tempfile.mkdtemp(prefix="ee_bench_")
+    stub, _ = make_stub_everything(workdir)
+    # set_path가 실제 설정 파일을 건드리지 않도록 임시 설정/로그/지표 경로 사용
+    env = host_env(stub,
+                   EE_CONFIG_FILE=os.path.join(workdir, "everything_config.json"),
+                   EE_LOG_FILE=os.path.join(workdir, "native_host.log"),
+                   EE_METRICS_DIR=os.path.join(workdir, "metrics"))
+    
+    results = {}
+    for action in actions:
+        for size in sizes:
+            message = build_message(action, size, stub)
+            key = f"{action}/{size}B"
+            entry = {'message_bytes': len(json.dumps(message)),
+                     'cold': run_cold(host, env, message, cold_count)}
+            for concurrency in concurrencies:
+                entry[f"warm_c{concurrency}"] = run_warm(host, env, message, count, concurrency)
+            results[key] = entry
+            print(f"{key}: cold p50 {entry['cold']['p50_ms']}ms, "
+                  + ", ".join(f"c{c} {entry[f'warm_c{c}']['msgs_per_sec']} msg/s"
+                              for c in concurrencies), file=sys.stderr)
+    shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+def compare(base, new, threshold):
+    """두 결과를 비교해서 회귀 목록 반환"""
+    regressions = []
+    rows = []
+    for key, entry in new['results'].items():
+        base_entry = base['results'].get(key)
+        if not base_entry:
+            continue
+        for mode, stats in entry.items():
+            if not isinstance(stats, dict) or mode not in base_entry:
+                continue
+            for metric, higher_is_worse in COMPARED:
+                old, cur = base_entry[mode].get(metric), stats.get(metric)
+                if not old or cur is None:
+                    continue
+                change = (cur - old) / old
+                row = {'case': key, 'mode': mode, 'metric': metric,
+                       'base': old, 'new': cur, 'change': round(change, 4)}
+                rows.append(row)
+                if (change > threshold) if higher_is_worse else (change < -threshold):
+                    regressions.append(row)
+    return {'threshold': threshold, 'regressions': regressions, 'compared': len(rows)}
+
+def checkout(ref):
+    """ref를 임시 worktree로 꺼내서 (디렉토리, native_host.py 경로) 반환"""
+    directory = tempfile.mkdtemp(prefix="ee_bench_ref_")
+    subprocess.run(['git', '-C', str(PROJECT_DIR), 'worktree', 'add', '--detach', directory, ref],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # 설치된 호스트처럼 .pyc를 미리 만들어 둔다 (바이트코드 쓰기가 꺼진 환경에서도 공정하게)
+    subprocess.run([sys.executable, '-m', 'compileall', '-q', os.path.join(directory, "native-host")],
+                   stdout=subprocess.DEVNULL)
+    return directory, os.path.join(directory, "native-host", "native_host.py")
+
+def remove_checkout(directory):
+    subprocess.run(['git', '-C', str(PROJECT_DIR), 'worktree', 'remove', '--force', directory],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    shutil.rmtree(directory, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=200, help='웜 측정 요청 수 (조합마다)')
+    parser.add_argument('--cold', type=int, default=10, help='콜드 스타트 측정 횟수 (조합마다)')
+    parser.add_argument('--actions', default=','.join(ACTIONS))
+    parser.add_argument('--sizes', default='64,4096,65536', help='메시지 크기 (바이트, 쉼표 구분)')
+    parser.add_argument('--concurrency', default='1,4', help='동시 세션 수 (쉼표 구분)')
+    parser.add_argument('--host', default=str(NATIVE_HOST), help='측정할 native_host.py')
+    parser.add_argument('-o', '--output', help='결과 JSON 파일 (없으면 stdout)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='결과 파일 두 개 비교')
+    parser.add_argument('--commits', nargs=2, metavar=('BASE', 'NEW'), help='두 커밋을 측정해서 비교')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+    
+    if args.compare:
+        with open(args.compare[0], 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.compare[1], 'r', encoding='utf-8') as f:
+            new = json.load(f)
+        report = compare(base, new, args.threshold)
+    else:
+        actions = [a for a in args.actions.split(',') if a]
+        unknown = set(actions) - set(ACTIONS)
+        if unknown:
+            parser.error(f"unknown actions: {', '.join(sorted(unknown))}")
+        sizes = [int(s) for s in args.sizes.split(',') if s]
+        concurrencies = [int(c) for c in args.concurrency.split(',') if c]
+        
+        def measure(host, label):
+            return {
+                'label': label,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'settings': {'count': args.count, 'cold': args.cold, 'sizes': sizes,
+                             'concurrency': concurrencies},
+                'results': run_suite(host, actions, sizes, concurrencies, args.count, args.cold),
+            }
+        
+        if args.commits:
+            runs = []
+            for ref in args.commits:
+                directory, host = checkout(ref)
+                try:
+                    runs.append(measure(host, ref))
+                finally:
+                    remove_checkout(directory)
+            report = {'base': runs[0], 'new': runs[1],
+                      'comparison': compare(runs[0], runs[1], args.threshold)}
+        else:
+            report = measure(args.host, os.path.relpath(args.host, PROJECT_DIR))
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    
+    comparison = report if args.compare else report.get('comparison')
+    if comparison and comparison['regressions']:
+        for row in comparison['regressions']:
+            print(f"REGRESSION {row['case']} {row['mode']} {row['metric']}: "
+                  f"{row['base']} -> {row['new']} ({row['change']:+.0%})", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""프레이밍 마이크로벤치마크: 예전 방식(read 두 번 + str 디코딩, write 두 번 + flush)과
+framing 모듈(버퍼 재사용 readinto, bytes에서 바로 디코딩, writev 한 번)을 파이프로 비교
+
+메시지 크기 100B ~ 1MB, 표준 json / orjson(설치되어 있으면) 각각 측정하고,
+짧은 읽기, 크기 제한, 잘린 프레임 처리를 먼저 확인한다.
+
+사용법: python benchmarks/bench_framing.py [--sizes 100,1000,10000,100000,1000000]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+import threading
+
+from host_client import PROJECT_DIR
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+import framing
+from framing import FrameReader, FrameWriter, FrameError, MessageTooLarge, TruncatedFrame
+
+class LegacyCodec:
+    """변경 전 native_host.py의 send_message/read_message"""
+
+    def __init__(self, rfile, wfile):
+        self.rfile = rfile
+        self.wfile = wfile
+
+    def write(self, message):
+        body = json.dumps(message).encode('utf-8')
+        self.wfile.write(struct.pack('I', len(body)))
+        self.wfile.write(body)
+        self.wfile.flush()
+
+    def read(self):
+        raw_length = self.rfile.read(4)
+        if not raw_length:
+            return None
+        length = struct.unpack('I', raw_length)[0]
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+class FramingCodec:
+    def __init__(self, rfile, wfile):
+        self.reader = FrameReader(rfile)
+        self.writer = FrameWriter(wfile)
+        self.write = self.writer.write
+        self.read = self.reader.read
+
+class ShortReads(io.RawIOBase):
+    """readinto가 한 번에 최대 3바이트만 채우는 스트림 (짧은 읽기 재현)"""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, view):
+        n = min(3, len(view), len(self.data) - self.pos)
+        view[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+def frame(message):
+    body = json.dumps(message).encode('utf-8')
+    return struct.pack('I', len(body)) + body
+
+def check_behaviour():
+    """짧은 읽기, 크기 제한, 잘린 프레임"""
+    messages = [{'action': 'search', 'query': 'x' * n, 'id': n} for n in (0, 10, 5000)]
+    reader = FrameReader(ShortReads(b''.join(frame(m) for m in messages)))
+    assert [reader.read() for _ in messages] == messages
+    assert reader.read() is None
+    
+    try:
+        FrameWriter(io.BytesIO()).write({'results': 'x' * framing.MAX_OUTBOUND_BYTES})
+        raise AssertionError('outbound limit not enforced')
+    except MessageTooLarge:
+        pass
+    
+    big = {'query': 'y' * 2000}
+    reader = FrameReader(io.BytesIO(frame(big) + frame(messages[1])), max_bytes=1000)
+    try:
+        reader.read()
+        raise AssertionError('inbound limit not enforced')
+    except MessageTooLarge:
+        pass
+    assert reader.read() == messages[1], 'stream not resynchronised after oversized message'
+    
+    try:
+        FrameReader(io.BytesIO(frame(big)[:-10])).read()
+        raise AssertionError('truncated body not detected')
+    except TruncatedFrame:
+        pass
+    try:
+        FrameReader(io.BytesIO(b'\x05\x00\x00\x00{"a"')).read()
+        raise AssertionError('truncated body not detected')
+    except TruncatedFrame:
+        pass
+    try:
+        FrameReader(io.BytesIO(struct.pack('I', 3) + b'{x}')).read()
+        raise AssertionError('invalid JSON not detected')
+    except FrameError:
+        pass
+    
+    # 보관 버퍼보다 큰 메시지: read가 있는 스트림 / readinto만 있는 스트림(데몬의 named pipe)
+    huge = {'results': 'z' * (framing._RETAINED_BUFFER + 10)}
+    data = frame(huge) + frame(messages[2])
+    for stream in (io.BytesIO(data), ShortReads(data)):
+        reader = FrameReader(stream)
+        assert reader.read() == huge and reader.read() == messages[2], 'large message misread'
+        assert len(reader._buffer) <= framing._RETAINED_BUFFER, 'large buffer retained'
+    
+    # writev가 없는 경우 (Windows)
+    for message in (messages[1], {'results': 'w' * 200000}):
+        out = io.BytesIO()
+        writer = FrameWriter(out)
+        writer._fd = None
+        writer.write(message)
+        assert out.getvalue() == frame(message), 'non-writev frame mismatch'
+
+def make_message(size):
+    """JSON 크기가 size 근처인 결과 응답"""
+    paths = []
+    total = 40
+    i = 0
+    while total < size:
+        path = f"C:\\data\\folder{i % 97:03d}\\report_{i:07d}.txt"
+        paths.append(path)
+        total += len(json.dumps(path)) + 1
+        i += 1
+    return {'partial': True, 'results': paths, 'id': 1}
+
+def best_round_trip(codec_class, message, count, repeat=3):
+    """스케줄링 잡음을 줄이려고 여러 번 재서 가장 빠른 값"""
+    return min(round_trip(codec_class, message, count) for _ in range(repeat))
+
+def round_trip(codec_class, message, count):
+    """파이프 한쪽에서 count개를 쓰고 다른 쪽 스레드에서 읽는 데 걸린 시간"""
+    rfd, wfd = os.pipe()
+    rfile = os.fdopen(rfd, 'rb')
+    wfile = os.fdopen(wfd, 'wb')
+    received = []
+    
+    def consume():
+        codec = codec_class(rfile, None)
+        for _ in range(count):
+            received.append(codec.read())
+    
+    thread = threading.Thread(target=consume)
+    thread.start()
+    codec = codec_class(None, wfile)
+    start = time.perf_counter()
+    for _ in range(count):
+        codec.write(message)
+    thread.join()
+    elapsed = time.perf_counter() - start
+    wfile.close()
+    rfile.close()
+    assert len(received) == count and received[-1] == message
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000,100000,1000000')
+    parser.add_argument('--bytes-per-size', type=int, default=20 * 1024 * 1024,
+                        help='크기마다 주고받을 총 바이트 (메시지 수 결정)')
+    args = parser.parse_args()
+    
+    check_behaviour()
+    
+    backends = ['json']
+    if framing.use_fast_json() != 'json':
+        backends.append(framing.JSON_BACKEND)
+    
+    report = {'checks': 'ok', 'backends': backends, 'sizes': {}}
+    for size in [int(s) for s in args.sizes.split(',') if s]:
+        message = make_message(size)
+        count = max(20, min(10000, args.bytes_per_size // size))
+        actual = len(json.dumps(message))
+        entry = {'message_bytes': actual, 'count': count}
+        
+        # 표준 json으로 되돌려서 예전 방식과 같은 조건에서 비교
+        framing.dumps, framing.loads, framing.JSON_BACKEND = framing_json
+        for name, codec in (('legacy', LegacyCodec), ('framing_json', FramingCodec)):
+            elapsed = best_round_trip(codec, message, count)
+            entry[name] = {'us_per_msg': round(elapsed / count * 1e6, 1),
+                           'mb_per_sec': round(actual * count / elapsed / 1e6, 1)}
+        if len(backends) > 1:
+            framing.dumps, framing.loads, framing.JSON_BACKEND = fast_json
+            elapsed = best_round_trip(FramingCodec, message, count)
+            entry[f'framing_{backends[1]}'] = {'us_per_msg': round(elapsed / count * 1e6, 1),
+                                               'mb_per_sec': round(actual * count / elapsed / 1e6, 1)}
+        report['sizes'][str(size)] = entry
+    print(json.dumps(report, indent=2))
+    return 0
+
+framing_json = (framing.dumps, framing.loads, framing.JSON_BACKEND)
+framing.use_fast_json()
+fast_json = (framing.dumps, framing.loads, framing.JSON_BACKEND)
+framing.dumps, framing.loads, framing.JSON_BACKEND = framing_json
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""검색 기록(SQLite WAL + FTS5)과 suggest 자동 완성 측정
+
+- 기록 100,000건 (서로 다른 검색어 수만 개, 자주 쓰는 검색어는 여러 번)을 만든 뒤
+  빈 접두어(최근 목록), 1~3글자 접두어, 단어 중간 접두어의 suggest 지연 시간
+- 세션 호스트를 거친 suggest 왕복 시간과 호스트가 잰 처리 시간
+- 최대 개수를 넘겼을 때 배치 정리 시간
+- 호스트 프로세스마다 한 건씩만 쓸 때도 history_max_entries + COMPACT_SLACK을 넘지 않는지
+  (sendNativeMessage처럼 메시지마다 새 프로세스, 넘으면 종료 코드 1)
+
+사용법: python benchmarks/bench_history.py [--entries 100000] [-n 300]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import string
+import tempfile
+import argparse
+
+from host_client import (PROJECT_DIR, encode_message, read_frame, host_env, spawn_host,
+                         summarize)
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+import history
+
+WORDS = ['report', 'invoice', 'backup', 'photo', 'project', 'readme', 'setup', 'draft',
+         'budget', 'meeting', 'notes', 'design', 'release', 'build', 'config', 'archive']
+EXTENSIONS = ['pdf', 'docx', 'xlsx', 'txt', 'md', 'jpg', 'png', 'zip', 'py', 'log']
+
+def make_query(rng):
+    kind = rng.random()
+    word = rng.choice(WORDS)
+    if kind < 0.4:
+        return f"{word}_{rng.randrange(100000)}.{rng.choice(EXTENSIONS)}"
+    if kind < 0.7:
+        return f"C:\\Users\\dev\\{rng.choice(WORDS)}\\{word} {rng.randrange(5000)}.{rng.choice(EXTENSIONS)}"
+    if kind < 0.9:
+        return ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(1, 4)))
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randrange(3, 12)))
+
+def populate(count, seed=1):
+    """검색 count건을 기록 (일부 검색어는 반복)"""
+    rng = random.Random(seed)
+    popular = [make_query(rng) for _ in range(500)]
+    started = time.perf_counter()
+    batch = 1000
+    for start in range(0, count, batch):
+        for _ in range(min(batch, count - start)):
+            query = rng.choice(popular) if rng.random() < 0.3 else make_query(rng)
+            history.record(query, 'es', 'found' if rng.random() < 0.8 else 'empty', rng.randrange(50))
+        history.flush()
+    return (time.perf_counter() - started) * 1000
+
+def time_suggest(prefixes, count):
+    rows = {}
+    for name, prefix in prefixes.items():
+        latencies = []
+        found = 0
+        for _ in range(count):
+            start = time.perf_counter()
+            found = len(history.suggest(prefix, 10))
+            latencies.append((time.perf_counter() - start) * 1000)
+        rows[name] = dict(summarize(latencies), prefix=prefix, suggestions=found)
+    return rows
+
+def through_host(db_file, prefixes, count):
+    proc = spawn_host(host_env(EE_HISTORY_FILE=db_file))
+    rows = {}
+    request_id = 0
+    for name, prefix in prefixes.items():
+        round_trips = []
+        host_ms = []
+        for _ in range(count):
+            request_id += 1
+            start = time.perf_counter()
+            proc.stdin.write(encode_message({'action': 'suggest', 'prefix': prefix, 'id': request_id}))
+            proc.stdin.flush()
+            response = read_frame(proc.stdout)
+            round_trips.append((time.perf_counter() - start) * 1000)
+            host_ms.append(response['elapsed_ms'])
+        rows[name] = {'round_trip': summarize(round_trips), 'host': summarize(host_ms)}
+    proc.stdin.close()
+    proc.wait()
+    return rows
+
+WRITER = r"""
+import sys
+sys.path.insert(0, {host_dir!r})
+import history
+history.HISTORY_FILE = {db_file!r}
+history.record(sys.argv[1], 'es', 'found', 1)
+history.flush()
+history.close()
+"""
+
+def per_process_writes(workdir, processes):
+    """기록이 max_entries + COMPACT_SLACK개인 DB에 프로세스 processes개가 한 건씩 쓴 뒤의 기록 수"""
+    import subprocess
+
+    db_file = os.path.join(workdir, "per_process.db")
+    config_file = os.path.join(workdir, "everything_config.json")
+    max_entries = 1000
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump({'history_max_entries': max_entries}, f)
+    history.close()
+    history.HISTORY_FILE = db_file
+    rng = random.Random(4)
+    for _ in range(max_entries + history.COMPACT_SLACK):
+        history.record(make_query(rng), 'es', 'found', 1)
+    history.flush()
+    history.close()
+    before = count_rows(db_file)['searches']
+
+    script = WRITER.format(host_dir=str(PROJECT_DIR / "native-host"), db_file=db_file)
+    env = host_env(EE_CONFIG_FILE=config_file)
+    for n in range(processes):
+        subprocess.run([sys.executable, '-c', script, f'process query {n}'], env=env, check=True)
+    return {
+        'max_entries': max_entries,
+        'slack': history.COMPACT_SLACK,
+        'rows_before': before,
+        'processes': processes,
+        'rows_after': count_rows(db_file)['searches'],
+    }
+
+def count_rows(db_file):
+    import sqlite3
+    conn = sqlite3.connect(db_file)
+    try:
+        return {table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                for table in ('searches', 'queries')}
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('-n', '--count', type=int, default=300)
+    args = parser.parse_args()
+
+    db_file = os.path.join(tempfile.mkdtemp(prefix="ee_bench_"), "search_history.db")
+    history.HISTORY_FILE = db_file
+    report = {'entries': args.entries}
+    report['populate_ms'] = round(populate(args.entries), 1)
+    report['rows'] = count_rows(db_file)
+
+    prefixes = {
+        'recent': '',
+        '1_char': 'r',
+        '2_chars': 're',
+        '3_chars': 'rep',
+        'path_prefix': 'C:\\Users\\dev\\bu',
+        'word_in_middle': 'meeting 12',
+        'no_match': 'zzzzqq',
+    }
+    # 첫 질의는 페이지 캐시를 채우므로 따로 기록
+    start = time.perf_counter()
+    history.suggest('r', 10)
+    report['first_suggest_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    report['suggest'] = time_suggest(prefixes, args.count)
+    report['host'] = through_host(db_file, prefixes, max(20, args.count // 5))
+
+    # 최대 개수를 넘기면 배치로 정리되는지
+    extra = args.entries // 5
+    start = time.perf_counter()
+    populate(extra, seed=2)
+    history.flush()
+    rng = random.Random(3)
+    history.record(make_query(rng), 'es', 'found', 1)
+    compact_start = time.perf_counter()
+    history.flush(max_entries=args.entries)
+    report['compaction'] = {
+        'added': extra,
+        'compact_ms': round((time.perf_counter() - compact_start) * 1000, 1),
+        'rows_after': count_rows(db_file),
+    }
+    history.close()
+    report['db_bytes'] = os.path.getsize(db_file)
+    per_process = per_process_writes(os.path.dirname(db_file), 5)
+    report['per_process_writes'] = per_process
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    worst = max(row['p99_ms'] for row in report['suggest'].values())
+    bounded = per_process['rows_after'] <= per_process['max_entries'] + per_process['slack']
+    return 0 if worst < 5 and bounded else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
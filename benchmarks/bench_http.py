@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Everything HTTP 백엔드 벤치마크 (로컬 가짜 HTTP 서버)
+
+연결 재사용(keep-alive 풀) 유무에 따른 순차/동시 검색 처리량과,
+서버가 죽었을 때 circuit breaker가 요청을 얼마나 빨리 끊는지 측정한다.
+연결 관리도 확인한다 (하나라도 틀리면 종료 코드 1):
+- 서버가 쉬고 있던 keep-alive 연결을 끊었을 때 새 연결로 다시 요청해서 성공하고 실패로 세지 않는지
+- 읽지 않고 버린 페이지 결과의 연결이 닫히는지
+- http_timeout/http_pool_size가 잘못된 설정이면 기본값으로 클라이언트를 만드는지
+- http_keepalive가 "false" 문자열이면 keep-alive를 끄는지
+- https나 잘못된 http_url이면 auto 백엔드 선택이 예외 없이 다음 백엔드로 넘어가는지
+
+사용법: python benchmarks/bench_http.py [-n 500] [--concurrency 8] [--page 50]
+"""
+
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from host_client import PROJECT_DIR, summarize
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+import everything_http
+
+TOTAL_RESULTS = 100000
+
+class StubEverythingHandler(BaseHTTPRequestHandler):
+    """Everything HTTP 서버의 json=1 응답 흉내"""
+
+    protocol_version = 'HTTP/1.1'
+    # 헤더와 본문을 따로 쓰므로 Nagle이 켜져 있으면 keep-alive 응답이 지연 ACK(~40ms)에 걸린다
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        params = parse_qs(urlsplit(self.path).query)
+        term = params.get('search', [''])[0]
+        offset = int(params.get('offset', ['0'])[0])
+        count = int(params.get('count', ['100'])[0])
+        end = min(TOTAL_RESULTS, offset + count)
+        body = json.dumps({
+            'totalResults': TOTAL_RESULTS,
+            'results': [{'type': 'file', 'name': f'{term}_{n:06d}.txt',
+                         'path': f'C:\\data\\dir{n // 1000:04d}'} for n in range(offset, end)]
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def setup(self):
+        super().setup()
+        self.server.connections.add(self.connection)
+
+    def finish(self):
+        self.server.connections.discard(self.connection)
+        super().finish()
+
+    def log_message(self, *args):
+        pass
+
+def start_stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubEverythingHandler)
+    server.daemon_threads = True
+    # 서버 쪽 연결 (쉬는 연결 끊기 재현용)
+    server.connections = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def make_client(url, keepalive, pool_size):
+    return everything_http.EverythingHttpClient(
+        url, timeout=2.0, pool_size=pool_size, keepalive=keepalive,
+        circuit=everything_http.CircuitBreaker(state_file=None))
+
+def one_query(client, i, page):
+    start = time.perf_counter()
+    paths = list(client.search(f'file{i % 50}', offset=(i * 37) % 5000, limit=page))
+    assert len(paths) == page, len(paths)
+    return (time.perf_counter() - start) * 1000
+
+def bench(url, count, concurrency, page, keepalive):
+    client = make_client(url, keepalive, max(1, concurrency))
+    start = time.perf_counter()
+    if concurrency <= 1:
+        latencies = [one_query(client, i, page) for i in range(count)]
+    else:
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = list(pool.map(lambda i: one_query(client, i, page), range(count)))
+    elapsed = time.perf_counter() - start
+    result = summarize(latencies)
+    result.update(queries_per_sec=round(count / elapsed, 1),
+                  connections_created=client.pool.created,
+                  connections_reused=client.pool.reused)
+    client.close()
+    return result
+
+def bench_circuit(count):
+    """닫힌 포트로 요청: threshold번 실패 후에는 연결 시도 없이 바로 실패"""
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    
+    client = make_client(f'http://127.0.0.1:{port}/', True, 1)
+    latencies = []
+    errors = set()
+    for i in range(count):
+        start = time.perf_counter()
+        try:
+            list(client.search('x', limit=10))
+        except everything_http.HttpBackendError as e:
+            errors.add(str(e).split(':')[0])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {'requests': count, 'errors': sorted(errors),
+            'first_ms': round(latencies[0], 3), 'after_open': summarize(latencies[3:])}
+
+def drop_server_connections(server):
+    """서버가 쉬고 있던 keep-alive 연결을 모두 끊음 (Everything 재시작, 유휴 타임아웃 등)"""
+    for conn in list(server.connections):
+        try:
+            conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    time.sleep(0.05)
+
+def check_connections(server, url):
+    client = make_client(url, True, 2)
+    list(client.search('warm', limit=10))
+    drop_server_connections(server)
+    try:
+        stale_ok = len(list(client.search('after_drop', limit=10))) == 10
+    except everything_http.HttpBackendError:
+        stale_ok = False
+    report = {
+        'stale_keepalive_retried': stale_ok,
+        'stale_circuit_failures': client.circuit.failures,
+        'connections_created': client.pool.created,
+    }
+
+    # 읽지 않고 버린 페이지: 연결이 풀로 돌아가지도, 열린 채로 남지도 않는다
+    total, paths = client.search_page('unread', 0, 10)
+    conn = paths._conn
+    del paths
+    report['unread_page_closed'] = conn.sock is None and conn not in client.pool._idle
+    client.close()
+
+    everything_http._shared_client = None
+    bad = everything_http.get_client({'http_url': url, 'http_timeout': 'fast', 'http_pool_size': [4]})
+    report['bad_config_defaults'] = (bad.pool.timeout == everything_http.DEFAULT_TIMEOUT
+                                     and bad.pool.size == everything_http.DEFAULT_POOL_SIZE)
+    bad.close()
+    everything_http._shared_client = None
+
+    off = everything_http.get_client({'http_url': url, 'http_keepalive': 'false'})
+    report['keepalive_string_false'] = off.pool.keepalive is False
+    off.close()
+    everything_http._shared_client = None
+
+    import backends
+    fallthrough = {}
+    for bad_url in ('https://127.0.0.1:8080', 'http://127.0.0.1:notaport/'):
+        try:
+            name, _ = backends.resolve_query_backend({'http_url': bad_url, 'backend': 'auto'})
+            fallthrough[bad_url] = name != 'http'
+        except Exception as e:
+            fallthrough[bad_url] = f'{type(e).__name__}: {e}'
+    report['bad_url_falls_through'] = fallthrough
+    everything_http._shared_client = None
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--page', type=int, default=50)
+    args = parser.parse_args()
+    
+    server = start_stub_server()
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+    results = {}
+    for keepalive in (True, False):
+        label = 'keepalive' if keepalive else 'no_reuse'
+        results[f'sequential_{label}'] = bench(url, args.count, 1, args.page, keepalive)
+        results[f'concurrent_{label}'] = bench(url, args.count, args.concurrency, args.page, keepalive)
+    results['circuit_breaker'] = bench_circuit(20)
+    results['connections'] = check_connections(server, url)
+    server.shutdown()
+    
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    checks = results['connections']
+    ok = (checks['stale_keepalive_retried'] and checks['stale_circuit_failures'] == 0
+          and checks['connections_created'] == 2 and checks['unread_page_closed']
+          and checks['bad_config_defaults'] and checks['keepalive_string_false']
+          and all(value is True for value in checks['bad_url_falls_through'].values()))
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
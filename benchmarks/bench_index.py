@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""내장 파일 이름 인덱스 벤치마크 (생성된 트리 기준)
+
+인덱스 생성 시간, 파일 크기, 로드 시간, 검색 p50/p99, 증분 갱신 시간을 측정하고,
+증분 갱신한 인덱스의 검색 결과가 처음부터 다시 만든 인덱스와 같은지 확인한다 (다르면 종료 코드 1).
+
+사용법: python benchmarks/bench_index.py [--files 1000000] [--per-dir 1000] [--tree DIR]
+트리는 한 번 만들어 두면 --tree로 재사용할 수 있다.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from itertools import islice
+
+from host_client import PROJECT_DIR, summarize
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+import filename_index
+
+WORDS = ['report', 'invoice', 'build', 'backup', 'photo', 'draft', 'final', 'log',
+         'config', 'notes', 'budget', 'design', 'scan', 'export', 'video', 'data']
+EXTS = ['.txt', '.pdf', '.docx', '.xlsx', '.jpg', '.png', '.log', '.zip', '.py', '.mp4']
+
+def generate_tree(root, files, per_dir, seed=1):
+    """files개의 빈 파일을 per_dir개씩 하위 폴더에 생성"""
+    rng = random.Random(seed)
+    dirs = (files + per_dir - 1) // per_dir
+    for d in range(dirs):
+        directory = os.path.join(root, f"proj{d // 100:03d}", f"folder{d:05d}")
+        os.makedirs(directory, exist_ok=True)
+        for i in range(min(per_dir, files - d * per_dir)):
+            name = f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{d:05d}_{i:04d}{rng.choice(EXTS)}"
+            open(os.path.join(directory, name), 'wb').close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=1000000)
+    parser.add_argument('--per-dir', type=int, default=1000)
+    parser.add_argument('--tree', help='기존 트리 재사용 (없으면 생성)')
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix="ee_index_")
+    tree = args.tree or os.path.join(workdir, "tree")
+    index_file = os.path.join(workdir, "filename_index.bin")
+    
+    results = {}
+    if not os.path.isdir(tree):
+        start = time.perf_counter()
+        generate_tree(tree, args.files, args.per_dir)
+        results['generate_s'] = round(time.perf_counter() - start, 2)
+    
+    build = filename_index.update_index([tree], index_file, full=True)
+    results['build_ms'] = build['elapsed_ms']
+    results['entries'] = build['entries']
+    results['dirs'] = build['dirs']
+    results['size_bytes'] = build['size_bytes']
+    
+    start = time.perf_counter()
+    index = filename_index.open_index(index_file)
+    results['load_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    
+    rng = random.Random(2)
+    queries = []
+    for _ in range(args.queries):
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(rng.choice(WORDS)[:rng.randint(3, 6)])
+        elif kind < 0.7:
+            queries.append(f"{rng.choice(WORDS)} {rng.choice(EXTS)}")
+        else:
+            # 드문 검색어 (특정 폴더 번호)
+            queries.append(f"_{rng.randrange(max(1, results['dirs'])):05d}_{rng.randrange(args.per_dir):04d}")
+    
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        list(islice(index.search(query), args.limit))
+        latencies.append((time.perf_counter() - start) * 1000)
+    results['query'] = summarize(latencies)
+    results['query']['max_ms'] = round(max(latencies), 3)
+    index.close()
+    
+    # 폴더 10개만 바꾸고 증분 갱신
+    changed = 0
+    for dirpath, dirnames, filenames in os.walk(tree):
+        if filenames:
+            open(os.path.join(dirpath, f"bench_new_{changed}.txt"), 'wb').close()
+            changed += 1
+            if changed == 10:
+                break
+    update = filename_index.update_index([tree], index_file)
+    results['incremental_update_ms'] = update['elapsed_ms']
+    results['incremental_mode'] = update['mode']
+    results['incremental_changed_dirs'] = changed
+    results['incremental_dead_entries'] = update['dead_entries']
+    
+    # 같은 트리를 처음부터 다시 만든 인덱스와 검색 결과 비교
+    rebuilt_file = os.path.join(workdir, "filename_index_full.bin")
+    rebuilt = filename_index.update_index([tree], rebuilt_file, full=True)
+    results['rebuild_ms'] = rebuilt['elapsed_ms']
+    incremental = filename_index.open_index(index_file)
+    full = filename_index.open_index(rebuilt_file)
+    mismatches = [query for query in queries[:100] + ['bench_new']
+                  if sorted(incremental.search(query)) != sorted(full.search(query))]
+    incremental.close()
+    full.close()
+    results['incremental_matches_full'] = not mismatches and update['entries'] == rebuilt['entries']
+    
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    return 0 if results['incremental_matches_full'] and update['mode'] == 'incremental' else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""설치 프로그램의 확장 프로그램 ID 계산과 프로필 검색 확인/측정
+
+가짜 사용자 데이터 디렉토리(브라우저 여러 개, Local State에 등록된 프로필 여러 개,
+프로필마다 확장 프로그램 수백 개)를 만들어서
+- 경로/키로 계산한 ID가 크롬과 같은 규칙인지 (알려진 값과 비교)
+- 예전 방식(고정 프로필 4개, 모든 manifest 읽기)과 새 검색의 결과와 시간
+을 비교한다. Windows가 아니어도 실행된다.
+
+사용법: python benchmarks/bench_installer.py [--profiles 8] [--extensions 300]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+
+from host_client import PROJECT_DIR
+
+sys.path.insert(0, str(PROJECT_DIR / "installer"))
+import install
+
+def legacy_find_chrome_extensions(chrome_dirs):
+    """예전 find_chrome_extensions (사용자 데이터 디렉토리만 인자로 받도록 바꿈)"""
+    extensions = []
+    for chrome_dir in chrome_dirs:
+        if not os.path.exists(chrome_dir):
+            continue
+        for profile in ["Default", "Profile 1", "Profile 2", "Profile 3"]:
+            extensions_dir = os.path.join(chrome_dir, profile, "Extensions")
+            if not os.path.exists(extensions_dir):
+                continue
+            for ext_id in os.listdir(extensions_dir):
+                ext_path = os.path.join(extensions_dir, ext_id)
+                if not os.path.isdir(ext_path):
+                    continue
+                for version in os.listdir(ext_path):
+                    manifest_path = os.path.join(ext_path, version, "manifest.json")
+                    if os.path.exists(manifest_path):
+                        try:
+                            with open(manifest_path, 'r', encoding='utf-8') as f:
+                                manifest = json.load(f)
+                            if (manifest.get('name') == 'EverythingEverywhere' or
+                                    'everything' in manifest.get('name', '').lower()):
+                                extensions.append({'id': ext_id, 'profile': profile})
+                        except Exception:
+                            continue
+    return extensions
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+def _fake_id(n):
+    return install._id_from_digest(n.to_bytes(16, 'big') * 2)
+
+def build_tree(base, browsers, profiles, extensions, target):
+    """가짜 사용자 데이터 디렉토리들을 만들고 roots 목록 반환
+
+    target: (브라우저, 프로필 번호, 'packed' 또는 'unpacked') 대상 확장 위치
+    """
+    roots = []
+    counter = 0
+    # 어느 설치본에도 넣지 않은 압축해제 폴더 (Preferences에서만 참조)
+    unpacked_dir = os.path.join(base, "unpacked", "chrome-extension")
+    _write_json(os.path.join(unpacked_dir, "manifest.json"),
+                {'name': install.EXTENSION_NAME, 'version': '9.9.9'})
+    for browser in browsers:
+        root = os.path.join(base, browser, "User Data")
+        names = ["Default"] + [f"Profile {i}" for i in range(1, profiles)]
+        _write_json(os.path.join(root, "Local State"),
+                    {'profile': {'info_cache': {name: {'name': name} for name in names}}})
+        for index, name in enumerate(names):
+            profile_dir = os.path.join(root, name)
+            settings = {}
+            for _ in range(extensions):
+                counter += 1
+                ext_id = _fake_id(counter)
+                _write_json(os.path.join(profile_dir, "Extensions", ext_id, "1.0.0_0", "manifest.json"),
+                            {'name': f"Extension {counter}", 'version': '1.0.0',
+                             'description': 'x' * 500})
+                settings[ext_id] = {'path': f"{ext_id}\\1.0.0_0", 'location': 1}
+            if target[:2] == (browser, index):
+                if target[2] == 'packed':
+                    ext_id = _fake_id(10 ** 9)
+                    _write_json(os.path.join(profile_dir, "Extensions", ext_id, "1.2.2_0", "manifest.json"),
+                                {'name': install.EXTENSION_NAME, 'version': '1.2.2'})
+                else:
+                    ext_id = install.extension_id_from_path(unpacked_dir)
+                    settings[ext_id] = {'path': unpacked_dir, 'location': 4}
+            _write_json(os.path.join(profile_dir, "Secure Preferences"),
+                        {'extensions': {'settings': settings}})
+        roots.append((browser, root))
+    return roots, unpacked_dir
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+def check_ids():
+    """Chromium id_util 테스트의 알려진 값과 비교"""
+    import hashlib
+    assert install._id_from_digest(hashlib.sha256(b'test').digest()) == 'jpignaibiiemhngfjkcpokkamffknabf'
+    assert install._id_from_digest(hashlib.sha256(b'_').digest()) == 'ncocknphbhhlhkikpnnlmbcnbgdempcd'
+    # Windows 경로는 UTF-16LE로, 드라이브 문자는 대문자로 바꿔서 해시
+    lower = install.extension_id_from_path(r"c:\ext\chrome-extension", windows=True)
+    upper = install.extension_id_from_path(r"C:\ext\chrome-extension", windows=True)
+    expected = install._id_from_digest(hashlib.sha256(r"C:\ext\chrome-extension".encode('utf-16-le')).digest())
+    assert lower == upper == expected
+    assert install.extension_id_from_path("/ext/chrome-extension", windows=False) != expected
+    return expected
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', type=int, default=8, help='브라우저마다 프로필 수')
+    parser.add_argument('--extensions', type=int, default=300, help='프로필마다 확장 프로그램 수')
+    args = parser.parse_args()
+
+    report = {'windows_path_id': check_ids()}
+    base = tempfile.mkdtemp(prefix="ee_bench_")
+    try:
+        browsers = ['Chrome', 'Edge', 'Brave', 'Chromium']
+        last = args.profiles - 1
+        cases = [
+            ('packed_in_default', ('Chrome', 0, 'packed')),
+            ('packed_in_last_profile', ('Brave', last, 'packed')),
+            ('unpacked_in_last_profile', ('Edge', last, 'unpacked')),
+        ]
+        for case, target in cases:
+            case_dir = os.path.join(base, case)
+            roots, unpacked_dir = build_tree(case_dir, browsers, args.profiles, args.extensions, target)
+
+            legacy, legacy_ms = timed(legacy_find_chrome_extensions, [root for _, root in roots])
+            found, scan_ms = timed(install.find_chrome_extensions, roots)
+            everything, all_ms = timed(install.find_chrome_extensions, roots, first_match=False)
+            direct, direct_ms = timed(install.local_extension_id, unpacked_dir)
+
+            assert len(found) == 1 and found[0]['browser'] == target[0], found
+            assert len(everything) == 1, everything
+            if target[2] == 'unpacked':
+                assert found[0]['id'] == direct, (found, direct)
+            report[case] = {
+                'legacy_ms': round(legacy_ms, 2), 'legacy_found': len(legacy),
+                'scan_first_ms': round(scan_ms, 2), 'scan_all_ms': round(all_ms, 2),
+                'found': {k: found[0][k] for k in ('id', 'browser', 'profile')},
+                'path_id_ms': round(direct_ms, 3),
+            }
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    report['tree'] = {'browsers': 4, 'profiles_per_browser': args.profiles,
+                      'extensions_per_profile': args.extensions}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
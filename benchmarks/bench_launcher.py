@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Everything 실행 관리(launcher) 확인: 가짜 Everything.exe가 남긴 호출 기록과 시각으로 검사
+
+세션 호스트 하나에 search를 보내면서
+- 연속 클릭: 같은 검색어를 합치기 창 안에 여러 번 → Everything 실행 1번 (나머지는 coalesced)
+- 인스턴스 재사용: 처음 실행만 -newwindow (인스턴스), 이후 검색어는 -existingwindow로 넘김
+- 동시 실행 제한: 서로 다른 검색어 여러 개 → 검색어를 넘기는 실행이 동시에 launch_max_concurrent개 이하
+- 합치기 창이 지나면 같은 검색어도 다시 실행
+- 회수: 넘기는 실행이 끝난 뒤 호스트의 좀비 자식이 없고, 인스턴스가 끝나면 자식이 하나도 없는지
+- 잘못된 설정 값(launch_coalesce_seconds, launch_max_concurrent)은 기본값으로
+
+POSIX에서만 실행된다 (/proc로 자식 프로세스 상태 확인).
+
+사용법: python benchmarks/bench_launcher.py [--clicks 5] [--queries 8] [--max-concurrent 2]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+
+from host_client import PROJECT_DIR, encode_message, read_frame, host_env, spawn_host, make_stub_everything
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+import launcher
+
+def children(pid):
+    """pid의 자식 프로세스 {pid: 상태 문자}"""
+    found = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            found[int(entry)] = fields[0]
+    return found
+
+def max_overlap(records):
+    """기록된 실행들의 최대 동시 실행 수"""
+    events = sorted([(r['start'], 1) for r in records] + [(r['end'], -1) for r in records],
+                    key=lambda event: (event[0], event[1]))
+    current = peak = 0
+    for _, delta in events:
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+def read_launches(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+class Session:
+    def __init__(self, env):
+        self.proc = spawn_host(env)
+        self.next_id = 0
+
+    def search(self, query):
+        self.next_id += 1
+        start = time.perf_counter()
+        self.proc.stdin.write(encode_message({'action': 'search', 'query': query, 'id': self.next_id}))
+        self.proc.stdin.flush()
+        response = read_frame(self.proc.stdout)
+        return response, (time.perf_counter() - start) * 1000
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+def wait_until(predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return predicate()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clicks', type=int, default=5, help='같은 검색어 연속 클릭 수')
+    parser.add_argument('--queries', type=int, default=8, help='서로 다른 검색어 수')
+    parser.add_argument('--max-concurrent', type=int, default=2)
+    parser.add_argument('--window', type=float, default=0.5, help='합치기 창 (초)')
+    parser.add_argument('--forward-seconds', type=float, default=0.3, help='가짜 실행이 검색어를 넘기는 시간')
+    parser.add_argument('--instance-seconds', type=float, default=4.0, help='가짜 인스턴스가 떠 있는 시간')
+    args = parser.parse_args()
+    if os.name == 'nt':
+        print("POSIX only", file=sys.stderr)
+        return 2
+
+    workdir = tempfile.mkdtemp(prefix="ee_bench_")
+    stub, _ = make_stub_everything(workdir)
+    launch_log = os.path.join(workdir, "launches.jsonl")
+    config_file = os.path.join(workdir, "everything_config.json")
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump({'launch_max_concurrent': args.max_concurrent,
+                   'launch_coalesce_seconds': args.window}, f)
+    env = host_env(stub, EE_CONFIG_FILE=config_file,
+                   EE_HISTORY_FILE=os.path.join(workdir, "history.db"),
+                   EE_METRICS_DIR=os.path.join(workdir, "metrics"),
+                   EE_STUB_LAUNCH_LOG=launch_log,
+                   EE_STUB_INSTANCE_SECONDS=args.instance_seconds,
+                   EE_STUB_FORWARD_SECONDS=args.forward_seconds)
+
+    session = Session(env)
+    report = {}
+
+    clicks = [session.search('same query') for _ in range(args.clicks)]
+    report['repeated_clicks'] = {
+        'clicks': args.clicks,
+        'launch': [response.get('launch') for response, _ in clicks],
+        'ms': [round(ms, 1) for _, ms in clicks],
+    }
+
+    queries = [session.search(f'query {n}') for n in range(args.queries)]
+    report['distinct_queries'] = {
+        'queries': args.queries,
+        'launch': [response.get('launch') for response, _ in queries],
+        'ms': [round(ms, 1) for _, ms in queries],
+    }
+
+    time.sleep(args.window)
+    again, _ = session.search('same query')
+    report['after_window'] = again.get('launch')
+
+    # 넘기는 실행이 모두 끝날 때까지 기다린 뒤 자식 상태
+    host_pid = session.proc.pid
+    wait_until(lambda: len(read_launches(launch_log)) >= args.queries + 1, args.forward_seconds * 20 + 5)
+    time.sleep(0.2)
+    after_forward = children(host_pid)
+    wait_until(lambda: not children(host_pid), args.instance_seconds + 5)
+    after_instance = children(host_pid)
+    session.close()
+
+    launches = read_launches(launch_log)
+    instances = [r for r in launches if '-newwindow' in r['args']]
+    forwarded = [r for r in launches if '-existingwindow' in r['args']]
+    report['stub'] = {
+        'invocations': len(launches),
+        'new_window': len(instances),
+        'existing_window': len(forwarded),
+        'max_concurrent_forwarded': max_overlap(forwarded),
+    }
+    report['reaping'] = {
+        'children_after_forwarded_exit': after_forward,
+        'zombies_after_forwarded_exit': sum(state == 'Z' for state in after_forward.values()),
+        'children_after_instance_exit': len(after_instance),
+    }
+    report['bad_settings'] = list(launcher._settings({'launch_coalesce_seconds': 'soon',
+                                                      'launch_max_concurrent': None}))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    ok = (report['bad_settings'] == [launcher.DEFAULT_COALESCE_SECONDS, launcher.DEFAULT_MAX_CONCURRENT, False]
+          and report['repeated_clicks']['launch'] == ['started'] + ['coalesced'] * (args.clicks - 1)
+          and all(launch == 'forwarded' for launch in report['distinct_queries']['launch'])
+          and report['after_window'] == 'forwarded'
+          and report['stub']['new_window'] == 1
+          and report['stub']['existing_window'] == args.queries + 1
+          and report['stub']['max_concurrent_forwarded'] <= args.max_concurrent
+          and report['reaping']['zombies_after_forwarded_exit'] == 0
+          and len(after_forward) <= 1
+          and not after_instance)
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
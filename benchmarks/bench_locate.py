@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""locate 데이터베이스 백엔드 벤치마크 (로컬에서 생성한 mlocate.db / LOCATE02)
+
+초당 확인한 경로 수(paths/s)와 호스트 query 액션의 응답 시간을 보고한다.
+
+updatedb가 설치되어 있으면 (mlocate 또는 findutils) 작은 실제 디렉토리 트리를 색인해서 만든
+데이터베이스로 검색 결과를 os.walk 결과와 비교한다 (하위 디렉토리 항목, 공백, 한글, 대소문자 포함).
+읽을 수 없는 데이터베이스(배포판의 root:mlocate 0640, open을 PermissionError로 바꿔서 재현)는
+건너뛰고 다음 후보나 다음 백엔드로 넘어가는지도 확인한다.
+데몬처럼 여러 스레드가 get_locate_db로 검색하는 동안 데이터베이스 파일이 교체되어도
+검색이 예외 없이 끝나는지 확인한다.
+생성한 데이터베이스의 검색 결과나 실제 데이터베이스 비교가 틀리면 종료 코드 1.
+
+사용법: python benchmarks/bench_locate.py [--paths 1000000] [--per-dir 200]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import struct
+import argparse
+import tempfile
+import subprocess
+
+from host_client import (PROJECT_DIR, encode_message, read_frame,
+                         host_env, spawn_host)
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+import locate_db
+
+def generate_dirs(paths, per_dir):
+    """(디렉토리 경로, 파일 이름 목록)을 경로 순서대로 생성"""
+    dirs = (paths + per_dir - 1) // per_dir
+    for d in range(dirs):
+        directory = f"/home/user/projects/proj{d // 100:04d}/src{d:06d}"
+        names = [f"module_{d:06d}_{i:04d}.py" for i in range(min(per_dir, paths - d * per_dir))]
+        yield directory, names
+
+def write_mlocate(path, paths, per_dir):
+    """mlocate.db 형식으로 기록 (updatedb와 같은 구조)"""
+    conf = b'prune_bind_mounts\x000\x00\x00prunefs\x00\x00prunenames\x00\x00prunepaths\x00\x00'
+    with open(path, 'wb') as f:
+        f.write(locate_db.MLOCATE_MAGIC + struct.pack('>IBBH', len(conf), 0, 0, 0))
+        f.write(b'/\x00' + conf)
+        for directory, names in generate_dirs(paths, per_dir):
+            f.write(struct.pack('>QII', 0, 0, 0) + directory.encode() + b'\x00')
+            f.write(b''.join(b'\x00' + n.encode() + b'\x00' for n in names))
+            f.write(b'\x02')
+
+def write_locate02(path, paths, per_dir):
+    """findutils LOCATE02 형식으로 기록 (front compression)"""
+    with open(path, 'wb') as f:
+        f.write(locate_db.LOCATE02_MAGIC)
+        prev = b''
+        count = 0
+        for directory, names in generate_dirs(paths, per_dir):
+            for name in names:
+                full = f"{directory}/{name}".encode()
+                shared = 0
+                limit = min(len(prev), len(full))
+                while shared < limit and prev[shared] == full[shared]:
+                    shared += 1
+                diff = shared - count
+                if -127 <= diff <= 127:
+                    f.write(struct.pack('b', diff))
+                else:
+                    f.write(b'\x80' + struct.pack('>h', diff))
+                f.write(full[shared:] + b'\x00')
+                prev, count = full, shared
+
+def bench_scan(db_path, query):
+    """데이터베이스 전체를 훑는 검색의 처리량"""
+    db = locate_db.open_locate_db(db_path)
+    start = time.perf_counter()
+    matches = sum(1 for _ in db.search(query))
+    elapsed = time.perf_counter() - start
+    result = {
+        'format': db.format,
+        'query': query,
+        'matches': matches,
+        'scanned': db.scanned,
+        'elapsed_ms': round(elapsed * 1000, 1),
+        'paths_per_sec': round(db.scanned / elapsed) if elapsed else 0,
+    }
+    db.close()
+    return result
+
+# 실제 updatedb로 색인할 트리 (디렉토리 안의 파일 경로들)
+FIXTURE_FILES = [
+    'docs/Report 2024.txt',
+    'docs/report_final.PDF',
+    'docs/archive/old/report-1999.doc',
+    'src/main.py',
+    'src/sub dir/helper.py',
+    'src/sub dir/deep/nested/Report.py',
+    '사진/여행 2023/바다.jpg',
+    '사진/README',
+    'empty dir/',
+]
+FIXTURE_QUERIES = ['report', 'sub dir/', 'deep/nested/rep', '여행', '.py', 'no-such-file']
+
+def make_tree(root):
+    for relative in FIXTURE_FILES:
+        path = os.path.join(root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not relative.endswith('/'):
+            with open(path, 'w') as f:
+                f.write('x')
+
+def expected_paths(root, query):
+    """locate와 같은 기준(전체 경로 부분 문자열, ASCII 대소문자 무시)의 기대 결과 (root 자체 제외)"""
+    needle = query.lower()
+    found = set()
+    for directory, dirs, files in os.walk(root):
+        for name in dirs + files:
+            path = os.path.join(directory, name)
+            if needle in path.lower():
+                found.add(path)
+    return found
+
+def updatedb_command(root, output):
+    """설치된 updatedb 종류에 맞는 명령 (지원하지 않는 종류나 없으면 (None, 이유))"""
+    updatedb = shutil.which('updatedb')
+    if not updatedb:
+        return None, 'updatedb not found'
+    try:
+        version = subprocess.run([updatedb, '--version'], capture_output=True, text=True,
+                                 timeout=30).stdout.lower()
+    except (OSError, subprocess.SubprocessError) as e:
+        return None, f'updatedb --version failed: {e}'
+    if 'plocate' in version:
+        return None, 'plocate updatedb writes plocate.db (not supported)'
+    if 'mlocate' in version:
+        # 시스템 updatedb.conf의 제외 목록(/tmp 등)을 비워서 작업 폴더도 색인되게
+        return [updatedb, '--require-visibility', '0', '--database-root', root, '--output', output,
+                '--prunepaths', '', '--prunefs', '', '--prunenames', '',
+                '--prune-bind-mounts', 'no'], 'mlocate'
+    if 'findutils' in version:
+        return [updatedb, f'--localpaths={root}', f'--output={output}',
+                '--prunepaths=', '--prunefs='], 'findutils'
+    return None, f'unknown updatedb: {version.strip()[:80]}'
+
+def updatedb_fixture(workdir):
+    """실제 updatedb로 만든 데이터베이스의 검색 결과를 os.walk 결과와 비교"""
+    root = os.path.join(workdir, 'tree')
+    output = os.path.join(workdir, 'updatedb.db')
+    make_tree(root)
+    command, kind = updatedb_command(root, output)
+    if command is None:
+        return {'skipped': kind}
+    result = subprocess.run(command, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        return {'updatedb': kind, 'error': result.stderr.strip()[-500:], 'mismatches': ['updatedb failed']}
+
+    db = locate_db.open_locate_db(output)
+    mismatches = []
+    for query in FIXTURE_QUERIES:
+        got = set(db.search(query)) - {root}
+        expected = expected_paths(root, query)
+        if got != expected:
+            mismatches.append({'query': query, 'missing': sorted(expected - got),
+                               'unexpected': sorted(got - expected)})
+    report = {'updatedb': kind, 'format': db.format, 'queries': len(FIXTURE_QUERIES),
+              'mismatches': mismatches}
+    db.close()
+    return report
+
+def unreadable(readable_path, workdir):
+    """읽을 수 없는 데이터베이스는 건너뛰고, auto 백엔드 선택이 예외 없이 끝나는지"""
+    import backends
+
+    denied = os.path.join(workdir, "denied_mlocate.db")
+    shutil.copyfile(readable_path, denied)
+
+    def deny(path, *args, **kwargs):
+        if path == denied:
+            raise PermissionError(13, 'Permission denied', path)
+        return open(path, *args, **kwargs)
+
+    report = {}
+    locate_db.open = deny
+    saved = os.environ.get('LOCATE_PATH')
+    try:
+        os.environ['LOCATE_PATH'] = readable_path
+        report['next_candidate'] = locate_db.find_locate_db({'locate_db': denied}) == readable_path
+        os.environ['LOCATE_PATH'] = denied
+        report['only_unreadable_skipped'] = locate_db.find_locate_db({'locate_db': denied}) != denied
+        # 후보 확인은 통과했지만 여는 데 실패하는 경우 (확인한 뒤 권한이 바뀜 등)
+        locate_db.find_locate_db = lambda config=None: denied
+        try:
+            name, _ = backends.resolve_query_backend({'backend': 'auto'})
+            report['auto_falls_through'] = name != 'locate'
+        except Exception as e:
+            report['auto_falls_through'] = f'{type(e).__name__}: {e}'
+    finally:
+        del locate_db.open
+        locate_db.find_locate_db = find_locate_db
+        if saved is None:
+            os.environ.pop('LOCATE_PATH', None)
+        else:
+            os.environ['LOCATE_PATH'] = saved
+    return report
+
+find_locate_db = locate_db.find_locate_db
+
+def replaced_while_searching(source_path, workdir, query, threads=4, replacements=20):
+    """여러 스레드가 공유 데이터베이스로 검색하는 동안 파일을 교체 (updatedb), 검색 예외 수와 결과 수"""
+    import threading
+
+    path = os.path.join(workdir, "shared_mlocate.db")
+    shutil.copyfile(source_path, path)
+    errors = []
+    counts = set()
+    done = threading.Event()
+
+    def searcher():
+        while not done.is_set():
+            try:
+                counts.add(sum(1 for _ in locate_db.get_locate_db(path).search(query)))
+            except Exception as e:
+                errors.append(f'{type(e).__name__}: {e}')
+                return
+
+    workers = [threading.Thread(target=searcher) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for i in range(replacements):
+        tmp_path = f"{path}.tmp"
+        shutil.copyfile(source_path, tmp_path)
+        # 같은 크기라도 시그니처가 바뀌도록 mtime을 밀어 둠
+        stamp = time.time_ns() + (i + 1) * 1000000
+        os.utime(tmp_path, ns=(stamp, stamp))
+        os.replace(tmp_path, path)
+        time.sleep(0.01)
+    done.set()
+    for worker in workers:
+        worker.join()
+    return {'threads': threads, 'replacements': replacements, 'errors': errors[:5],
+            'match_counts': sorted(counts)}
+
+def bench_host_query(db_path, query):
+    """호스트 query 액션 (첫 페이지) 응답 시간"""
+    proc = spawn_host(host_env(LOCATE_PATH=db_path))
+    start = time.perf_counter()
+    proc.stdin.write(encode_message({'action': 'query', 'id': 1, 'query': query, 'limit': 100}))
+    proc.stdin.flush()
+    while True:
+        response = read_frame(proc.stdout)
+        if response is None or not response.get('partial'):
+            break
+    elapsed = (time.perf_counter() - start) * 1000
+    proc.stdin.close()
+    proc.wait()
+    return {'query': query, 'elapsed_ms': round(elapsed, 1), 'response': response}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--paths', type=int, default=1000000)
+    parser.add_argument('--per-dir', type=int, default=200)
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix="ee_locate_")
+    mlocate_path = os.path.join(workdir, "mlocate.db")
+    locate02_path = os.path.join(workdir, "locatedb")
+    write_mlocate(mlocate_path, args.paths, args.per_dir)
+    write_locate02(locate02_path, args.paths, args.per_dir)
+    
+    rare = f"module_{(args.paths // args.per_dir) - 1:06d}_0001"
+    results = {
+        'paths': args.paths,
+        'mlocate_size_bytes': os.path.getsize(mlocate_path),
+        'locate02_size_bytes': os.path.getsize(locate02_path),
+        'mlocate_no_match': bench_scan(mlocate_path, 'no-such-file'),
+        'mlocate_rare': bench_scan(mlocate_path, rare),
+        'mlocate_path_query': bench_scan(mlocate_path, 'src000042/module'),
+        'locate02_no_match': bench_scan(locate02_path, 'no-such-file'),
+        'locate02_rare': bench_scan(locate02_path, rare),
+        'host_query_mlocate': bench_host_query(mlocate_path, 'module_000042'),
+        'updatedb_fixture': updatedb_fixture(workdir),
+        'unreadable_database': unreadable(mlocate_path, workdir),
+        'replaced_while_searching': replaced_while_searching(mlocate_path, workdir, rare),
+    }
+    json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+    host = results['host_query_mlocate']['response'] or {}
+    checks = {
+        'no_match_empty': all(results[name]['matches'] == 0 and results[name]['scanned'] == args.paths
+                              for name in ('mlocate_no_match', 'locate02_no_match')),
+        'rare_found_once': results['mlocate_rare']['matches'] == results['locate02_rare']['matches'] == 1,
+        'path_query_one_dir': results['mlocate_path_query']['matches'] == min(args.per_dir, args.paths),
+        'host_query_success': bool(host.get('success')) and host.get('backend') == 'locate',
+        'updatedb_fixture_matches': not results['updatedb_fixture'].get('mismatches'),
+        'unreadable_database_skipped': all(value is True for value in results['unreadable_database'].values()),
+        'replaced_while_searching': (not results['replaced_while_searching']['errors']
+                                     and results['replaced_while_searching']['match_counts'] == [1]),
+    }
+    failed = [name for name, passed in checks.items() if not passed]
+    for name in failed:
+        print(f"FAIL: {name}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""로깅 설정별 요청 지연 시간과 로그 크기 비교
+
+큰 선택 영역을 보낸 것처럼 긴 text가 붙은 요청을 세션 하나로 순차 처리한다.
+- sync_full: 큐 없이 바로 쓰고 메시지를 자르지 않음 (예전 방식에 해당)
+- queued: 백그라운드 스레드 기록 + 페이로드 자르기
+- sampled: queued + 10% 샘플링
+- warning: 경고 이상만 기록
+
+사용법: python benchmarks/bench_logging.py [-n 500] [--payload-kb 64]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+
+from host_client import encode_message, read_frame, host_env, spawn_host, summarize
+
+MODES = {
+    'sync_full': {'log_level': 'DEBUG', 'log_async': False, 'log_payload_chars': 0},
+    'queued': {'log_level': 'INFO'},
+    'sampled': {'log_level': 'INFO', 'log_sampling': {'*': 0.1}},
+    'warning': {'log_level': 'WARNING'},
+}
+
+def run_mode(settings, count, payload):
+    directory = tempfile.mkdtemp(prefix="ee_bench_")
+    config_file = os.path.join(directory, "everything_config.json")
+    log_file = os.path.join(directory, "native_host.log")
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump(dict(settings, log_max_bytes=4 * 1024 * 1024, log_backups=2), f)
+    
+    proc = spawn_host(host_env(EE_CONFIG_FILE=config_file, EE_LOG_FILE=log_file))
+    # 첫 응답 뒤에 로깅이 시작되므로 한 번 주고받은 뒤 측정
+    proc.stdin.write(encode_message({'action': 'ping', 'id': 0}))
+    proc.stdin.flush()
+    read_frame(proc.stdout)
+    
+    latencies = []
+    for i in range(1, count + 1):
+        start = time.perf_counter()
+        proc.stdin.write(encode_message({'action': 'ping', 'id': i, 'text': payload}))
+        proc.stdin.flush()
+        read_frame(proc.stdout)
+        latencies.append((time.perf_counter() - start) * 1000)
+    proc.stdin.close()
+    proc.wait()
+    
+    files = [name for name in os.listdir(directory) if name.startswith("native_host.log")]
+    report = summarize(latencies)
+    report['log_bytes'] = sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+    report['log_files'] = len(files)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=500)
+    parser.add_argument('--payload-kb', type=int, default=64)
+    args = parser.parse_args()
+    
+    payload = '\n'.join(f"C:\\data\\folder{i:05d}\\report_{i:07d}.txt"
+                        for i in range(args.payload_kb * 1024 // 40))
+    report = {'payload_bytes': len(payload), 'count': args.count}
+    for mode, settings in MODES.items():
+        report[mode] = run_mode(settings, args.count, payload)
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""지표 스냅샷 동시 합치기(metrics.aggregate) 확인
+
+호스트 종료처럼 스냅샷 파일을 계속 쓰는 프로세스들과 get_metrics(aggregate=true)처럼
+합치기를 반복하는 프로세스들을 동시에 돌린 뒤, 마지막 합계가 쓴 스냅샷 수와 정확히 같은지 확인한다
+(같은 스냅샷을 두 번 더하거나 다른 쪽이 합친 결과를 덮어쓰면 달라짐, 다르면 종료 코드 1).
+비교용으로 잠금 없이 합치는 방식(예전 aggregate)도 같은 조건으로 돌린다.
+
+사용법: python benchmarks/bench_metrics.py [--writers 4] [--snapshots 100] [--aggregators 4]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import subprocess
+
+from host_client import PROJECT_DIR
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+import metrics
+
+WORKER = r"""
+import os, sys, time
+sys.path.insert(0, {host_dir!r})
+import metrics
+role, directory, count, locked = sys.argv[1], sys.argv[2], int(sys.argv[3]), sys.argv[4] == '1'
+for n in range(count):
+    if role == 'writer':
+        # 호스트 한 번 = 스냅샷 하나 = dispatch 관측 하나
+        snapshot = metrics.Metrics()
+        snapshot.observe('ping', 'dispatch', 1.0)
+        path = os.path.join(directory, 'snapshot_%d_%d_%d.json' % (time.time() * 1000, os.getpid(), n))
+        metrics._write_json(path, snapshot.snapshot(summary=False))
+    elif locked:
+        metrics.aggregate(directory, include_current=False)
+    else:
+        # 예전 aggregate: 잠금 없이 읽고, 합쳐서 쓰고, 스냅샷 삭제
+        total = metrics.Metrics()
+        total.processes = 0
+        metrics._merge_files(directory, total)
+"""
+
+def run(directory, writers, snapshots, aggregators, rounds, locked):
+    os.makedirs(directory)
+    script = WORKER.format(host_dir=str(PROJECT_DIR / "native-host"))
+    flag = '1' if locked else '0'
+    start = time.perf_counter()
+    procs = [subprocess.Popen([sys.executable, '-c', script, 'writer', directory, str(snapshots), flag])
+             for _ in range(writers)]
+    procs += [subprocess.Popen([sys.executable, '-c', script, 'aggregator', directory, str(rounds), flag])
+              for _ in range(aggregators)]
+    for proc in procs:
+        proc.wait()
+    elapsed = time.perf_counter() - start
+
+    final = metrics.aggregate(directory, include_current=False)
+    expected = writers * snapshots
+    counted = final['actions'].get('ping', {}).get('count', 0)
+    leftover = [name for name in os.listdir(directory) if name.startswith('snapshot_')]
+    return {
+        'expected': expected,
+        'counted': counted,
+        'processes': final['processes'],
+        'leftover_snapshots': len(leftover),
+        'elapsed_s': round(elapsed, 2),
+        'exit_codes': sorted({proc.returncode for proc in procs}),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--snapshots', type=int, default=100, help='writer마다 쓰는 스냅샷 수')
+    parser.add_argument('--aggregators', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=50, help='aggregator마다 합치는 횟수')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ee_bench_")
+    report = {}
+    for locked in (True, False):
+        name = 'locked' if locked else 'unlocked_legacy'
+        report[name] = run(os.path.join(workdir, name), args.writers, args.snapshots,
+                           args.aggregators, args.rounds, locked)
+    print(json.dumps(report, indent=2))
+
+    locked = report['locked']
+    ok = (locked['counted'] == locked['expected'] and locked['processes'] == locked['expected']
+          and locked['exit_codes'] == [0])
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
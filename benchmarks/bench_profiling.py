@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""요청별 프로파일링(profiling 모듈) 비용과 동작 확인
+
+- 꺼져 있을 때: 메시지 루프가 하는 확인(EE_PROFILE, 메시지의 profile 키)의 메시지당 비용과
+  세션 호스트 ping/get_status 지연 시간, 프로필 디렉토리가 생기지 않는지
+- 켜져 있을 때: profile=cpu / mem / all 메시지의 지연 시간 (비교용)
+- 회전: MAX_PROFILES개보다 많이 저장해도 요약 json과 .prof가 MAX_PROFILES개씩만 남는지
+- get_profiles: 최근 것부터, 요약에 top_functions / allocations가 들어 있는지
+- 다른 루프: asyncio 루프(EE_HOST_LOOP=async)와 공유 데몬(relay, POSIX)에서도 profile 값으로 프로필이 남는지
+
+사용법: python benchmarks/bench_profiling.py [-n 300]
+"""
+
+import os
+import sys
+import json
+import time
+import timeit
+import tempfile
+import argparse
+
+from host_client import PROJECT_DIR, encode_message, read_frame, host_env, spawn_host, summarize
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+import profiling
+
+def round_trip(proc, message):
+    proc.stdin.write(encode_message(message))
+    proc.stdin.flush()
+    return read_frame(proc.stdout)
+
+def latencies(proc, message, count):
+    rows = []
+    response = None
+    for i in range(count):
+        start = time.perf_counter()
+        response = round_trip(proc, dict(message, id=i))
+        rows.append((time.perf_counter() - start) * 1000)
+    return summarize(rows), response
+
+def check_cost(count=1000000):
+    """꺼져 있을 때 메시지마다 하는 확인의 비용 (ns)"""
+    seconds = timeit.timeit("PROFILE_ENV or 'profile' in message",
+                            setup="PROFILE_ENV = None; message = {'action': 'get_status', 'id': 1}",
+                            number=count)
+    return round(seconds / count * 1e9, 1)
+
+def files(directory, suffix):
+    try:
+        return sorted(name for name in os.listdir(directory) if name.endswith(suffix))
+    except OSError:
+        return []
+
+def other_loop(workdir, loop):
+    """EE_HOST_LOOP 루프에서 profile 값을 붙인 요청의 프로필이 남는지 (저장된 액션 목록, ping 응답)"""
+    profile_dir = os.path.join(workdir, f"profiles-{loop}")
+    env = host_env(EE_HOST_LOOP=loop, EE_PROFILE_DIR=profile_dir,
+                   EE_CONFIG_FILE=os.path.join(workdir, "everything_config.json"),
+                   EE_HISTORY_FILE=os.path.join(workdir, "history.db"),
+                   EE_METRICS_DIR=os.path.join(workdir, "metrics"),
+                   EE_DAEMON_ADDRESS=os.path.join(workdir, f"{loop}.sock"), EE_DAEMON_IDLE=1)
+    env.pop('EE_PROFILE', None)
+    proc = spawn_host(env)
+    status = round_trip(proc, {'action': 'get_status', 'id': 1, 'profile': 'all'})
+    ping = round_trip(proc, {'action': 'ping', 'id': 2, 'profile': 'cpu'})
+    plain = round_trip(proc, {'action': 'ping', 'id': 3})
+    listed = round_trip(proc, {'action': 'get_profiles', 'id': 4})
+    proc.stdin.close()
+    proc.wait()
+    return {
+        'responses_ok': all(r and r.get('success') for r in (status, ping, plain, listed)),
+        'ping_daemon': ping.get('daemon', False),
+        'actions': sorted(profile['action'] for profile in listed.get('profiles', [])),
+        'status_allocations': any('allocations' in profile for profile in listed.get('profiles', [])),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=300)
+    parser.add_argument('--profiled', type=int, default=30, help='모드마다 프로파일링한 요청 수')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ee_bench_")
+    profile_dir = os.path.join(workdir, "profiles")
+    env = host_env(EE_PROFILE_DIR=profile_dir,
+                   EE_CONFIG_FILE=os.path.join(workdir, "everything_config.json"),
+                   EE_HISTORY_FILE=os.path.join(workdir, "history.db"),
+                   EE_METRICS_DIR=os.path.join(workdir, "metrics"))
+    env.pop('EE_PROFILE', None)
+
+    proc = spawn_host(env)
+    latencies(proc, {'action': 'ping'}, 3)
+    disabled = {action: latencies(proc, {'action': action}, args.count)[0]
+                for action in ('ping', 'get_status')}
+    report = {
+        'disabled': {
+            'check_ns_per_message': check_cost(),
+            'session': disabled,
+            'profile_dir_created': os.path.exists(profile_dir),
+        },
+        'enabled': {},
+    }
+
+    for mode in ('cpu', 'mem', 'all'):
+        report['enabled'][mode] = latencies(proc, {'action': 'get_status', 'profile': mode},
+                                            args.profiled)[0]
+
+    # 회전: MAX_PROFILES보다 많이 저장
+    for i in range(profiling.MAX_PROFILES + 10):
+        round_trip(proc, {'action': 'ping', 'id': i, 'profile': True})
+    listed = round_trip(proc, {'action': 'get_profiles', 'id': 'list', 'limit': 5})
+    last_mem = round_trip(proc, {'action': 'get_status', 'id': 'mem', 'profile': 'mem'})
+    latest = round_trip(proc, {'action': 'get_profiles', 'id': 'latest', 'limit': 1})['profiles'][0]
+    proc.stdin.close()
+    proc.wait()
+
+    report['loops'] = {loop: other_loop(workdir, loop)
+                       for loop in (('async', 'relay') if os.name != 'nt' else ('async',))}
+
+    summaries = files(profile_dir, '.json')
+    profs = files(profile_dir, '.prof')
+    started = [profile['started_at'] for profile in listed['profiles']]
+    report['rotation'] = {
+        'max_profiles': profiling.MAX_PROFILES,
+        'summaries': len(summaries),
+        'prof_files': len(profs),
+    }
+    report['get_profiles'] = {
+        'returned': len(listed['profiles']),
+        'newest_first': started == sorted(started, reverse=True),
+        'top_functions': len(listed['profiles'][0].get('top_functions', [])),
+        'mem_profile_action': latest['action'],
+        'mem_allocations': len(latest.get('allocations', [])),
+        'mem_peak_kb': latest.get('peak_kb'),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    ok = (not report['disabled']['profile_dir_created']
+          and last_mem.get('success')
+          and report['rotation']['summaries'] == profiling.MAX_PROFILES
+          and report['rotation']['prof_files'] <= profiling.MAX_PROFILES
+          and report['get_profiles']['returned'] == 5 and report['get_profiles']['newest_first']
+          and report['get_profiles']['top_functions'] > 0
+          and latest['action'] == 'get_status' and 'allocations' in latest
+          and all(loop['responses_ok'] and loop['actions'] == ['get_status', 'ping'] and loop['status_allocations']
+                  for loop in report['loops'].values())
+          and report['loops'].get('relay', {'ping_daemon': True})['ping_daemon'])
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""query 액션 스트리밍 벤치마크 (가짜 es.exe 사용)
+
+결과 수가 많아도 호스트 메모리와 프레임 크기가 제한되는지 확인한다.
+
+사용법: python benchmarks/bench_query.py [--hits 200000] [--limit 200000]
+"""
+
+import sys
+import json
+import time
+import argparse
+
+from host_client import (encode_message, read_frame, make_stub_es,
+                         host_env, spawn_host, peak_rss_kb)
+
+def run_query(proc, request_id, query, limit, cancel_after_chunks=None):
+    """query 요청 하나를 보내고 done 응답까지 읽으며 통계 수집"""
+    start = time.perf_counter()
+    proc.stdin.write(encode_message({'action': 'query', 'id': request_id,
+                                     'query': query, 'limit': limit}))
+    proc.stdin.flush()
+    
+    first_chunk_ms = None
+    chunks = 0
+    results = 0
+    max_frame = 0
+    while True:
+        response = read_frame(proc.stdout)
+        if response is None:
+            raise SystemExit('host exited early')
+        if response.get('id') != request_id:
+            continue
+        max_frame = max(max_frame, len(json.dumps(response)))
+        if not response.get('partial'):
+            break
+        chunks += 1
+        results += len(response['results'])
+        if first_chunk_ms is None:
+            first_chunk_ms = (time.perf_counter() - start) * 1000
+        if cancel_after_chunks is not None and chunks == cancel_after_chunks:
+            proc.stdin.write(encode_message({'action': 'cancel', 'id': request_id + 1000,
+                                             'target': request_id}))
+            proc.stdin.flush()
+    
+    total_ms = (time.perf_counter() - start) * 1000
+    return {
+        'results': results,
+        'chunks': chunks,
+        'first_chunk_ms': round(first_chunk_ms or 0.0, 3),
+        'total_ms': round(total_ms, 3),
+        'results_per_sec': round(results / (total_ms / 1000), 1) if total_ms else 0.0,
+        'max_frame_bytes': max_frame,
+        'has_more': response.get('has_more'),
+        'cancelled': response.get('cancelled'),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hits', type=int, default=200000)
+    parser.add_argument('--limit', type=int, default=200000)
+    args = parser.parse_args()
+    
+    es = make_stub_es(hits=args.hits)
+    proc = spawn_host(host_env(EVERYTHING_ES_PATH=es))
+    
+    results = {
+        'full': run_query(proc, 1, 'report', args.limit),
+        'first_page': run_query(proc, 2, 'report', 100),
+        'cancelled': run_query(proc, 3, 'report', args.limit, cancel_after_chunks=2),
+        'host_peak_rss_kb': peak_rss_kb(proc.pid),
+    }
+    proc.stdin.close()
+    proc.wait()
+    
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""큰 선택 영역 전처리(query_prep) 측정
+
+- 로그 페이지 같은 텍스트 1/2/5/10MB에서 토큰 추출 + OR 검색어 생성 시간 (선형인지 확인)
+- 구분자가 없는 긴 조각, '/'만 많은 base64 같은 나쁜 입력에서도 시간이 늘지 않는지
+- 호스트에 1MB 선택으로 search를 보냈을 때 가짜 Everything이 받은 -s 인자 길이
+- 결과 백엔드가 없을 때 search_batch의 OR 검색어가 공백 있는 경로를 따옴표로 묶는지 (예산 포함)
+
+사용법: python benchmarks/bench_query_prep.py [--max-mb 10]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+from host_client import (PROJECT_DIR, encode_message, read_frame, host_env, spawn_host,
+                         make_stub_everything)
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+import query_prep
+
+def log_page(size, seed=1):
+    """파일 이름/경로/해시/URL이 섞인 로그 줄로 size 글자 안팎의 텍스트"""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    n = 0
+    while total < size:
+        n += 1
+        # 같은 파일이 여러 번 나오도록 범위를 좁게
+        i = rng.randrange(20000)
+        kind = n % 5
+        if kind == 0:
+            line = f"2024-05-{n % 28 + 1:02d} 12:{n % 60:02d}:07 ERROR failed to open C:\\Users\\dev\\build\\out{i}\\module_{i}.dll (code {n})"
+        elif kind == 1:
+            line = f"INFO uploaded /var/lib/app/data/{i % 97}/chunk_{i}.bin in {rng.random():.3f}s, version 1.2.{n % 10}"
+        elif kind == 2:
+            line = f"DEBUG sha256={rng.getrandbits(256):064x} for report_{i}.pdf"
+        elif kind == 3:
+            line = f"WARN fetching https://cdn.example.com/assets/{i}/bundle.{i % 7}.js?v={n} took too long"
+        else:
+            line = "INFO the quick brown fox jumps over the lazy dog while nothing is being processed at all"
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines)
+
+def timed(text, repeat=3):
+    best = None
+    report = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        report = query_prep.prepare_query(text)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return report, best
+
+def scaling(max_mb):
+    rows = {}
+    base = log_page(1024 * 1024)
+    for mb in sorted({1, 2, 5, max_mb}):
+        if mb > max_mb:
+            continue
+        text = (base + '\n') * mb
+        report, ms = timed(text)
+        rows[f"{mb}MB"] = {
+            'ms': round(ms, 1),
+            'mb_per_s': round(len(text) / 1024 / 1024 / (ms / 1000), 1),
+            'kept': report['kept'],
+            'kinds': report['kinds'],
+            'dropped': {k: v for k, v in report['dropped'].items() if k != 'samples'},
+            'query_bytes': report['query_bytes'],
+        }
+    return rows
+
+def adversarial(mb):
+    size = mb * 1024 * 1024
+    cases = {
+        # 구분자 없는 한 덩어리
+        'one_huge_token': 'a' * size,
+        # '/'와 '.'이 많은 base64 비슷한 덩어리 (경로/파일 이름 패턴의 되돌아가기 확인)
+        'slashes_and_dots': ('ab/cd.ef+' * (size // 9)),
+        # 공백 없이 이어진 파일 이름들
+        'dotted_run': ('x.' * (size // 2)),
+        # 숫자와 점만 (버전 번호)
+        'numbers': ' '.join(f"{i}.{i % 10}.{i % 7}" for i in range(size // 12)),
+    }
+    rows = {}
+    for name, text in cases.items():
+        report, ms = timed(text, repeat=1)
+        rows[name] = {'chars': len(text), 'ms': round(ms, 1), 'kept': report['kept'],
+                      'query_bytes': report['query_bytes']}
+    return rows
+
+def read_invocation(log_file):
+    # 가짜 Everything은 비동기로 실행되므로 기록이 생길 때까지 잠깐 기다린다
+    for _ in range(100):
+        if os.path.exists(log_file) and os.path.getsize(log_file):
+            break
+        time.sleep(0.05)
+    with open(log_file, 'r', encoding='utf-8') as f:
+        return f.readline().rstrip('\n')
+
+def or_query_quoting():
+    """공백/'|'가 있는 검색어는 따옴표로 묶이고, 예산은 따옴표까지 센다"""
+    spaced = 'C:\\Program Files\\a.txt'
+    query, kept, dropped = query_prep.build_or_query(['report.pdf', spaced, 'a|b', 'x"y z'])
+    quoted = query == 'report.pdf | "C:\\Program Files\\a.txt" | "a|b" | "xy z"'
+    # 따옴표를 빼고 세면 들어가는 예산: 따옴표 2바이트 때문에 두 번째 검색어는 버려야 한다
+    budget = len('report.pdf') + len(query_prep.OR_SEPARATOR) + len(spaced)
+    _, tight_kept, tight_dropped = query_prep.build_or_query(['report.pdf', spaced], budget)
+    return {'quoted': quoted and kept == 4 and not dropped,
+            'budget_counts_quotes': tight_kept == 1 and tight_dropped == [spaced]}
+
+def batch_through_host():
+    """결과 백엔드 없이 search_batch → 가짜 Everything이 받은 OR 검색어"""
+    stub, log_file = make_stub_everything()
+    env = host_env(stub)
+    env.pop('EVERYTHING_ES_PATH', None)
+    proc = spawn_host(env)
+    queries = ['C:\\Program Files\\Everything\\Everything.exe', 'notes.txt']
+    proc.stdin.write(encode_message({'action': 'search_batch', 'queries': queries, 'id': 1}))
+    proc.stdin.flush()
+    response = read_frame(proc.stdout)
+    proc.stdin.close()
+    proc.wait()
+    argv = read_invocation(log_file)
+    return {'success': bool(response and response.get('success')), 'argv': argv,
+            'quoted': '"C:\\Program Files\\Everything\\Everything.exe" | notes.txt' in argv}
+
+def through_host(text):
+    """가짜 Everything으로 호스트에 search를 보내고 받은 인자 길이 확인"""
+    stub, log_file = make_stub_everything()
+    proc = spawn_host(host_env(stub))
+    start = time.perf_counter()
+    proc.stdin.write(encode_message({'action': 'search', 'query': text, 'id': 1}))
+    proc.stdin.flush()
+    response = read_frame(proc.stdout)
+    elapsed = (time.perf_counter() - start) * 1000
+    proc.stdin.close()
+    proc.wait()
+    argv = read_invocation(log_file)
+    report = response.get('preprocessed', {})
+    return {
+        'input_chars': len(text),
+        'round_trip_ms': round(elapsed, 1),
+        'success': response.get('success'),
+        'everything_args_chars': len(argv),
+        'kept': report.get('kept'),
+        'dropped': report.get('dropped', {}).get('over_budget'),
+        'response_bytes': len(json.dumps(response)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-mb', type=int, default=10)
+    args = parser.parse_args()
+
+    report = {
+        'scaling': scaling(args.max_mb),
+        'adversarial_10MB': adversarial(args.max_mb),
+        'host_1MB_selection': through_host(log_page(1024 * 1024, seed=2)),
+        'or_query_quoting': or_query_quoting(),
+        'host_batch_fallback': batch_through_host(),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    checks = {
+        'command_line_limit': report['host_1MB_selection']['everything_args_chars']
+                              < query_prep.COMMAND_LINE_LIMIT,
+        'or_query_quoted': report['or_query_quoting']['quoted'],
+        'or_query_budget_counts_quotes': report['or_query_quoting']['budget_counts_quotes'],
+        'batch_fallback_quoted': report['host_batch_fallback']['success']
+                                 and report['host_batch_fallback']['quoted'],
+    }
+    failed = [name for name, passed in checks.items() if not passed]
+    for name in failed:
+        print(f"FAIL: {name}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""메시지마다 호스트를 띄우는 방식과 connectNative 세션 방식의 지연 시간 비교
+
+사용법: python benchmarks/bench_session.py [-n 50] [--action get_status]
+"""
+
+import sys
+import json
+import time
+import argparse
+
+from host_client import (encode_message, read_frame, make_stub_everything,
+                         host_env, spawn_host, request_once, summarize)
+
+def bench_spawn_per_message(message, count, env):
+    """sendNativeMessage 방식: 요청마다 인터프리터 콜드 스타트"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        request_once(message, env)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return summarize(latencies)
+
+def bench_session(message, count, env, pipelined):
+    """connectNative 방식: 프로세스 하나로 여러 요청 처리"""
+    proc = spawn_host(env)
+    # 첫 응답까지 기다려서 인터프리터 기동 비용은 제외
+    proc.stdin.write(encode_message({'action': 'ping', 'id': 0}))
+    proc.stdin.flush()
+    read_frame(proc.stdout)
+    
+    latencies = []
+    if pipelined:
+        # 요청을 한꺼번에 보내고 id로 응답 매칭
+        sent_at = {}
+        for i in range(1, count + 1):
+            sent_at[i] = time.perf_counter()
+            proc.stdin.write(encode_message(dict(message, id=i)))
+        proc.stdin.flush()
+        for _ in range(count):
+            response = read_frame(proc.stdout)
+            latencies.append((time.perf_counter() - sent_at[response['id']]) * 1000)
+    else:
+        for i in range(1, count + 1):
+            start = time.perf_counter()
+            proc.stdin.write(encode_message(dict(message, id=i)))
+            proc.stdin.flush()
+            response = read_frame(proc.stdout)
+            assert response['id'] == i, response
+            latencies.append((time.perf_counter() - start) * 1000)
+    
+    proc.stdin.close()
+    proc.wait()
+    return summarize(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=50)
+    parser.add_argument('--action', default='get_status')
+    parser.add_argument('--query', default='benchmark.txt')
+    args = parser.parse_args()
+    
+    stub, _ = make_stub_everything()
+    env = host_env(stub)
+    message = {'action': args.action}
+    if args.action == 'search':
+        message['query'] = args.query
+    
+    results = {
+        'action': args.action,
+        'spawn_per_message': bench_spawn_per_message(message, args.count, env),
+        'session_sequential': bench_session(message, args.count, env, pipelined=False),
+        'session_pipelined': bench_session(message, args.count, env, pipelined=True),
+    }
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""stat_paths 액션 측정: 디렉토리별 scandir + 스레드 풀 + 캐시 vs 경로마다 os.stat
+
+- 디렉토리 100개 × 경로 100개 (10,000개, 그중 일부는 없는 파일, 디렉토리마다 요청하지 않은 파일도 섞음)
+- 경로마다 os.stat (순차) / run_stat 캐시 없음 / run_stat 캐시 사용 / 디렉토리마다 scandir(Windows 방식)
+  시간 (여러 번 중 중앙값)
+- 결과가 os.stat과 같은지 (존재 여부, 디렉토리 여부, 크기, 수정 시각)
+- scandir 목록에 나오지 않는 이름(Windows 8.3 짧은 이름, 목록에서 숨긴 별칭으로 재현)도 찾는지
+- 호스트를 거친 stat_paths 왕복 시간과 청크 수
+
+사용법: python benchmarks/bench_stat.py [--dirs 100] [--per-dir 100] [--repeat 5]
+"""
+
+import os
+import sys
+import stat
+import json
+import time
+import random
+import tempfile
+import argparse
+
+from host_client import PROJECT_DIR, encode_message, read_frame, host_env, spawn_host
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+import path_stat
+
+def build_tree(base, dirs, per_dir, missing_ratio=0.1, extra=50, seed=1):
+    """요청할 경로 목록 반환 (없는 경로 포함, 디렉토리마다 요청하지 않는 파일 extra개)"""
+    rng = random.Random(seed)
+    paths = []
+    for d in range(dirs):
+        directory = os.path.join(base, f"dir{d:03d}")
+        os.makedirs(directory)
+        os.makedirs(os.path.join(directory, "subdir"))
+        for i in range(extra):
+            with open(os.path.join(directory, f"other_{i}.bin"), 'wb') as f:
+                f.write(b'x' * i)
+        for i in range(per_dir - 1):
+            path = os.path.join(directory, f"file_{i:04d}.txt")
+            if rng.random() >= missing_ratio:
+                with open(path, 'wb') as f:
+                    f.write(b'y' * rng.randrange(4096))
+            paths.append(path)
+        paths.append(os.path.join(directory, "subdir"))
+    rng.shuffle(paths)
+    return paths
+
+def naive(paths):
+    """경로마다 os.stat (같은 응답 항목을 만드는 단순한 처리)"""
+    results = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            results[path] = {'path': path, 'exists': False}
+            continue
+        results[path] = {'path': path, 'exists': True, 'is_dir': stat.S_ISDIR(st.st_mode),
+                         'size': st.st_size, 'mtime': st.st_mtime}
+    return results
+
+def batched(paths):
+    results = {}
+    final = None
+    for part in path_stat.run_stat(paths):
+        if part.get('partial'):
+            for entry in part['results']:
+                results[entry['path']] = entry
+        else:
+            final = part
+    return results, final
+
+def median_ms(func, repeat, before=None):
+    times = []
+    value = None
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        value = func()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return round(times[len(times) // 2], 2), value
+
+def short_names(base):
+    """디렉토리 목록에는 긴 이름만 나오고 짧은 이름은 stat으로만 열리는 경우 (Windows 8.3 이름)"""
+    directory = os.path.join(base, "short")
+    os.makedirs(directory)
+    long_names = [f"Long File Name {i}.txt" for i in range(path_stat.SCANDIR_MIN_NAMES)]
+    for name in long_names:
+        with open(os.path.join(directory, name), 'w') as f:
+            f.write(name)
+    # 짧은 이름은 별칭(심볼릭 링크)으로 만들고 scandir 결과에서 숨긴다
+    hidden = {f"LONGFI~{i + 1}.TXT": name for i, name in enumerate(long_names)}
+    for short, name in hidden.items():
+        os.symlink(name, os.path.join(directory, short))
+    paths = [os.path.join(directory, name) for name in list(hidden) + long_names[:1] + ["MISSIN~1.TXT"]]
+
+    real_scandir = os.scandir
+
+    class Listing:
+        def __init__(self, path):
+            self.entries = real_scandir(path)
+
+        def __enter__(self):
+            return (entry for entry in self.entries if entry.name not in hidden)
+
+        def __exit__(self, *exc):
+            self.entries.close()
+
+    path_stat.clear_cache()
+    os.scandir = Listing
+    try:
+        results, _ = batched(paths)
+    finally:
+        os.scandir = real_scandir
+    return results == naive(paths)
+
+def through_host(paths, repeat):
+    proc = spawn_host(host_env())
+    rows = []
+    for n in range(repeat):
+        start = time.perf_counter()
+        proc.stdin.write(encode_message({'action': 'stat_paths', 'paths': paths, 'id': n}))
+        proc.stdin.flush()
+        chunks = 0
+        while True:
+            response = read_frame(proc.stdout)
+            if not response.get('partial'):
+                break
+            chunks += 1
+        rows.append({'round_trip_ms': round((time.perf_counter() - start) * 1000, 1),
+                     'host_ms': response.get('elapsed_ms'), 'chunks': chunks,
+                     'cached_directories': response.get('cached_directories')})
+    proc.stdin.close()
+    proc.wait()
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dirs', type=int, default=100)
+    parser.add_argument('--per-dir', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    base = tempfile.mkdtemp(prefix="ee_bench_")
+    paths = build_tree(base, args.dirs, args.per_dir)
+    # 페이지 캐시/dentry를 먼저 채워서 두 방식을 같은 조건에서 비교
+    expected = naive(paths)
+
+    naive_ms, _ = median_ms(lambda: naive(paths), args.repeat)
+    cold_ms, (cold, cold_final) = median_ms(lambda: batched(paths), args.repeat,
+                                            before=path_stat.clear_cache)
+    warm_ms, (warm, warm_final) = median_ms(lambda: batched(paths), args.repeat)
+    # Windows 방식(디렉토리마다 scandir)도 같은 결과인지 (POSIX에서는 느림)
+    path_stat.SCANDIR_HAS_STAT = True
+    scan_ms, (scanned, _) = median_ms(lambda: batched(paths), args.repeat,
+                                      before=path_stat.clear_cache)
+
+    report = {
+        'paths': len(paths),
+        'directories': args.dirs,
+        'existing': sum(entry['exists'] for entry in expected.values()),
+        'naive_os_stat_ms': naive_ms,
+        'stat_paths_uncached_ms': cold_ms,
+        'stat_paths_cached_ms': warm_ms,
+        'stat_paths_scandir_ms': scan_ms,
+        'cached_directories': warm_final['cached_directories'],
+        'matches_os_stat': cold == expected and warm == expected and scanned == expected,
+        'short_names_found': short_names(base),
+        'host': through_host(paths, 3),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0 if report['matches_os_stat'] and report['short_names_found'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""get_status 스냅샷(status 모듈) 지연 시간과 부분 재계산 확인
+
+- 콜드: 스냅샷이 없을 때 (모두 계산) vs 스냅샷 파일이 있을 때, 메시지마다 호스트를 새로 띄움
+- 세션: 같은 호스트에서 연속 get_status (입력 확인만)
+- 재계산 부분: 바뀐 것 없음 → [], 설정 저장(set_path) → everything부터,
+  Everything.exe 내용 변경 → everything만 (값이 같으면 version 유지),
+  찾지 못한 상태에서 일반 설치 경로(%LOCALAPPDATA%)에 설치 → 바로 everything_found
+- version: 확장 프로그램의 version과 같으면 unchanged 응답만, 값이 바뀔 때만 올라감
+
+사용법: python benchmarks/bench_status.py [-n 30]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+
+from host_client import encode_message, read_frame, host_env, spawn_host, make_stub_pe, summarize
+
+def round_trip(proc, message):
+    proc.stdin.write(encode_message(message))
+    proc.stdin.flush()
+    return read_frame(proc.stdout)
+
+def cold_request(env, message):
+    start = time.perf_counter()
+    proc = spawn_host(env)
+    response = round_trip(proc, message)
+    proc.stdin.close()
+    proc.wait()
+    return (time.perf_counter() - start) * 1000, response
+
+def install_step(workdir):
+    """찾지 못한 스냅샷이 있는 상태에서 일반 설치 경로에 Everything.exe가 생기면 바로 찾는지"""
+    env = host_env(LOCALAPPDATA=os.path.join(workdir, "appdata"),
+                   EE_STATUS_FILE=os.path.join(workdir, "status_snapshot.json"),
+                   EE_CONFIG_FILE=os.path.join(workdir, "everything_config.json"),
+                   EE_HISTORY_FILE=os.path.join(workdir, "history.db"),
+                   EE_METRICS_DIR=os.path.join(workdir, "metrics"))
+    env.pop('EVERYTHING_PATH', None)
+    # 호스트와 같은 방식으로 펼친 후보 경로 (리눅스에서는 %VAR%를 펼치지 않으므로 작업 폴더 기준의
+    # 상대 경로가 되고 역슬래시는 파일 이름의 일부, 호스트도 같은 작업 폴더에서 실행)
+    os.environ['LOCALAPPDATA'] = env['LOCALAPPDATA']
+    os.chdir(workdir)
+    candidate = os.path.abspath(os.path.expandvars(r"%LOCALAPPDATA%\Everything\Everything.exe"))
+    proc = spawn_host(env)
+    before = round_trip(proc, {'action': 'get_status', 'id': 1})
+    os.makedirs(os.path.dirname(candidate), exist_ok=True)
+    with open(candidate, 'wb') as f:
+        f.write(b'MZ')
+    after = round_trip(proc, {'action': 'get_status', 'id': 2, 'version': before['version']})
+    proc.stdin.close()
+    proc.wait()
+    return before, after, candidate
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=30)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ee_bench_")
+    status_file = os.path.join(workdir, "status_snapshot.json")
+    stub = make_stub_pe(workdir)
+    env = host_env(EE_STATUS_FILE=status_file,
+                   EE_CONFIG_FILE=os.path.join(workdir, "everything_config.json"),
+                   EE_HISTORY_FILE=os.path.join(workdir, "history.db"),
+                   EE_METRICS_DIR=os.path.join(workdir, "metrics"))
+    env.pop('EVERYTHING_PATH', None)
+    message = {'action': 'get_status', 'id': 1}
+
+    # 콜드: 스냅샷 없음 / 있음을 번갈아
+    cold = {'no_snapshot': [], 'snapshot': []}
+    for _ in range(args.count):
+        try:
+            os.remove(status_file)
+        except OSError:
+            pass
+        ms, response = cold_request(env, message)
+        cold['no_snapshot'].append(ms)
+        ms, warm = cold_request(env, message)
+        cold['snapshot'].append(ms)
+    report = {'cold': {name: summarize(rows) for name, rows in cold.items()},
+              'cold_recomputed': {'no_snapshot': response['recomputed'], 'snapshot': warm['recomputed']}}
+
+    proc = spawn_host(env)
+    first = round_trip(proc, message)
+    rows = []
+    for i in range(args.count * 10):
+        start = time.perf_counter()
+        round_trip(proc, dict(message, id=i))
+        rows.append((time.perf_counter() - start) * 1000)
+    report['session'] = summarize(rows)
+
+    steps = {}
+    steps['nothing_changed'] = round_trip(proc, message)
+    steps['same_version'] = round_trip(proc, dict(message, version=first['version']))
+    round_trip(proc, {'action': 'set_path', 'id': 2, 'path': stub})
+    steps['set_path'] = round_trip(proc, dict(message, version=first['version']))
+    found_version = steps['set_path']['version']
+    with open(stub, 'ab') as f:
+        f.write(b'\0')
+    steps['exe_changed'] = round_trip(proc, dict(message, version=found_version))
+    proc.stdin.close()
+    proc.wait()
+
+    before, after, candidate = install_step(tempfile.mkdtemp(prefix="ee_bench_"))
+    steps['not_found'] = before
+    steps['installed'] = after
+
+    report['steps'] = {name: {key: step.get(key) for key in ('version', 'recomputed', 'unchanged',
+                                                             'everything_found')}
+                       for name, step in steps.items()}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    ok = (report['cold_recomputed']['no_snapshot'] == ['everything', 'available_paths']
+          and report['cold_recomputed']['snapshot'] == []
+          and steps['nothing_changed']['recomputed'] == []
+          and steps['same_version'].get('unchanged') and 'everything_found' not in steps['same_version']
+          and steps['set_path']['recomputed'][0] == 'everything'
+          and steps['set_path']['everything_found'] and found_version == first['version'] + 1
+          and steps['exe_changed']['recomputed'] == ['everything']
+          and steps['exe_changed'].get('unchanged') and steps['exe_changed']['version'] == found_version
+          and not before['everything_found'] and after['everything_found']
+          and os.path.abspath(after['everything_path']) == candidate and len(after['available_paths']) == 1)
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""validate_path 검증 캐시와 PE 버전 리소스 확인 측정
+
+- PE 파일(버전 리소스 ProductName=Everything): 처음에도 실행 없이 검증, 두 번째는 캐시
+- 스크립트 가짜 Everything.exe: 처음 한 번만 -help 실행, 이후 캐시 (실행 기록으로 확인)
+- 파일이 바뀌면 (mtime/크기/헤더) 다시 실행해서 검증
+
+사용법: python benchmarks/bench_validate.py [-n 1000]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+
+from host_client import PROJECT_DIR, make_stub_everything, make_stub_pe, summarize
+
+sys.path.insert(0, str(PROJECT_DIR / "native-host"))
+import discovery
+
+def time_calls(path, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        result = discovery.validation_result(path)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return result, summarize(latencies)
+
+def invocations(log_file):
+    try:
+        with open(log_file, 'r', encoding='utf-8') as f:
+            return sum(1 for _ in f)
+    except OSError:
+        return 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=1000)
+    args = parser.parse_args()
+    
+    # 호스트의 실제 캐시 파일을 건드리지 않도록 임시 파일 사용
+    discovery.VALIDATION_CACHE_FILE = os.path.join(tempfile.mkdtemp(prefix="ee_bench_"), "validation_cache.json")
+    report = {}
+    
+    pe = make_stub_pe()
+    first, cold = time_calls(pe, 1)
+    _, warm = time_calls(pe, args.count)
+    report['pe_version'] = {'first': first, 'first_ms': cold['mean_ms'], 'cached': warm}
+    
+    stub, log_file = make_stub_everything()
+    first, cold = time_calls(stub, 1)
+    after_first = invocations(log_file)
+    _, warm = time_calls(stub, args.count)
+    report['exec'] = {'first': first, 'first_ms': cold['mean_ms'], 'cached': warm,
+                      'processes_spawned': invocations(log_file)}
+    
+    # 내용이 바뀌면 캐시를 쓰지 않는다
+    with open(stub, 'a', encoding='utf-8') as f:
+        f.write('# changed\n')
+    discovery.validation_result(stub)
+    report['exec']['processes_after_change'] = invocations(log_file)
+    print(json.dumps(report, indent=2))
+    
+    ok = (report['pe_version']['first']['method'] == 'pe_version'
+          and after_first == 1 and report['exec']['processes_spawned'] == 1
+          and report['exec']['processes_after_change'] == 2)
+    if not ok:
+        print("FAIL: validation cache did not avoid re-running Everything.exe", file=sys.stderr)
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
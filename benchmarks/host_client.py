@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""벤치마크용 Native Host 클라이언트 (크롬 대신 4바이트 길이 프레임으로 통신)"""
+
+import os
+import sys
+import json
+import struct
+import tempfile
+import subprocess
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+NATIVE_HOST = PROJECT_DIR / "native-host" / "native_host.py"
+
+STUB_EVERYTHING = """#!{python}
+# 벤치마크용 가짜 Everything.exe: 인자만 기록하고 바로 종료
+# (EE_STUB_HELP_DELAY초가 지정되면 -help 응답을 그만큼 늦춤)
+# EE_STUB_LAUNCH_LOG가 지정되면 pid/인자/시작·끝 시각을 JSON 한 줄로 남기고,
+# -newwindow는 EE_STUB_INSTANCE_SECONDS초(새 인스턴스), 그 밖은 EE_STUB_FORWARD_SECONDS초
+# (떠 있는 인스턴스로 넘기고 끝나는 실행) 동안 떠 있는다
+import os
+import sys
+import json
+import time
+started = time.time()
+with open({log!r}, 'a', encoding='utf-8') as f:
+    f.write(' '.join(sys.argv[1:]) + '\\n')
+if '-help' in sys.argv[1:]:
+    time.sleep(float(os.environ.get('EE_STUB_HELP_DELAY', '0')))
+launch_log = os.environ.get('EE_STUB_LAUNCH_LOG')
+if launch_log:
+    key = 'EE_STUB_INSTANCE_SECONDS' if '-newwindow' in sys.argv[1:] else 'EE_STUB_FORWARD_SECONDS'
+    time.sleep(float(os.environ.get(key, '0')))
+    with open(launch_log, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({{'pid': os.getpid(), 'args': sys.argv[1:],
+                            'start': started, 'end': time.time()}}) + '\\n')
+"""
+
+STUB_ES = r"""#!{python}
+# 벤치마크용 가짜 es.exe: -offset/-n을 지원하고 결과를 한 줄씩 출력
+import os
+import sys
+
+args = sys.argv[1:]
+offset, limit = 0, None
+query = []
+i = 0
+while i < len(args):
+    if args[i] in ('-offset', '-o'):
+        offset = int(args[i + 1])
+        i += 2
+    elif args[i] in ('-n', '-max-results'):
+        limit = int(args[i + 1])
+        i += 2
+    else:
+        query.append(args[i])
+        i += 1
+
+total = int(os.environ.get('EE_STUB_ES_HITS', '{hits}'))
+end = total if limit is None else min(total, offset + limit)
+out = sys.stdout.buffer
+term = ' '.join(query)
+for n in range(offset, end):
+    out.write(('C:\\data\\dir%04d\\%s_%07d.txt\r\n' % (n // 1000, term, n)).encode('utf-8'))
+"""
+
+def encode_message(message):
+    """메시지를 크롬 Native Messaging 프레임으로 인코딩"""
+    body = json.dumps(message).encode('utf-8')
+    return struct.pack('I', len(body)) + body
+
+def read_frame(stream):
+    """스트림에서 프레임 하나를 읽어 dict로 반환 (EOF면 None)"""
+    header = stream.read(4)
+    if len(header) < 4:
+        return None
+    length = struct.unpack('I', header)[0]
+    return json.loads(stream.read(length).decode('utf-8'))
+
+def make_stub_everything(directory=None):
+    """가짜 Everything.exe를 만들고 (경로, 호출 기록 파일) 반환"""
+    directory = Path(directory or tempfile.mkdtemp(prefix="ee_bench_"))
+    stub = directory / "Everything.exe"
+    log = directory / "invocations.log"
+    stub.write_text(STUB_EVERYTHING.format(python=sys.executable, log=str(log)), encoding='utf-8')
+    stub.chmod(0o755)
+    return str(stub), str(log)
+
+def make_stub_es(directory=None, hits=200000):
+    """가짜 es.exe를 만들고 경로 반환 (결과 수는 EE_STUB_ES_HITS로도 조절)"""
+    directory = Path(directory or tempfile.mkdtemp(prefix="ee_bench_"))
+    stub = directory / "es.exe"
+    stub.write_text(STUB_ES.format(python=sys.executable, hits=hits), encoding='utf-8')
+    stub.chmod(0o755)
+    return str(stub)
+
+def _version_block(key, value=b'', value_type=0, children=b'', value_length=None):
+    """VS_VERSIONINFO 블록 하나 인코딩 (헤더 + key + 4바이트 정렬 값/자식)"""
+    def pad(data):
+        return data + b'\x00' * (-len(data) % 4)
+    body = pad(struct.pack('<HHH', 0, 0, 0) + (key + '\x00').encode('utf-16-le'))
+    body = pad(body + value) + children
+    if value_length is None:
+        value_length = len(value) // 2 if value_type == 1 else len(value)
+    return pad(struct.pack('<HHH', len(body), value_length, value_type) + body[6:])
+
+def build_pe_with_version(product='Everything', version=(1, 4, 1, 1026)):
+    """버전 리소스만 있는 최소 PE32+ 파일 bytes (실행은 안 되고 파싱용)"""
+    ms = (version[0] << 16) | version[1]
+    ls = (version[2] << 16) | version[3]
+    fixed = struct.pack('<13I', 0xFEEF04BD, 0x10000, ms, ls, ms, ls, 0x3F, 0, 4, 1, 0, 0, 0)
+    version_text = '.'.join(map(str, version))
+    strings = b''.join(
+        _version_block(name, (text + '\x00').encode('utf-16-le'), 1)
+        for name, text in (('CompanyName', 'voidtools'), ('ProductName', product),
+                           ('ProductVersion', version_text), ('FileVersion', version_text)))
+    info = _version_block('VS_VERSION_INFO', fixed, 0, _version_block(
+        'StringFileInfo', children=_version_block('040904b0', children=strings), value_type=1))
+    
+    rsrc_rva, raw_ptr = 0x1000, 0x200
+    # 종류(16) → 이름(1) → 언어(0x409) → 데이터 항목 → 버전 정보
+    rsrc = bytearray()
+    rsrc += struct.pack('<IIHHHH', 0, 0, 0, 0, 0, 1) + struct.pack('<II', 16, 0x80000000 | 0x18)
+    rsrc += struct.pack('<IIHHHH', 0, 0, 0, 0, 0, 1) + struct.pack('<II', 1, 0x80000000 | 0x30)
+    rsrc += struct.pack('<IIHHHH', 0, 0, 0, 0, 0, 1) + struct.pack('<II', 0x409, 0x48)
+    rsrc += struct.pack('<IIII', rsrc_rva + 0x58, len(info), 0, 0)
+    rsrc += b'\x00' * (0x58 - len(rsrc)) + info
+    
+    optional = bytearray(240)
+    struct.pack_into('<H', optional, 0, 0x20B)
+    struct.pack_into('<I', optional, 108, 16)
+    struct.pack_into('<II', optional, 112 + 2 * 8, rsrc_rva, len(rsrc))
+    section = struct.pack('<8sIIIIIIHHI', b'.rsrc', len(rsrc), rsrc_rva, len(rsrc), raw_ptr,
+                          0, 0, 0, 0, 0x40000040)
+    header = bytearray(0x40)
+    header[:2] = b'MZ'
+    struct.pack_into('<I', header, 0x3C, 0x40)
+    header += b'PE\x00\x00' + struct.pack('<HHIIIHH', 0x8664, 1, 0, 0, 0, len(optional), 0x22)
+    header += optional + section
+    header += b'\x00' * (raw_ptr - len(header))
+    return bytes(header + rsrc)
+
+def make_stub_pe(directory=None, product='Everything'):
+    """버전 리소스가 있는 가짜 Everything.exe (PE 파일) 경로 반환"""
+    directory = Path(directory or tempfile.mkdtemp(prefix="ee_bench_"))
+    stub = directory / "Everything.exe"
+    stub.write_bytes(build_pe_with_version(product))
+    return str(stub)
+
+def peak_rss_kb(pid):
+    """프로세스의 최대 RSS (KB), /proc가 없으면 None"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def host_env(everything_path=None, **extra):
+    """호스트 실행용 환경 변수 (가짜 Everything 경로 지정)"""
+    env = dict(os.environ)
+    if everything_path:
+        env['EVERYTHING_PATH'] = everything_path
+    env.update({k: str(v) for k, v in extra.items()})
+    return env
+
+def spawn_host(env=None, args=(), host=None):
+    """크롬과 같은 방식으로 호스트 프로세스 실행 (host: 다른 native_host.py 경로)"""
+    return subprocess.Popen(
+        [sys.executable, str(host or NATIVE_HOST), *args],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        env=env,
+    )
+
+def request_once(message, env=None):
+    """sendNativeMessage처럼 호스트를 새로 띄워 메시지 하나를 처리"""
+    proc = spawn_host(env)
+    proc.stdin.write(encode_message(message))
+    proc.stdin.flush()
+    response = read_frame(proc.stdout)
+    proc.stdin.close()
+    proc.wait()
+    return response
+
+def percentile(values, pct):
+    """정렬 기반 백분위수 (nearest-rank)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summarize(latencies_ms):
+    """지연 시간 목록 요약"""
+    return {
+        'count': len(latencies_ms),
+        'mean_ms': round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else 0.0,
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p95_ms': round(percentile(latencies_ms, 95), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+    }
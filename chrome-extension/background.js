@@ -1,6 +1,118 @@
 // Native Messaging Host 이름
 const NATIVE_HOST_NAME = 'com.everythingeverywhere.host';
 
+// 재연결 백오프 설정 (ms)
+const RECONNECT_BASE_DELAY = 500;
+const RECONNECT_MAX_DELAY = 30000;
+const RECONNECT_MAX_ATTEMPTS = 6;
+
+// 선택 텍스트 크기 제한: 이보다 큰 선택은 잘라서 보냄 (호스트가 파일 이름/경로 토큰만 뽑아 씀)
+const MAX_SELECTION_CHARS = 1024 * 1024;
+// 이보다 크거나 줄이 많은 선택은 줄별 일괄 검색 대신 호스트 전처리(토큰 OR 검색)로 보냄
+const LARGE_SELECTION_CHARS = 64 * 1024;
+const MAX_BATCH_LINES = 500;
+// 일괄 검색 설정(batchLines)이 꺼져 있을 때 줄마다 검색하는 기준: 모든 줄이 경로나 파일 이름
+// (호스트 query_prep의 경로/파일 이름 패턴과 같은 기준, 파일 이름은 NTFS 이름 길이까지)
+const PATH_LINE = /^(?:[A-Za-z]:|\\\\[^\\\/:]+)\\[^:]*$|^(?:~|\.{1,2})?\/[^\/\\:]+(?:\/[^\/\\:]*)+$/;
+const FILENAME_LINE = /^[^\\\/:*?"<>|]{1,246}\.[A-Za-z][A-Za-z0-9_]{0,7}$/;
+
+// connectNative로 유지하는 호스트 세션 상태
+let nativePort = null;
+let nextRequestId = 1;
+const pendingRequests = new Map();
+let reconnectAttempts = 0;
+let reconnectTimer = null;
+
+// 호스트 세션 연결 (이미 연결되어 있으면 그대로 사용)
+function connectHost() {
+  if (nativePort) {
+    return nativePort;
+  }
+  
+  if (reconnectTimer) {
+    clearTimeout(reconnectTimer);
+    reconnectTimer = null;
+  }
+  
+  const port = chrome.runtime.connectNative(NATIVE_HOST_NAME);
+  nativePort = port;
+  
+  port.onMessage.addListener((response) => {
+    // 응답을 하나라도 받으면 호스트가 정상 동작 중이므로 백오프 초기화
+    reconnectAttempts = 0;
+    
+    const requestId = response ? response.id : undefined;
+    const pending = pendingRequests.get(requestId);
+    if (!pending) {
+      console.warn('Unmatched native response:', response);
+      return;
+    }
+    
+    // partial 응답은 스트리밍 중간 결과, 마지막 응답에서 요청 완료
+    if (!response.partial) {
+      pendingRequests.delete(requestId);
+    }
+    pending.callback(response, null);
+  });
+  
+  port.onDisconnect.addListener(() => {
+    const error = chrome.runtime.lastError || { message: 'Native host disconnected' };
+    console.warn('Native host disconnected:', error.message);
+    
+    if (nativePort === port) {
+      nativePort = null;
+    }
+    
+    // 응답을 기다리던 요청들은 모두 실패 처리
+    const pending = Array.from(pendingRequests.values());
+    pendingRequests.clear();
+    pending.forEach(({ callback }) => callback(null, error));
+    
+    scheduleReconnect();
+  });
+  
+  return port;
+}
+
+// 호스트가 죽었을 때 지수 백오프로 재연결
+function scheduleReconnect() {
+  if (reconnectTimer || reconnectAttempts >= RECONNECT_MAX_ATTEMPTS) {
+    // 최대 시도 횟수를 넘기면 다음 요청 시점에 다시 연결한다
+    return;
+  }
+  
+  const delay = Math.min(RECONNECT_BASE_DELAY * Math.pow(2, reconnectAttempts), RECONNECT_MAX_DELAY);
+  reconnectAttempts++;
+  
+  reconnectTimer = setTimeout(() => {
+    reconnectTimer = null;
+    // 연결 실패 시에는 onDisconnect에서 다시 scheduleReconnect가 호출됨
+    sendHostMessage({ action: 'ping' }, (response, error) => {
+      if (response) {
+        console.log('Native host session restored, pid:', response.pid);
+      }
+    });
+  }, delay);
+}
+
+// 세션을 통해 호스트에 메시지 전송 (요청 id로 응답 매칭, 파이프라이닝 가능)
+// callback(response, error) 형태로 호출됨
+function sendHostMessage(message, callback) {
+  const requestId = nextRequestId++;
+  pendingRequests.set(requestId, { callback: callback || (() => {}) });
+  
+  try {
+    connectHost().postMessage({ ...message, id: requestId });
+  } catch (error) {
+    pendingRequests.delete(requestId);
+    if (callback) {
+      callback(null, error);
+    }
+  }
+  
+  return requestId;
+}
+
 // 확장 프로그램이 설치되거나 업데이트될 때
 chrome.runtime.onInstalled.addListener(() => {
   // 컨텍스트 메뉴 생성
@@ -16,28 +128,201 @@ chrome.runtime.onInstalled.addListener(() => {
 // 컨텍스트 메뉴 클릭 시
 chrome.contextMenus.onClicked.addListener((info, tab) => {
   if (info.menuItemId === 'searchInEverything' && info.selectionText) {
-    searchInEverything(info.selectionText);
+    const selection = capSelection(info.selectionText);
+    if (selection.truncated || selection.text.length >= LARGE_SELECTION_CHARS) {
+      // 로그 페이지 전체 같은 큰 선택은 호스트가 토큰을 뽑아 OR 검색어 하나로 검색
+      searchInEverything(selection.text, { preprocess: true, truncated: selection.truncated });
+      return;
+    }
+    const lines = selection.text.split(/\r?\n/).map(line => line.trim()).filter(line => line);
+    if (lines.length > MAX_BATCH_LINES) {
+      searchInEverything(selection.text, { preprocess: true });
+    } else if (lines.length > 1) {
+      // 파일 목록처럼 보이거나 설정으로 켰을 때만 줄마다 검색 (호스트에는 한 번만 요청),
+      // 문단 같은 일반 여러 줄 선택은 예전처럼 한 번에 검색
+      chrome.storage.sync.get(['batchLines'], (result) => {
+        if (result.batchLines === true || lines.every(looksLikePathOrFilename)) {
+          searchBatchInEverything(lines);
+        } else {
+          searchInEverything(selection.text);
+        }
+      });
+    } else {
+      searchInEverything(selection.text);
+    }
   }
 });
 
+// 한 줄이 파일 경로나 파일 이름처럼 보이는지
+function looksLikePathOrFilename(line) {
+  return PATH_LINE.test(line) || FILENAME_LINE.test(line);
+}
+
+// 선택 텍스트를 MAX_SELECTION_CHARS까지 자름 (가능하면 줄 끝에서)
+function capSelection(text) {
+  if (text.length <= MAX_SELECTION_CHARS) {
+    return { text: text, truncated: false };
+  }
+  const cut = text.lastIndexOf('\n', MAX_SELECTION_CHARS);
+  return { text: text.substring(0, cut > 0 ? cut : MAX_SELECTION_CHARS), truncated: true };
+}
+
+// 여러 검색어를 search_batch 요청 하나로 검색
+// 경로 줄은 stat_paths로 로컬에 실제로 있는지도 함께 확인해서 (Everything 색인이 늦어도) 알림에 덧붙임
+function searchBatchInEverything(lines) {
+  console.log(`Batch searching ${lines.length} lines`);
+  
+  const pathLines = lines.filter(line => PATH_LINE.test(line));
+  let pending = pathLines.length > 0 ? 2 : 1;
+  let notification = null;
+  let existence = '';
+  const finish = () => {
+    if (--pending > 0) {
+      return;
+    }
+    showSimpleNotification(notification.title, notification.message + existence);
+  };
+  
+  if (pathLines.length > 0) {
+    const missing = [];
+    statPaths(pathLines, (results) => {
+      results.forEach(result => {
+        if (!result.exists) {
+          missing.push(result.path);
+        }
+      });
+    }, (response, error) => {
+      if (response && response.success) {
+        existence = ` 경로 ${response.count}개 중 ${response.found}개가 로컬에 있습니다.`;
+        if (missing.length > 0) {
+          console.log('Missing paths:', missing);
+        }
+      } else {
+        console.warn('stat_paths failed:', error || response);
+      }
+      finish();
+    });
+  }
+  
+  const found = [];
+  sendHostMessage({ action: 'search_batch', queries: lines }, (response, error) => {
+    if (error || !response) {
+      console.error('Native messaging error:', error);
+      notification = { title: 'Everything 검색 오류', message: 'Everything 검색을 실행할 수 없습니다. Native Host가 설치되어 있는지 확인해주세요.' };
+      finish();
+      return;
+    }
+    
+    // 항목별 결과는 끝나는 순서대로 partial 응답으로 도착
+    if (response.partial) {
+      if (response.success && response.results && response.results.length > 0) {
+        found.push(response.query);
+      }
+      return;
+    }
+    
+    if (!response.success) {
+      notification = { title: 'Everything 검색 오류', message: response.error || '알 수 없는 오류가 발생했습니다.' };
+    } else if (response.found !== undefined) {
+      console.log('Batch search found:', found);
+      notification = { title: '✅ Everything 일괄 검색 완료', message: `${response.count}개 중 ${response.found}개 항목을 찾았습니다.` };
+    } else {
+      notification = { title: '✅ Everything 검색 완료', message: `${lines.length}개 검색어로 Everything 검색이 실행되었습니다.` };
+    }
+    finish();
+  });
+}
+
+// 팝업의 결과 미리보기: 포트로 받은 검색어를 query로 스트리밍하고,
+// 새 검색어가 오거나 팝업이 닫히면 (포트 끊김) 진행 중인 요청을 취소
+chrome.runtime.onConnect.addListener((port) => {
+  if (port.name !== 'query') {
+    return;
+  }
+  let currentRequest = null;
+  let connected = true;
+  
+  port.onMessage.addListener(({ request, query, offset, limit }) => {
+    if (currentRequest !== null) {
+      cancelHostRequest(currentRequest);
+    }
+    const requestId = queryEverything(query, offset || 0, limit, (results, chunkOffset) => {
+      if (connected) {
+        port.postMessage({ request: request, results: results, offset: chunkOffset });
+      }
+    }, (response, error) => {
+      if (currentRequest === requestId) {
+        currentRequest = null;
+      }
+      if (connected) {
+        port.postMessage({
+          request: request,
+          done: response || { success: false, error: error ? error.message : 'Native host disconnected' }
+        });
+      }
+    });
+    currentRequest = requestId;
+  });
+  
+  port.onDisconnect.addListener(() => {
+    connected = false;
+    if (currentRequest !== null) {
+      cancelHostRequest(currentRequest);
+    }
+  });
+});
+
+// 스트리밍 중인 요청 취소 (예: query 결과를 더 이상 받지 않을 때)
+function cancelHostRequest(requestId) {
+  if (!pendingRequests.has(requestId)) {
+    return;
+  }
+  sendHostMessage({ action: 'cancel', target: requestId });
+}
+
+// Everything 결과 조회 (offset/limit 페이지 단위)
+// onChunk(results)는 partial 응답마다, onDone(response, error)는 마지막에 호출됨
+function queryEverything(query, offset, limit, onChunk, onDone) {
+  return sendHostMessage({ action: 'query', query: query, offset: offset, limit: limit }, (response, error) => {
+    if (response && response.partial) {
+      onChunk(response.results, response.offset);
+    } else if (onDone) {
+      onDone(response, error);
+    }
+  });
+}
+
+// 경로 여러 개의 존재 여부/크기/수정 시각 확인 (stat_paths, 디렉토리별로 끝나는 순서대로 도착)
+// onChunk(results)는 partial 응답마다, onDone(response, error)는 마지막에 호출됨
+function statPaths(paths, onChunk, onDone) {
+  return sendHostMessage({ action: 'stat_paths', paths: paths }, (response, error) => {
+    if (response && response.partial) {
+      onChunk(response.results);
+    } else if (onDone) {
+      onDone(response, error);
+    }
+  });
+}
+
 // Everything에서 검색 실행
-function searchInEverything(searchText) {
-  console.log('Searching for:', searchText);
+// options.preprocess: 호스트가 선택에서 파일 이름/경로/해시 토큰만 뽑아 OR 검색
+function searchInEverything(searchText, options) {
+  console.log('Searching for:', searchText.length > 200 ? `${searchText.substring(0, 200)}... (${searchText.length} chars)` : searchText);
   
   // 클립보드 설정 확인 후 복사
   chrome.storage.sync.get(['copyToClipboard'], (result) => {
     const copyEnabled = result.copyToClipboard !== undefined ? result.copyToClipboard : true;
     
-    // Native Messaging Host로 메시지 전송
-    chrome.runtime.sendNativeMessage(
-      NATIVE_HOST_NAME,
+    // Native Messaging Host 세션으로 메시지 전송
+    sendHostMessage(
       { 
         action: 'search',
-        query: searchText 
+        query: searchText,
+        ...options
       },
-      (response) => {
-        if (chrome.runtime.lastError) {
-          console.error('Native messaging error:', chrome.runtime.lastError);
+      (response, error) => {
+        if (error) {
+          console.error('Native messaging error:', error);
           // 사용자에게 오류 알림
           chrome.notifications.create({
             type: 'basic',
@@ -50,6 +335,15 @@ function searchInEverything(searchText) {
           if (response && response.success) {
             console.log('Everything search launched successfully');
             
+            if (response.preprocessed) {
+              // 전처리한 검색은 실제로 쓴 검색어를 복사하고 버린 토큰 수를 알림
+              showPreprocessNotification(response.preprocessed);
+              if (copyEnabled) {
+                performClipboardCopy(response.query);
+              }
+              return;
+            }
+            
             // 검색 성공 후 클립보드 복사 실행 (설정에 따라)
             if (copyEnabled) {
               performClipboardCopy(searchText);
@@ -188,6 +482,19 @@ function performClipboardCopy(text) {
   });
 }
 
+// 큰 선택 전처리 결과 알림 (사용한 토큰 수, 중복/길이 초과로 버린 수)
+function showPreprocessNotification(report) {
+  const dropped = report.dropped || {};
+  let message = `${report.kept}개 항목(파일 이름/경로/해시)으로 검색했습니다.`;
+  if (dropped.over_budget) {
+    message += ` 검색어 길이 제한으로 ${dropped.over_budget}개를 제외했습니다.`;
+  }
+  if (report.input_truncated) {
+    message += ' 선택이 너무 커서 앞부분만 사용했습니다.';
+  }
+  showSimpleNotification('✅ Everything 검색 완료', message);
+}
+
 // 간단한 알림 표시
 function showSimpleNotification(title, message) {
   chrome.notifications.create({
@@ -220,11 +527,21 @@ function showClipboardNotification(text) {
 }
 
 // 확장 프로그램 아이콘 클릭 시 간단한 정보 표시를 위한 메시지 리스너
+// hostMessage: 팝업의 호스트 요청을 같은 세션으로 보내고 마지막 응답만 돌려줌 (팝업마다 호스트를 띄우지 않음)
 chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
   if (request.action === 'getStatus') {
     sendResponse({ 
       status: 'active',
       hostName: NATIVE_HOST_NAME 
     });
+  } else if (request.action === 'hostMessage') {
+    sendHostMessage(request.message, (response, error) => {
+      if (response && response.partial) {
+        return;
+      }
+      sendResponse(response || { success: false, error: error ? error.message : 'Native host disconnected' });
+    });
+    // 응답은 비동기로 보냄
+    return true;
   }
 });
\ No newline at end of file
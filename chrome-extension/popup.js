@@ -10,11 +10,39 @@ document.addEventListener('DOMContentLoaded', () => {
   const suggestions = document.getElementById('suggestions');
   const suggestionsList = document.getElementById('suggestionsList');
   const copyToClipboardCheckbox = document.getElementById('copyToClipboard');
+  const batchLinesCheckbox = document.getElementById('batchLines');
+  const metricsRefresh = document.getElementById('metricsRefresh');
+  const metricsSummary = document.getElementById('metricsSummary');
+  const metricsTable = document.getElementById('metricsTable');
+  const metricsBody = document.getElementById('metricsBody');
+  const metricsExtra = document.getElementById('metricsExtra');
+  const profilesList = document.getElementById('profilesList');
+  const historySection = document.getElementById('historySection');
+  const historyFilter = document.getElementById('historyFilter');
+  const historyList = document.getElementById('historyList');
+  const queryInput = document.getElementById('queryInput');
+  const querySummary = document.getElementById('querySummary');
+  const queryResults = document.getElementById('queryResults');
 
   let currentStatus = null;
 
+  // 자동 완성 요청 간격 (입력이 멈춘 뒤 보냄)
+  const HISTORY_DEBOUNCE_MS = 150;
+  const HISTORY_LIMIT = 8;
+  // 진단에 보여 줄 최근 프로필 수
+  const PROFILE_LIMIT = 5;
+  let historyTimer = null;
+  let historyRequest = 0;
+  // 결과 미리보기: 보여 줄 최대 결과 수, 백그라운드의 query 스트리밍 포트
+  // (팝업이 닫히면 포트가 끊기고 백그라운드가 진행 중인 조회를 취소함)
+  const QUERY_LIMIT = 50;
+  let queryTimer = null;
+  let queryRequest = 0;
+  let queryPort = null;
+
   // 초기 상태 확인
   checkEverythingStatus();
+  loadHistory('');
 
   // 설정 토글 버튼
   settingsToggle.addEventListener('click', () => {
@@ -22,6 +50,7 @@ document.addEventListener('DOMContentLoaded', () => {
       settingsSection.classList.remove('hidden');
       settingsToggle.textContent = '닫기';
       loadSuggestions();
+      loadMetrics();
     } else {
       settingsSection.classList.add('hidden');
       settingsToggle.textContent = '설정';
@@ -87,37 +116,89 @@ document.addEventListener('DOMContentLoaded', () => {
     }
   });
 
+  metricsRefresh.addEventListener('click', loadMetrics);
+
+  // 최근 검색어: 입력하면 접두어 자동 완성, 클릭하면 다시 검색
+  historyFilter.addEventListener('input', () => {
+    clearTimeout(historyTimer);
+    historyTimer = setTimeout(() => loadHistory(historyFilter.value), HISTORY_DEBOUNCE_MS);
+  });
+  historyList.addEventListener('click', (e) => {
+    const item = e.target.closest('.history-item');
+    if (item) {
+      searchAgain(item.dataset.query);
+    }
+  });
+
+  // 결과 미리보기: 입력이 멈추면 조회, 결과를 클릭하면 Everything에서 검색
+  queryInput.addEventListener('input', () => {
+    clearTimeout(queryTimer);
+    queryTimer = setTimeout(() => runQuery(queryInput.value.trim()), HISTORY_DEBOUNCE_MS);
+  });
+  queryResults.addEventListener('click', (e) => {
+    const item = e.target.closest('.history-item');
+    if (item) {
+      searchAgain(item.dataset.query);
+    }
+  });
+
   // 클립보드 설정 로드 및 저장
   loadClipboardSetting();
   copyToClipboardCheckbox.addEventListener('change', saveClipboardSetting);
 
+  // 여러 줄 일괄 검색 설정 로드 및 저장
+  loadBatchSetting();
+  batchLinesCheckbox.addEventListener('change', saveBatchSetting);
+
+  // 마지막 상태 스냅샷을 바로 그리고, 호스트에 version을 보내서 바뀐 경우에만 다시 그린다
   function checkEverythingStatus() {
-    statusDiv.textContent = '상태 확인 중...';
-    statusDiv.className = 'status';
-    
-    sendNativeMessage({ action: 'get_status' }, (response) => {
-      currentStatus = response;
-      
-      if (response && response.success) {
-        if (response.everything_found) {
-          statusDiv.textContent = '✅ Everything 연결됨';
-          statusDiv.className = 'status active';
-          
-          if (response.everything_path) {
-            pathInfoDiv.textContent = `경로: ${response.everything_path}`;
-            pathInfoDiv.classList.remove('hidden');
-          }
-        } else {
-          statusDiv.textContent = '⚠️ Everything을 찾을 수 없습니다';
-          statusDiv.className = 'status warning';
-          pathInfoDiv.classList.add('hidden');
+    chrome.storage.local.get(['statusSnapshot'], (result) => {
+      const cached = result.statusSnapshot;
+      if (cached) {
+        renderStatus(cached);
+      } else {
+        statusDiv.textContent = '상태 확인 중...';
+        statusDiv.className = 'status';
+      }
+
+      const message = { action: 'get_status' };
+      if (cached) {
+        message.version = cached.version;
+      }
+      sendNativeMessage(message, (response) => {
+        if (cached && response && response.success && response.unchanged) {
+          return;
+        }
+        renderStatus(response);
+        if (response && response.success) {
+          chrome.storage.local.set({ statusSnapshot: response });
+        }
+      });
+    });
+  }
+
+  function renderStatus(response) {
+    currentStatus = response;
+
+    if (response && response.success) {
+      if (response.everything_found) {
+        statusDiv.textContent = '✅ Everything 연결됨';
+        statusDiv.className = 'status active';
+
+        if (response.everything_path) {
+          pathInfoDiv.textContent = `경로: ${response.everything_path}`;
+          pathInfoDiv.classList.remove('hidden');
         }
       } else {
-        statusDiv.textContent = '❌ Native Host 연결 실패';
-        statusDiv.className = 'status error';
+        statusDiv.textContent = '⚠️ Everything을 찾을 수 없습니다';
+        statusDiv.className = 'status warning';
         pathInfoDiv.classList.add('hidden');
       }
-    });
+    } else {
+      statusDiv.textContent = '❌ Native Host 연결 실패';
+      statusDiv.className = 'status error';
+      pathInfoDiv.classList.add('hidden');
+    }
   }
 
   function loadSuggestions() {
@@ -149,6 +230,196 @@ document.addEventListener('DOMContentLoaded', () => {
     }
   }
 
+  // 호스트의 검색 기록에서 자동 완성 목록을 받아 표시 (호스트는 LIMIT만큼만 읽음)
+  function loadHistory(prefix) {
+    const request = ++historyRequest;
+    sendNativeMessage({ action: 'suggest', prefix: prefix, limit: HISTORY_LIMIT }, (response) => {
+      // 입력이 바뀐 뒤 도착한 이전 응답은 무시
+      if (request !== historyRequest) {
+        return;
+      }
+      if (!response || !response.success) {
+        historySection.classList.add('hidden');
+        return;
+      }
+      renderHistory(response.suggestions || [], prefix);
+    });
+  }
+
+  function renderHistory(suggestions, prefix) {
+    historyList.innerHTML = '';
+    suggestions.forEach(entry => {
+      const item = document.createElement('div');
+      item.className = 'history-item';
+      item.dataset.query = entry.query;
+      item.title = entry.query;
+      
+      const query = document.createElement('span');
+      query.className = 'history-query';
+      query.textContent = entry.query;
+      const meta = document.createElement('span');
+      meta.className = 'history-meta';
+      meta.textContent = `${entry.uses}회 · ${formatAge(entry.last_ts)}`;
+      
+      item.appendChild(query);
+      item.appendChild(meta);
+      historyList.appendChild(item);
+    });
+    // 기록이 하나도 없으면 처음부터 숨김 (검색어를 입력 중이면 입력란은 유지)
+    historySection.classList.toggle('hidden', suggestions.length === 0 && !prefix);
+  }
+
+  function formatAge(timestamp) {
+    const seconds = Math.max(0, Date.now() / 1000 - timestamp);
+    if (seconds < 60) return '방금';
+    if (seconds < 3600) return `${Math.floor(seconds / 60)}분 전`;
+    if (seconds < 86400) return `${Math.floor(seconds / 3600)}시간 전`;
+    return `${Math.floor(seconds / 86400)}일 전`;
+  }
+
+  function searchAgain(query) {
+    sendNativeMessage({ action: 'search', query: query }, (response) => {
+      if (response && response.success) {
+        loadHistory(historyFilter.value);
+      } else {
+        statusDiv.textContent = `❌ 검색 실패: ${response?.error || '알 수 없는 오류'}`;
+        statusDiv.className = 'status error';
+      }
+    });
+  }
+
+  // 백그라운드 세션으로 query를 보내고 partial 청크가 도착하는 대로 결과를 그림
+  // (새 검색어를 보내면 백그라운드가 이전 조회를 취소하고, 늦게 도착한 이전 응답은 무시)
+  function runQuery(query) {
+    const request = ++queryRequest;
+    queryResults.innerHTML = '';
+    if (!query) {
+      querySummary.classList.add('hidden');
+      return;
+    }
+    querySummary.textContent = '조회 중...';
+    querySummary.classList.remove('hidden');
+    
+    if (!queryPort) {
+      queryPort = chrome.runtime.connect({ name: 'query' });
+      queryPort.onMessage.addListener(onQueryMessage);
+      queryPort.onDisconnect.addListener(() => {
+        queryPort = null;
+      });
+    }
+    queryPort.postMessage({ request: request, query: query, offset: 0, limit: QUERY_LIMIT });
+  }
+
+  function onQueryMessage(message) {
+    if (message.request !== queryRequest) {
+      return;
+    }
+    if (message.results) {
+      message.results.forEach(path => {
+        const item = document.createElement('div');
+        item.className = 'history-item';
+        item.dataset.query = path;
+        item.title = path;
+        const text = document.createElement('span');
+        text.className = 'history-query';
+        text.textContent = path;
+        item.appendChild(text);
+        queryResults.appendChild(item);
+      });
+      return;
+    }
+    
+    const response = message.done;
+    if (!response.success) {
+      querySummary.textContent = `❌ 조회 실패: ${response.error || '알 수 없는 오류'}`;
+    } else if (response.count === 0) {
+      querySummary.textContent = '결과가 없습니다.';
+    } else {
+      const backend = response.backend ? ` (${response.backend})` : '';
+      querySummary.textContent = `${response.count}${response.has_more ? '개 이상' : '개'}${backend}, 클릭하면 Everything에서 검색`;
+    }
+  }
+
+  // 진단: 호스트 지표 (종료한 호스트들의 스냅샷까지 합친 값)
+  function loadMetrics() {
+    metricsSummary.textContent = '불러오는 중...';
+    
+    sendNativeMessage({ action: 'get_metrics', aggregate: true }, (response) => {
+      if (!response || !response.success) {
+        metricsSummary.textContent = '❌ 지표를 가져오지 못했습니다.';
+        metricsTable.classList.add('hidden');
+        metricsExtra.textContent = '';
+        return;
+      }
+      renderMetrics(response.metrics);
+    });
+    loadProfiles();
+  }
+
+  // 진단: 프로파일링(EE_PROFILE 또는 메시지의 profile)으로 저장한 최근 프로필
+  function loadProfiles() {
+    sendNativeMessage({ action: 'get_profiles', limit: PROFILE_LIMIT }, (response) => {
+      profilesList.innerHTML = '';
+      if (!response || !response.success || response.profiles.length === 0) {
+        return;
+      }
+      const title = document.createElement('div');
+      title.textContent = `최근 프로필 (${response.directory})`;
+      profilesList.appendChild(title);
+      response.profiles.forEach(profile => {
+        const div = document.createElement('div');
+        const when = new Date(profile.started_at * 1000).toLocaleTimeString();
+        const top = (profile.top_functions || [])[0];
+        const memory = profile.peak_kb !== undefined ? `, 최대 ${profile.peak_kb}KB` : '';
+        div.textContent = `${when} ${profile.action} ${formatMs(profile.elapsed_ms)} [${profile.modes.join('+')}]${memory}`;
+        div.title = [profile.name, top ? `가장 오래 걸린 함수: ${top.function}` : ''].filter(Boolean).join('\n');
+        profilesList.appendChild(div);
+      });
+    });
+  }
+
+  function formatMs(value) {
+    return value >= 100 ? `${Math.round(value)}ms` : `${value.toFixed(1)}ms`;
+  }
+
+  function renderMetrics(metrics) {
+    const actions = Object.entries(metrics.actions || {})
+      .filter(([, entry]) => entry.count > 0)
+      .sort((a, b) => b[1].count - a[1].count);
+    
+    metricsSummary.textContent = `호스트 프로세스 ${metrics.processes}개, 처리 시간(dispatch) 기준`;
+    metricsBody.innerHTML = '';
+    actions.forEach(([action, entry]) => {
+      const dispatch = entry.phases.dispatch;
+      const row = document.createElement('tr');
+      [action, entry.count, entry.errors, formatMs(dispatch.p50_ms), formatMs(dispatch.p95_ms), formatMs(dispatch.p99_ms)]
+        .forEach(value => {
+          const cell = document.createElement('td');
+          cell.textContent = value;
+          row.appendChild(cell);
+        });
+      metricsBody.appendChild(row);
+    });
+    metricsTable.classList.toggle('hidden', actions.length === 0);
+    
+    const lines = [];
+    Object.entries(metrics.caches || {}).forEach(([name, entry]) => {
+      lines.push(`캐시 ${name}: 적중률 ${(entry.hit_rate * 100).toFixed(0)}% (${entry.hits}/${entry.hits + entry.misses})`);
+    });
+    Object.entries(metrics.launches || {}).forEach(([name, hist]) => {
+      lines.push(`실행 ${name}: p50 ${formatMs(hist.p50_ms)}, p99 ${formatMs(hist.p99_ms)} (${hist.count}회)`);
+    });
+    const errors = Object.entries(metrics.errors || {}).sort((a, b) => b[1] - a[1]).slice(0, 3);
+    errors.forEach(([message, count]) => lines.push(`오류 ${count}회: ${message}`));
+    
+    metricsExtra.innerHTML = '';
+    lines.forEach(line => {
+      const div = document.createElement('div');
+      div.textContent = line;
+      metricsExtra.appendChild(div);
+    });
+  }
+
   function showValidation(message, type) {
     pathValidation.textContent = message;
     pathValidation.className = `info status ${type}`;
@@ -160,9 +431,18 @@ document.addEventListener('DOMContentLoaded', () => {
     }, 3000);
   }
 
+  // 백그라운드의 호스트 세션으로 요청 (팝업을 열 때마다 호스트를 새로 띄우지 않음)
   function sendNativeMessage(message, callback) {
     try {
-      chrome.runtime.sendNativeMessage('com.everythingeverywhere.host', message, callback);
+      chrome.runtime.sendMessage({ action: 'hostMessage', message: message }, (response) => {
+        if (chrome.runtime.lastError) {
+          console.error('Native message error:', chrome.runtime.lastError.message);
+          response = { success: false, error: 'Native messaging failed' };
+        }
+        if (callback) {
+          callback(response);
+        }
+      });
     } catch (error) {
       console.error('Native message error:', error);
       if (callback) {
@@ -194,4 +474,25 @@ document.addEventListener('DOMContentLoaded', () => {
       showValidation(message, 'success');
     });
   }
+
+  // 여러 줄 일괄 검색 설정 로드 (기본값 false: 경로/파일 이름 목록일 때만 일괄 검색)
+  function loadBatchSetting() {
+    chrome.storage.sync.get(['batchLines'], (result) => {
+      batchLinesCheckbox.checked = result.batchLines === true;
+    });
+  }
+
+  // 여러 줄 일괄 검색 설정 저장
+  function saveBatchSetting() {
+    const enabled = batchLinesCheckbox.checked;
+    chrome.storage.sync.set({ batchLines: enabled }, () => {
+      console.log('여러 줄 일괄 검색 설정 저장:', enabled);
+      
+      const message = enabled ?
+        '여러 줄을 선택하면 항상 줄마다 검색합니다.' :
+        '경로/파일 이름 목록일 때만 줄마다 검색합니다.';
+      
+      showValidation(message, 'success');
+    });
+  }
 });
\ No newline at end of file
@@ -1,52 +1,67 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+"""배포용 ZIP 패키지 생성
+
+- 복사용 폴더 없이 원본 파일을 바로 ZIP에 쓴다
+- 재현 가능한 빌드: 항목은 이름순, 시각/권한은 고정 (같은 내용이면 같은 ZIP)
+- 파일별 SHA-256을 dist/ 아래 매니페스트에 기록해서
+  바뀐 파일이 없으면 빌드를 건너뛰고, 바뀐 파일만 다시 압축한다
+  (나머지는 이전 ZIP의 압축된 데이터를 그대로 복사)
+- 다시 압축할 파일은 스레드 풀에서 동시에 압축 (zlib은 압축 중 GIL을 놓는다)
+- native-host/native_host.pyz: 호스트 모듈을 미리 컴파일한 묶음 (installer/host_bundle.py,
+  이 파이썬 버전용이며 설치 프로그램이 버전이 다르면 다시 만든다)
+
+사용법: python create_package.py [--force] [--jobs N]
+"""
+
 import os
-import shutil
-import zipfile
+import json
+import time
+import zlib
+import struct
+import hashlib
+import argparse
 from pathlib import Path
 
-def create_distribution_package():
-    """배포용 패키지 생성"""
-    
-    print("EverythingEverywhere 배포 패키지 생성 중...")
-    
-    # 프로젝트 루트 디렉토리
-    project_dir = Path(__file__).parent
-    
-    # 배포용 디렉토리 생성 (타임스탬프 추가)
-    import time
-    timestamp = int(time.time())
-    dist_dir = project_dir / "dist"
-    package_dir = dist_dir / f"EverythingEverywhere_{timestamp}"
-    
-    # 배포 디렉토리 생성 (존재하면 덮어쓰기)
-    package_dir.mkdir(parents=True, exist_ok=True)
-    
-    # 복사할 파일/폴더 목록
-    items_to_copy = [
-        "chrome-extension",
-        "native-host", 
-        "installer",
-        "README.md"
-    ]
-    
-    # 파일/폴더 복사
-    for item in items_to_copy:
-        src = project_dir / item
-        dst = package_dir / item
-        
-        if src.is_dir():
-            shutil.copytree(src, dst)
-            print(f"[OK] 폴더 복사: {item}")
-        elif src.is_file():
-            shutil.copy2(src, dst)
-            print(f"[OK] 파일 복사: {item}")
-    
-    # 간단한 설치 스크립트 생성
-    setup_script = package_dir / "setup.bat"
-    with open(setup_script, 'w', encoding='utf-8') as f:
-        f.write("""@echo off
+from installer.host_bundle import BUNDLE_NAME, build_bundle
+
+PROJECT_DIR = Path(__file__).parent
+DIST_DIR = PROJECT_DIR / "dist"
+ZIP_NAME = "EverythingEverywhere_portable.zip"
+MANIFEST_NAME = "EverythingEverywhere_portable.manifest.json"
+MANIFEST_VERSION = 1
+
+# 패키지에 넣을 파일/폴더 목록
+PACKAGE_ITEMS = [
+    "chrome-extension",
+    "native-host",
+    "installer",
+    "README.md"
+]
+
+# 실행 중에 생기는 파일은 넣지 않는다 (.gitignore의 Native host 런타임 파일)
+EXCLUDE_DIRS = {'__pycache__', 'metrics', 'profiles'}
+EXCLUDE_FILES = {'everything_config.json', 'everything_config.json.lock', 'discovery_cache.json', BUNDLE_NAME,
+                 'filename_index.bin', 'http_circuit.json', 'validation_cache.json', 'status_snapshot.json',
+                 'search_history.db', 'search_history.db-wal', 'search_history.db-shm'}
+EXCLUDE_SUFFIXES = ('.pyc', '.pyo', '.log')
+
+COMPRESS_LEVEL = 9
+# ZIP이 표현할 수 있는 가장 이른 시각 1980-01-01 00:00:00 (DOS 날짜/시간 형식)
+_DOS_DATE = (0 << 9) | (1 << 5) | 1
+_DOS_TIME = 0
+# 일반 파일 0644, 이름은 UTF-8 (플래그 비트 11)
+_EXTERNAL_ATTR = 0o100644 << 16
+_FLAG_UTF8 = 0x800
+_STORED, _DEFLATED = 0, 8
+
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+_CENTRAL_HEADER = struct.Struct('<4s6H3L5H2L')
+_END_RECORD = struct.Struct('<4s4H2LH')
+
+# 패키지에서 만드는 파일 (원본 트리에는 없음)
+SETUP_SCRIPT = """@echo off
 chcp 65001 > nul
 echo.
 echo ==========================================
@@ -70,12 +85,9 @@ echo 설치가 완료되었습니다!
 echo 크롬을 재시작한 후 사용하세요.
 echo.
 pause
-""")
-    
-    # 사용 설명서 생성
-    guide_file = package_dir / "사용법.txt"
-    with open(guide_file, 'w', encoding='utf-8') as f:
-        f.write("""EverythingEverywhere 사용법
+"""
+
+GUIDE = """EverythingEverywhere 사용법
 ================================
 
 ## 설치 방법
@@ -107,28 +119,209 @@ pause
 
 ## 제거 방법
 installer/uninstall.bat 실행
-""")
-    
-    # ZIP 파일로 압축
-    zip_path = dist_dir / "EverythingEverywhere_portable.zip"
+"""
+
+def _excluded(name):
+    return (name in EXCLUDE_FILES or name.endswith(EXCLUDE_SUFFIXES) or '.log.' in name)
+
+def collect_entries(project_dir=PROJECT_DIR):
+    """(ZIP 안 이름, 원본 경로 또는 내용 bytes) 목록을 이름순으로"""
+    entries = []
+    for item in PACKAGE_ITEMS:
+        src = Path(project_dir) / item
+        if src.is_file():
+            entries.append((item, str(src)))
+            continue
+        for root, dirs, files in os.walk(src):
+            dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+            rel_root = Path(root).relative_to(project_dir).as_posix()
+            entries.extend((f"{rel_root}/{name}", os.path.join(root, name))
+                           for name in files if not _excluded(name))
+    # 원본 폴더에 남은 묶음 대신 지금 원본으로 새로 만든다
+    entries.append((f"native-host/{BUNDLE_NAME}", build_bundle(Path(project_dir) / "native-host")))
+    # Windows에서 텍스트 모드로 쓰던 것과 같도록 CRLF로
+    entries.append(("setup.bat", SETUP_SCRIPT.replace('\n', '\r\n').encode('utf-8')))
+    entries.append(("사용법.txt", GUIDE.replace('\n', '\r\n').encode('utf-8')))
+    entries.sort(key=lambda entry: entry[0])
+    return entries
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get('version') == MANIFEST_VERSION else {}
+
+def _hash_entries(entries, previous):
+    """항목마다 {sha256, size, mtime_ns} (크기/mtime이 같으면 이전 해시 재사용)"""
+    hashed = {}
+    for name, source in entries:
+        if isinstance(source, bytes):
+            hashed[name] = {'sha256': hashlib.sha256(source).hexdigest(), 'size': len(source)}
+            continue
+        st = os.stat(source)
+        old = previous.get(name)
+        if old and old.get('size') == st.st_size and old.get('mtime_ns') == st.st_mtime_ns:
+            hashed[name] = {'sha256': old['sha256'], 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+            continue
+        digest = hashlib.sha256()
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        hashed[name] = {'sha256': digest.hexdigest(), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    return hashed
+
+def _compress(source, level):
+    """원본 → (압축 방식, 압축된 데이터, CRC32, 원본 크기), 줄지 않으면 그대로 저장"""
+    if isinstance(source, bytes):
+        data = source
+    else:
+        with open(source, 'rb') as f:
+            data = f.read()
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    packed = compressor.compress(data) + compressor.flush()
+    if len(packed) >= len(data):
+        return _STORED, data, zlib.crc32(data), len(data)
+    return _DEFLATED, packed, zlib.crc32(data), len(data)
+
+def _reusable(previous, name, sha256, old_zip):
+    """이전 ZIP에서 그대로 복사할 수 있는 항목이면 이전 매니페스트 항목 반환"""
+    old = previous.get(name)
+    if old_zip is None or not old or old.get('sha256') != sha256 or 'offset' not in old:
+        return None
+    return old
+
+def _read_raw(old_zip, old):
+    old_zip.seek(old['offset'])
+    data = old_zip.read(old['compressed_size'])
+    if len(data) != old['compressed_size']:
+        raise OSError('Previous archive is truncated')
+    return old['method'], data, old['crc'], old['size']
+
+def _archive_matches(zip_path, manifest):
+    try:
+        return os.path.getsize(zip_path) == manifest.get('archive_size')
+    except OSError:
+        return False
+
+def build_package(dist_dir=DIST_DIR, project_dir=PROJECT_DIR, force=False, jobs=None,
+                  level=COMPRESS_LEVEL):
+    """ZIP을 만들고 통계 dict 반환 (바뀐 파일이 없으면 skipped=True)"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    started = time.perf_counter()
+    dist_dir = Path(dist_dir)
+    zip_path = dist_dir / ZIP_NAME
+    manifest_path = dist_dir / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    previous = {} if force else manifest.get('entries', {})
+
+    entries = collect_entries(project_dir)
+    hashed = _hash_entries(entries, previous)
+    hash_ms = (time.perf_counter() - started) * 1000
+    stats = {'zip': str(zip_path), 'files': len(entries), 'hash_ms': round(hash_ms, 1),
+             'previous_build_ms': manifest.get('build_ms')}
+
+    unchanged = (list(hashed) == list(previous)
+                 and all(previous[name]['sha256'] == entry['sha256'] for name, entry in hashed.items()))
+    if unchanged and _archive_matches(zip_path, manifest):
+        stats.update(skipped=True, total_ms=round((time.perf_counter() - started) * 1000, 1))
+        return stats
+
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    old_zip = None
+    if previous and _archive_matches(zip_path, manifest):
+        old_zip = open(zip_path, 'rb')
+    tmp_path = zip_path.with_name(f"{ZIP_NAME}.{os.getpid()}.tmp")
+    reused = compressed = 0
+    central = []
+    try:
+        with ThreadPoolExecutor(max_workers=jobs or min(8, (os.cpu_count() or 1) + 2)) as pool:
+            # 다시 압축할 항목만 풀에 넣고, 쓰기는 이름순으로 결과가 나오는 대로
+            jobs_by_name = {}
+            for name, source in entries:
+                if not _reusable(previous, name, hashed[name]['sha256'], old_zip):
+                    jobs_by_name[name] = pool.submit(_compress, source, level)
+            with open(tmp_path, 'wb') as out:
+                for name, _ in entries:
+                    future = jobs_by_name.get(name)
+                    if future is None:
+                        method, data, crc, size = _read_raw(old_zip, previous[name])
+                        reused += 1
+                    else:
+                        method, data, crc, size = future.result()
+                        compressed += 1
+                    encoded = name.encode('utf-8')
+                    header_offset = out.tell()
+                    out.write(_LOCAL_HEADER.pack(b'PK\x03\x04', 20, _FLAG_UTF8, method, _DOS_TIME,
+                                                 _DOS_DATE, crc, len(data), size, len(encoded), 0))
+                    out.write(encoded)
+                    offset = out.tell()
+                    out.write(data)
+                    central.append((encoded, method, crc, len(data), size, header_offset))
+                    hashed[name].update(method=method, crc=crc, compressed_size=len(data), offset=offset)
+
+                directory_offset = out.tell()
+                for encoded, method, crc, packed_size, size, header_offset in central:
+                    out.write(_CENTRAL_HEADER.pack(b'PK\x01\x02', (3 << 8) | 20, 20, _FLAG_UTF8, method,
+                                                   _DOS_TIME, _DOS_DATE, crc, packed_size, size,
+                                                   len(encoded), 0, 0, 0, 0, _EXTERNAL_ATTR, header_offset))
+                    out.write(encoded)
+                directory_size = out.tell() - directory_offset
+                if directory_offset + directory_size > 0xFFFFFFFF or len(central) > 0xFFFF:
+                    raise ValueError('Package is too large for a ZIP without ZIP64')
+                out.write(_END_RECORD.pack(b'PK\x05\x06', 0, 0, len(central), len(central),
+                                           directory_size, directory_offset, 0))
+                archive_size = out.tell()
+    except BaseException:
+        if old_zip is not None:
+            old_zip.close()
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+    if old_zip is not None:
+        old_zip.close()
+    os.replace(tmp_path, zip_path)
+
+    total_ms = (time.perf_counter() - started) * 1000
+    manifest = {'version': MANIFEST_VERSION, 'archive_size': archive_size,
+                'build_ms': round(total_ms, 1), 'entries': hashed}
+    tmp_manifest = manifest_path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+    with open(tmp_manifest, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_manifest, manifest_path)
+
+    stats.update(skipped=False, compressed=compressed, reused=reused, size=archive_size,
+                 total_ms=round(total_ms, 1))
+    return stats
+
+def create_distribution_package(force=False, jobs=None):
+    """배포용 패키지 생성"""
     
-    print(f"\n[압축] ZIP 파일 생성 중: {zip_path}")
+    print("EverythingEverywhere 배포 패키지 생성 중...")
+    stats = build_package(force=force, jobs=jobs)
+    zip_path = Path(stats['zip'])
     
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(package_dir):
-            for file in files:
-                file_path = Path(root) / file
-                arc_path = file_path.relative_to(package_dir)
-                zipf.write(file_path, arc_path)
-                
-    file_size = zip_path.stat().st_size / 1024  # KB
+    if stats['previous_build_ms'] is not None:
+        print(f"[시간] 이전 빌드: {stats['previous_build_ms']:.1f} ms")
+    if stats['skipped']:
+        print(f"[건너뜀] 바뀐 파일이 없습니다 ({stats['files']}개 확인, {stats['total_ms']:.1f} ms)")
+        print(f"   ZIP: {zip_path}")
+        return stats
     
+    print(f"[OK] 파일 {stats['files']}개: 다시 압축 {stats['compressed']}개, 이전 ZIP에서 복사 {stats['reused']}개")
+    print(f"[시간] 이번 빌드: {stats['total_ms']:.1f} ms (해시 확인 {stats['hash_ms']:.1f} ms)")
     print(f"\n[완료] 배포 패키지 생성 완료!")
-    print(f"   폴더: {package_dir}")
-    print(f"   ZIP: {zip_path} ({file_size:.1f} KB)")
+    print(f"   ZIP: {zip_path} ({stats['size'] / 1024:.1f} KB)")
     print(f"\n[사용법] 다른 컴퓨터에서 사용하려면:")
     print(f"   1. {zip_path.name} 파일을 전송")
     print(f"   2. 압축 해제 후 setup.bat 실행")
+    return stats
 
 if __name__ == "__main__":
-    create_distribution_package()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="배포용 ZIP 패키지 생성")
+    parser.add_argument('--force', action='store_true', help='이전 빌드를 무시하고 모든 파일을 다시 압축')
+    parser.add_argument('--jobs', type=int, default=None, help='압축 스레드 수')
+    args = parser.parse_args()
+    create_distribution_package(force=args.force, jobs=args.jobs)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Native Host 묶음(native_host.pyz) 만들기와 확인
+
+native-host/*.py를 미리 컴파일한 .pyc(unchecked-hash, 독스트링 제거)만 담은 zipapp 하나로 묶는다.
+- 배포 폴더에 __pycache__를 쓸 수 없거나 원본 mtime이 바뀌어도 시작할 때마다 다시 컴파일하지 않는다
+- 원본 .py는 찾지도 stat하지도 않는다 (zip 목차 한 번으로 모든 모듈을 찾음)
+- __main__은 모듈의 __file__을 묶음 옆의 원본 경로(native-host/<모듈>.py)로 맞춰서 로드하므로
+  설정/기록/로그 파일 위치는 원본으로 실행할 때와 같다
+- 크롬은 INTERPRETER_FLAGS로 실행한다 (-I: PYTHON* 환경 변수/사용자 site 무시, -S: site 모듈 로드 안 함)
+
+.pyc는 만든 파이썬 버전에서만 읽을 수 있으므로 설치 프로그램은 bundle_matches()로 확인하고,
+다르면 설치하는 파이썬으로 다시 만든 뒤 verify_bundle()로 ping 왕복을 확인한다.
+create_package.py와 installer/install.py가 함께 쓴다.
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import struct
+import marshal
+import zipfile
+import importlib.util
+from pathlib import Path
+
+BUNDLE_NAME = "native_host.pyz"
+INTERPRETER_FLAGS = ('-I', '-S')
+# 독스트링/assert 제거 (호스트는 실행 중에 __doc__을 쓰지 않는다)
+OPTIMIZE = 2
+# 재현 가능한 빌드: ZIP 항목 시각 고정 (create_package.py와 같은 1980-01-01)
+_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+# pyc 플래그: 해시 기반(비트 0), 원본 확인 안 함(비트 1 꺼짐)
+_UNCHECKED_HASH = 0b01
+
+MAIN_SOURCE = '''\
+# native_host.pyz 진입점 (installer/host_bundle.py가 생성)
+import os
+import sys
+from importlib.machinery import ModuleSpec
+
+BUNDLE_PATH = os.path.abspath(sys.argv[0])
+HOST_DIR = os.path.dirname(BUNDLE_PATH)
+# 데몬을 띄울 때도 같은 묶음과 옵션으로 (daemon._start_daemon)
+INTERPRETER_FLAGS = {flags!r}
+MODULES = frozenset({modules!r})
+
+class BundleFinder:
+    """묶음 안의 호스트 모듈을 원본과 같은 __file__로 로드"""
+
+    def __init__(self, importer):
+        self.importer = importer
+
+    def find_spec(self, name, path=None, target=None):
+        if name not in MODULES:
+            return None
+        spec = ModuleSpec(name, self, origin=os.path.join(HOST_DIR, name + '.py'))
+        spec.has_location = True
+        return spec
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        exec(self.importer.get_code(module.__name__), module.__dict__)
+
+sys.meta_path.insert(0, BundleFinder(__loader__))
+
+import native_host
+native_host.main()
+'''
+
+def host_modules(native_host_dir):
+    """묶음에 넣을 모듈 이름 (native-host 폴더의 .py)"""
+    return sorted(path.stem for path in Path(native_host_dir).glob('*.py'))
+
+def _pyc(source, filename):
+    """원본 → unchecked-hash .pyc 바이트"""
+    code = compile(source, filename, 'exec', dont_inherit=True, optimize=OPTIMIZE)
+    return (importlib.util.MAGIC_NUMBER + struct.pack('<I', _UNCHECKED_HASH)
+            + importlib.util.source_hash(source) + marshal.dumps(code))
+
+def build_bundle(native_host_dir, flags=INTERPRETER_FLAGS):
+    """native_host.pyz 내용 (bytes, 같은 원본과 파이썬이면 같은 바이트)"""
+    modules = host_modules(native_host_dir)
+    if 'native_host' not in modules:
+        raise FileNotFoundError(f"native_host.py not found in {native_host_dir}")
+    main = MAIN_SOURCE.format(flags=list(flags), modules=modules).encode('utf-8')
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        def add(name, data):
+            info = zipfile.ZipInfo(name, _DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o100644 << 16
+            bundle.writestr(info, data)
+
+        add('__main__.pyc', _pyc(main, '__main__.py'))
+        for name in modules:
+            source = (Path(native_host_dir) / f"{name}.py").read_bytes()
+            add(f"{name}.pyc", _pyc(source, f"{name}.py"))
+    return buffer.getvalue()
+
+def write_bundle(native_host_dir, output=None, flags=INTERPRETER_FLAGS):
+    """native-host 폴더에 native_host.pyz 쓰기 (임시 파일 → 교체), 경로 반환"""
+    output = Path(output or Path(native_host_dir) / BUNDLE_NAME)
+    data = build_bundle(native_host_dir, flags)
+    tmp = output.with_name(f"{output.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, output)
+    return output
+
+def bundle_matches(path):
+    """묶음이 있고 이 파이썬이 .pyc를 읽을 수 있으면 True (매직 넘버 비교)"""
+    try:
+        with zipfile.ZipFile(path) as bundle:
+            with bundle.open('__main__.pyc') as f:
+                return f.read(len(importlib.util.MAGIC_NUMBER)) == importlib.util.MAGIC_NUMBER
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return False
+
+def host_command(bundle_path, python=None, flags=INTERPRETER_FLAGS):
+    """크롬이 실행할 명령 (인터프리터, 옵션, 묶음)"""
+    return [python or sys.executable, *flags, str(bundle_path)]
+
+def verify_bundle(bundle_path, python=None, flags=INTERPRETER_FLAGS, timeout=15):
+    """묶음을 크롬과 같은 방식으로 실행해서 ping 왕복 확인 → (성공 여부, 설명, 걸린 ms)"""
+    import subprocess
+
+    body = json.dumps({'action': 'ping', 'id': 'verify'}).encode('utf-8')
+    started = time.perf_counter()
+    try:
+        proc = subprocess.run(host_command(bundle_path, python, flags),
+                              input=struct.pack('<I', len(body)) + body,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return False, str(e), None
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    out = proc.stdout
+    try:
+        length = struct.unpack('<I', out[:4])[0]
+        response = json.loads(out[4:4 + length].decode('utf-8'))
+    except (struct.error, ValueError):
+        detail = proc.stderr.decode('utf-8', 'replace').strip().splitlines()
+        return False, detail[-1] if detail else f'exit code {proc.returncode}', elapsed_ms
+    if not response.get('success') or response.get('id') != 'verify':
+        return False, f'unexpected response: {response}', elapsed_ms
+    return True, f"pid {response.get('pid')}", elapsed_ms
+
+if __name__ == '__main__':
+    # 원본 트리에서 직접 만들어 확인: python installer/host_bundle.py
+    host_dir = Path(__file__).resolve().parent.parent / "native-host"
+    path = write_bundle(host_dir)
+    ok, detail, elapsed_ms = verify_bundle(path)
+    print(f"{path}: {'OK' if ok else 'FAILED'} ({detail}, {elapsed_ms} ms)")
+    sys.exit(0 if ok else 1)
@@ -4,71 +4,202 @@
 import os
 import sys
 import json
-import winreg
-import shutil
-import sqlite3
 import hashlib
 from pathlib import Path
 
-def find_chrome_extensions():
-    """설치된 크롬 확장 프로그램에서 EverythingEverywhere 찾기"""
-    extensions = []
-    
-    # 크롬 사용자 데이터 디렉토리들
-    chrome_dirs = [
-        os.path.expandvars(r"%LOCALAPPDATA%\Google\Chrome\User Data"),
-        os.path.expandvars(r"%APPDATA%\Google\Chrome\User Data"),
-    ]
-    
-    for chrome_dir in chrome_dirs:
-        if not os.path.exists(chrome_dir):
+EXTENSION_NAME = 'EverythingEverywhere'
+
+def _user_data_roots():
+    """크로미움 계열 브라우저의 (브라우저 이름, 사용자 데이터 디렉토리) 목록"""
+    roots = []
+    local = os.environ.get('LOCALAPPDATA')
+    if local:
+        roots += [
+            ('Chrome', os.path.join(local, "Google", "Chrome", "User Data")),
+            ('Edge', os.path.join(local, "Microsoft", "Edge", "User Data")),
+            ('Brave', os.path.join(local, "BraveSoftware", "Brave-Browser", "User Data")),
+            ('Chromium', os.path.join(local, "Chromium", "User Data")),
+        ]
+    roaming = os.environ.get('APPDATA')
+    if roaming:
+        roots.append(('Chrome', os.path.join(roaming, "Google", "Chrome", "User Data")))
+    return roots
+
+def _id_from_digest(digest):
+    """SHA-256 앞 16바이트를 16진수로 쓰고 0-f를 a-p로 바꾼 것이 확장 프로그램 ID"""
+    return digest[:16].hex().translate(str.maketrans('0123456789abcdef', 'abcdefghijklmnop'))
+
+def extension_id_from_path(path, windows=None):
+    """압축해제된 확장 프로그램 폴더 경로로 크롬이 만드는 ID 계산
+
+    크롬은 절대 경로 문자열의 바이트(Windows는 UTF-16LE, 드라이브 문자는 대문자)를
+    해시한다. 폴더를 옮기면 ID도 바뀐다.
+    """
+    if windows is None:
+        windows = os.name == 'nt'
+    if windows:
+        if len(path) >= 2 and path[1] == ':':
+            path = path[0].upper() + path[1:]
+        data = path.encode('utf-16-le')
+    else:
+        data = os.fsencode(path)
+    return _id_from_digest(hashlib.sha256(data).digest())
+
+def extension_id_from_key(key):
+    """manifest.json의 key(base64 공개 키)로 정해지는 ID 계산"""
+    import base64
+    return _id_from_digest(hashlib.sha256(base64.b64decode(key)).digest())
+
+def local_extension_id(extension_dir):
+    """이 프로젝트의 chrome-extension 폴더를 압축해제로 로드했을 때의 ID (폴더가 없으면 None)"""
+    manifest_path = os.path.join(extension_dir, "manifest.json")
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('key'):
+        return extension_id_from_key(manifest['key'])
+    return extension_id_from_path(os.path.abspath(extension_dir))
+
+def list_profiles(user_data_dir):
+    """Local State에 등록된 프로필 폴더 이름 목록 (없으면 Default / Profile N 폴더)"""
+    try:
+        with open(os.path.join(user_data_dir, "Local State"), 'r', encoding='utf-8') as f:
+            info_cache = json.load(f).get('profile', {}).get('info_cache', {})
+        if info_cache:
+            return sorted(info_cache)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        with os.scandir(user_data_dir) as entries:
+            return sorted(entry.name for entry in entries if entry.is_dir()
+                          and (entry.name == "Default" or entry.name.startswith("Profile ")))
+    except OSError:
+        return []
+
+def _read_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _is_target(manifest):
+    name = manifest.get('name', '')
+    return isinstance(name, str) and (name == EXTENSION_NAME or 'everything' in name.lower())
+
+def _unpacked_extensions(profile_dir):
+    """프로필 설정(Secure Preferences, Preferences)에 기록된 압축해제 확장의 (ID, 경로)"""
+    for name in ("Secure Preferences", "Preferences"):
+        try:
+            with open(os.path.join(profile_dir, name), 'r', encoding='utf-8') as f:
+                settings = json.load(f).get('extensions', {}).get('settings', {})
+        except (OSError, ValueError, AttributeError):
             continue
-            
-        # Default 프로필과 Profile 1, 2... 확인
-        for profile in ["Default", "Profile 1", "Profile 2", "Profile 3"]:
-            extensions_dir = os.path.join(chrome_dir, profile, "Extensions")
-            if not os.path.exists(extensions_dir):
+        for ext_id, entry in settings.items():
+            path = entry.get('path') if isinstance(entry, dict) else None
+            # 스토어 확장은 Extensions 아래 상대 경로, 압축해제 확장은 절대 경로
+            if isinstance(path, str) and os.path.isabs(path):
+                yield ext_id, path
+
+def _scan_profile(browser, user_data_dir, profile, stop):
+    """프로필 하나에서 EverythingEverywhere 확장 찾기 (stop이 설정되면 중단)"""
+    found = []
+    profile_dir = os.path.join(user_data_dir, profile)
+
+    def add(ext_id, manifest, path):
+        found.append({
+            'id': ext_id,
+            'name': manifest.get('name', 'Unknown'),
+            'version': manifest.get('version', 'Unknown'),
+            'profile': profile,
+            'browser': browser,
+            'path': path,
+        })
+
+    # 압축해제로 로드한 확장은 설정 파일에만 경로가 있다
+    for ext_id, path in _unpacked_extensions(profile_dir):
+        manifest = _read_manifest(os.path.join(path, "manifest.json"))
+        if manifest and _is_target(manifest):
+            add(ext_id, manifest, path)
+            return found
+
+    try:
+        extensions = os.scandir(os.path.join(profile_dir, "Extensions"))
+    except OSError:
+        return found
+    with extensions:
+        for ext_entry in extensions:
+            if stop.is_set():
+                break
+            if not ext_entry.is_dir():
                 continue
-                
-            # 각 확장 프로그램 디렉토리 확인
-            for ext_id in os.listdir(extensions_dir):
-                ext_path = os.path.join(extensions_dir, ext_id)
-                if not os.path.isdir(ext_path):
-                    continue
-                    
-                # 버전 폴더들 확인
-                for version in os.listdir(ext_path):
-                    version_path = os.path.join(ext_path, version)
-                    manifest_path = os.path.join(version_path, "manifest.json")
-                    
-                    if os.path.exists(manifest_path):
-                        try:
-                            with open(manifest_path, 'r', encoding='utf-8') as f:
-                                manifest = json.load(f)
-                                
-                            # EverythingEverywhere 확장인지 확인
-                            if (manifest.get('name') == 'EverythingEverywhere' or 
-                                'everything' in manifest.get('name', '').lower()):
-                                extensions.append({
-                                    'id': ext_id,
-                                    'name': manifest.get('name', 'Unknown'),
-                                    'version': manifest.get('version', 'Unknown'),
-                                    'profile': profile
-                                })
-                        except:
-                            continue
-    
-    return extensions
-
-def get_chrome_extension_id():
-    """크롬 확장 프로그램 ID 가져오기 또는 입력받기"""
+            try:
+                with os.scandir(ext_entry.path) as versions:
+                    version_dirs = [v.path for v in versions if v.is_dir()]
+            except OSError:
+                continue
+            for version_path in version_dirs:
+                manifest = _read_manifest(os.path.join(version_path, "manifest.json"))
+                if manifest and _is_target(manifest):
+                    add(ext_entry.name, manifest, version_path)
+                    return found
+    return found
+
+def find_chrome_extensions(roots=None, first_match=True, workers=None):
+    """크로미움 계열 브라우저의 모든 프로필에서 EverythingEverywhere 확장 찾기
+
+    프로필마다 스레드 풀에서 검색하고, first_match면 처음 찾은 하나만 반환한다.
+    roots: (브라우저 이름, 사용자 데이터 디렉토리) 목록, 없으면 기본 설치 위치.
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    tasks = []
+    for browser, user_data_dir in (_user_data_roots() if roots is None else roots):
+        if os.path.isdir(user_data_dir):
+            tasks.extend((browser, user_data_dir, profile) for profile in list_profiles(user_data_dir))
+    if not tasks:
+        return []
+
+    extensions = []
+    futures = []
+    stop = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=workers or min(8, len(tasks)))
+    try:
+        futures = [pool.submit(_scan_profile, *task, stop) for task in tasks]
+        for future in as_completed(futures):
+            extensions.extend(future.result())
+            if extensions and first_match:
+                stop.set()
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=True)
+    return extensions[:1] if first_match else extensions
+
+def get_chrome_extension_id(extension_dir=None, scan=False):
+    """크롬 확장 프로그램 ID 가져오기 또는 입력받기
+
+    chrome-extension 폴더를 압축해제로 로드했다면 경로로 ID를 바로 계산하고,
+    폴더가 없거나 scan이면 브라우저 프로필을 검색한다.
+    """
     print("=" * 60)
     print("EverythingEverywhere 설치 프로그램")
     print("=" * 60)
     
+    extension_id = None if scan or extension_dir is None else local_extension_id(extension_dir)
+    if extension_id:
+        print(f"\n✅ 압축해제된 확장 프로그램 폴더: {os.path.abspath(extension_dir)}")
+        print(f"   확장 ID: {extension_id}")
+        print("   (다른 위치의 폴더를 로드했다면 install.py --scan 으로 검색하세요)")
+        return extension_id
+    
     # 자동으로 확장 프로그램 찾기
     print("\n🔍 설치된 EverythingEverywhere 확장 검색 중...")
-    extensions = find_chrome_extensions()
+    extensions = find_chrome_extensions(first_match=not scan)
     
     if extensions:
         print(f"\n✅ {len(extensions)}개의 EverythingEverywhere 확장을 발견했습니다:")
@@ -76,7 +207,7 @@ def get_chrome_extension_id():
             print(f"   {i}. ID: {ext['id']}")
             print(f"      이름: {ext['name']}")
             print(f"      버전: {ext['version']}")
-            print(f"      프로필: {ext['profile']}")
+            print(f"      프로필: {ext['browser']} / {ext['profile']}")
             print()
         
         if len(extensions) == 1:
@@ -112,29 +243,65 @@ def get_chrome_extension_id():
     
     return extension_id
 
-def install_native_host():
-    """Native Messaging Host 설치"""
+def host_command(native_host_dir, python_exe, source=False):
+    """크롬이 실행할 호스트 명령
+    
+    미리 컴파일한 묶음(native_host.pyz)을 시작 옵션(-I -S)과 함께 쓰고,
+    묶음이 없거나 다른 파이썬 버전용이면 이 파이썬으로 다시 만든다.
+    실제로 실행해서 ping에 응답하지 않으면 (또는 source면) 원본 native_host.py로 실행한다.
+    """
+    import host_bundle
+    
+    source_command = [python_exe, str(native_host_dir / "native_host.py")]
+    if source:
+        return source_command
+    
+    bundle = native_host_dir / host_bundle.BUNDLE_NAME
+    if not host_bundle.bundle_matches(bundle):
+        print(f"\n🔧 {bundle.name}을(를) 이 파이썬 버전으로 컴파일하는 중...")
+        try:
+            host_bundle.write_bundle(native_host_dir)
+        except (OSError, SyntaxError) as e:
+            print(f"⚠️  묶음을 만들지 못했습니다: {e}")
+            return source_command
+    
+    ok, detail, elapsed_ms = host_bundle.verify_bundle(bundle, python_exe)
+    if not ok:
+        print(f"⚠️  {bundle.name} 실행 확인 실패 ({detail}), 원본 native_host.py로 실행합니다")
+        return source_command
+    print(f"\n✅ {bundle.name} 실행 확인 ({detail}, {elapsed_ms} ms)")
+    return host_bundle.host_command(bundle, python_exe)
+
+def install_native_host(scan=False, relay=False, source=False):
+    """Native Messaging Host 설치
+    
+    relay=True면 호스트를 --relay로 실행해서 모든 브라우저/프로필이 데몬 하나를 함께 쓴다.
+    source=True면 미리 컴파일한 묶음 대신 원본 native_host.py로 실행한다.
+    """
+    import winreg
+    
     # 경로 설정
     script_dir = Path(__file__).parent
     project_dir = script_dir.parent
     native_host_dir = project_dir / "native-host"
     
     # 확장 프로그램 ID 가져오기
-    extension_id = get_chrome_extension_id()
+    extension_id = get_chrome_extension_id(project_dir / "chrome-extension", scan)
     
     # 매니페스트 파일 업데이트
     manifest_file = native_host_dir / "com.everythingeverywhere.host.json"
     with open(manifest_file, 'r', encoding='utf-8') as f:
         manifest = json.load(f)
     
-    # Python 실행 파일 경로 설정
-    python_exe = sys.executable
-    native_host_py = str(native_host_dir / "native_host.py")
+    # Python 실행 파일과 호스트 (미리 컴파일한 묶음 또는 원본)
+    command = host_command(native_host_dir, sys.executable, source)
     
-    # 배치 파일 생성 (Python 스크립트 실행용)
+    # 배치 파일 생성 (옵션은 따옴표 없이, 경로는 따옴표로)
     batch_file = native_host_dir / "native_host.bat"
+    host_args = ' --relay' if relay else ''
+    quoted = ' '.join(arg if arg.startswith('-') else f'"{arg}"' for arg in command)
     with open(batch_file, 'w') as f:
-        f.write(f'@echo off\n"{python_exe}" "{native_host_py}" %*')
+        f.write(f'@echo off\n{quoted}{host_args} %*')
     
     # 매니페스트에서 경로와 allowed_origins 업데이트
     manifest['path'] = str(batch_file)
@@ -208,6 +375,8 @@ def install_native_host():
 
 def uninstall_native_host():
     """Native Messaging Host 제거"""
+    import winreg
+    
     print("\nNative Messaging Host 제거 중...")
     
     try:
@@ -222,4 +391,5 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "uninstall":
         uninstall_native_host()
     else:
-        install_native_host()
\ No newline at end of file
+        install_native_host(scan="--scan" in sys.argv[1:], relay="--daemon" in sys.argv[1:],
+                            source="--source" in sys.argv[1:])
\ No newline at end of file
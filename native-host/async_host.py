@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""asyncio 기반 메시지 루프 (native_host --async 또는 EE_HOST_LOOP=async)
+
+메시지마다 태스크를 만들어 동시에 처리하므로 느린 액션(validate_path 등)이
+뒤에 온 get_status를 막지 않는다. 응답은 끝나는 순서대로 나가고 요청 id로 매칭된다.
+
+- stdin은 리더 스레드에서 읽어 루프로 넘긴다 (Windows 파이프에서도 동작)
+- stdout 쓰기는 작업자 하나짜리 executor로 직렬화해서 프레임이 섞이지 않는다
+- Everything.exe 실행 검증은 asyncio subprocess로 기다린다
+- 나머지 액션은 기존 handle_message를 스레드에서 실행한다
+"""
+
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import host_log as log
+import metrics
+
+async def validation_result_async(path):
+    """validation_result의 asyncio 버전 (캐시/PE 확인 후 필요할 때만 -help 실행)"""
+    from discovery import check_everything_path, record_validation, VALIDATE_TIMEOUT
+    
+    loop = asyncio.get_running_loop()
+    result, identity = await loop.run_in_executor(None, check_everything_path, path)
+    if result is not None:
+        return result
+    
+    started = time.perf_counter()
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            path, '-help',
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL)
+    except OSError:
+        return record_validation(path, identity, False, 'exec')
+    
+    try:
+        await asyncio.wait_for(proc.wait(), VALIDATE_TIMEOUT)
+        valid = True
+    except asyncio.TimeoutError:
+        # 동기 버전(subprocess.run timeout)과 같이 시간 초과는 실패로 처리
+        proc.kill()
+        await proc.wait()
+        valid = False
+    metrics.launch('validate', started)
+    return await loop.run_in_executor(None, record_validation, path, identity, valid, 'exec')
+
+async def validate_everything_path_async(path):
+    """validate_everything_path의 asyncio 버전 (-help 실행을 루프를 막지 않고 기다림)"""
+    return (await validation_result_async(path))['valid']
+
+async def handle_validate_path(host, message):
+    path = message.get('path', '')
+    return host.validate_path_response(path, await validation_result_async(path))
+
+async def handle_set_path(host, message):
+    from discovery import save_everything_path
+    
+    path = message.get('path', '')
+    if not await validate_everything_path_async(path):
+        return {
+            'success': False,
+            'error': 'Invalid Everything.exe path'
+        }
+    loop = asyncio.get_running_loop()
+    if await loop.run_in_executor(None, save_everything_path, path):
+        return {
+            'success': True,
+            'message': 'Everything path saved successfully'
+        }
+    return {
+        'success': False,
+        'error': 'Failed to save path'
+    }
+
+async def handle_cancel(host, message):
+    # 취소 표시는 리더 스레드에서 이미 했고, 대상 요청이 끝날 때 지운다
+    # (동기 루프와 달리 대상이 아직 실행 중이므로 여기서 지우면 안 됨)
+    return {
+        'success': True,
+        'target': message.get('target')
+    }
+
+# asyncio로 직접 처리하는 액션 (나머지는 handle_message를 스레드에서 실행)
+ASYNC_HANDLERS = {
+    'validate_path': handle_validate_path,
+    'set_path': handle_set_path,
+    'cancel': handle_cancel,
+}
+
+class AsyncHost:
+    """메시지 루프 상태 (입력 큐, 직렬 writer, 실행 중인 태스크)"""
+
+    def __init__(self, host):
+        self.host = host
+        self.loop = asyncio.get_running_loop()
+        self.inbox = asyncio.Queue()
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stdout-writer')
+        self.tasks = set()
+        self.sent = 0
+
+    def _read_stdin(self):
+        """리더 스레드: 프레임을 읽어 루프의 입력 큐에 넣음"""
+        while True:
+            try:
+                message = self.host.read_message()
+            except self.host.FrameError as e:
+                if isinstance(e, self.host.TruncatedFrame):
+                    message = e
+                else:
+                    # 크기 초과나 잘못된 JSON은 오류로 응답하고 계속 읽는다
+                    self.loop.call_soon_threadsafe(self.inbox.put_nowait, e)
+                    continue
+            except Exception as e:
+                message = e
+            # 스트리밍 중인 요청이 바로 멈출 수 있도록 cancel은 여기서 표시
+            self.host.mark_cancelled(message)
+            self.loop.call_soon_threadsafe(self.inbox.put_nowait, message)
+            if not isinstance(message, dict) or not message:
+                return
+
+    async def send(self, message, result):
+        """응답 하나를 직렬 writer로 전송, 쓰는 데 걸린 시간(ms) 반환"""
+        result = self.host.with_request_id(message, result)
+        started = time.perf_counter()
+        await self.loop.run_in_executor(self.writer, self.host.send_message, result)
+        write_ms = (time.perf_counter() - started) * 1000
+        self.sent += 1
+        if self.sent == 1:
+            # 첫 응답 후 로그 파일 열기, orjson 로드 (동기 루프와 동일)
+            log.start()
+            self.host.use_fast_json()
+        return write_ms
+
+    def _send_from_thread(self, message, result):
+        """다른 스레드에서 응답 하나를 루프의 직렬 writer로 전송, 쓰는 데 걸린 시간(ms) 반환"""
+        return asyncio.run_coroutine_threadsafe(self.send(message, result), self.loop).result()
+
+    def _drain_stream(self, message, parts):
+        """스레드에서 스트리밍 응답 generator를 돌며 하나씩 전송"""
+        final = None
+        chunks = 0
+        write_ms = 0.0
+        for final in parts:
+            write_ms += self._send_from_thread(message, final)
+            chunks += 1
+        return final, chunks, write_ms
+
+    async def dispatch(self, message, logged):
+        """메시지 하나 처리 (태스크)"""
+        started = time.perf_counter()
+        try:
+            if self.host.wants_profile(message):
+                # 프로파일링은 처리와 전송을 한 스레드에서 감싸므로 비동기 핸들러 대신 handle_message로 처리
+                final, chunks, write_ms = await self.loop.run_in_executor(
+                    None, self.host.handle_profiled, message, lambda result: self._send_from_thread(message, result))
+                log.response(message, final, logged, chunks=chunks)
+                self.host.record_metrics(message.get('action'), started, write_ms, final)
+                await self.loop.run_in_executor(None, self.host.flush_history)
+                return
+            handler = ASYNC_HANDLERS.get(message.get('action'))
+            if handler is not None:
+                result = await handler(self.host, message)
+            else:
+                result = await self.loop.run_in_executor(None, self.host.handle_message, message)
+            
+            if isinstance(result, dict):
+                write_ms = await self.send(message, result)
+                final = result
+                log.response(message, result, logged)
+            else:
+                final, chunks, write_ms = await self.loop.run_in_executor(
+                    None, self._drain_stream, message, result)
+                log.response(message, final, logged, chunks=chunks)
+            self.host.record_metrics(message.get('action'), started, write_ms, final)
+            await self.loop.run_in_executor(None, self.host.flush_history)
+        except Exception as e:
+            log.error(f"Error handling {message.get('action')}: {str(e)}", action=message.get('action'))
+            metrics.error(message.get('action'), str(e))
+            await self.send(message, {
+                'success': False,
+                'error': str(e)
+            })
+
+    async def serve(self):
+        log.info("Native host started (asyncio loop)")
+        self.host.use_external_reader()
+        threading.Thread(target=self._read_stdin, name='stdin-reader', daemon=True).start()
+        
+        handled = 0
+        while True:
+            message = await self.inbox.get()
+            if isinstance(message, self.host.FrameError) and not isinstance(message, self.host.TruncatedFrame):
+                log.error(f"Error reading message: {str(message)}")
+                metrics.error(None, str(message))
+                await self.send({}, {
+                    'success': False,
+                    'error': str(message)
+                })
+                continue
+            if isinstance(message, Exception):
+                log.error(f"Error reading message: {str(message)}")
+                break
+            if not message:
+                break
+            
+            logged = log.request(message)
+            task = asyncio.ensure_future(self.dispatch(message, logged))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            handled += 1
+        
+        # 입력이 끝나도 처리 중인 요청의 응답은 보내고 종료
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.writer.shutdown(wait=True)
+        self.host.flush_history()
+        log.info(f"Native host ended ({handled} messages handled)")
+        log.start()
+        log.stop()
+        metrics.flush()
+
+async def _serve(host):
+    await AsyncHost(host).serve()
+
+def run(host):
+    """host: native_host 모듈 (프레이밍과 handle_message를 공유)"""
+    asyncio.run(_serve(host))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""검색 백엔드 선택
+
+설정 파일의 backend 값으로 고정할 수 있고, 기본값 auto는 사용 가능한 첫 백엔드를 쓴다.
+- everything: Everything.exe GUI 실행 (search 액션 전용, 결과 반환 없음)
+- http: Everything HTTP 서버 (http_url 설정 필요)
+- es: es.exe 명령줄 클라이언트
+- locate: 리눅스 mlocate/locatedb 데이터베이스
+- index: 내장 파일 이름 인덱스
+
+각 결과 백엔드는 run(query, offset, limit, is_cancelled, **options) generator를 돌려준다.
+options의 sort/ascending은 정렬을 지원하는 백엔드(http)만 사용한다.
+"""
+
+BACKENDS = ('auto', 'everything', 'http', 'es', 'locate', 'index')
+# auto일 때 결과 백엔드를 시도하는 순서 (http는 http_url이 설정된 경우만)
+AUTO_QUERY_ORDER = ('http', 'es', 'locate', 'index')
+
+def configured_backend(config):
+    """설정의 backend 값 (잘못된 값이면 auto)"""
+    backend = config.get('backend', 'auto')
+    return backend if backend in BACKENDS else 'auto'
+
+def _open_http(config):
+    from everything_http import get_client, run_query
+    try:
+        client = get_client(config)
+    except (ValueError, OSError) as e:
+        # https나 잘못된 http_url이면 다음 백엔드로 넘어간다
+        import host_log as log
+        log.warning(f"Everything HTTP backend unavailable: {e}")
+        return None
+    if client is None:
+        return None
+    # auto에서는 서버가 죽어 있으면(circuit open) 다음 백엔드로 넘어간다
+    if configured_backend(config) != 'http' and not client.circuit.allow():
+        return None
+    return lambda query, offset, limit, is_cancelled, sort=None, ascending=True: run_query(
+        client, query, offset, limit, is_cancelled, sort, ascending)
+
+def _open_es(config):
+    from es_query import find_es_command, run_query
+    es_command = find_es_command(config)
+    if not es_command:
+        return None
+    return lambda query, offset, limit, is_cancelled, **options: run_query(
+        query, offset, limit, is_cancelled, es_command)
+
+def _open_locate(config):
+    from locate_db import find_locate_db, get_locate_db, run_query
+    path = find_locate_db(config)
+    if not path:
+        return None
+    try:
+        db = get_locate_db(path)
+    except (OSError, ValueError) as e:
+        # 권한이 없거나 형식이 맞지 않으면 다음 백엔드로 넘어간다
+        import host_log as log
+        log.warning(f"Skipping locate database {path}: {e}")
+        return None
+    return lambda query, offset, limit, is_cancelled, **options: run_query(
+        db, query, offset, limit, is_cancelled)
+
+def _open_index(config):
+    from filename_index import get_index, run_query
+    index = get_index()
+    if index is None:
+        return None
+    return lambda query, offset, limit, is_cancelled, **options: run_query(
+        index, query, offset, limit, is_cancelled)
+
+_OPENERS = {
+    'http': _open_http,
+    'es': _open_es,
+    'locate': _open_locate,
+    'index': _open_index,
+}
+
+def resolve_query_backend(config=None):
+    """결과를 돌려줄 수 있는 첫 백엔드의 (이름, run) 반환, 없으면 (None, None)"""
+    if config is None:
+        from discovery import load_config
+        config = load_config()
+    
+    backend = configured_backend(config)
+    order = AUTO_QUERY_ORDER if backend in ('auto', 'everything') else (backend,)
+    for name in order:
+        run = _OPENERS[name](config)
+        if run is not None:
+            return name, run
+    return None, None
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""search_batch 액션: 여러 검색어를 메시지 하나로 받아 스레드 풀에서 동시에 검색
+
+항목마다 끝나는 순서대로 partial 응답(item id, 결과 또는 오류)을 보내고,
+마지막에 요약 응답을 보낸다. 500줄 선택도 왕복 한 번, 인터프리터 하나로 처리된다.
+"""
+
+import os
+
+import host_log as log
+
+# 한 메시지에서 받는 최대 검색어 수
+MAX_BATCH_ITEMS = 10000
+# 항목 하나당 기본/최대 결과 수 (partial 응답 하나가 1MB를 넘지 않도록)
+DEFAULT_ITEM_LIMIT = 20
+MAX_ITEM_LIMIT = 500
+
+def default_workers():
+    return min(8, (os.cpu_count() or 1) + 4)
+
+def parse_items(message):
+    """queries 목록(문자열 또는 {id, query}) 또는 text(줄 단위)를 (id, query) 목록으로
+
+    빈 줄은 버리고, id가 없는 중복 검색어는 한 번만 검색한다.
+    """
+    raw = message.get('queries')
+    if raw is None:
+        raw = (message.get('text') or '').splitlines()
+    if not isinstance(raw, list):
+        raise ValueError('queries must be a list')
+
+    items = []
+    seen = set()
+    for index, entry in enumerate(raw):
+        if isinstance(entry, dict):
+            item_id = entry.get('id', index)
+            query = str(entry.get('query', '')).strip()
+        else:
+            item_id = index
+            query = str(entry).strip()
+            if query in seen:
+                continue
+        if not query:
+            continue
+        seen.add(query)
+        items.append((item_id, query))
+
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f'Too many queries ({len(items)} > {MAX_BATCH_ITEMS})')
+    return items
+
+def _search_item(run, query, limit):
+    """항목 하나 검색 (스레드에서 실행), 결과 목록과 has_more 반환"""
+    results = []
+    final = {}
+    for part in run(query, 0, limit, None):
+        if part.get('partial'):
+            results.extend(part['results'])
+        else:
+            final = part
+    if not final.get('success'):
+        raise RuntimeError(final.get('error', 'Search failed'))
+    return results, final.get('has_more', False)
+
+def run_batch(items, run, backend, limit=DEFAULT_ITEM_LIMIT, workers=None, is_cancelled=None):
+    """항목들을 스레드 풀에서 검색하며 끝나는 순서대로 partial 응답 yield"""
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    limit = max(1, min(int(limit), MAX_ITEM_LIMIT))
+    workers = max(1, int(workers or default_workers()))
+    found = 0
+    errors = 0
+    cancelled = False
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch')
+    try:
+        pending = {pool.submit(_search_item, run, query, limit): (item_id, query)
+                   for item_id, query in items}
+        while pending:
+            # 취소를 확인할 수 있도록 짧게 나눠서 기다린다
+            done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            if is_cancelled and is_cancelled():
+                cancelled = True
+                break
+            for future in done:
+                item_id, query = pending.pop(future)
+                try:
+                    results, has_more = future.result()
+                except Exception as e:
+                    errors += 1
+                    log.warning(f"Batch item {item_id} failed: {e}")
+                    yield {'partial': True, 'item': item_id, 'query': query,
+                           'success': False, 'error': str(e)}
+                    continue
+                if results:
+                    found += 1
+                yield {'partial': True, 'item': item_id, 'query': query, 'success': True,
+                       'results': results, 'has_more': has_more}
+    finally:
+        # 아직 시작하지 않은 항목은 취소 (실행 중인 항목은 끝나도록 둔다)
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=not cancelled)
+
+    yield {
+        'success': True,
+        'done': True,
+        'backend': backend,
+        'count': len(items),
+        'found': found,
+        'errors': errors,
+        'cancelled': cancelled
+    }
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""everything_config.json 읽기/쓰기 (메모리 스냅샷 + 원자적 쓰기 + 프로세스 간 잠금)
+
+- load(): 파싱한 설정을 메모리에 두고, 파일 stat 한 번으로 (mtime_ns, 크기, inode)가
+  같으면 다시 읽지 않는다. 쓰기는 항상 새 파일로 교체하므로 다른 프로세스가 쓰면 inode가 바뀐다.
+- update(): 옆의 .lock 파일에 advisory 잠금(POSIX flock / Windows msvcrt.locking)을 건 채로
+  디스크에서 최신 설정을 다시 읽고, 바꾼 뒤 임시 파일 + os.replace로 교체한다.
+  여러 호스트가 동시에 set_path를 보내도 반쯤 쓴 파일을 읽거나 다른 키를 잃지 않는다.
+- Windows는 다른 프로세스가 설정 파일을 열고 있는 동안 교체(os.replace)와 열기가 PermissionError로
+  실패하므로 REPLACE_RETRY_DELAYS 간격으로 다시 시도한다.
+
+load()가 돌려주는 dict는 호출한 쪽이 고쳐도 스냅샷에 영향이 없다 (얕은 복사).
+"""
+
+import os
+import json
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 락 사용
+import _thread
+
+import host_log as log
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# EE_CONFIG_FILE로 다른 설정 파일을 지정할 수 있다 (벤치마크 등)
+CONFIG_FILE = os.environ.get('EE_CONFIG_FILE') or os.path.join(HOST_DIR, "everything_config.json")
+
+# 다른 프로세스가 잠금을 놓지 않을 때 기다리는 최대 시간 (초)
+LOCK_TIMEOUT = 10
+# Windows: 다른 프로세스가 파일을 열고 있을 때 교체/열기를 다시 시도하는 간격 (초, 합계 약 1초)
+REPLACE_RETRY_DELAYS = (0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5)
+
+_lock = _thread.allocate_lock()
+# (signature, 파싱한 설정)
+_snapshot = None
+
+def signature(path=None):
+    """설정 파일의 [mtime_ns, 크기, inode], 없으면 None (stat 한 번)"""
+    try:
+        st = os.stat(path or CONFIG_FILE)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+def _retry(func, *args):
+    """func(*args), PermissionError면 REPLACE_RETRY_DELAYS 간격으로 다시 시도 (마지막 실패는 그대로)"""
+    for delay in REPLACE_RETRY_DELAYS:
+        try:
+            return func(*args)
+        except PermissionError:
+            import time
+            time.sleep(delay)
+    return func(*args)
+
+def _load_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        st = os.fstat(f.fileno())
+        return st, json.load(f)
+
+def _read(path, strict=False):
+    """(signature, 설정 dict) 읽기 (없으면 빈 dict, 깨졌으면 빈 dict 또는 strict면 예외)
+
+    읽는 동안 교체되면 signature가 내용과 맞지 않을 수 있으므로 연 파일의 fstat을 쓴다.
+    """
+    try:
+        st, config = _retry(_load_file, path)
+    except FileNotFoundError:
+        return None, {}
+    except Exception as e:
+        if strict:
+            raise
+        log.warning(f"Failed to read config: {e}")
+        return None, {}
+    if not isinstance(config, dict):
+        config = {}
+    return [st.st_mtime_ns, st.st_size, st.st_ino], config
+
+def load():
+    """설정 dict (바뀌지 않았으면 메모리 스냅샷의 복사본)"""
+    global _snapshot
+    current = signature()
+    snapshot = _snapshot
+    if snapshot is not None and current is not None and snapshot[0] == current:
+        return dict(snapshot[1])
+    if current is None:
+        return {}
+    sig, config = _read(CONFIG_FILE)
+    if sig is not None:
+        _snapshot = (sig, config)
+    return dict(config)
+
+def invalidate():
+    """메모리 스냅샷 버리기 (다음 load()에서 다시 읽음)"""
+    global _snapshot
+    _snapshot = None
+
+class FileLock:
+    """.lock 파일의 프로세스 간 advisory 잠금 (with 문으로 사용, metrics 집계도 같이 씀)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.name == 'nt':
+                self._lock_windows()
+            else:
+                import fcntl
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(self.fd)
+            self.fd = None
+            raise
+        return self
+
+    def _lock_windows(self):
+        import time
+        import msvcrt
+        # LK_LOCK은 1초씩 10번만 재시도하므로 직접 재시도한다
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                msvcrt.locking(self.fd, msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.005)
+
+    def __exit__(self, *exc):
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+def _write(path, config):
+    """임시 파일에 쓰고 fsync한 뒤 교체 (읽는 쪽은 이전 파일 또는 새 파일 전체만 본다)
+
+    Windows에서 다른 프로세스가 읽는 중이라 교체가 PermissionError로 실패하면 잠시 후 다시 시도한다.
+    """
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        _retry(os.replace, tmp_file, path)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+
+def update(changes=None, remove=()):
+    """설정 키를 바꿔서 저장하고 새 설정 dict 반환
+
+    changes: 덮어쓸 키/값, remove: 지울 키들.
+    잠금을 잡은 뒤 디스크에서 다시 읽으므로 다른 프로세스가 바꾼 키를 덮어쓰지 않는다.
+    사용자가 손으로 고친 파일이 깨져 있으면 덮어쓰지 않고 예외(ValueError)를 낸다.
+    """
+    global _snapshot
+    path = CONFIG_FILE
+    with _lock, FileLock(f"{path}.lock"):
+        _, config = _read(path, strict=True)
+        config = dict(config)
+        config.update(changes or {})
+        for key in remove:
+            config.pop(key, None)
+        _write(path, config)
+        sig = signature(path)
+        _snapshot = (sig, config) if sig is not None else None
+    return dict(config)
@@ -0,0 +1,679 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""여러 브라우저/프로필이 함께 쓰는 상주 호스트 (native_host --daemon) 와 stdio 중계 (--relay)
+
+크롬 프로필마다, install.py로 등록한 Edge/Brave마다 호스트 프로세스가 따로 뜨면
+탐색/설정/캐시/백엔드 연결도 프로세스마다 따로 만든다.
+--relay로 실행한 호스트는 메시지를 직접 처리하지 않고 stdin/stdout 바이트를
+로컬 소켓(리눅스 Unix 소켓, Windows named pipe)의 데몬으로 그대로 넘기고,
+데몬이 없으면 띄운다. 데몬은 모든 클라이언트의 요청을 한 프로세스에서 처리한다.
+
+- 소켓 위의 프레임은 크롬과 같은 4바이트 길이 프레임 (중계는 JSON을 파싱하지 않음)
+- 중계는 stdin이 끝나면 빈 프레임을 보내고, 데몬은 남은 응답을 보낸 뒤 연결을 닫는다
+- 공정성: 클라이언트마다 요청 큐를 두고, 작업자들이 클라이언트를 돌아가며 한 단계씩 처리
+  (일반 응답 하나 또는 스트리밍 청크 하나). 한 클라이언트의 요청은 받은 순서대로 처리된다
+- 요청 id와 cancel 대상은 클라이언트 번호를 붙여 구분한다 (프로필끼리 id가 겹쳐도 안전)
+- 클라이언트가 하나도 없는 채로 daemon_idle_seconds가 지나면 종료
+- 한 사용자에 데몬 하나: POSIX는 .lock 파일 flock, Windows는 FILE_FLAG_FIRST_PIPE_INSTANCE
+
+주소: EE_DAEMON_ADDRESS 환경 변수, 없으면 $XDG_RUNTIME_DIR(또는 /tmp/everything-everywhere-UID)
+아래 host.sock, Windows는 \\\\.\\pipe\\everything-everywhere-사용자 이름.
+설정(everything_config.json): daemon_workers (기본 4), daemon_idle_seconds (기본 600,
+EE_DAEMON_IDLE 환경 변수가 우선). 데몬은 처음 띄운 중계의 환경 변수를 물려받는다.
+
+중계 경로는 콜드 스타트 비용이므로 socket(POSIX) 또는 _winapi(Windows)와 _thread만 로드한다.
+"""
+
+import os
+import sys
+import time
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 스레드 사용 (중계)
+import _thread
+
+import host_log as log
+import metrics
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_WORKERS = 4
+DEFAULT_IDLE_SECONDS = 600
+# 클라이언트 하나가 쌓아 둘 수 있는 요청 수 (넘으면 그 클라이언트의 입력을 잠시 읽지 않음)
+MAX_PENDING = 64
+# 중계가 데몬을 띄운 뒤 연결될 때까지 기다리는 최대 시간 (초)
+START_TIMEOUT = 5
+# 유휴 종료를 확인하는 간격 (초)
+ACCEPT_POLL = 1.0
+RELAY_CHUNK = 64 * 1024
+PIPE_BUFFER = 64 * 1024
+# 길이 0인 프레임 = 입력 끝
+END_OF_INPUT = b'\x00\x00\x00\x00'
+
+# _winapi에 없는 상수
+PIPE_REJECT_REMOTE_CLIENTS = 0x8
+WAIT_TIMEOUT = 0x102
+ERROR_BROKEN_PIPE = 109
+ERROR_NO_DATA = 232
+
+def default_address():
+    """이 사용자의 데몬 주소 (소켓 경로 또는 named pipe 이름)"""
+    address = os.environ.get('EE_DAEMON_ADDRESS')
+    if address:
+        return address
+    if os.name == 'nt':
+        user = os.environ.get('USERNAME', 'user')
+        return rf"\\.\pipe\everything-everywhere-{user}"
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or f"/tmp/everything-everywhere-{os.getuid()}"
+    return os.path.join(runtime_dir, "host.sock")
+
+# ---------------------------------------------------------------------------
+# 전송 (POSIX Unix 소켓 / Windows named pipe)
+# ---------------------------------------------------------------------------
+
+class _PipeStream:
+    """Windows named pipe 핸들 (overlapped I/O라서 읽기와 쓰기를 다른 스레드에서 동시에 할 수 있음)
+
+    소켓과 같은 recv_into/sendall/close와 FrameReader/FrameWriter용 readinto/write/flush 제공.
+    """
+
+    def __init__(self, handle):
+        self.handle = handle
+
+    def recv_into(self, view):
+        import _winapi
+        try:
+            ov, err = _winapi.ReadFile(self.handle, len(view), overlapped=True)
+            try:
+                if err == _winapi.ERROR_IO_PENDING:
+                    _winapi.WaitForMultipleObjects([ov.event], False, _winapi.INFINITE)
+            except BaseException:
+                ov.cancel()
+                raise
+            finally:
+                nread, err = ov.GetOverlappedResult(True)
+        except OSError as e:
+            if e.winerror in (ERROR_BROKEN_PIPE, ERROR_NO_DATA):
+                return 0
+            raise
+        view[:nread] = ov.getbuffer()
+        return nread
+
+    readinto = recv_into
+
+    def sendall(self, data):
+        import _winapi
+        data = memoryview(data)
+        while data:
+            try:
+                ov, err = _winapi.WriteFile(self.handle, data, overlapped=True)
+                try:
+                    if err == _winapi.ERROR_IO_PENDING:
+                        _winapi.WaitForMultipleObjects([ov.event], False, _winapi.INFINITE)
+                except BaseException:
+                    ov.cancel()
+                    raise
+                finally:
+                    written, err = ov.GetOverlappedResult(True)
+            except OSError as e:
+                if e.winerror in (ERROR_BROKEN_PIPE, ERROR_NO_DATA):
+                    raise BrokenPipeError(str(e)) from None
+                raise
+            data = data[written:]
+
+    def write(self, data):
+        self.sendall(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        import _winapi
+        if self.handle is not None:
+            handle, self.handle = self.handle, None
+            _winapi.CloseHandle(handle)
+
+class _PipeListener:
+    """named pipe 서버 (인스턴스 하나를 미리 만들어 두고 연결되면 다음 인스턴스 생성)"""
+
+    def __init__(self, address):
+        self.address = address
+        self._pending = self._create(first=True)
+        self._ov = None
+
+    def _create(self, first=False):
+        import _winapi
+        mode = _winapi.PIPE_ACCESS_DUPLEX | _winapi.FILE_FLAG_OVERLAPPED
+        if first:
+            # 다른 데몬이 이미 같은 이름을 쓰고 있으면 PermissionError
+            mode |= _winapi.FILE_FLAG_FIRST_PIPE_INSTANCE
+        return _winapi.CreateNamedPipe(
+            self.address, mode,
+            _winapi.PIPE_WAIT | PIPE_REJECT_REMOTE_CLIENTS,  # 바이트 모드 (PIPE_TYPE_BYTE = 0)
+            _winapi.PIPE_UNLIMITED_INSTANCES, PIPE_BUFFER, PIPE_BUFFER,
+            _winapi.NMPWAIT_WAIT_FOREVER, _winapi.NULL)
+
+    def accept(self, timeout):
+        """연결된 _PipeStream, timeout초 안에 없으면 None"""
+        import _winapi
+        if self._ov is None:
+            self._ov = _winapi.ConnectNamedPipe(self._pending, overlapped=True)
+        result = _winapi.WaitForMultipleObjects([self._ov.event], False, int(timeout * 1000))
+        if result == WAIT_TIMEOUT:
+            return None
+        ov, self._ov = self._ov, None
+        ov.GetOverlappedResult(True)
+        handle, self._pending = self._pending, self._create()
+        return _PipeStream(handle)
+
+    def close(self):
+        import _winapi
+        if self._ov is not None:
+            self._ov.cancel()
+            self._ov = None
+        if self._pending is not None:
+            _winapi.CloseHandle(self._pending)
+            self._pending = None
+
+class _SocketListener:
+    """Unix 소켓 서버 (수명 동안 .lock 파일을 flock으로 잡아 데몬을 하나로 유지)"""
+
+    def __init__(self, address):
+        import socket
+        import fcntl
+        directory = os.path.dirname(address)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.stat(directory)
+        if st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise PermissionError(f"Daemon directory is not private: {directory}")
+        self.address = address
+        self._lock_fd = os.open(f"{address}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # 이미 다른 데몬이 있으면 BlockingIOError
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(self._lock_fd)
+            raise
+        # 잠금을 잡았으므로 남아 있는 소켓 파일은 죽은 데몬의 것
+        try:
+            os.remove(address)
+        except FileNotFoundError:
+            pass
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)
+        try:
+            self.sock.bind(address)
+        finally:
+            os.umask(old_umask)
+        self.sock.listen(64)
+
+    def accept(self, timeout):
+        import socket
+        self.sock.settimeout(timeout)
+        try:
+            conn, _ = self.sock.accept()
+        except socket.timeout:
+            return None
+        conn.setblocking(True)
+        return conn
+
+    def close(self):
+        # 소켓 파일을 먼저 지워서 새 중계가 이 데몬에 연결하지 않고 새 데몬을 띄우게 한다
+        try:
+            os.remove(self.address)
+        except OSError:
+            pass
+        self.sock.close()
+        os.close(self._lock_fd)
+
+def listen(address=None):
+    """데몬 리스너, 다른 데몬이 이미 있으면 None"""
+    address = address or default_address()
+    try:
+        if os.name == 'nt':
+            return _PipeListener(address)
+        return _SocketListener(address)
+    except (BlockingIOError, PermissionError) as e:
+        log.info(f"Another daemon is running at {address}: {e}")
+        return None
+
+def _connect(address):
+    """데몬에 연결 (소켓 또는 _PipeStream), 데몬이 없으면 None"""
+    if os.name == 'nt':
+        import _winapi
+        while True:
+            try:
+                handle = _winapi.CreateFile(
+                    address, _winapi.GENERIC_READ | _winapi.GENERIC_WRITE, 0, _winapi.NULL,
+                    _winapi.OPEN_EXISTING, _winapi.FILE_FLAG_OVERLAPPED, _winapi.NULL)
+            except FileNotFoundError:
+                return None
+            except OSError as e:
+                # 모든 인스턴스가 연결 중이면 다음 인스턴스를 기다린다
+                if e.winerror != _winapi.ERROR_PIPE_BUSY:
+                    raise
+                _winapi.WaitNamedPipe(address, 1000)
+                continue
+            return _PipeStream(handle)
+
+    import socket
+    try:
+        # 다른 사용자가 만든 소켓에는 연결하지 않는다
+        if os.stat(address).st_uid != os.getuid():
+            return None
+    except OSError:
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+def _start_daemon():
+    """이 호스트를 --daemon으로 분리 실행 (중계 프로세스가 끝나도 남음)"""
+    import subprocess
+    main = sys.modules.get('__main__')
+    bundle = getattr(main, 'BUNDLE_PATH', None)
+    if bundle:
+        # 묶음(native_host.pyz)으로 실행 중이면 데몬도 같은 묶음과 인터프리터 옵션으로
+        args = [sys.executable, *main.INTERPRETER_FLAGS, bundle, '--daemon']
+    else:
+        args = [sys.executable, os.path.join(HOST_DIR, "native_host.py"), '--daemon']
+    options = dict(stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, close_fds=True, cwd=HOST_DIR)
+    if os.name == 'nt':
+        flags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        try:
+            # 크롬이 호스트를 넣는 job에서 빠져나가야 포트가 닫혀도 데몬이 남는다
+            subprocess.Popen(args, creationflags=flags | subprocess.CREATE_BREAKAWAY_FROM_JOB, **options)
+        except OSError:
+            subprocess.Popen(args, creationflags=flags, **options)
+    else:
+        subprocess.Popen(args, start_new_session=True, **options)
+
+def connect(address=None, start=True):
+    """데몬에 연결하고, 없으면 (start=True일 때) 띄워서 연결될 때까지 기다림 (실패하면 None)"""
+    address = address or default_address()
+    channel = _connect(address)
+    if channel is not None or not start:
+        return channel
+
+    started = time.perf_counter()
+    _start_daemon()
+    deadline = time.monotonic() + START_TIMEOUT
+    delay = 0.005
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, 0.1)
+        channel = _connect(address)
+        if channel is not None:
+            log.info("Started host daemon", address=address,
+                     ms=round((time.perf_counter() - started) * 1000, 1))
+            return channel
+    log.error(f"Host daemon did not start at {address}")
+    return None
+
+# ---------------------------------------------------------------------------
+# 중계 (--relay)
+# ---------------------------------------------------------------------------
+
+def _raw(stream):
+    """버퍼 없는 FileIO (PYTHONUNBUFFERED면 sys.stdin.buffer가 이미 FileIO)"""
+    return getattr(stream, 'raw', stream)
+
+def _forward_input(channel):
+    """중계 스레드: stdin 바이트를 데몬으로, 끝나면 빈 프레임"""
+    stdin = _raw(sys.stdin.buffer)
+    buffer = bytearray(RELAY_CHUNK)
+    view = memoryview(buffer)
+    try:
+        while True:
+            n = stdin.readinto(view)
+            if not n:
+                break
+            channel.sendall(view[:n])
+        channel.sendall(END_OF_INPUT)
+    except OSError:
+        # 데몬이 연결을 끊으면 응답 쪽에서 EOF를 보고 종료한다
+        pass
+
+def relay(address=None):
+    """stdin/stdout과 데몬 사이에서 바이트를 중계 (데몬에 연결하지 못하면 False)"""
+    channel = connect(address)
+    if channel is None:
+        return False
+    _thread.start_new_thread(_forward_input, (channel,))
+
+    stdout = _raw(sys.stdout.buffer)
+    buffer = bytearray(RELAY_CHUNK)
+    view = memoryview(buffer)
+    while True:
+        try:
+            n = channel.recv_into(view)
+        except OSError:
+            break
+        if not n:
+            break
+        # 크롬 쪽 파이프에 다 쓸 때까지 (부분 쓰기 처리)
+        chunk = view[:n]
+        while chunk:
+            chunk = chunk[stdout.write(chunk):]
+    channel.close()
+    return True
+
+# ---------------------------------------------------------------------------
+# 데몬 (--daemon)
+# ---------------------------------------------------------------------------
+
+class _Request:
+    """처리 중인 요청 하나 (스트리밍이면 generator와 진행 상태)"""
+    __slots__ = ('message', 'internal', 'logged', 'started', 'parts', 'final', 'chunks', 'write_ms')
+
+    def __init__(self, message, internal, logged):
+        self.message = message
+        self.internal = internal
+        self.logged = logged
+        self.started = None
+        self.parts = None
+        self.final = None
+        self.chunks = 0
+        self.write_ms = 0.0
+
+class _Client:
+    """연결된 중계 하나 (요청 큐, 프레이밍, 스케줄 상태)"""
+
+    def __init__(self, number, channel):
+        import threading
+        from collections import deque
+        from framing import FrameReader, FrameWriter
+        self.number = number
+        self.channel = channel
+        if os.name == 'nt':
+            self.reader = FrameReader(channel)
+            self.writer = FrameWriter(channel)
+        else:
+            self.reader = FrameReader(channel.makefile('rb'))
+            self.writer = FrameWriter(channel.makefile('wb', buffering=0))
+        self.write_lock = threading.Lock()
+        self.work = deque()
+        # 준비 큐에 있거나 작업자가 처리 중이면 True
+        self.scheduled = False
+        self.reading = True
+        self.broken = False
+
+    def internal_message(self, message):
+        """요청 id와 cancel 대상에 클라이언트 번호를 붙인 메시지 (다른 클라이언트와 구분)"""
+        if 'id' not in message and message.get('action') != 'cancel':
+            return message
+        internal = dict(message)
+        if 'id' in message:
+            internal['id'] = (self.number, message['id'])
+        if message.get('action') == 'cancel':
+            internal['target'] = (self.number, message.get('target'))
+        return internal
+
+    def send(self, message, result):
+        """응답 하나 전송 (원래 id로), 쓰는 데 걸린 시간(ms) 반환"""
+        from framing import MessageTooLarge
+        if 'id' in message:
+            result['id'] = message['id']
+        if message.get('action') == 'cancel' and 'target' in result:
+            result['target'] = message.get('target')
+        started = time.perf_counter()
+        with self.write_lock:
+            try:
+                self.writer.write(result)
+            except MessageTooLarge as e:
+                log.error(str(e), action='send')
+                self.writer.write({
+                    'success': False,
+                    'error': str(e),
+                    'id': message.get('id')
+                })
+        return (time.perf_counter() - started) * 1000
+
+    def close(self):
+        try:
+            if os.name != 'nt':
+                import socket
+                self.channel.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.channel.close()
+
+class Daemon:
+    """클라이언트별 큐를 돌아가며 처리하는 작업자 풀과 연결 수락 루프"""
+
+    def __init__(self, host, listener, workers=DEFAULT_WORKERS, idle_seconds=DEFAULT_IDLE_SECONDS):
+        import threading
+        from collections import deque
+        self.host = host
+        self.listener = listener
+        self.workers = max(1, int(workers))
+        self.idle_seconds = float(idle_seconds)
+        self.cond = threading.Condition()
+        self.ready = deque()
+        self.clients = {}
+        self.next_number = 0
+        self.handled = 0
+        self.idle_since = time.monotonic()
+        self.stopping = False
+
+    # 연결별 리더 스레드
+    def _read_client(self, client):
+        host = self.host
+        while True:
+            try:
+                message = client.reader.read()
+            except host.FrameError as e:
+                if isinstance(e, host.TruncatedFrame):
+                    break
+                # 크기 초과나 잘못된 JSON은 오류로 응답하고 다음 메시지를 계속 읽는다
+                log.error(f"Error reading message: {str(e)}", client=client.number)
+                try:
+                    client.send({}, {'success': False, 'error': str(e)})
+                except OSError:
+                    break
+                continue
+            except (OSError, ValueError):
+                break
+            if not message:
+                break
+            if not isinstance(message, dict):
+                message = {'action': None}
+
+            internal = client.internal_message(message)
+            # 스트리밍 중인 요청이 바로 멈출 수 있도록 cancel은 받자마자 표시
+            host.mark_cancelled(internal)
+            request = _Request(message, internal, log.request(message))
+            with self.cond:
+                while len(client.work) >= MAX_PENDING and not client.broken:
+                    self.cond.wait()
+                if client.broken:
+                    break
+                client.work.append(request)
+                self._schedule(client)
+
+        with self.cond:
+            client.reading = False
+            if not client.scheduled:
+                self._drop(client)
+
+    def _schedule(self, client):
+        """(cond를 잡은 상태) 할 일이 있는 클라이언트를 준비 큐 끝에 넣음"""
+        if not client.scheduled and client.work:
+            client.scheduled = True
+            self.ready.append(client)
+            self.cond.notify()
+
+    def _drop(self, client):
+        """(cond를 잡은 상태) 입력이 끝나고 할 일이 없는 클라이언트 연결 닫기"""
+        for request in client.work:
+            if request.parts is not None:
+                request.parts.close()
+        client.work.clear()
+        client.close()
+        if self.clients.pop(client.number, None) is not None and not self.clients:
+            self.idle_since = time.monotonic()
+        self.cond.notify_all()
+
+    # 작업자 스레드
+    def _worker(self):
+        while True:
+            with self.cond:
+                while not self.ready and not self.stopping:
+                    self.cond.wait()
+                if not self.ready:
+                    return
+                client = self.ready.popleft()
+                request = client.work.popleft()
+                # 큐에 자리가 났으므로 기다리는 리더를 깨운다
+                self.cond.notify_all()
+
+            more = self._step(client, request)
+
+            with self.cond:
+                if more and not client.broken:
+                    # 같은 클라이언트의 다음 요청보다 먼저, 하지만 다른 클라이언트들 뒤에서 이어서
+                    client.work.appendleft(request)
+                elif more:
+                    request.parts.close()
+                client.scheduled = False
+                if client.broken:
+                    self._drop(client)
+                elif client.work:
+                    self._schedule(client)
+                elif not client.reading:
+                    self._drop(client)
+
+    def _step(self, client, request):
+        """요청 하나를 한 단계 처리 (일반 응답 전체 또는 스트리밍 청크 하나), 남았으면 True"""
+        host = self.host
+        message = request.message
+        action = message.get('action')
+        try:
+            if request.started is None:
+                request.started = time.perf_counter()
+                if host.wants_profile(message):
+                    # 프로파일링은 처리와 전송을 한 스레드에서 감싸므로 청크를 나눠 돌리지 않고 이 단계에서 끝냄
+                    def send(part):
+                        if action == 'ping':
+                            part.update(daemon=True, clients=len(self.clients))
+                        return client.send(message, part)
+                    request.final, request.chunks, request.write_ms = host.handle_profiled(request.internal, send)
+                    log.response(message, request.final, request.logged, chunks=request.chunks)
+                    self._finish(request)
+                    return False
+                result = host.handle_message(request.internal)
+                if isinstance(result, dict):
+                    if action == 'ping':
+                        result.update(daemon=True, clients=len(self.clients))
+                    request.write_ms = client.send(message, result)
+                    request.final = result
+                    log.response(message, result, request.logged)
+                    self._finish(request)
+                    return False
+                request.parts = iter(result)
+
+            try:
+                part = next(request.parts)
+            except StopIteration:
+                log.response(message, request.final, request.logged, chunks=request.chunks)
+                self._finish(request)
+                return False
+            request.write_ms += client.send(message, part)
+            request.final = part
+            request.chunks += 1
+            return True
+        except OSError as e:
+            # 중계가 끊겼으면 이 클라이언트의 남은 요청은 버린다
+            log.warning(f"Client {client.number} disconnected: {e}", action=action)
+            client.broken = True
+            return False
+        except Exception as e:
+            log.error(f"Error handling {action}: {str(e)}", action=action)
+            metrics.error(action, str(e))
+            try:
+                client.send(message, {
+                    'success': False,
+                    'error': str(e)
+                })
+            except OSError:
+                client.broken = True
+            return False
+
+    def _finish(self, request):
+        host = self.host
+        host.record_metrics(request.message.get('action'), request.started, request.write_ms, request.final)
+        host.flush_history()
+        with self.cond:
+            self.handled += 1
+            first = self.handled == 1
+        if first:
+            # 첫 응답 후 로그 파일 열기, orjson 로드 (다른 루프와 동일)
+            log.start()
+            host.use_fast_json()
+
+    def _idle(self):
+        with self.cond:
+            return not self.clients and time.monotonic() - self.idle_since >= self.idle_seconds
+
+    def serve(self):
+        import threading
+        workers = [threading.Thread(target=self._worker, name=f'daemon-worker-{i}', daemon=True)
+                   for i in range(self.workers)]
+        for worker in workers:
+            worker.start()
+
+        while not self._idle():
+            channel = self.listener.accept(min(ACCEPT_POLL, self.idle_seconds))
+            if channel is None:
+                continue
+            with self.cond:
+                self.next_number += 1
+                client = _Client(self.next_number, channel)
+                self.clients[client.number] = client
+            threading.Thread(target=self._read_client, args=(client,),
+                             name=f'daemon-client-{client.number}', daemon=True).start()
+
+        self.listener.close()
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        for worker in workers:
+            worker.join()
+        return self.handled
+
+def _settings():
+    from discovery import load_config
+    config = load_config()
+    try:
+        workers = int(config.get('daemon_workers', DEFAULT_WORKERS))
+    except (TypeError, ValueError):
+        workers = DEFAULT_WORKERS
+    try:
+        idle = float(os.environ.get('EE_DAEMON_IDLE') or config.get('daemon_idle_seconds', DEFAULT_IDLE_SECONDS))
+    except (TypeError, ValueError):
+        idle = DEFAULT_IDLE_SECONDS
+    return max(1, workers), max(0.1, idle)
+
+def serve(host, address=None):
+    """host: native_host 모듈 (handle_message 등을 공유), 다른 데몬이 있으면 바로 종료"""
+    address = address or default_address()
+    listener = listen(address)
+    if listener is None:
+        return
+    workers, idle = _settings()
+    # 스트리밍 액션이 stdin 리더 스레드를 만들지 않도록
+    host.use_external_reader()
+    log.info("Native host daemon started", address=address, workers=workers, idle_seconds=idle)
+
+    handled = Daemon(host, listener, workers, idle).serve()
+
+    log.info(f"Native host daemon ended ({handled} messages handled)")
+    host.flush_history()
+    log.start()
+    log.stop()
+    metrics.flush()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Everything.exe 경로 탐색, 검증, 저장
+
+subprocess는 실제로 프로세스를 띄워야 할 때만 로드한다.
+"""
+
+import os
+import json
+import time
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 락 사용
+import _thread
+
+import host_log as log
+import metrics
+import config as host_config
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 설정 파일 경로 (EE_CONFIG_FILE로 바꿀 수 있음, 읽기/쓰기는 config 모듈)
+CONFIG_FILE = host_config.CONFIG_FILE
+
+# Everything.exe 탐색 결과 캐시 (호스트 옆에 저장, 프로세스 간 공유)
+DISCOVERY_CACHE_FILE = os.path.join(HOST_DIR, "discovery_cache.json")
+DISCOVERY_CACHE_VERSION = 1
+# 찾지 못한 결과(negative)를 재사용하는 시간 (초)
+NEGATIVE_CACHE_TTL = 300
+
+# 세션 모드에서 캐시 파일을 매번 읽지 않도록 메모리에도 보관
+_discovery_memo = None
+# 데몬은 요청을 여러 스레드에서 처리하므로 메모리 캐시와 캐시 파일 쓰기를 한 번에 하나씩
+_cache_lock = _thread.allocate_lock()
+
+def load_config():
+    """everything_config.json 설정 dict (없거나 깨졌으면 빈 dict, config 모듈의 메모리 스냅샷)"""
+    return host_config.load()
+
+def _load_discovery_cache():
+    """디스크의 탐색 캐시 읽기 (메모리에 있으면 그대로 사용)"""
+    global _discovery_memo
+    with _cache_lock:
+        if _discovery_memo is None:
+            try:
+                with open(DISCOVERY_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    cache = json.load(f)
+                if cache.get('version') == DISCOVERY_CACHE_VERSION:
+                    _discovery_memo = cache
+            except (OSError, ValueError):
+                pass
+        return _discovery_memo
+
+def _store_discovery_cache(path, config_signature, env_path):
+    """탐색 결과를 캐시 파일에 원자적으로 저장"""
+    global _discovery_memo
+    memo = {
+        'version': DISCOVERY_CACHE_VERSION,
+        'path': path,
+        'config_signature': config_signature,
+        'env_path': env_path,
+        'checked_at': time.time()
+    }
+    tmp_file = f"{DISCOVERY_CACHE_FILE}.{os.getpid()}.{_thread.get_ident()}.tmp"
+    with _cache_lock:
+        _discovery_memo = memo
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(memo, f, ensure_ascii=False)
+            os.replace(tmp_file, DISCOVERY_CACHE_FILE)
+        except OSError as e:
+            log.warning(f"Failed to write discovery cache: {e}")
+
+def invalidate_discovery_cache():
+    """탐색 캐시 삭제 (경로 설정이 바뀌었을 때)"""
+    global _discovery_memo
+    with _cache_lock:
+        _discovery_memo = None
+        try:
+            os.remove(DISCOVERY_CACHE_FILE)
+        except OSError:
+            pass
+
+def find_everything_exe():
+    """Everything.exe 경로 찾기 (캐시 우선)
+    
+    캐시된 경로는 설정 파일 stat과 캐시된 경로 stat 한 번씩으로 재검증하고,
+    찾지 못한 결과는 NEGATIVE_CACHE_TTL 동안 재사용한다.
+    재검증에 실패했을 때만 전체 탐색을 수행한다.
+    """
+    config_signature = host_config.signature()
+    env_path = os.environ.get('EVERYTHING_PATH')
+    
+    cache = _load_discovery_cache()
+    if (cache and cache.get('config_signature') == config_signature
+            and cache.get('env_path') == env_path):
+        cached_path = cache.get('path')
+        if cached_path:
+            if os.path.exists(cached_path):
+                metrics.cache_hit('discovery')
+                return cached_path
+            log.info(f"Cached Everything path is gone: {cached_path}")
+        elif time.time() - cache.get('checked_at', 0) < NEGATIVE_CACHE_TTL:
+            metrics.cache_hit('discovery')
+            return None
+    
+    metrics.cache_miss('discovery')
+    path = probe_everything_exe()
+    _store_discovery_cache(path, config_signature, env_path)
+    return path
+
+def probe_everything_exe():
+    """Everything.exe 경로 전체 탐색 (설정 파일, 일반 설치 경로, PATH 순)"""
+    # 저장된 사용자 설정 경로 확인
+    custom_path = load_config().get('everything_path')
+    if custom_path and os.path.exists(custom_path):
+        log.info(f"Using saved custom path: {custom_path}")
+        return custom_path
+    
+    # 일반적인 Everything 설치 경로들 (더 포괄적으로)
+    possible_paths = []
+    
+    # Program Files 경로들 - 다양한 버전 지원
+    program_files_paths = [
+        os.environ.get('PROGRAMFILES', r'C:\Program Files'),
+        os.environ.get('PROGRAMFILES(X86)', r'C:\Program Files (x86)'),
+        os.environ.get('PROGRAMW6432', r'C:\Program Files')
+    ]
+    
+    # 다양한 Everything 버전과 설치 형태
+    everything_patterns = [
+        r"Everything\Everything.exe",
+        r"Everything 1.4\Everything.exe", 
+        r"Everything 1.5a\Everything.exe",
+        r"Everything 1.5b\Everything.exe",
+        r"Everything64\Everything.exe",
+        r"Everything32\Everything.exe",
+        r"VoidTools\Everything\Everything.exe",
+    ]
+    
+    # Program Files 조합
+    for pf_path in program_files_paths:
+        if pf_path:
+            for pattern in everything_patterns:
+                possible_paths.append(os.path.join(pf_path, pattern))
+    
+    # 추가 일반적인 경로들
+    additional_paths = [
+        os.path.expandvars(r"%LOCALAPPDATA%\Everything\Everything.exe"),
+        os.path.expandvars(r"%APPDATA%\Everything\Everything.exe"),
+        os.path.expandvars(r"%USERPROFILE%\Everything\Everything.exe"),
+        os.path.expandvars(r"%USERPROFILE%\Desktop\Everything\Everything.exe"),
+        os.path.expandvars(r"%USERPROFILE%\Downloads\Everything\Everything.exe"),
+        r"C:\Everything\Everything.exe",
+        r"D:\Everything\Everything.exe",
+        r"C:\Tools\Everything\Everything.exe",
+        r"D:\Tools\Everything\Everything.exe",
+        r"C:\Portable\Everything\Everything.exe",
+        r"D:\Portable\Everything\Everything.exe",
+    ]
+    
+    possible_paths.extend(additional_paths)
+    
+    # 환경 변수에서 Everything 경로 확인
+    everything_path = os.environ.get('EVERYTHING_PATH')
+    if everything_path:
+        possible_paths.insert(0, everything_path)
+    
+    # 각 경로 확인
+    for path in possible_paths:
+        expanded_path = os.path.expandvars(path)
+        if os.path.exists(expanded_path):
+            log.info(f"Found Everything at: {expanded_path}")
+            return expanded_path
+    
+    # PATH에서 Everything 찾기
+    try:
+        import subprocess
+        result = subprocess.run(['where', 'Everything.exe'], 
+                              capture_output=True, text=True)
+        if result.returncode == 0:
+            path = result.stdout.strip().split('\n')[0]
+            log.info(f"Found Everything in PATH: {path}")
+            return path
+    except:
+        pass
+    
+    log.error("Everything.exe not found")
+    return None
+
+def save_everything_path(path):
+    """Everything 경로를 설정 파일에 저장 (잠금 + 원자적 교체, 다른 키는 유지)"""
+    try:
+        host_config.update({'everything_path': path})
+        
+        # mtime 해상도가 낮은 파일 시스템에서도 바로 반영되도록 캐시 삭제
+        invalidate_discovery_cache()
+        
+        log.info(f"Saved Everything path: {path}")
+        return True
+    except Exception as e:
+        log.error(f"Failed to save config: {e}")
+        return False
+
+# validate_path에서 Everything.exe -help 실행을 기다리는 최대 시간 (초)
+VALIDATE_TIMEOUT = 5
+
+# 검증 결과 캐시 (경로별, 파일 크기/mtime/헤더 해시가 같으면 재사용)
+VALIDATION_CACHE_FILE = os.path.join(HOST_DIR, "validation_cache.json")
+VALIDATION_CACHE_VERSION = 1
+VALIDATION_CACHE_MAX_ENTRIES = 32
+
+_validation_memo = None
+
+def is_everything_candidate(path):
+    """실행 없이 확인할 수 있는 조건 (파일 존재, 이름이 Everything.exe)"""
+    if not path or not os.path.exists(path):
+        return False
+    
+    # 파일명이 Everything.exe인지 확인
+    return path.lower().endswith('everything.exe')
+
+def _load_validation_cache():
+    with _cache_lock:
+        return _validation_entries()
+
+def _validation_entries():
+    """검증 캐시 항목 dict (_cache_lock 안에서 호출)"""
+    global _validation_memo
+    if _validation_memo is None:
+        _validation_memo = {}
+        try:
+            with open(VALIDATION_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('version') == VALIDATION_CACHE_VERSION:
+                _validation_memo = cache.get('entries', {})
+        except (OSError, ValueError, AttributeError):
+            pass
+    return _validation_memo
+
+def _store_validation_cache(entries):
+    tmp_file = f"{VALIDATION_CACHE_FILE}.{os.getpid()}.{_thread.get_ident()}.tmp"
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': VALIDATION_CACHE_VERSION, 'entries': entries}, f, ensure_ascii=False)
+        os.replace(tmp_file, VALIDATION_CACHE_FILE)
+    except OSError as e:
+        log.warning(f"Failed to write validation cache: {e}")
+
+def _file_identity(path):
+    """(크기, mtime_ns, 헤더 sha256) 및 읽은 헤더 bytes"""
+    import hashlib
+    from pe_version import HEADER_SIZE
+    
+    st = os.stat(path)
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    return [st.st_size, st.st_mtime_ns, hashlib.sha256(header).hexdigest()], header
+
+def check_everything_path(path):
+    """실행하지 않고 검증 (캐시 → PE 버전 리소스)
+    
+    (결과 dict 또는 None, 파일 식별자) 반환. 결과가 None이면
+    -help 실행으로 확인한 뒤 record_validation으로 저장해야 한다.
+    """
+    if not is_everything_candidate(path):
+        return {'valid': False}, None
+    
+    try:
+        identity, header = _file_identity(path)
+    except OSError:
+        return {'valid': False}, None
+    
+    entry = _load_validation_cache().get(path)
+    if entry and entry.get('identity') == identity:
+        metrics.cache_hit('validation')
+        result = {k: v for k, v in entry.items() if k not in ('identity', 'checked_at')}
+        result['cached'] = True
+        return result, identity
+    
+    metrics.cache_miss('validation')
+    # 버전 리소스의 제품 이름이 Everything이면 실행 없이 유효로 판단
+    from pe_version import read_version_info, PEFormatError
+    try:
+        info = read_version_info(path, header)
+    except (OSError, PEFormatError) as e:
+        log.debug(f"No PE version info for {path}: {e}")
+        info = None
+    if info and info['strings'].get('ProductName', '').strip().lower() == 'everything':
+        return record_validation(path, identity, True, 'pe_version', info), identity
+    return None, identity
+
+def record_validation(path, identity, valid, method, info=None):
+    """검증 결과를 캐시에 저장하고 결과 dict 반환 (유효한 결과만 캐시)"""
+    result = {'valid': valid, 'method': method}
+    if info:
+        strings = info.get('strings', {})
+        result['product'] = strings.get('ProductName')
+        result['version'] = strings.get('ProductVersion') or info.get('product_version')
+    if not valid or identity is None:
+        return result
+    
+    with _cache_lock:
+        entries = _validation_entries()
+        entries[path] = dict(result, identity=identity, checked_at=time.time())
+        # 오래된 항목부터 정리
+        for old in sorted(entries, key=lambda p: entries[p].get('checked_at', 0))[:-VALIDATION_CACHE_MAX_ENTRIES]:
+            del entries[old]
+        _store_validation_cache(entries)
+    return result
+
+def validation_result(path):
+    """Everything 경로 검증 결과 dict (valid, method, product, version)"""
+    result, identity = check_everything_path(path)
+    if result is not None:
+        return result
+    
+    # 실행 가능한지 확인
+    started = time.perf_counter()
+    try:
+        import subprocess
+        subprocess.run([path, '-help'], 
+                       capture_output=True, 
+                       timeout=VALIDATE_TIMEOUT)
+        valid = True
+    except:
+        valid = False
+    metrics.launch('validate', started)
+    return record_validation(path, identity, valid, 'exec')
+
+def validate_everything_path(path):
+    """Everything 경로가 유효한지 확인"""
+    return validation_result(path)['valid']
+
+def potential_everything_paths():
+    """찾지 못했을 때 안내하는 일반 설치 경로 (존재하지 않을 수 있음)"""
+    return [
+        r"C:\Program Files\Everything\Everything.exe",
+        r"C:\Program Files (x86)\Everything\Everything.exe",
+        r"C:\Everything\Everything.exe",
+        os.path.expandvars(r"%LOCALAPPDATA%\Everything\Everything.exe"),
+    ]
+
+# get_potential_everything_paths에 탐색 결과를 넘기지 않았을 때의 기본값 (None은 '찾지 못함')
+_FIND = object()
+
+def get_potential_everything_paths(everything_exe=_FIND):
+    """잠재적인 Everything 경로들을 반환 (진단용)
+    
+    이미 탐색한 결과(찾지 못했으면 None)를 넘기면 다시 탐색하지 않는다.
+    """
+    if everything_exe is _FIND:
+        everything_exe = find_everything_exe()
+    if everything_exe:
+        return [everything_exe]
+    
+    # 일반 설치 경로 중 실제로 있는 것 (사용자 참고용)
+    return [p for p in potential_everything_paths() if os.path.exists(p)]
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""ES(Everything 명령줄 클라이언트) 기반 결과 조회
+
+es.exe 출력(한 줄에 경로 하나)을 읽는 즉시 청크로 묶어 스트리밍한다.
+청크 크기 제한은 results.stream_paths에서 처리한다.
+"""
+
+import os
+import time
+
+import host_log as log
+import metrics
+from results import DEFAULT_QUERY_LIMIT, stream_paths, done_response
+
+def find_es_command(config=None):
+    """ES 실행 명령 반환 (리스트), 없으면 None
+    
+    우선순위: EVERYTHING_ES_PATH 환경 변수 > 설정 파일 es_path > Everything.exe 옆 es.exe > PATH의 es.exe
+    설정의 es_path는 문자열 또는 ["python", "stub_es.py"] 같은 리스트를 허용한다.
+    """
+    env_path = os.environ.get('EVERYTHING_ES_PATH')
+    if env_path:
+        return [env_path]
+    
+    if config is None:
+        from discovery import load_config
+        config = load_config()
+    
+    es_path = config.get('es_path')
+    if isinstance(es_path, list) and es_path:
+        return [str(part) for part in es_path]
+    if isinstance(es_path, str) and es_path:
+        return [es_path]
+    
+    from discovery import find_everything_exe
+    everything_exe = find_everything_exe()
+    if everything_exe:
+        sibling = os.path.join(os.path.dirname(everything_exe), 'es.exe')
+        if os.path.exists(sibling):
+            return [sibling]
+    
+    # 리눅스의 es 셸 등 다른 프로그램과 혼동하지 않도록 es.exe만 찾는다
+    import shutil
+    found = shutil.which('es.exe')
+    return [found] if found else None
+
+def iter_lines(stream, encoding='utf-8'):
+    """ES 출력에서 경로를 한 줄씩 디코딩 (빈 줄 제외)"""
+    for raw in stream:
+        path = raw.rstrip(b'\r\n').decode(encoding, errors='replace')
+        if path:
+            yield path
+
+def run_query(query, offset=0, limit=DEFAULT_QUERY_LIMIT, is_cancelled=None, es_command=None):
+    """ES로 검색하고 partial 청크들과 마지막 요약 응답을 차례로 yield
+    
+    has_more 판단을 위해 limit + 1개를 요청하고 마지막 하나는 버린다.
+    취소되면 ES 프로세스를 종료하고 cancelled=True로 끝낸다.
+    """
+    es_command = es_command or find_es_command()
+    if not es_command:
+        yield {
+            'success': False,
+            'error': 'es.exe not found'
+        }
+        return
+    
+    import subprocess
+    
+    cmd = es_command + ['-offset', str(offset), '-n', str(limit + 1), query]
+    log.info(f"Executing: {' '.join(cmd)}")
+    
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, shell=False)
+    metrics.launch('es', started)
+    
+    state = {}
+    try:
+        yield from stream_paths(iter_lines(proc.stdout), offset, limit, is_cancelled, state)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        returncode = proc.wait()
+    
+    if (not state['cancelled'] and not state['has_more']
+            and returncode not in (0, None) and state['count'] == 0):
+        yield {
+            'success': False,
+            'error': f'es.exe exited with code {returncode}'
+        }
+        return
+    
+    yield done_response(query, offset, limit, state, backend='es')
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Everything HTTP 서버 백엔드
+
+Everything의 HTTP 서버(도구 > 옵션 > HTTP 서버)에 json=1로 검색을 요청한다.
+- keep-alive 연결을 작은 풀에 보관해서 요청마다 TCP 연결을 새로 맺지 않는다
+  (쉬는 동안 서버가 끊은 연결이면 새 연결로 한 번 더 요청, 실패로 세지 않음)
+- offset/count로 페이지 단위 요청, sort/ascending 정렬 지원
+- 응답 본문은 읽는 대로 결과 객체 하나씩 디코딩한다 (전체를 버퍼링하지 않음)
+- 요청마다 타임아웃을 걸고, 연속 실패 시 일정 시간 요청을 끊는다 (circuit breaker)
+
+circuit 상태는 호스트 옆 파일에 저장해서 메시지마다 새로 뜨는 호스트끼리도 공유한다.
+"""
+
+import os
+import json
+import time
+import ntpath
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 락 사용
+import _thread
+
+import host_log as log
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+CIRCUIT_FILE = os.path.join(HOST_DIR, "http_circuit.json")
+
+DEFAULT_TIMEOUT = 3.0
+DEFAULT_POOL_SIZE = 4
+# 한 번에 요청하는 결과 수 (응답 하나의 크기 상한)
+DEFAULT_PAGE_SIZE = 500
+# 연속 실패 몇 번에 circuit을 열지, 열린 뒤 몇 초 동안 요청을 막을지
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN = 30.0
+
+SORT_FIELDS = ('name', 'path', 'size', 'extension', 'date_created',
+               'date_modified', 'date_accessed', 'run_count', 'date_run')
+
+_READ_SIZE = 64 * 1024
+
+class HttpBackendError(Exception):
+    """HTTP 서버 요청 실패 (연결 실패, 타임아웃, 잘못된 응답, circuit open)"""
+
+class CircuitBreaker:
+    """연속 실패 횟수와 차단 시각을 파일에 저장하는 circuit breaker"""
+
+    def __init__(self, state_file=CIRCUIT_FILE, threshold=CIRCUIT_FAILURE_THRESHOLD,
+                 cooldown=CIRCUIT_COOLDOWN):
+        self.state_file = state_file
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        # 데몬의 여러 스레드가 같은 클라이언트로 요청하므로 카운터 갱신과 저장을 한 번에 하나씩
+        self._lock = _thread.allocate_lock()
+        self._load()
+
+    def _load(self):
+        if not self.state_file:
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.failures = int(state.get('failures', 0))
+            self.open_until = float(state.get('open_until', 0.0))
+        except (OSError, ValueError, TypeError):
+            pass
+
+    def _save(self):
+        if not self.state_file:
+            return
+        tmp_file = f"{self.state_file}.{os.getpid()}.{_thread.get_ident()}.tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'failures': self.failures, 'open_until': self.open_until}, f)
+            os.replace(tmp_file, self.state_file)
+        except OSError as e:
+            log.warning(f"Failed to write circuit state: {e}")
+
+    def allow(self):
+        """요청을 보내도 되는지 (open 상태면 cooldown이 지난 뒤 한 번 시험 허용)"""
+        return time.time() >= self.open_until
+
+    def record_success(self):
+        with self._lock:
+            if self.failures or self.open_until:
+                self.failures = 0
+                self.open_until = 0.0
+                self._save()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.open_until = time.time() + self.cooldown
+                log.warning(f"Everything HTTP circuit open for {self.cooldown:.0f}s")
+            self._save()
+
+class ConnectionPool:
+    """keep-alive HTTPConnection 풀 (스레드 안전)"""
+
+    def __init__(self, host, port, timeout=DEFAULT_TIMEOUT, size=DEFAULT_POOL_SIZE, keepalive=True):
+        import threading
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.size = size
+        self.keepalive = keepalive
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+        # 통계: 새로 연결한 횟수 / 재사용 횟수
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, fresh=False):
+        """(연결, 풀에서 꺼낸 연결인지), fresh면 항상 새 연결"""
+        with self._lock:
+            if self._idle and not fresh:
+                self.reused += 1
+                return self._idle.pop(), True
+            self.created += 1
+        import http.client
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def release(self, conn, reusable=True):
+        """응답을 끝까지 읽은 연결만 풀에 돌려놓는다"""
+        if self.keepalive and reusable:
+            with self._lock:
+                # 닫힌 풀(설정이 바뀌어 교체된 클라이언트)에는 돌려놓지 않음
+                if not self._closed and len(self._idle) < self.size:
+                    self._idle.append(conn)
+                    return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+def iter_json_results(response):
+    """Everything JSON 응답을 읽는 대로 (totalResults, 결과 dict iterator)로 분해
+
+    {"totalResults":N,"results":[{...},{...}]} 형태에서
+    results 배열의 객체를 하나씩 raw_decode하고, 다 쓴 버퍼 앞부분은 버린다.
+    """
+    import codecs
+
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    state = {'buf': '', 'eof': False}
+
+    def fill():
+        data = response.read(_READ_SIZE)
+        if not data:
+            state['eof'] = True
+            state['buf'] += text_decoder.decode(b'', final=True)
+            return False
+        state['buf'] += text_decoder.decode(data)
+        return True
+
+    # "results":[ 앞부분에서 totalResults 읽기
+    while '"results"' not in state['buf'] or '[' not in state['buf'][state['buf'].index('"results"'):]:
+        if not fill():
+            raise HttpBackendError('Invalid Everything HTTP response: no results array')
+    buf = state['buf']
+    results_at = buf.index('"results"')
+    total = None
+    total_at = buf.find('"totalResults"', 0, results_at)
+    if total_at >= 0:
+        start = buf.index(':', total_at) + 1
+        while buf[start] in ' \t\r\n':
+            start += 1
+        total, _ = decoder.raw_decode(buf, start)
+    state['buf'] = buf[buf.index('[', results_at) + 1:]
+
+    def results():
+        pos = 0
+        while True:
+            buf = state['buf']
+            # 구분자(공백, 쉼표) 건너뛰기
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) and buf[pos] == ']':
+                return
+            if pos < len(buf):
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except ValueError:
+                    item = None
+                if item is not None and (end < len(buf) or state['eof']):
+                    pos = end
+                    yield item
+                    continue
+            # 객체가 잘렸으면 이미 처리한 부분을 버리고 더 읽는다
+            state['buf'] = buf[pos:]
+            pos = 0
+            if not fill():
+                if state['buf'].strip():
+                    raise HttpBackendError('Truncated Everything HTTP response')
+                return
+
+    return total, results()
+
+class PagePaths:
+    """페이지 하나의 경로 iterator
+
+    끝까지 읽으면 연결을 풀로 돌려놓고, 중간에 close()하거나 읽지 않고 버리면 연결을 닫는다
+    (generator는 시작하지 않으면 finally가 실행되지 않아 연결이 남는다).
+    """
+
+    def __init__(self, client, conn, response, items):
+        self._client = client
+        self._conn = conn
+        self._response = response
+        self._items = items
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._conn is None:
+            raise StopIteration
+        try:
+            item = next(self._items)
+        except StopIteration:
+            try:
+                self._response.read()
+            except OSError:
+                self._release(False)
+                raise StopIteration
+            self._release(not self._response.will_close)
+            raise
+        except (OSError, HttpBackendError) as e:
+            self._release(False)
+            self._client.circuit.record_failure()
+            raise HttpBackendError(f'Everything HTTP response failed: {e}') from e
+        return result_path(item)
+
+    def _release(self, reusable):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._client.pool.release(conn, reusable)
+
+    def close(self):
+        self._release(False)
+
+    def __del__(self):
+        self.close()
+
+def result_path(item):
+    """결과 객체의 전체 경로 (path_column=1이면 path + name)"""
+    name = item.get('name', '')
+    directory = item.get('path')
+    return ntpath.join(directory, name) if directory else name
+
+class EverythingHttpClient:
+    """Everything HTTP 서버 검색 클라이언트"""
+
+    def __init__(self, url, timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_POOL_SIZE,
+                 keepalive=True, auth=None, circuit=None, page_size=DEFAULT_PAGE_SIZE):
+        from urllib.parse import urlsplit
+        parts = urlsplit(url if '://' in url else f"http://{url}")
+        if parts.scheme != 'http':
+            raise ValueError(f'Unsupported Everything HTTP URL: {url}')
+        self.url = url
+        self.base_path = parts.path.rstrip('/') + '/'
+        self.pool = ConnectionPool(parts.hostname or '127.0.0.1', parts.port or 80,
+                                   timeout, pool_size, keepalive)
+        self.circuit = circuit if circuit is not None else CircuitBreaker()
+        self.page_size = page_size
+        self.headers = {'Accept': 'application/json'}
+        if auth:
+            import base64
+            token = base64.b64encode(f"{auth[0]}:{auth[1]}".encode('utf-8')).decode('ascii')
+            self.headers['Authorization'] = f'Basic {token}'
+        if not keepalive:
+            self.headers['Connection'] = 'close'
+
+    def search_page(self, query, offset, count, sort=None, ascending=True):
+        """페이지 하나 요청, (totalResults, 경로 iterator) 반환
+
+        iterator(PagePaths)를 끝까지 소비하면 연결이 풀로 돌아가고,
+        중간에 닫거나(close) 읽지 않고 버리면 읽다 만 연결은 닫는다.
+        풀에서 꺼낸 연결을 서버가 이미 끊었으면 새 연결로 한 번 더 요청한다.
+        """
+        if not self.circuit.allow():
+            raise HttpBackendError('Everything HTTP server unavailable (circuit open)')
+
+        from urllib.parse import urlencode
+        params = {'search': query, 'json': 1, 'path_column': 1,
+                  'offset': offset, 'count': count}
+        if sort in SORT_FIELDS:
+            params['sort'] = sort
+            params['ascending'] = 1 if ascending else 0
+
+        target = f"{self.base_path}?{urlencode(params)}"
+        conn, reused = self.pool.acquire()
+        try:
+            try:
+                response = self._request(conn, target)
+            except ConnectionError:
+                if not reused:
+                    raise
+                # 쉬는 동안 서버가 끊은 keep-alive 연결 (RemoteDisconnected, BrokenPipe 등)
+                conn.close()
+                conn, _ = self.pool.acquire(fresh=True)
+                response = self._request(conn, target)
+            total, items = iter_json_results(response)
+        except (OSError, HttpBackendError) as e:
+            conn.close()
+            self.circuit.record_failure()
+            if isinstance(e, HttpBackendError):
+                raise
+            raise HttpBackendError(f'Everything HTTP request failed: {e}') from e
+
+        self.circuit.record_success()
+        return total, PagePaths(self, conn, response, items)
+
+    def _request(self, conn, target):
+        conn.request('GET', target, headers=self.headers)
+        response = conn.getresponse()
+        if response.status != 200:
+            response.read()
+            raise HttpBackendError(f'Everything HTTP server returned {response.status}')
+        return response
+
+    def search(self, query, offset=0, limit=None, sort=None, ascending=True):
+        """offset부터 limit개까지 페이지를 이어서 요청하며 경로를 yield"""
+        remaining = limit
+        while remaining is None or remaining > 0:
+            count = self.page_size if remaining is None else min(self.page_size, remaining)
+            total, paths = self.search_page(query, offset, count, sort, ascending)
+            received = 0
+            try:
+                for path in paths:
+                    received += 1
+                    yield path
+            finally:
+                paths.close()
+            offset += received
+            if remaining is not None:
+                remaining -= received
+            if received < count or (total is not None and offset >= total):
+                return
+
+    def close(self):
+        self.pool.close()
+
+def parse_flag(value, default):
+    """설정의 켜기/끄기 값 (bool, 0/1, "true"/"false" 등), 알 수 없는 값이면 default
+
+    bool("false")처럼 문자열을 그대로 bool로 바꾸면 꺼 둔 설정이 켜지므로 값을 확인한다.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        name = value.strip().lower()
+        if name in ('1', 'true', 'yes', 'on'):
+            return True
+        if name in ('0', 'false', 'no', 'off'):
+            return False
+    if value is not None:
+        log.warning(f"Ignoring invalid boolean setting: {value!r}")
+    return default
+
+# 세션 모드에서 재사용하는 클라이언트와 그 설정 (데몬의 여러 스레드가 함께 쓰므로 _shared_lock 안에서 교체)
+_shared_client = None
+_shared_settings = None
+_shared_lock = _thread.allocate_lock()
+
+def get_client(config):
+    """설정(http_url 등)으로 클라이언트를 만들거나 재사용, http_url이 없으면 None"""
+    global _shared_client, _shared_settings
+    url = config.get('http_url')
+    if not url:
+        return None
+
+    auth = None
+    if config.get('http_user'):
+        auth = (config['http_user'], config.get('http_password', ''))
+    try:
+        timeout = float(config.get('http_timeout', DEFAULT_TIMEOUT))
+    except (TypeError, ValueError):
+        timeout = DEFAULT_TIMEOUT
+    try:
+        pool_size = int(config.get('http_pool_size', DEFAULT_POOL_SIZE))
+    except (TypeError, ValueError):
+        pool_size = DEFAULT_POOL_SIZE
+    keepalive = parse_flag(config.get('http_keepalive'), True)
+    settings = (url, timeout, pool_size, keepalive, auth)
+    with _shared_lock:
+        if _shared_client is None or settings != _shared_settings:
+            client = EverythingHttpClient(url, timeout, pool_size, keepalive, auth)
+            if _shared_client is not None:
+                # 다른 스레드가 쓰고 있는 연결은 돌려받을 때 닫힌다
+                _shared_client.close()
+            _shared_client = client
+            _shared_settings = settings
+        return _shared_client
+
+def run_query(client, query, offset=0, limit=None, is_cancelled=None, sort=None, ascending=True):
+    """HTTP 서버 검색 결과를 partial 청크와 마지막 요약 응답으로 yield"""
+    from results import DEFAULT_QUERY_LIMIT, stream_paths, done_response
+
+    limit = limit or DEFAULT_QUERY_LIMIT
+    state = {}
+    # has_more 판단을 위해 하나 더 요청
+    paths = client.search(query, offset, limit + 1, sort, ascending)
+    try:
+        yield from stream_paths(paths, offset, limit, is_cancelled, state)
+    except HttpBackendError as e:
+        yield {
+            'success': False,
+            'error': str(e)
+        }
+        return
+    finally:
+        paths.close()
+    yield done_response(query, offset, limit, state, backend='http')
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Everything이 없는 환경을 위한 내장 파일 이름 인덱스 (trigram)
+
+설정의 index_roots 아래를 os.scandir로 크롤링해서 파일/폴더 이름마다
+소문자 UTF-8 trigram -> 항목 id posting list를 만든다.
+인덱스 파일은 mmap으로 열어 배열을 memoryview로 바로 사용하므로 로드는 수 ms면 된다.
+
+갱신 시에는 저장된 디렉토리 mtime과 비교해서 바뀐 디렉토리만 다시 읽고, 기존 파일의 이름과
+posting list는 그대로 복사한 뒤 바뀐 디렉토리의 항목만 끝에 덧붙인다 (entry id가 바뀌지 않으므로
+posting list는 이어 붙이기만 하면 정렬 상태가 유지됨). 바뀌거나 사라진 디렉토리의 예전 항목은
+entry_dir을 DEAD_DIR로 표시해서 검색에서 건너뛰고, 그런 항목이 COMPACT_RATIO를 넘으면 전체를 다시 만든다.
+
+사용법:
+    python filename_index.py build [root ...]
+    python filename_index.py update
+    python filename_index.py search <query>
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 락 사용
+import _thread
+from array import array
+from bisect import bisect_left
+
+import host_log as log
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE = os.path.join(HOST_DIR, "filename_index.bin")
+
+INDEX_MAGIC = b'EEIDX\x00\x00\x01'
+INDEX_VERSION = 2
+
+# magic, version, 항목 수, 디렉토리 수, trigram 수, 지워진 항목 수, 생성 시각, 섹션 오프셋 11개
+_HEADER = struct.Struct('<8sIIIIId11Q')
+_SECTIONS = ('names', 'name_offsets', 'entry_dir', 'dirs', 'dir_offsets',
+             'dir_mtime', 'dir_parent', 'dir_entries', 'tri_keys', 'tri_starts', 'postings')
+
+# 지워진 항목(바뀌거나 사라진 디렉토리의 예전 항목)의 entry_dir 값
+DEAD_DIR = 0xFFFFFFFF
+# 지워진 항목이 전체의 이 비율을 넘으면 증분 갱신 대신 전체를 다시 만든다
+COMPACT_RATIO = 0.25
+# Windows: 다른 프로세스가 mmap으로 열고 있으면 교체가 잠시 실패한다 (재시도 간격, 초)
+REPLACE_RETRY_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8)
+
+def _trigrams(data):
+    """바이트열의 trigram 키 집합 (3바이트를 24비트 정수로)"""
+    return {(data[i] << 16) | (data[i + 1] << 8) | data[i + 2] for i in range(len(data) - 2)}
+
+class IndexData:
+    """크롤링 결과 (메모리): 디렉토리 목록과 디렉토리별 항목 이름"""
+
+    def __init__(self):
+        self.dirs = []          # 디렉토리 전체 경로
+        self.dir_mtime = []     # st_mtime_ns
+        self.dir_parent = []    # 상위 디렉토리 id (루트는 -1)
+        self.dir_names = []     # 디렉토리별 직속 항목 이름 목록 (재사용한 디렉토리는 None)
+        self.dir_reused = []    # 재사용한 이전 인덱스의 디렉토리 id (다시 읽었으면 -1)
+
+    def add_dir(self, path, mtime, parent, names, reused=-1):
+        self.dirs.append(path)
+        self.dir_mtime.append(mtime)
+        self.dir_parent.append(parent)
+        self.dir_names.append(names)
+        self.dir_reused.append(reused)
+        return len(self.dirs) - 1
+
+def _scan_dir(path):
+    """디렉토리 하나를 읽어 (항목 이름들, 하위 디렉토리 경로들) 반환"""
+    names = []
+    subdirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            names.append(entry.name)
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+            except OSError:
+                pass
+    return names, subdirs
+
+def crawl(roots, previous=None):
+    """루트들을 크롤링해서 IndexData 반환
+
+    previous(FilenameIndex)가 있으면 mtime이 같은 디렉토리는 다시 읽지 않고
+    저장된 하위 디렉토리 목록을 재사용한다 (항목은 write_index가 이전 파일에서 그대로 복사).
+    """
+    reuse = {}
+    children = {}
+    if previous is not None:
+        for dir_id in range(previous.dir_count):
+            path = previous.dir_path(dir_id)
+            reuse[path] = dir_id
+            parent = previous.dir_parent[dir_id]
+            if parent >= 0:
+                children.setdefault(parent, []).append(path)
+
+    data = IndexData()
+    rescanned = 0
+    stack = [(os.path.abspath(root), -1) for root in reversed(roots)]
+    while stack:
+        path, parent = stack.pop()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+
+        old_id = reuse.get(path)
+        if old_id is not None and previous.dir_mtime[old_id] == mtime:
+            names = None
+            subdirs = children.get(old_id, [])
+        else:
+            old_id = -1
+            try:
+                names, subdirs = _scan_dir(path)
+            except OSError as e:
+                log.warning(f"Index scan failed: {path}: {e}")
+                continue
+            rescanned += 1
+
+        dir_id = data.add_dir(path, mtime, parent, names, old_id)
+        stack.extend((sub, dir_id) for sub in reversed(subdirs))
+
+    log.info(f"Index crawl: {len(data.dirs)} dirs, {rescanned} rescanned")
+    return data
+
+def _encode_strings(strings):
+    """문자열 목록을 (UTF-8 blob, 시작 오프셋 배열 n+1개)로 인코딩"""
+    blob = bytearray()
+    offsets = array('I', [0])
+    for s in strings:
+        blob += s.encode('utf-8', errors='surrogateescape')
+        offsets.append(len(blob))
+    return bytes(blob), offsets
+
+def _postings(names, first_id=0):
+    """이름 목록의 trigram 키 -> entry id 배열 (id는 first_id부터 오름차순)"""
+    postings = {}
+    for entry_id, name in enumerate(names, first_id):
+        for key in _trigrams(name.lower().encode('utf-8', errors='surrogateescape')):
+            lst = postings.get(key)
+            if lst is None:
+                postings[key] = lst = array('I')
+            lst.append(entry_id)
+    return postings
+
+def write_index(data, index_file=INDEX_FILE, previous=None):
+    """IndexData로 trigram 인덱스를 만들어 파일에 원자적으로 저장
+
+    previous(이전 인덱스)가 있으면 재사용한 디렉토리의 항목과 posting list를 복사하고
+    다시 읽은 디렉토리의 항목만 trigram을 만든다. previous는 파일을 교체하기 전에 닫는다.
+    반환: {'mode': 'full' 또는 'incremental', 'entries': 살아 있는 항목 수, 'dead': 지워진 항목 수}
+    """
+    built = None
+    try:
+        if previous is not None:
+            if any(reused >= 0 for reused in data.dir_reused):
+                built = _incremental_sections(data, previous)
+            if built is None:
+                _load_reused_names(data, previous)
+        mode = 'full' if built is None else 'incremental'
+        if built is None:
+            built = _full_sections(data)
+    finally:
+        if previous is not None:
+            previous.close()
+
+    counts, sections = built
+    tmp_file = f"{index_file}.{os.getpid()}.{_thread.get_ident()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(b'\x00' * _HEADER.size)
+        offsets = []
+        for name in _SECTIONS:
+            # memoryview.cast를 위해 8바이트 정렬
+            f.write(b'\x00' * (-f.tell() % 8))
+            offsets.append(f.tell())
+            f.write(sections[name])
+        f.seek(0)
+        f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, counts['entries'], len(data.dirs),
+                             counts['trigrams'], counts['dead'], time.time(), *offsets))
+    _replace_index(tmp_file, index_file)
+    log.info(f"Index written ({mode}): {counts['entries']} entries, {counts['dead']} dead, "
+             f"{counts['trigrams']} trigrams")
+    return {'mode': mode, 'entries': counts['entries'] - counts['dead'], 'dead': counts['dead']}
+
+def _load_reused_names(data, previous):
+    """재사용한 디렉토리의 항목 이름을 이전 인덱스에서 읽어 채움 (전체 다시 만들기 전)"""
+    for dir_id, reused in enumerate(data.dir_reused):
+        if reused >= 0:
+            data.dir_names[dir_id] = previous.dir_entry_names(reused)
+            data.dir_reused[dir_id] = -1
+
+def _dir_sections(data):
+    dirs_blob, dir_offsets = _encode_strings(data.dirs)
+    return {
+        'dirs': dirs_blob,
+        'dir_offsets': dir_offsets.tobytes(),
+        'dir_mtime': array('q', data.dir_mtime).tobytes(),
+        'dir_parent': array('i', data.dir_parent).tobytes(),
+    }
+
+def _full_sections(data):
+    """모든 항목으로 새로 만든 섹션"""
+    names = []
+    entry_dir = array('I')
+    dir_entries = array('I')
+    for dir_id, dir_names in enumerate(data.dir_names):
+        dir_entries.append(len(names))
+        names.extend(dir_names)
+        entry_dir.extend([dir_id] * len(dir_names))
+        dir_entries.append(len(names))
+
+    postings = _postings(names)
+    tri_keys = array('I', sorted(postings))
+    tri_starts = array('I', [0])
+    all_postings = array('I')
+    for key in tri_keys:
+        all_postings.extend(postings[key])
+        tri_starts.append(len(all_postings))
+
+    names_blob, name_offsets = _encode_strings(names)
+    sections = dict(_dir_sections(data), **{
+        'names': names_blob,
+        'name_offsets': name_offsets.tobytes(),
+        'entry_dir': entry_dir.tobytes(),
+        'dir_entries': dir_entries.tobytes(),
+        'tri_keys': tri_keys.tobytes(),
+        'tri_starts': tri_starts.tobytes(),
+        'postings': all_postings.tobytes(),
+    })
+    return {'entries': len(names), 'dead': 0, 'trigrams': len(tri_keys)}, sections
+
+def _incremental_sections(data, previous):
+    """이전 인덱스 뒤에 다시 읽은 디렉토리의 항목만 덧붙인 섹션, 지워진 항목이 너무 많으면 None
+
+    이전 항목의 entry id는 그대로이므로 이전 posting list 뒤에 새 id(모두 더 큼)를 이어 붙인다.
+    재사용한 디렉토리의 항목은 entry_dir만 새 디렉토리 id로 바꾸고, 나머지 이전 항목은 DEAD_DIR.
+    """
+    old_count = previous.entry_count
+    entry_dir = array('I', [DEAD_DIR]) * old_count
+    dir_entries = array('I')
+    live = 0
+    fresh = []
+    for dir_id, reused in enumerate(data.dir_reused):
+        if reused >= 0:
+            start, end = previous.dir_entry_range(reused)
+            entry_dir[start:end] = array('I', [dir_id]) * (end - start)
+            live += end - start
+        else:
+            start = old_count + len(fresh)
+            fresh.extend(data.dir_names[dir_id])
+            end = start + len(data.dir_names[dir_id])
+        dir_entries.append(start)
+        dir_entries.append(end)
+    for dir_id, names in enumerate(data.dir_names):
+        if names is not None:
+            entry_dir.extend([dir_id] * len(names))
+
+    total = old_count + len(fresh)
+    dead = old_count - live
+    if dead > total * COMPACT_RATIO:
+        return None
+
+    postings = _postings(fresh, old_count)
+    tri_keys = array('I', sorted(set(previous.trigram_keys()).union(postings)))
+    tri_starts = array('I', [0])
+    all_postings = array('I')
+    for key in tri_keys:
+        old = previous._posting(key)
+        if old is not None:
+            all_postings.frombytes(old.cast('B'))
+        new = postings.get(key)
+        if new is not None:
+            all_postings.extend(new)
+        tri_starts.append(len(all_postings))
+
+    # 이름: 이전 blob 뒤에 새 이름, 새 오프셋은 이전 blob 길이만큼 밀어서
+    fresh_blob, fresh_offsets = _encode_strings(fresh)
+    base = previous.names_size
+    name_offsets = array('I')
+    name_offsets.frombytes(previous.name_offsets_bytes())
+    name_offsets.extend(map(base.__add__, fresh_offsets[1:]))
+
+    sections = dict(_dir_sections(data), **{
+        'names': previous.names_bytes() + fresh_blob,
+        'name_offsets': name_offsets.tobytes(),
+        'entry_dir': entry_dir.tobytes(),
+        'dir_entries': dir_entries.tobytes(),
+        'tri_keys': tri_keys.tobytes(),
+        'tri_starts': tri_starts.tobytes(),
+        'postings': all_postings.tobytes(),
+    })
+    return {'entries': total, 'dead': dead, 'trigrams': len(tri_keys)}, sections
+
+def _replace_index(tmp_file, index_file):
+    """임시 파일로 인덱스 교체
+
+    이 프로세스가 열어 둔 인덱스(_shared_index)는 먼저 닫고, Windows에서 다른 프로세스가
+    열고 있어서 PermissionError가 나면 REPLACE_RETRY_DELAYS 간격으로 다시 시도한다.
+    """
+    release_index(index_file)
+    for delay in REPLACE_RETRY_DELAYS:
+        try:
+            os.replace(tmp_file, index_file)
+            return
+        except PermissionError:
+            time.sleep(delay)
+    try:
+        os.replace(tmp_file, index_file)
+    except OSError:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+
+class FilenameIndex:
+    """mmap으로 연 인덱스 파일 (읽기 전용)"""
+
+    def __init__(self, index_file=INDEX_FILE):
+        self.index_file = index_file
+        with open(index_file, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        (magic, version, self.entry_count, self.dir_count, tri_count, self.dead_count,
+         self.created_at, *offsets) = _HEADER.unpack_from(view)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f'Unsupported index file: {index_file}')
+
+        bounds = dict(zip(_SECTIONS, zip(offsets, offsets[1:] + [len(view)])))
+        def section(name, fmt=None, count=None):
+            start, end = bounds[name]
+            part = view[start:end]
+            if fmt is None:
+                return part
+            itemsize = struct.calcsize(fmt)
+            return part[:count * itemsize].cast(fmt)
+
+        self._names = section('names')
+        self._name_offsets = section('name_offsets', 'I', self.entry_count + 1)
+        self._entry_dir = section('entry_dir', 'I', self.entry_count)
+        self._dirs = section('dirs')
+        self._dir_offsets = section('dir_offsets', 'I', self.dir_count + 1)
+        self.dir_mtime = section('dir_mtime', 'q', self.dir_count)
+        self.dir_parent = section('dir_parent', 'i', self.dir_count)
+        self._dir_entries = section('dir_entries', 'I', self.dir_count * 2)
+        self._tri_keys = section('tri_keys', 'I', tri_count)
+        self._tri_starts = section('tri_starts', 'I', tri_count + 1)
+        self._postings = section('postings', 'I', self._tri_starts[tri_count] if tri_count else 0)
+
+    def close(self):
+        """mmap 해제 (memoryview를 먼저 놓아야 함, 여러 번 불러도 됨)"""
+        if self._mmap.closed:
+            return
+        for attr in ('_names', '_name_offsets', '_entry_dir', '_dirs', '_dir_offsets',
+                     'dir_mtime', 'dir_parent', '_dir_entries', '_tri_keys', '_tri_starts', '_postings'):
+            getattr(self, attr).release()
+        self._mmap.close()
+
+    @property
+    def names_size(self):
+        return self._name_offsets[self.entry_count]
+
+    def names_bytes(self):
+        return self._names[:self.names_size].tobytes()
+
+    def name_offsets_bytes(self):
+        return self._name_offsets.tobytes()
+
+    def trigram_keys(self):
+        return self._tri_keys
+
+    def name(self, entry_id):
+        start = self._name_offsets[entry_id]
+        end = self._name_offsets[entry_id + 1]
+        return str(self._names[start:end], 'utf-8', 'surrogateescape')
+
+    def dir_path(self, dir_id):
+        start = self._dir_offsets[dir_id]
+        end = self._dir_offsets[dir_id + 1]
+        return str(self._dirs[start:end], 'utf-8', 'surrogateescape')
+
+    def full_path(self, entry_id):
+        return os.path.join(self.dir_path(self._entry_dir[entry_id]), self.name(entry_id))
+
+    def dir_entry_range(self, dir_id):
+        """디렉토리의 직속 항목 entry id 범위 (start, end)"""
+        return self._dir_entries[dir_id * 2], self._dir_entries[dir_id * 2 + 1]
+
+    def dir_entry_names(self, dir_id):
+        """디렉토리의 직속 항목 이름 목록 (전체 다시 만들 때 재사용)"""
+        start, end = self.dir_entry_range(dir_id)
+        return [self.name(entry_id) for entry_id in range(start, end)]
+
+    def _posting(self, key):
+        """trigram 키의 posting list (memoryview), 없으면 None"""
+        pos = bisect_left(self._tri_keys, key)
+        if pos == len(self._tri_keys) or self._tri_keys[pos] != key:
+            return None
+        return self._postings[self._tri_starts[pos]:self._tri_starts[pos + 1]]
+
+    def _candidates(self, terms):
+        """모든 trigram을 포함하는 항목 id를 오름차순으로 yield
+
+        가장 짧은 posting list를 순회하면서 나머지 list는 이진 탐색으로 확인한다.
+        3바이트보다 짧은 검색어만 있으면 전체 항목을 순회한다.
+        """
+        keys = set()
+        for term in terms:
+            keys |= _trigrams(term)
+        if not keys:
+            yield from range(self.entry_count)
+            return
+
+        lists = []
+        for key in keys:
+            posting = self._posting(key)
+            if posting is None:
+                return
+            lists.append(posting)
+        lists.sort(key=len)
+
+        smallest, others = lists[0], lists[1:]
+        for entry_id in smallest:
+            for other in others:
+                pos = bisect_left(other, entry_id)
+                if pos == len(other) or other[pos] != entry_id:
+                    break
+            else:
+                yield entry_id
+
+    def search(self, query):
+        """공백으로 나뉜 모든 검색어를 이름에 포함하는 항목의 전체 경로를 yield (대소문자 무시)"""
+        words = query.lower().split()
+        if not words:
+            return
+        terms = [w.encode('utf-8', errors='surrogateescape') for w in words]
+        entry_dir = self._entry_dir
+        for entry_id in self._candidates(terms):
+            if entry_dir[entry_id] == DEAD_DIR:
+                continue
+            name = self.name(entry_id).lower()
+            if all(w in name for w in words):
+                yield self.full_path(entry_id)
+
+def open_index(index_file=INDEX_FILE):
+    """인덱스 파일을 열어 반환, 없거나 깨졌으면 None"""
+    if not os.path.exists(index_file):
+        return None
+    try:
+        return FilenameIndex(index_file)
+    except (OSError, ValueError, struct.error) as e:
+        log.warning(f"Failed to open filename index: {e}")
+        return None
+
+# 세션 모드에서 재사용하는 열린 인덱스와 그 파일의 (mtime_ns, size)
+# 데몬은 여러 스레드가 같은 인덱스로 검색하므로 교체는 _shared_lock 안에서 하고, 예전 인덱스는
+# 닫지 않고 참조만 놓는다 (진행 중인 검색이 끝나 마지막 참조가 사라질 때 mmap이 해제됨)
+_shared_index = None
+_shared_signature = None
+_shared_lock = _thread.allocate_lock()
+
+def get_index(index_file=INDEX_FILE):
+    """열린 인덱스 재사용 (파일이 교체되었으면 다시 연다), 없으면 None"""
+    global _shared_index, _shared_signature
+    try:
+        st = os.stat(index_file)
+    except OSError:
+        return None
+
+    signature = (st.st_mtime_ns, st.st_size)
+    with _shared_lock:
+        if _shared_index is None or signature != _shared_signature:
+            _shared_index = open_index(index_file)
+            _shared_signature = signature
+        return _shared_index
+
+def release_index(index_file=INDEX_FILE):
+    """이 프로세스가 공유하는 인덱스를 놓음 (파일을 교체하기 전, Windows는 mmap으로 열린 파일을 교체할 수 없음)
+
+    다른 스레드가 검색 중일 수 있으므로 닫지 않는다. 검색이 없으면 바로, 있으면 끝날 때 mmap이 해제되고
+    그 사이 교체는 _replace_index가 다시 시도한다.
+    """
+    global _shared_index, _shared_signature
+    with _shared_lock:
+        if _shared_index is None or _shared_index.index_file != index_file:
+            return
+        _shared_index = None
+        _shared_signature = None
+
+def index_roots(config=None):
+    """설정 파일의 index_roots 목록"""
+    if config is None:
+        from discovery import load_config
+        config = load_config()
+    roots = config.get('index_roots') or []
+    return [os.path.expandvars(r) for r in roots if isinstance(r, str)]
+
+def update_index(roots=None, index_file=INDEX_FILE, full=False):
+    """인덱스 생성 또는 증분 갱신, 통계 dict 반환"""
+    roots = roots if roots is not None else index_roots()
+    if not roots:
+        raise ValueError('No index_roots configured')
+
+    start = time.perf_counter()
+    previous = None if full else open_index(index_file)
+    try:
+        data = crawl(roots, previous)
+        written = write_index(data, index_file, previous)
+    finally:
+        if previous is not None:
+            previous.close()
+
+    return {
+        'roots': roots,
+        'mode': written['mode'],
+        'dirs': len(data.dirs),
+        'entries': written['entries'],
+        'dead_entries': written['dead'],
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+        'size_bytes': os.path.getsize(index_file)
+    }
+
+def run_query(index, query, offset=0, limit=None, is_cancelled=None):
+    """인덱스 검색 결과를 partial 청크와 마지막 요약 응답으로 yield"""
+    from itertools import islice
+    from results import DEFAULT_QUERY_LIMIT, stream_paths, done_response
+
+    limit = limit or DEFAULT_QUERY_LIMIT
+    state = {}
+    paths = islice(index.search(query), offset, None)
+    yield from stream_paths(paths, offset, limit, is_cancelled, state)
+    yield done_response(query, offset, limit, state, backend='index')
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'update'
+    if command in ('build', 'update'):
+        print(update_index(sys.argv[2:] or None, full=(command == 'build')))
+    elif command == 'search':
+        index = open_index()
+        if index is None:
+            sys.exit('Index not found, run: python filename_index.py build <root>')
+        for path in index.search(' '.join(sys.argv[2:])):
+            print(path)
+    else:
+        sys.exit(__doc__)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Native Messaging 프레이밍 (4바이트 네이티브 엔디언 길이 + UTF-8 JSON)
+
+- 읽기: 재사용하는 bytearray에 readinto로 채우고, 짧게 읽히면 다 찰 때까지 반복
+  (보관하는 버퍼보다 큰 메시지는 새 bytearray를 0으로 채우지 않도록 read가 있으면 바로 bytes로 받음)
+- JSON은 버퍼(memoryview)에서 바로 디코딩 (중간 bytes 사본 없음)
+- 쓰기: 헤더와 본문을 writev 한 번으로 (Windows처럼 writev가 없으면 작은 메시지만 이어 붙여 한 번에,
+  큰 본문은 사본을 만들지 않도록 헤더와 따로 씀)
+- 크롬 제한: 호스트 → 크롬 1MB, 크롬 → 호스트 64MB
+- orjson이 설치되어 있으면 use_fast_json() 이후 사용 (EE_JSON=json으로 끌 수 있음).
+  orjson은 선택 사항이다 (pip install orjson, 없으면 표준 json, 저장소에 휠을 함께 두지 않음)
+
+orjson은 import에 15ms 넘게 걸리므로 (uuid, zoneinfo 등 로드) 시작할 때는 표준 json을 쓰고,
+호스트가 첫 응답을 보낸 뒤(세션 모드) use_fast_json()으로 바꾼다.
+"""
+
+import os
+import sys
+import json
+import struct
+
+# 크롬이 받는 메시지 최대 크기 (호스트 → 확장 프로그램)
+MAX_OUTBOUND_BYTES = 1024 * 1024
+# 크롬이 보내는 메시지 최대 크기 (확장 프로그램 → 호스트)
+MAX_INBOUND_BYTES = 64 * 1024 * 1024
+
+_HEADER = struct.Struct('=I')
+# 메시지를 다 읽은 뒤에도 보관하는 버퍼 최대 크기 (더 큰 메시지는 그때만 할당)
+_RETAINED_BUFFER = 1024 * 1024
+_INITIAL_BUFFER = 64 * 1024
+# writev가 없을 때 헤더와 이어 붙여 한 번에 쓰는 본문 최대 크기 (더 크면 복사 대신 두 번 씀)
+_COALESCE_BYTES = 64 * 1024
+
+class FrameError(ValueError):
+    """프레임이 잘렸거나 JSON이 아닐 때"""
+
+class MessageTooLarge(FrameError):
+    """크롬 메시지 크기 제한을 넘을 때 (본문은 버렸으므로 다음 메시지는 읽을 수 있음)"""
+
+class TruncatedFrame(FrameError):
+    """스트림이 프레임 중간에 끝났을 때 (더 읽을 수 없음)"""
+
+def dumps(obj):
+    """객체 → UTF-8 JSON bytes"""
+    return json.dumps(obj).encode('utf-8')
+
+def loads(view):
+    """bytes/memoryview → 객체"""
+    # json.loads는 memoryview를 받지 않으므로 str로 한 번만 디코딩
+    return json.loads(str(view, 'utf-8'))
+
+JSON_BACKEND = 'json'
+
+def use_fast_json():
+    """orjson이 있으면 dumps/loads를 orjson으로 교체, 사용 중인 백엔드 이름 반환"""
+    global dumps, loads, JSON_BACKEND
+    if JSON_BACKEND != 'json' or os.environ.get('EE_JSON', '').lower() == 'json':
+        return JSON_BACKEND
+    try:
+        import orjson
+    except ImportError:
+        if not sys.flags.no_site:
+            return JSON_BACKEND
+        # 설치된 호스트는 python -I -S로 실행되므로 pip로 설치한 orjson이 경로에 없다.
+        # 이때만 site-packages를 추가해서 다시 찾는다 (첫 응답 이후라 시작 시간에는 영향 없음)
+        import site
+        for path in site.getsitepackages():
+            site.addsitedir(path)
+        try:
+            import orjson
+        except ImportError:
+            return JSON_BACKEND
+
+    option = orjson.OPT_NON_STR_KEYS
+    json_dumps = dumps
+
+    def orjson_dumps(obj):
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # orjson이 못 다루는 값(64비트를 넘는 정수 등)은 표준 json으로
+            return json_dumps(obj)
+
+    dumps, loads, JSON_BACKEND = orjson_dumps, orjson.loads, 'orjson'
+    return JSON_BACKEND
+
+class FrameReader:
+    """스트림에서 프레임을 읽어 JSON 객체로 (버퍼 재사용)"""
+
+    def __init__(self, stream, max_bytes=MAX_INBOUND_BYTES):
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self._buffer = bytearray(_INITIAL_BUFFER)
+        self._header = bytearray(_HEADER.size)
+        # read가 없는 스트림(daemon의 Windows named pipe)은 큰 메시지도 readinto로
+        self._read = getattr(stream, 'read', None)
+
+    def _read_into(self, view):
+        """view를 다 채울 때까지 읽고 읽은 바이트 수 반환 (EOF면 그보다 작음)"""
+        got = 0
+        size = len(view)
+        readinto = self.stream.readinto
+        while got < size:
+            n = readinto(view[got:])
+            if not n:
+                break
+            got += n
+        return got
+
+    def _read_bytes(self, length):
+        """length바이트를 bytes로 (큰 메시지용), EOF로 모자라면 None"""
+        chunks = []
+        remaining = length
+        while remaining:
+            chunk = self._read(remaining)
+            if not chunk:
+                return None
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+    def _skip(self, length):
+        """너무 큰 메시지 본문을 버려서 다음 프레임 위치를 맞춤"""
+        view = memoryview(self._buffer)
+        while length > 0:
+            n = self._read_into(view[:min(length, len(view))])
+            if not n:
+                break
+            length -= n
+
+    def read(self):
+        """다음 메시지 반환, 깨끗한 EOF나 빈 프레임이면 None"""
+        header = memoryview(self._header)
+        got = self._read_into(header)
+        if got == 0:
+            return None
+        if got < len(header):
+            raise TruncatedFrame('Truncated message header')
+
+        length = _HEADER.unpack_from(self._header)[0]
+        if length == 0:
+            # 빈 프레임은 입력 끝 표시 (중계가 stdin EOF를 데몬에 알릴 때, 크롬은 보내지 않음)
+            return None
+        if length > self.max_bytes:
+            self._skip(length)
+            raise MessageTooLarge(
+                f'Incoming message is {length} bytes (limit {self.max_bytes} bytes)')
+
+        buffer = self._buffer
+        if length > _RETAINED_BUFFER and self._read is not None:
+            view = self._read_bytes(length)
+            if view is None:
+                raise TruncatedFrame(f'Truncated message body (expected {length} bytes)')
+        else:
+            if length > len(buffer):
+                buffer = bytearray(length)
+                if length <= _RETAINED_BUFFER:
+                    self._buffer = buffer
+            view = memoryview(buffer)[:length]
+            if self._read_into(view) < length:
+                raise TruncatedFrame(f'Truncated message body (expected {length} bytes)')
+        try:
+            return loads(view)
+        except ValueError as e:
+            raise FrameError(f'Invalid JSON message: {e}') from None
+
+class FrameWriter:
+    """JSON 객체를 프레임으로 써서 보냄 (헤더 + 본문을 한 번에)"""
+
+    def __init__(self, stream, max_bytes=MAX_OUTBOUND_BYTES):
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self._fd = None
+        if hasattr(os, 'writev'):
+            try:
+                self._fd = stream.fileno()
+            except (AttributeError, OSError, ValueError):
+                self._fd = None
+
+    def encode(self, message):
+        """메시지를 (헤더, 본문) bytes로, 크기 제한을 넘으면 MessageTooLarge"""
+        body = dumps(message)
+        if len(body) > self.max_bytes:
+            raise MessageTooLarge(
+                f'Outgoing message is {len(body)} bytes (limit {self.max_bytes} bytes)')
+        return _HEADER.pack(len(body)), body
+
+    def write(self, message):
+        header, body = self.encode(message)
+        if self._fd is None:
+            if len(body) <= _COALESCE_BYTES:
+                self.stream.write(header + body)
+            else:
+                self.stream.write(header)
+                self.stream.write(body)
+            self.stream.flush()
+            return
+        # 버퍼에 남은 것이 없도록 한 뒤 fd에 직접 gathered write
+        self.stream.flush()
+        parts = [header, body]
+        total = len(header) + len(body)
+        while total:
+            n = os.writev(self._fd, parts)
+            total -= n
+            if not total:
+                break
+            # 일부만 쓰였으면 남은 부분부터 다시
+            while n >= len(parts[0]):
+                n -= len(parts[0])
+                parts.pop(0)
+            parts[0] = memoryview(parts[0])[n:]
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""검색 기록 (SQLite WAL + FTS5) 과 suggest 액션의 자동 완성
+
+- searches: 검색 한 번마다 한 줄 (검색어, 시각, 백엔드, 결과)
+- queries: 검색어별 사용 횟수와 마지막 사용 시각 (자동 완성 순위용, 소문자 key 인덱스)
+- queries_fts: queries의 FTS5 색인 (검색어 중간 단어의 접두어 일치용, 트리거로 유지)
+
+기록은 record()로 메모리에 모았다가 응답을 보낸 뒤 flush()에서 트랜잭션 하나로 쓴다
+(sqlite3 로드와 DB 열기가 응답 경로에 들어가지 않도록).
+searches가 history_max_entries보다 COMPACT_SLACK개 넘게 많아지면 오래된 것부터 COMPACT_BATCH개씩 나눠 지운다.
+기록 수는 flush마다 DB의 min(id)/max(id)로 확인한다 (메시지마다 새로 뜨는 호스트는 한두 건만 쓰므로
+프로세스별 카운터로는 정리 시점을 알 수 없음).
+자동 완성은 LIMIT이 붙은 질의만 쓰므로 기록 전체를 메모리로 읽지 않는다.
+
+설정(everything_config.json): history_enabled (기본 true), history_max_entries (기본 100000)
+"""
+
+import os
+import time
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 락 사용
+import _thread
+
+import host_log as log
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_FILE = os.environ.get('EE_HISTORY_FILE') or os.path.join(HOST_DIR, "search_history.db")
+SCHEMA_VERSION = 1
+
+DEFAULT_MAX_ENTRIES = 100000
+# 한 트랜잭션에서 지우는 오래된 기록 수 (다른 호스트의 쓰기를 오래 막지 않도록)
+COMPACT_BATCH = 5000
+# 기록이 max_entries보다 이만큼 넘게 많아지면 정리 (쓸 때마다 한두 건씩 지우지 않도록)
+COMPACT_SLACK = 500
+# 이보다 긴 검색어는 기록하지 않음 (큰 선택을 전처리한 OR 검색어 등)
+MAX_QUERY_CHARS = 1024
+
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 50
+# 접두어가 짧아 일치하는 검색어가 많을 때 순위를 매길 후보 수 상한
+MAX_CANDIDATES = 1000
+# 순위: 사용 횟수 × 최근성 (RECENCY_SECONDS가 지나면 절반)
+RECENCY_SECONDS = 7 * 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    id INTEGER PRIMARY KEY,
+    query TEXT NOT NULL,
+    ts REAL NOT NULL,
+    backend TEXT,
+    outcome TEXT,
+    results INTEGER
+);
+CREATE TABLE IF NOT EXISTS queries (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    query TEXT NOT NULL,
+    uses INTEGER NOT NULL,
+    last_ts REAL NOT NULL,
+    backend TEXT,
+    outcome TEXT
+);
+CREATE INDEX IF NOT EXISTS queries_last_ts ON queries(last_ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS queries_fts USING fts5(
+    query, content='queries', content_rowid='id', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS queries_ai AFTER INSERT ON queries BEGIN
+    INSERT INTO queries_fts(rowid, query) VALUES (new.id, new.query);
+END;
+CREATE TRIGGER IF NOT EXISTS queries_ad AFTER DELETE ON queries BEGIN
+    INSERT INTO queries_fts(queries_fts, rowid, query) VALUES ('delete', old.id, old.query);
+END;
+CREATE TRIGGER IF NOT EXISTS queries_au AFTER UPDATE OF query ON queries
+WHEN old.query <> new.query BEGIN
+    INSERT INTO queries_fts(queries_fts, rowid, query) VALUES ('delete', old.id, old.query);
+    INSERT INTO queries_fts(rowid, query) VALUES (new.id, new.query);
+END;
+"""
+
+_SCORE = f"uses * {RECENCY_SECONDS}.0 / ({RECENCY_SECONDS}.0 + max(0, :now - last_ts))"
+_COLUMNS = "query, uses, last_ts, backend, outcome"
+
+_lock = _thread.allocate_lock()
+_conn = None
+_pending = []
+
+def _settings():
+    from discovery import load_config
+    config = load_config()
+    try:
+        max_entries = int(config.get('history_max_entries', DEFAULT_MAX_ENTRIES))
+    except (TypeError, ValueError):
+        max_entries = DEFAULT_MAX_ENTRIES
+    return config.get('history_enabled', True) is not False, max(1000, max_entries)
+
+def _connect(path=None):
+    """DB 연결 (처음 호출 시 열고 스키마 생성), 열 수 없으면 None"""
+    global _conn
+    if _conn is not None:
+        return _conn
+    import sqlite3
+    try:
+        conn = sqlite3.connect(path or HISTORY_FILE, timeout=5, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL에서는 NORMAL이어도 DB가 깨지지 않는다 (마지막 몇 건만 잃을 수 있음)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    except sqlite3.Error as e:
+        log.warning(f"Failed to open search history: {e}")
+        return None
+    _conn = conn
+    return conn
+
+def close():
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+
+def record(query, backend=None, outcome=None, results=None):
+    """검색 하나를 기록 대기열에 추가 (실제 쓰기는 flush())"""
+    if not isinstance(query, str):
+        return
+    query = query.strip()
+    if not query or len(query) > MAX_QUERY_CHARS:
+        return
+    with _lock:
+        _pending.append((query, time.time(), backend, outcome, results))
+
+def flush(max_entries=None):
+    """대기 중인 기록을 트랜잭션 하나로 쓰고, 필요하면 오래된 기록 정리 (쓴 개수 반환)
+
+    max_entries를 주면 여유(COMPACT_SLACK) 없이 바로 그 개수로 줄인다.
+    """
+    if not _pending:
+        return 0
+    enabled, configured_max = _settings()
+    with _lock:
+        entries = _pending[:]
+        del _pending[:]
+        if not enabled:
+            return 0
+        conn = _connect()
+        if conn is None:
+            return 0
+        import sqlite3
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT INTO searches(query, ts, backend, outcome, results) "
+                             "VALUES (?, ?, ?, ?, ?)", entries)
+            conn.executemany(
+                "INSERT INTO queries(key, query, uses, last_ts, backend, outcome) "
+                "VALUES (?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET uses = uses + 1, query = excluded.query, "
+                "last_ts = max(last_ts, excluded.last_ts), "
+                "backend = excluded.backend, outcome = excluded.outcome",
+                [(query.lower(), query, ts, backend, outcome) for query, ts, backend, outcome, _ in entries])
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            log.warning(f"Failed to write search history: {e}")
+            return 0
+        _compact(conn, max_entries or configured_max, 0 if max_entries else COMPACT_SLACK)
+    return len(entries)
+
+def _compact(conn, max_entries, slack=0):
+    """searches를 max_entries개로 줄이고, 남은 기록에 없는 오래된 검색어 삭제 (배치 단위)
+
+    max_entries + slack개를 넘었을 때만 시작한다 (min(id)/max(id)는 rowid 양 끝이라 확인 비용이 작음).
+    """
+    import sqlite3
+    removed = 0
+    try:
+        while True:
+            low, high = conn.execute("SELECT min(id), max(id) FROM searches").fetchone()
+            if low is None or high - low + 1 <= max_entries + slack:
+                break
+            slack = 0
+            cutoff = min(low + COMPACT_BATCH, high - max_entries + 1)
+            conn.execute("BEGIN IMMEDIATE")
+            removed += conn.execute("DELETE FROM searches WHERE id < ?", (cutoff,)).rowcount
+            oldest = conn.execute("SELECT ts FROM searches WHERE id >= ? ORDER BY id LIMIT 1",
+                                  (cutoff,)).fetchone()
+            if oldest is not None:
+                # 남은 기록보다 오래 전에 마지막으로 쓴 검색어는 순위에도 남길 이유가 없다
+                conn.execute("DELETE FROM queries WHERE id IN (SELECT id FROM queries "
+                             "WHERE last_ts < ? ORDER BY last_ts LIMIT ?)", (oldest[0], COMPACT_BATCH))
+            conn.execute("COMMIT")
+    except sqlite3.Error as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        log.warning(f"Failed to compact search history: {e}")
+    return removed
+
+def _fts_query(prefix):
+    """입력의 단어마다 접두어 검색 ("단어"* AND ...), 단어가 없으면 None"""
+    import re
+    words = re.findall(r'\w+', prefix)
+    if not words:
+        return None
+    return ' '.join('"%s"*' % word.replace('"', '""') for word in words)
+
+def _row(row):
+    query, uses, last_ts, backend, outcome = row[:5]
+    return {'query': query, 'uses': uses, 'last_ts': last_ts, 'backend': backend, 'outcome': outcome}
+
+def suggest(prefix='', limit=DEFAULT_SUGGESTIONS, now=None):
+    """자동 완성 목록 (prefix가 비어 있으면 최근 검색어)
+
+    1. 검색어 전체가 prefix로 시작 (대소문자 무시): 사용 횟수 × 최근성 순
+    2. 모자라면 검색어 중간 단어가 prefix의 단어들로 시작하는 것 (FTS5)
+    """
+    limit = max(1, min(int(limit or DEFAULT_SUGGESTIONS), MAX_SUGGESTIONS))
+    prefix = (prefix or '').strip()
+    params = {'now': time.time() if now is None else now, 'limit': limit,
+              'candidates': MAX_CANDIDATES}
+    with _lock:
+        conn = _connect()
+        if conn is None:
+            return []
+        if not prefix:
+            rows = conn.execute(f"SELECT {_COLUMNS} FROM queries ORDER BY last_ts DESC LIMIT :limit",
+                                params).fetchall()
+            return [dict(_row(row), match='recent') for row in rows]
+
+        key = prefix.lower()
+        params.update(low=key, high=key + '\U0010ffff')
+        rows = conn.execute(
+            f"SELECT {_COLUMNS}, {_SCORE} AS score FROM "
+            f"(SELECT * FROM queries WHERE key >= :low AND key < :high LIMIT :candidates) "
+            f"ORDER BY score DESC LIMIT :limit", params).fetchall()
+        suggestions = [dict(_row(row), match='prefix') for row in rows]
+
+        match = _fts_query(prefix) if len(suggestions) < limit else None
+        if match:
+            import sqlite3
+            params.update(match=match, limit=limit + len(suggestions))
+            try:
+                rows = conn.execute(
+                    f"SELECT {_COLUMNS}, {_SCORE} AS score FROM queries JOIN "
+                    f"(SELECT rowid FROM queries_fts WHERE queries_fts MATCH :match LIMIT :candidates) AS f "
+                    f"ON queries.id = f.rowid ORDER BY score DESC LIMIT :limit", params).fetchall()
+            except sqlite3.Error:
+                rows = []
+            seen = {entry['query'] for entry in suggestions}
+            for row in rows:
+                if len(suggestions) >= limit:
+                    break
+                if row[0] not in seen:
+                    suggestions.append(dict(_row(row), match='word'))
+        return suggestions
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""지연 로깅 (큐 + 백그라운드 스레드, 크기 기반 회전, JSON lines)
+
+logging 모듈 로드와 로그 파일 열기는 첫 응답을 보낸 뒤로 미룬다.
+그 전에 남긴 로그는 메모리에 모아 두었다가 start() 시점에 원래 시각으로 기록한다.
+
+start() 이후에는 요청 처리 스레드가 레코드를 큐에 넣기만 하고,
+포맷과 파일 쓰기는 백그라운드 스레드가 한다. 설정(everything_config.json):
+- log_level: 'DEBUG' / 'INFO' / 'WARNING' / 'ERROR' (기본 INFO)
+- log_sampling: 액션별 요청/응답 기록 비율, 예 {"query": 0.1, "*": 1.0}
+- log_payload_chars: 메시지 안 문자열 최대 길이 (기본 200, 0이면 자르지 않음)
+- log_max_bytes / log_backups: 회전 크기 (기본 1MB) / 보관 개수 (기본 3)
+- log_async: false면 큐 없이 바로 기록 (비교용)
+경고 이상은 샘플링과 관계없이 기록한다.
+"""
+
+import os
+import time
+
+LOG_FILE = os.environ.get('EE_LOG_FILE') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "native_host.log")
+
+# logging 모듈을 로드하지 않고 쓰기 위한 레벨 값 (logging.DEBUG 등과 동일)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVELS = {'DEBUG': DEBUG, 'INFO': INFO, 'WARNING': WARNING, 'ERROR': ERROR}
+
+DEFAULT_LEVEL = INFO
+DEFAULT_PAYLOAD_CHARS = 200
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_BACKUPS = 3
+# 목록은 앞의 몇 개만 남기고 나머지는 개수로 표시
+_PAYLOAD_ITEMS = 5
+
+_logger = None
+_listener = None
+_pending = []
+_sampling = {}
+_payload_chars = DEFAULT_PAYLOAD_CHARS
+
+def _settings(config):
+    """설정 dict에서 로깅 설정 읽기 (잘못된 값은 기본값)"""
+    level = config.get('log_level', 'INFO')
+    if not isinstance(level, int):
+        level = LEVELS.get(str(level).upper(), DEFAULT_LEVEL)
+    sampling = {}
+    if isinstance(config.get('log_sampling'), dict):
+        for action, rate in config['log_sampling'].items():
+            try:
+                sampling[action] = float(rate)
+            except (TypeError, ValueError):
+                pass
+    try:
+        payload_chars = int(config.get('log_payload_chars', DEFAULT_PAYLOAD_CHARS))
+        max_bytes = int(config.get('log_max_bytes', DEFAULT_MAX_BYTES))
+        backups = int(config.get('log_backups', DEFAULT_BACKUPS))
+    except (TypeError, ValueError):
+        payload_chars, max_bytes, backups = DEFAULT_PAYLOAD_CHARS, DEFAULT_MAX_BYTES, DEFAULT_BACKUPS
+    return level, sampling, payload_chars, max_bytes, backups, config.get('log_async', True) is not False
+
+def _json_formatter():
+    import json
+    import logging
+
+    class JsonFormatter(logging.Formatter):
+        """레코드 하나를 JSON 한 줄로 (fields 속성은 최상위 키로 합침)"""
+
+        def format(self, record):
+            entry = {
+                'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + '.%03d' % record.msecs,
+                'level': record.levelname,
+                'msg': record.getMessage(),
+            }
+            entry.update(getattr(record, 'fields', None) or {})
+            return json.dumps(entry, ensure_ascii=False, default=str)
+
+    return JsonFormatter()
+
+def _file_handler(max_bytes, backups):
+    """크기 기반 회전 파일 핸들러
+
+    기본 RotatingFileHandler는 회전 여부를 보려고 레코드를 한 번 더 포맷하고
+    파일을 stat하므로, 현재 파일 위치만 보고 판단한다 (한 레코드만큼 넘칠 수 있음).
+    autoflush가 False면 레코드마다 flush하지 않는다 (리스너가 큐가 비었을 때 flush).
+    """
+    import logging.handlers
+
+    class SizeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+        autoflush = True
+
+        def shouldRollover(self, record):
+            if self.maxBytes <= 0:
+                return False
+            if self.stream is None:
+                self.stream = self._open()
+            return self.stream.tell() >= self.maxBytes
+
+        def flush(self):
+            if self.autoflush:
+                super().flush()
+
+        def flush_now(self):
+            if self.stream is not None:
+                super().flush()
+
+    return SizeRotatingFileHandler(LOG_FILE, maxBytes=max_bytes, backupCount=backups,
+                                   encoding='utf-8', delay=True)
+
+def _queue_handler(handler):
+    """레코드를 큐에 넣기만 하는 핸들러와 파일에 쓰는 리스너 스레드"""
+    import queue
+    import logging.handlers
+
+    class RecordQueueHandler(logging.handlers.QueueHandler):
+        # 같은 프로세스 안의 큐라 직렬화가 필요 없으므로 포맷도 리스너 스레드에서 한다
+        def prepare(self, record):
+            return record
+
+    class BatchingListener(logging.handlers.QueueListener):
+        # 쌓인 레코드를 모두 쓴 뒤에 한 번만 flush
+        def handle(self, record):
+            super().handle(record)
+            if self.queue.empty():
+                handler.flush_now()
+
+        def stop(self):
+            super().stop()
+            handler.flush_now()
+
+    handler.autoflush = False
+    records = queue.SimpleQueue()
+    listener = BatchingListener(records, handler)
+    listener.start()
+    return RecordQueueHandler(records), listener
+
+def start(config=None):
+    """logging 설정 후 쌓아 둔 로그를 기록 (여러 번 호출해도 안전)"""
+    global _logger, _listener, _sampling, _payload_chars
+    if _logger is None:
+        import logging
+        import logging.handlers
+
+        if config is None:
+            from discovery import load_config
+            config = load_config()
+        level, _sampling, _payload_chars, max_bytes, backups, use_queue = _settings(config)
+
+        handler = _file_handler(max_bytes, backups)
+        handler.setFormatter(_json_formatter())
+        if use_queue:
+            handler, _listener = _queue_handler(handler)
+            import atexit
+            atexit.register(stop)
+
+        logger = logging.getLogger('native_host')
+        logger.setLevel(level)
+        logger.propagate = False
+        logger.addHandler(handler)
+        _logger = logger
+
+    while _pending:
+        level, msg, created, fields = _pending.pop(0)
+        if not _logger.isEnabledFor(level):
+            continue
+        record = _logger.makeRecord(_logger.name, level, __file__, 0, msg, None, None,
+                                    extra={'fields': fields} if fields else None)
+        record.created = created
+        record.msecs = (created - int(created)) * 1000
+        _logger.handle(record)
+
+def stop():
+    """큐에 남은 로그를 모두 쓰고 백그라운드 스레드 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def log(level, msg, **fields):
+    """로그 기록 (start() 전에는 메모리에 보관), fields는 JSON 키로 기록"""
+    if _logger is None:
+        _pending.append((level, msg, time.time(), fields))
+    elif _logger.isEnabledFor(level):
+        # Logger.log는 호출 위치를 찾느라 스택을 훑으므로 레코드를 직접 만든다
+        _logger.handle(_logger.makeRecord(_logger.name, level, __file__, 0, msg, None, None,
+                                          extra={'fields': fields} if fields else None))
+
+def debug(msg, **fields):
+    log(DEBUG, msg, **fields)
+
+def info(msg, **fields):
+    log(INFO, msg, **fields)
+
+def warning(msg, **fields):
+    log(WARNING, msg, **fields)
+
+def error(msg, **fields):
+    log(ERROR, msg, **fields)
+
+def truncate_payload(value, max_chars=None, depth=0):
+    """로그용으로 메시지를 줄인 사본 (긴 문자열은 자르고, 긴 목록은 앞부분 + 개수)"""
+    if max_chars is None:
+        max_chars = _payload_chars
+    if max_chars <= 0:
+        return value
+    if isinstance(value, str):
+        if len(value) > max_chars:
+            return f"{value[:max_chars]}...(+{len(value) - max_chars} chars)"
+        return value
+    if depth >= 3:
+        return value if isinstance(value, (int, float, bool, type(None))) else '...'
+    if isinstance(value, dict):
+        return {k: truncate_payload(v, max_chars, depth + 1) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [truncate_payload(v, max_chars, depth + 1) for v in value[:_PAYLOAD_ITEMS]]
+        if len(value) > _PAYLOAD_ITEMS:
+            items.append(f"...(+{len(value) - _PAYLOAD_ITEMS} items)")
+        return items
+    return value
+
+def sampled(action):
+    """이 액션의 요청/응답을 기록할지 (start() 전에는 항상 기록)"""
+    if _logger is None:
+        return True
+    rate = _sampling.get(action, _sampling.get('*', 1.0))
+    if rate >= 1:
+        return True
+    import random
+    return random.random() < rate
+
+def request(message):
+    """이 요청을 기록할지 결정 (기록은 응답과 함께 response()에서 한 줄로)"""
+    action = message.get('action') if isinstance(message, dict) else None
+    if _logger is not None and not _logger.isEnabledFor(INFO):
+        return False
+    return sampled(action)
+
+def response(message, result, logged=True, **fields):
+    """요청과 응답을 한 줄로 기록 (request()가 False를 반환한 요청은 건너뜀)"""
+    if not logged:
+        return
+    info('Handled message', action=message.get('action'), id=message.get('id'),
+         request=truncate_payload(message), response=truncate_payload(result), **fields)
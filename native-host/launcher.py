@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Everything 실행 관리: 실행 중인 인스턴스 재사용, 같은 검색어 합치기, 동시 실행 제한, 자식 회수
+
+- Everything이 이미 떠 있으면 -existingwindow로 검색어만 넘긴다 (클릭마다 새 창이 생기지 않도록).
+  떠 있는지는 Windows에서 Everything IPC 창(EVERYTHING_TASKBAR_NOTIFICATION)으로, 그 밖에는
+  이 호스트가 띄운 인스턴스 프로세스가 살아 있는지로 판단한다.
+  launch_new_window가 true면 예전처럼 항상 -newwindow
+- 같은 실행 파일 + 검색어가 launch_coalesce_seconds(기본 1초) 안에 다시 오면 실행하지 않고
+  앞의 실행에 합친다 (연속 클릭, 컨텍스트 메뉴 두 번 선택)
+- 검색어만 넘기고 끝나는 실행이 launch_max_concurrent(기본 4)개 떠 있으면
+  LAUNCH_WAIT_SECONDS 동안 자리가 나기를 기다리고, 그래도 없으면 실패
+- 띄운 프로세스마다 대기 스레드가 wait()해서 끝나는 즉시 회수한다
+  (데몬/세션 호스트에서 좀비가 쌓이지 않도록). 자식은 호스트의 stdio(크롬 파이프)를 물려받지 않는다
+
+설정(everything_config.json): launch_coalesce_seconds, launch_max_concurrent, launch_new_window
+"""
+
+import os
+import time
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 락/스레드 사용
+import _thread
+
+import host_log as log
+import metrics
+
+DEFAULT_COALESCE_SECONDS = 1.0
+DEFAULT_MAX_CONCURRENT = 4
+# 동시 실행 제한에 걸렸을 때 자리가 나기를 기다리는 최대 시간 (초)
+LAUNCH_WAIT_SECONDS = 2.0
+LAUNCH_POLL_SECONDS = 0.01
+# Everything IPC 창 클래스 (Everything SDK의 EVERYTHING_IPC_WNDCLASS)
+IPC_WINDOW_CLASS = 'EVERYTHING_TASKBAR_NOTIFICATION'
+
+_lock = _thread.allocate_lock()
+# 이 호스트가 띄운 Everything 인스턴스 (Popen, 끝나면 None)
+_instance = None
+# 검색어만 넘기고 끝나는 실행 {pid: Popen}
+_launching = {}
+# 자리를 예약하고 아직 Popen 전인 실행 수
+_reserved = 0
+# (실행 파일, 검색어) → (실행 시각, pid)
+_recent = {}
+
+def _settings(config):
+    """설정 dict에서 실행 설정 읽기 (잘못된 값은 기본값)"""
+    try:
+        coalesce = float(config.get('launch_coalesce_seconds', DEFAULT_COALESCE_SECONDS))
+    except (TypeError, ValueError):
+        coalesce = DEFAULT_COALESCE_SECONDS
+    try:
+        max_concurrent = max(1, int(config.get('launch_max_concurrent', DEFAULT_MAX_CONCURRENT)))
+    except (TypeError, ValueError):
+        max_concurrent = DEFAULT_MAX_CONCURRENT
+    return coalesce, max_concurrent, bool(config.get('launch_new_window', False))
+
+def command(everything_exe, query, existing=False):
+    """Everything 명령줄 (-s: 검색어, -newwindow: 새 창, -existingwindow: 떠 있는 창에서 검색)"""
+    return [everything_exe, '-existingwindow' if existing else '-newwindow', '-s', query]
+
+def _ipc_window_exists():
+    if os.name != 'nt':
+        return False
+    try:
+        import ctypes
+        return bool(ctypes.windll.user32.FindWindowW(IPC_WINDOW_CLASS, None))
+    except Exception:
+        return False
+
+def instance_running():
+    """Everything 인스턴스가 떠 있는지 (이 호스트가 띄운 것 또는 IPC 창)"""
+    with _lock:
+        if _instance is not None:
+            return True
+    return _ipc_window_exists()
+
+def status():
+    """인스턴스 pid와 진행 중인 실행 수"""
+    with _lock:
+        return {
+            'instance_pid': _instance.pid if _instance is not None else None,
+            'launching': len(_launching) + _reserved,
+        }
+
+def _watch(proc, instance):
+    """대기 스레드: 프로세스가 끝나면 회수하고 목록에서 뺀다"""
+    global _instance
+    try:
+        proc.wait()
+    except Exception as e:
+        log.warning(f"Waiting for Everything failed: {e}")
+    with _lock:
+        if instance:
+            if _instance is proc:
+                _instance = None
+        else:
+            _launching.pop(proc.pid, None)
+
+def _reserve(max_concurrent):
+    """검색어를 넘기는 실행의 자리 예약 (LAUNCH_WAIT_SECONDS 안에 못 얻으면 False)"""
+    global _reserved
+    deadline = time.monotonic() + LAUNCH_WAIT_SECONDS
+    while True:
+        with _lock:
+            if len(_launching) + _reserved < max_concurrent:
+                _reserved += 1
+                return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(LAUNCH_POLL_SECONDS)
+
+def _spawn(everything_exe, query, forward, new_window):
+    """Popen 후 대기 스레드 등록 (forward: 떠 있는 인스턴스로 넘기는 실행, 예약한 자리 사용)"""
+    global _instance, _reserved
+    import subprocess
+
+    cmd = command(everything_exe, query, existing=forward and not new_window)
+    log.info("Executing Everything", command=cmd)
+    started = time.perf_counter()
+    try:
+        proc = subprocess.Popen(cmd, shell=False, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception:
+        if forward:
+            with _lock:
+                _reserved -= 1
+        raise
+    metrics.launch('everything', started)
+
+    with _lock:
+        if forward:
+            _reserved -= 1
+            _launching[proc.pid] = proc
+        elif _instance is None:
+            _instance = proc
+        else:
+            # 동시에 두 번 새로 띄운 경우: 나중 것은 앞의 인스턴스로 넘기고 끝날 것
+            forward = True
+            _launching[proc.pid] = proc
+    _thread.start_new_thread(_watch, (proc, not forward))
+    return proc
+
+def launch(everything_exe, query, config=None):
+    """Everything에서 검색어 열기
+
+    반환: {'launch': 'started' (새 인스턴스) | 'forwarded' (떠 있는 인스턴스로 넘김)
+    | 'coalesced' (합침), 'pid': 실행한 프로세스 pid}
+    동시 실행 제한에서 자리를 얻지 못하면 RuntimeError
+    """
+    window, max_concurrent, new_window = _settings(config or {})
+    key = (everything_exe, query)
+    now = time.monotonic()
+    with _lock:
+        for old in [k for k, (at, _) in _recent.items() if now - at > window]:
+            del _recent[old]
+        if key in _recent:
+            metrics.cache_hit('launch')
+            return {'launch': 'coalesced', 'pid': _recent[key][1]}
+        # 실행하는 동안 같은 검색어가 또 오면 합쳐지도록 먼저 기록
+        _recent[key] = (now, None)
+    metrics.cache_miss('launch')
+
+    try:
+        # 떠 있는 인스턴스로 넘기는 실행만 동시 실행 수에 센다 (인스턴스는 계속 떠 있음)
+        running = instance_running()
+        if running and not _reserve(max_concurrent):
+            raise RuntimeError(f'Too many Everything launches in progress ({max_concurrent})')
+        proc = _spawn(everything_exe, query, running, new_window)
+    except Exception:
+        with _lock:
+            _recent.pop(key, None)
+        raise
+
+    with _lock:
+        if key in _recent:
+            _recent[key] = (now, proc.pid)
+    return {'launch': 'forwarded' if running else 'started', 'pid': proc.pid}
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""리눅스 locate 데이터베이스 직접 읽기 (locate 프로세스 없이)
+
+updatedb가 갱신하는 데이터베이스를 mmap으로 열고 레코드를 필요한 만큼만 디코딩한다.
+- mlocate.db: 디렉토리별 블록 (디렉토리 경로 + 항목 이름들)
+- LOCATE02 (findutils locatedb): 앞부분 공유 길이 차이로 압축된 경로 목록
+plocate.db는 zstd 압축 블록이라 표준 라이브러리만으로는 읽을 수 없다.
+
+검색은 locate와 같이 전체 경로 부분 문자열 일치 (ASCII 대소문자 무시)이다.
+
+배포판의 시스템 데이터베이스(/var/lib/mlocate/mlocate.db 등)는 보통 root:mlocate 0640이라
+사용자로 실행되는 호스트는 읽을 수 없다 (locate 명령은 setgid로 읽음). 읽을 수 없는 데이터베이스는
+건너뛰므로, 사용자를 해당 그룹에 넣거나 updatedb -l 0 -o ~/.cache/mlocate.db -U ~ 처럼 직접 만든
+데이터베이스를 설정 locate_db (또는 LOCATE_PATH)로 지정한다.
+"""
+
+import os
+import mmap
+import struct
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 락 사용
+import _thread
+from abc import ABC, abstractmethod
+
+import host_log as log
+
+DEFAULT_DATABASES = [
+    '/var/lib/mlocate/mlocate.db',
+    '/var/cache/locate/locatedb',
+    '/var/lib/locate/locatedb',
+    '/var/lib/plocate/plocate.db',
+]
+
+MLOCATE_MAGIC = b'\x00mlocate'
+LOCATE02_MAGIC = b'\x00LOCATE02\x00'
+PLOCATE_MAGIC = b'\x00plocate'
+
+# mlocate 디렉토리 항목 종류 (0: 파일, 1: 하위 디렉토리, 2: 디렉토리 끝)
+_MLOCATE_END = 2
+
+def _decode(path):
+    return path.decode('utf-8', errors='surrogateescape')
+
+class LocateDatabase(ABC):
+    """locate 데이터베이스 공통 부분 (mmap, 통계), 형식마다 search를 구현"""
+
+    format = None
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # 마지막 검색에서 확인한 경로 수 (처리량 측정용)
+        self.scanned = 0
+
+    def close(self):
+        self._mmap.close()
+
+    @abstractmethod
+    def search(self, query):
+        """경로에 query가 포함된 항목의 전체 경로를 yield하고 scanned를 갱신"""
+
+class MlocateDatabase(LocateDatabase):
+    """mlocate.db 리더
+
+    헤더: magic(8) + 설정 블록 크기(4, BE) + 버전(1) + visibility(1) + 패딩(2) + 루트 경로 + 설정 블록
+    디렉토리: 시각(8+4, BE) + 패딩(4) + 경로 + [종류(1) + 이름]... + 종료(2)
+    """
+
+    format = 'mlocate'
+
+    def __init__(self, path):
+        super().__init__(path)
+        mm = self._mmap
+        if mm[:8] != MLOCATE_MAGIC:
+            raise ValueError(f'Not an mlocate database: {path}')
+        conf_size, version = struct.unpack_from('>IB', mm, 8)
+        if version != 0:
+            raise ValueError(f'Unsupported mlocate version: {version}')
+        root_end = mm.find(b'\x00', 16)
+        self.root = _decode(mm[16:root_end])
+        self._dirs_start = root_end + 1 + conf_size
+
+    def iter_dirs(self):
+        """(디렉토리 경로 bytes, 항목 블록 시작, 블록 끝) 순회
+
+        블록 끝(종료 바이트 2)은 NUL 바로 뒤의 0x02를 bytes.find로 찾고,
+        다음 디렉토리 헤더가 절대 경로로 시작하지 않으면 항목을 하나씩 따라가서 다시 찾는다.
+        """
+        mm = self._mmap
+        pos = self._dirs_start
+        size = len(mm)
+        while pos + 16 < size:
+            path_end = mm.find(b'\x00', pos + 16)
+            if path_end < 0:
+                break
+            dir_path = mm[pos + 16:path_end]
+
+            end = mm.find(b'\x00\x02', path_end) + 1
+            if end == 0:
+                break
+            if end + 1 < size and mm[end + 17:end + 18] != b'/':
+                end = self._walk_entries(path_end + 1)
+                if end < 0:
+                    break
+            yield dir_path, path_end + 1, end
+            pos = end + 1
+
+    def _walk_entries(self, entry):
+        """항목을 하나씩 따라가서 종료 바이트 위치 반환 (이름이 0x02로 시작하는 경우용)"""
+        mm = self._mmap
+        size = len(mm)
+        while entry < size and mm[entry] != _MLOCATE_END:
+            entry = mm.find(b'\x00', entry + 1) + 1
+            if entry == 0:
+                return -1
+        return entry
+
+    @staticmethod
+    def _count_entries(block):
+        """블록의 항목 수: NUL은 파일마다 2개(종류+종료), 디렉토리마다 1개"""
+        files = block.count(b'\x00\x00') + (block[:1] == b'\x00')
+        return block.count(b'\x00') - files
+
+    def search(self, query):
+        """경로에 query가 포함된 항목의 전체 경로를 yield
+
+        디렉토리 블록 전체에 대해 먼저 bytes.find로 걸러내므로
+        일치하는 항목이 없는 디렉토리는 이름을 하나씩 디코딩하지 않는다.
+        """
+        needle = query.lower().encode('utf-8', errors='surrogateescape')
+        # 이름에는 '/'가 없으므로 '/'가 있는 검색어는 디렉토리 경로 끝에 걸쳐야만 일치한다
+        slash = needle.rfind(b'/')
+        head, tail = needle[:slash + 1], needle[slash + 1:]
+        mm = self._mmap
+        self.scanned = 0
+
+        for dir_path, start, end in self.iter_dirs():
+            block = mm[start:end]
+            prefix = dir_path if dir_path.endswith(b'/') else dir_path + b'/'
+            dir_match = needle in dir_path.lower()
+            if not dir_match:
+                if slash >= 0:
+                    skip = not prefix.lower().endswith(head)
+                else:
+                    skip = needle not in block.lower()
+                if skip:
+                    self.scanned += self._count_entries(block)
+                    continue
+
+            pos = 0
+            while pos < len(block):
+                name_end = block.index(b'\x00', pos + 1)
+                full_path = prefix + block[pos + 1:name_end]
+                pos = name_end + 1
+                self.scanned += 1
+                if dir_match or (slash < 0 and needle in full_path.lower()) or (
+                        slash >= 0 and full_path[len(prefix):].lower().startswith(tail)):
+                    yield _decode(full_path)
+
+class Locate02Database(LocateDatabase):
+    """findutils LOCATE02 리더 (front compression)
+
+    각 레코드: 이전 경로와 공유하는 길이의 차이(1바이트 signed, 0x80이면 다음 2바이트 BE)
+    + 나머지 경로 + NUL. 앞 레코드에 의존하므로 순서대로 디코딩한다.
+    """
+
+    format = 'locate02'
+
+    def __init__(self, path):
+        super().__init__(path)
+        if self._mmap[:len(LOCATE02_MAGIC)] != LOCATE02_MAGIC:
+            raise ValueError(f'Not a LOCATE02 database: {path}')
+
+    def iter_paths(self):
+        """모든 경로 bytes를 순서대로 디코딩"""
+        mm = self._mmap
+        size = len(mm)
+        pos = len(LOCATE02_MAGIC)
+        prev = b'LOCATE02'
+        count = 0
+        find = mm.find
+        while pos < size:
+            diff = mm[pos]
+            pos += 1
+            if diff == 0x80:
+                diff = struct.unpack_from('>h', mm, pos)[0]
+                pos += 2
+            elif diff > 127:
+                diff -= 256
+            count += diff
+            end = find(b'\x00', pos)
+            if end < 0:
+                break
+            prev = prev[:count] + mm[pos:end]
+            pos = end + 1
+            yield prev
+
+    def search(self, query):
+        needle = query.lower().encode('utf-8', errors='surrogateescape')
+        self.scanned = 0
+        for path in self.iter_paths():
+            self.scanned += 1
+            if needle in path.lower():
+                yield _decode(path)
+
+def open_locate_db(path):
+    """데이터베이스 형식을 판별해서 연다"""
+    with open(path, 'rb') as f:
+        head = f.read(16)
+    if head.startswith(MLOCATE_MAGIC):
+        return MlocateDatabase(path)
+    if head.startswith(LOCATE02_MAGIC):
+        return Locate02Database(path)
+    if head.startswith(PLOCATE_MAGIC):
+        raise ValueError('plocate.db is zstd-compressed and not supported; use mlocate.db or locatedb')
+    raise ValueError(f'Unknown locate database format: {path}')
+
+# 세션 모드에서 재사용하는 열린 데이터베이스와 그 파일의 (경로, mtime_ns, size)
+# 데몬은 여러 스레드가 같은 데이터베이스로 검색하므로 교체는 _shared_lock 안에서 하고, 예전 것은
+# 닫지 않고 참조만 놓는다 (진행 중인 검색이 끝나 마지막 참조가 사라질 때 mmap이 해제됨)
+_shared_db = None
+_shared_signature = None
+_shared_lock = _thread.allocate_lock()
+
+def get_locate_db(path):
+    """열린 데이터베이스 재사용 (updatedb로 교체되었으면 다시 연다)"""
+    global _shared_db, _shared_signature
+    st = os.stat(path)
+    signature = (path, st.st_mtime_ns, st.st_size)
+    with _shared_lock:
+        if _shared_db is None or signature != _shared_signature:
+            _shared_db = open_locate_db(path)
+            _shared_signature = signature
+        return _shared_db
+
+def find_locate_db(config=None):
+    """사용할 locate 데이터베이스 경로 (설정 locate_db > LOCATE_PATH > 기본 위치)"""
+    if config is None:
+        from discovery import load_config
+        config = load_config()
+
+    candidates = []
+    if config.get('locate_db'):
+        candidates.append(config['locate_db'])
+    candidates.extend(p for p in os.environ.get('LOCATE_PATH', '').split(':') if p)
+    candidates.extend(DEFAULT_DATABASES)
+
+    for path in candidates:
+        if not os.path.isfile(path):
+            continue
+        try:
+            with open(path, 'rb') as f:
+                magic = f.read(8)
+        except OSError as e:
+            # 시스템 데이터베이스는 보통 mlocate 그룹만 읽을 수 있다
+            log.info(f"Skipping unreadable locate database: {path} ({e})")
+            continue
+        if magic == PLOCATE_MAGIC:
+            log.info(f"Skipping unsupported plocate database: {path}")
+            continue
+        return path
+    return None
+
+def run_query(db, query, offset=0, limit=None, is_cancelled=None):
+    """locate 검색 결과를 partial 청크와 마지막 요약 응답으로 yield"""
+    from itertools import islice
+    from results import DEFAULT_QUERY_LIMIT, stream_paths, done_response
+
+    limit = limit or DEFAULT_QUERY_LIMIT
+    state = {}
+    paths = islice(db.search(query), offset, None)
+    yield from stream_paths(paths, offset, limit, is_cancelled, state)
+    yield done_response(query, offset, limit, state, backend='locate', scanned=db.scanned)
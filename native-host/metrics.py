@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""액션별 지연 시간/오류/캐시 적중 지표 (get_metrics 액션)
+
+지연 시간은 고정 경계 히스토그램으로 모아서 프로세스끼리 더하기 쉽게 한다.
+- 액션별 단계: read (프레임 본문 읽기 + JSON 디코딩), dispatch (처리), write (응답 전송)
+- 오류 문자열별 횟수
+- 캐시 적중/실패 (discovery, validation, launch: 같은 검색어 실행 합치기)
+- 프로세스 실행 시간 (everything, es, validate)
+
+메시지마다 새로 뜨는 호스트는 종료할 때 스냅샷을 metrics/ 아래에 남기고,
+get_metrics(aggregate=true)가 그 파일들을 aggregate.json 하나로 합친다.
+합치기는 aggregate.json.lock 잠금(config.FileLock)을 잡은 채로 하므로 팝업과 세션 호스트가
+동시에 합쳐도 같은 스냅샷을 두 번 더하거나 다른 쪽이 합친 결과를 덮어쓰지 않는다.
+"""
+
+import os
+import json
+import time
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 락 사용
+import _thread
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+METRICS_DIR = os.environ.get('EE_METRICS_DIR') or os.path.join(HOST_DIR, "metrics")
+AGGREGATE_FILE = "aggregate.json"
+AGGREGATE_LOCK = "aggregate.json.lock"
+SNAPSHOT_VERSION = 1
+
+# 히스토그램 버킷 상한 (ms), 마지막 버킷은 그 이상 전부
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+              1000, 2500, 5000, 10000, 30000)
+PHASES = ('read', 'dispatch', 'write')
+# 오류 문자열 종류 상한 (메시지마다 다른 오류가 계속 쌓이지 않도록)
+MAX_ERROR_KEYS = 50
+# 합치지 않은 스냅샷 파일이 이보다 많아지면 종료 시 aggregate.json으로 합친다
+MAX_SNAPSHOTS = 200
+
+class Histogram:
+    """고정 경계 지연 시간 히스토그램 (ms)"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms):
+        index = 0
+        for bound in BUCKETS_MS:
+            if ms <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, pct):
+        """버킷 안에서 선형 보간한 백분위수 추정치"""
+        if not self.count:
+            return 0.0
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = BUCKETS_MS[index - 1] if index else 0.0
+                high = BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max
+                return min(self.max, low + (high - low) * (rank - seen) / count)
+            seen += count
+        return self.max
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def to_dict(self, summary=True):
+        data = {'counts': self.counts, 'count': self.count,
+                'sum_ms': round(self.total, 3), 'max_ms': round(self.max, 3)}
+        if summary:
+            data.update({
+                'mean_ms': round(self.total / self.count, 3) if self.count else 0.0,
+                'p50_ms': round(self.percentile(50), 3),
+                'p95_ms': round(self.percentile(95), 3),
+                'p99_ms': round(self.percentile(99), 3),
+            })
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        hist = cls()
+        counts = list(data.get('counts', []))
+        if len(counts) == len(hist.counts):
+            hist.counts = counts
+            hist.count = int(data.get('count', sum(counts)))
+            hist.total = float(data.get('sum_ms', 0.0))
+            hist.max = float(data.get('max_ms', 0.0))
+        return hist
+
+class Metrics:
+    """프로세스 하나의 지표 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = _thread.allocate_lock()
+        self.started_at = time.time()
+        self.processes = 1
+        self.actions = {}
+        self.errors = {}
+        self.caches = {}
+        self.launches = {}
+
+    def _action(self, action):
+        entry = self.actions.get(action)
+        if entry is None:
+            entry = self.actions[action] = {
+                'count': 0, 'errors': 0, 'phases': {phase: Histogram() for phase in PHASES}}
+        return entry
+
+    def observe(self, action, phase, ms):
+        with self._lock:
+            entry = self._action(action)
+            entry['phases'][phase].observe(ms)
+            if phase == 'dispatch':
+                entry['count'] += 1
+
+    def error(self, action, message):
+        with self._lock:
+            self._action(action)['errors'] += 1
+            key = str(message)[:200]
+            if key in self.errors or len(self.errors) < MAX_ERROR_KEYS:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            else:
+                self.errors['(other)'] = self.errors.get('(other)', 0) + 1
+
+    def cache(self, name, hit):
+        with self._lock:
+            entry = self.caches.setdefault(name, {'hits': 0, 'misses': 0})
+            entry['hits' if hit else 'misses'] += 1
+
+    def launch(self, name, ms):
+        with self._lock:
+            hist = self.launches.get(name)
+            if hist is None:
+                hist = self.launches[name] = Histogram()
+            hist.observe(ms)
+
+    def empty(self):
+        return not (self.actions or self.errors or self.caches or self.launches)
+
+    def snapshot(self, summary=True):
+        """JSON으로 보낼 수 있는 지표 dict"""
+        with self._lock:
+            caches = {}
+            for name, entry in self.caches.items():
+                total = entry['hits'] + entry['misses']
+                caches[name] = dict(entry, hit_rate=round(entry['hits'] / total, 4) if total else 0.0)
+            return {
+                'version': SNAPSHOT_VERSION,
+                'started_at': self.started_at,
+                'processes': self.processes,
+                'buckets_ms': list(BUCKETS_MS),
+                'actions': {
+                    str(action): {
+                        'count': entry['count'],
+                        'errors': entry['errors'],
+                        'phases': {phase: hist.to_dict(summary) for phase, hist in entry['phases'].items()},
+                    }
+                    for action, entry in self.actions.items()
+                },
+                'errors': dict(self.errors),
+                'caches': caches,
+                'launches': {name: hist.to_dict(summary) for name, hist in self.launches.items()},
+            }
+
+    def merge_snapshot(self, data):
+        """다른 프로세스의 스냅샷을 더함 (버킷 경계가 다르면 무시)"""
+        if data.get('version') != SNAPSHOT_VERSION or data.get('buckets_ms') != list(BUCKETS_MS):
+            return False
+        with self._lock:
+            self.processes += int(data.get('processes', 1))
+            self.started_at = min(self.started_at, float(data.get('started_at', self.started_at)))
+            for action, entry in data.get('actions', {}).items():
+                mine = self._action(action)
+                mine['count'] += entry.get('count', 0)
+                mine['errors'] += entry.get('errors', 0)
+                for phase, hist in entry.get('phases', {}).items():
+                    if phase in mine['phases']:
+                        mine['phases'][phase].merge(Histogram.from_dict(hist))
+            for key, count in data.get('errors', {}).items():
+                self.errors[key] = self.errors.get(key, 0) + count
+            for name, entry in data.get('caches', {}).items():
+                mine = self.caches.setdefault(name, {'hits': 0, 'misses': 0})
+                mine['hits'] += entry.get('hits', 0)
+                mine['misses'] += entry.get('misses', 0)
+            for name, hist in data.get('launches', {}).items():
+                self.launches.setdefault(name, Histogram()).merge(Histogram.from_dict(hist))
+        return True
+
+# 현재 프로세스의 지표
+_current = Metrics()
+
+def observe(action, phase, ms):
+    _current.observe(action, phase, ms)
+
+def error(action, message):
+    _current.error(action, message)
+
+def cache_hit(name):
+    _current.cache(name, True)
+
+def cache_miss(name):
+    _current.cache(name, False)
+
+def launch(name, started):
+    """started(time.perf_counter())부터 지금까지를 프로세스 실행 시간으로 기록"""
+    _current.launch(name, (time.perf_counter() - started) * 1000)
+
+def snapshot():
+    return _current.snapshot()
+
+def _write_json(path, data):
+    tmp_file = f"{path}.{os.getpid()}.{_thread.get_ident()}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_file, path)
+
+def flush(directory=None):
+    """현재 프로세스의 지표를 스냅샷 파일로 저장 (종료 시 호출, 기록이 없으면 생략)"""
+    if _current.empty():
+        return None
+    directory = directory or METRICS_DIR
+    path = os.path.join(directory, f"snapshot_{int(time.time() * 1000)}_{os.getpid()}.json")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        _write_json(path, _current.snapshot(summary=False))
+        # get_metrics를 오래 부르지 않아도 파일 수가 계속 늘지 않도록 합친다
+        if len(os.listdir(directory)) > MAX_SNAPSHOTS:
+            aggregate(directory, include_current=False)
+    except OSError:
+        return None
+    return path
+
+def _merge_files(directory, total, commit=True):
+    """aggregate.json과 스냅샷들을 total에 더함, commit이면 aggregate.json을 새로 쓰고 스냅샷 삭제"""
+    aggregate_file = os.path.join(directory, AGGREGATE_FILE)
+    try:
+        with open(aggregate_file, 'r', encoding='utf-8') as f:
+            total.merge_snapshot(json.load(f))
+    except (OSError, ValueError):
+        pass
+
+    merged = []
+    try:
+        names = sorted(name for name in os.listdir(directory)
+                       if name.startswith('snapshot_') and name.endswith('.json'))
+    except OSError:
+        names = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                total.merge_snapshot(json.load(f))
+            merged.append(path)
+        except (OSError, ValueError):
+            continue
+
+    if merged and commit:
+        try:
+            _write_json(aggregate_file, total.snapshot(summary=False))
+            for path in merged:
+                os.remove(path)
+        except OSError:
+            pass
+
+def aggregate(directory=None, include_current=True):
+    """디스크의 스냅샷들을 aggregate.json으로 합치고, 현재 프로세스 지표까지 더한 결과 반환
+
+    잠금을 잡지 못하면(폴더가 없거나 Windows에서 LOCK_TIMEOUT 초과) 파일은 건드리지 않고 읽기만 한다.
+    """
+    from config import FileLock
+
+    directory = directory or METRICS_DIR
+    total = Metrics()
+    total.processes = 0
+    try:
+        with FileLock(os.path.join(directory, AGGREGATE_LOCK)):
+            _merge_files(directory, total)
+    except OSError:
+        total = Metrics()
+        total.processes = 0
+        _merge_files(directory, total, commit=False)
+
+    if include_current:
+        total.merge_snapshot(_current.snapshot(summary=False))
+    return total.snapshot()
@@ -1,294 +1,635 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+# 크롬이 메시지마다 호스트를 새로 띄우므로 모듈 로드는 응답 경로의 비용이다.
+# 여기서는 메시지 루프와 프레이밍에 필요한 것만 로드하고,
+# subprocess/logging 등 무거운 모듈은 액션이 필요로 할 때 로드한다.
 import sys
-import json
-import struct
-import subprocess
 import os
-import logging
-from pathlib import Path
+import time
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 락 사용
+import _thread
 
-# 로깅 설정
-log_file = Path(__file__).parent / "native_host.log"
-logging.basicConfig(
-    filename=log_file,
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+import host_log as log
+import metrics
+from framing import (FrameReader, FrameWriter, FrameError, MessageTooLarge, TruncatedFrame,
+                     use_fast_json)
+
+# 스트리밍 액션 중에도 cancel 메시지를 받기 위한 입력 큐 (필요할 때만 생성)
+_inbox = None
+# cancel 메시지로 취소 요청된 요청 id들
+_cancelled_ids = set()
+# asyncio 루프처럼 다른 곳에서 stdin을 읽고 있으면 True
+_external_reader = False
+# stdin/stdout 프레이밍 (처음 쓸 때 생성)
+_frame_reader = None
+_frame_writer = None
+# 요청별 프로파일링 기본값 (profiling 모듈, 메시지의 profile 값이 우선)
+PROFILE_ENV = os.environ.get('EE_PROFILE')
+# 비동기/데몬 모드에서 프로파일링하는 요청을 한 번에 하나씩 (cProfile/tracemalloc 상태가 겹치지 않게)
+_profile_lock = _thread.allocate_lock()
 
 def send_message(message_dict):
-    """크롬으로 메시지 전송"""
-    message = json.dumps(message_dict).encode('utf-8')
-    sys.stdout.buffer.write(struct.pack('I', len(message)))
-    sys.stdout.buffer.write(message)
-    sys.stdout.buffer.flush()
+    """크롬으로 메시지 전송
+    
+    1MB 제한을 넘는 응답은 보낼 수 없으므로 같은 id의 오류 응답으로 대신한다.
+    """
+    global _frame_writer
+    if _frame_writer is None:
+        _frame_writer = FrameWriter(sys.stdout.buffer)
+    try:
+        _frame_writer.write(message_dict)
+    except MessageTooLarge as e:
+        log.error(str(e), action='send')
+        _frame_writer.write({
+            'success': False,
+            'error': str(e),
+            'id': message_dict.get('id') if isinstance(message_dict, dict) else None
+        })
 
 def read_message():
-    """크롬에서 메시지 읽기"""
-    raw_length = sys.stdin.buffer.read(4)
-    if not raw_length:
-        return None
+    """크롬에서 메시지 읽기 (EOF면 None)"""
+    global _frame_reader
+    if _frame_reader is None:
+        _frame_reader = FrameReader(sys.stdin.buffer)
     
-    message_length = struct.unpack('I', raw_length)[0]
-    message = sys.stdin.buffer.read(message_length).decode('utf-8')
-    return json.loads(message)
+    started = time.perf_counter()
+    message = _frame_reader.read()
+    if isinstance(message, dict):
+        metrics.observe(message.get('action'), 'read', (time.perf_counter() - started) * 1000)
+    return message
 
-def find_everything_exe():
-    """Everything.exe 경로 찾기"""
-    # 저장된 사용자 설정 경로 확인
-    config_file = Path(__file__).parent / "everything_config.json"
-    if config_file.exists():
+def _reader_thread():
+    """stdin에서 메시지를 읽어 입력 큐에 넣음 (cancel은 즉시 반영)"""
+    while True:
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                custom_path = config.get('everything_path')
-                if custom_path and os.path.exists(custom_path):
-                    logging.info(f"Using saved custom path: {custom_path}")
-                    return custom_path
+            message = read_message()
+        except FrameError as e:
+            # 크기 초과나 잘못된 JSON은 오류로 응답하고 다음 메시지를 계속 읽는다
+            _inbox.put(e)
+            if isinstance(e, TruncatedFrame):
+                return
+            continue
         except Exception as e:
-            logging.warning(f"Failed to read config: {e}")
-    
-    # 일반적인 Everything 설치 경로들 (더 포괄적으로)
-    possible_paths = []
-    
-    # Program Files 경로들 - 다양한 버전 지원
-    program_files_paths = [
-        os.environ.get('PROGRAMFILES', r'C:\Program Files'),
-        os.environ.get('PROGRAMFILES(X86)', r'C:\Program Files (x86)'),
-        os.environ.get('PROGRAMW6432', r'C:\Program Files')
-    ]
-    
-    # 다양한 Everything 버전과 설치 형태
-    everything_patterns = [
-        r"Everything\Everything.exe",
-        r"Everything 1.4\Everything.exe", 
-        r"Everything 1.5a\Everything.exe",
-        r"Everything 1.5b\Everything.exe",
-        r"Everything64\Everything.exe",
-        r"Everything32\Everything.exe",
-        r"VoidTools\Everything\Everything.exe",
-    ]
-    
-    # Program Files 조합
-    for pf_path in program_files_paths:
-        if pf_path:
-            for pattern in everything_patterns:
-                possible_paths.append(os.path.join(pf_path, pattern))
-    
-    # 추가 일반적인 경로들
-    additional_paths = [
-        os.path.expandvars(r"%LOCALAPPDATA%\Everything\Everything.exe"),
-        os.path.expandvars(r"%APPDATA%\Everything\Everything.exe"),
-        os.path.expandvars(r"%USERPROFILE%\Everything\Everything.exe"),
-        os.path.expandvars(r"%USERPROFILE%\Desktop\Everything\Everything.exe"),
-        os.path.expandvars(r"%USERPROFILE%\Downloads\Everything\Everything.exe"),
-        r"C:\Everything\Everything.exe",
-        r"D:\Everything\Everything.exe",
-        r"C:\Tools\Everything\Everything.exe",
-        r"D:\Tools\Everything\Everything.exe",
-        r"C:\Portable\Everything\Everything.exe",
-        r"D:\Portable\Everything\Everything.exe",
-    ]
-    
-    possible_paths.extend(additional_paths)
-    
-    # 환경 변수에서 Everything 경로 확인
-    everything_path = os.environ.get('EVERYTHING_PATH')
-    if everything_path:
-        possible_paths.insert(0, everything_path)
-    
-    # 각 경로 확인
-    for path in possible_paths:
-        expanded_path = os.path.expandvars(path)
-        if os.path.exists(expanded_path):
-            logging.info(f"Found Everything at: {expanded_path}")
-            return expanded_path
-    
-    # PATH에서 Everything 찾기
+            _inbox.put(e)
+            return
+        
+        mark_cancelled(message)
+        _inbox.put(message)
+        if not message:
+            return
+
+def start_background_reader():
+    """메시지 읽기를 백그라운드 스레드로 전환 (스트리밍 중 cancel 수신용)"""
+    global _inbox
+    if _inbox is not None or _external_reader:
+        return
+    
+    import queue
+    import threading
+    
+    _inbox = queue.Queue()
+    threading.Thread(target=_reader_thread, name='stdin-reader', daemon=True).start()
+
+def use_external_reader():
+    """stdin을 다른 루프가 읽는다고 표시 (스트리밍 액션이 리더 스레드를 만들지 않도록)"""
+    global _external_reader
+    _external_reader = True
+
+def mark_cancelled(message):
+    """cancel 메시지면 대상 요청을 취소 표시"""
+    if isinstance(message, dict) and message.get('action') == 'cancel':
+        _cancelled_ids.add(message.get('target'))
+
+def next_message():
+    """다음 메시지 반환 (백그라운드 리더가 있으면 큐에서)"""
+    if _inbox is None:
+        return read_message()
+    
+    message = _inbox.get()
+    if isinstance(message, Exception):
+        raise message
+    return message
+
+def is_cancelled(request_id):
+    """요청이 cancel 메시지로 취소되었는지 확인"""
+    return request_id is not None and request_id in _cancelled_ids
+
+def query_everything(message):
+    """ES로 결과를 조회해서 청크 단위로 스트리밍 (generator)"""
+    query = message.get('query', '')
+    if not query:
+        yield {
+            'success': False,
+            'error': 'No search query provided'
+        }
+        return
+    
     try:
-        result = subprocess.run(['where', 'Everything.exe'], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            path = result.stdout.strip().split('\n')[0]
-            logging.info(f"Found Everything in PATH: {path}")
-            return path
-    except:
-        pass
-    
-    logging.error("Everything.exe not found")
-    return None
+        from results import parse_paging
+        offset, limit = parse_paging(message)
+    except (TypeError, ValueError) as e:
+        yield {
+            'success': False,
+            'error': f'Invalid paging: {e}'
+        }
+        return
+    
+    from backends import resolve_query_backend
+    
+    request_id = message.get('id')
+    cancelled = lambda: is_cancelled(request_id)
+    start_background_reader()
+    try:
+        backend, run = resolve_query_backend()
+        if run is None:
+            yield {
+                'success': False,
+                'error': 'No search backend available (es.exe, locate database or filename index)'
+            }
+            return
+        final = None
+        for final in run(query, offset, limit, cancelled,
+                         sort=message.get('sort'), ascending=message.get('ascending', True)):
+            yield final
+        if offset == 0 and isinstance(final, dict):
+            remember(query, backend, final)
+    finally:
+        _cancelled_ids.discard(request_id)
 
-def save_everything_path(path):
-    """Everything 경로를 설정 파일에 저장"""
-    config_file = Path(__file__).parent / "everything_config.json"
+def search_batch(message):
+    """여러 검색어를 동시에 검색해서 항목별로 스트리밍 (generator)
+    
+    결과 백엔드가 없고 Everything.exe만 있으면 OR 검색(a | b | c)으로 창 하나만 띄운다.
+    """
+    from batch import parse_items, run_batch, DEFAULT_ITEM_LIMIT
+    
     try:
-        config = {}
-        if config_file.exists():
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-        
-        config['everything_path'] = path
-        
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
-        
-        logging.info(f"Saved Everything path: {path}")
-        return True
-    except Exception as e:
-        logging.error(f"Failed to save config: {e}")
-        return False
+        items = parse_items(message)
+    except ValueError as e:
+        yield {
+            'success': False,
+            'error': str(e)
+        }
+        return
+    if not items:
+        yield {
+            'success': False,
+            'error': 'No search query provided'
+        }
+        return
+    
+    from discovery import load_config
+    from backends import resolve_query_backend
+    
+    config = load_config()
+    backend, run = resolve_query_backend(config)
+    if run is None:
+        # 명령줄 길이 제한을 넘는 검색어는 버리고 개수를 알린다
+        from query_prep import build_or_query
+        query, _, dropped = build_or_query(query for _, query in items)
+        result = search_in_everything(query, preprocess=False)
+        result['count'] = len(items)
+        result['dropped'] = len(dropped)
+        yield result
+        return
+    
+    request_id = message.get('id')
+    start_background_reader()
+    try:
+        for part in run_batch(items, run, backend,
+                              limit=message.get('limit', DEFAULT_ITEM_LIMIT),
+                              workers=config.get('batch_workers'),
+                              is_cancelled=lambda: is_cancelled(request_id)):
+            if part.get('partial'):
+                remember(part['query'], backend, part)
+            yield part
+    finally:
+        _cancelled_ids.discard(request_id)
 
-def validate_everything_path(path):
-    """Everything 경로가 유효한지 확인"""
-    if not path or not os.path.exists(path):
-        return False
+def stat_paths(message):
+    """경로들의 존재 여부/크기/수정 시각을 디렉토리별로 확인해서 청크로 스트리밍 (generator)"""
+    from path_stat import parse_paths, run_stat
+    
+    try:
+        paths = parse_paths(message)
+    except ValueError as e:
+        yield {
+            'success': False,
+            'error': str(e)
+        }
+        return
+    if not paths:
+        yield {
+            'success': False,
+            'error': 'No paths provided'
+        }
+        return
     
-    # 파일명이 Everything.exe인지 확인
-    if not path.lower().endswith('everything.exe'):
-        return False
+    from discovery import load_config
     
-    # 실행 가능한지 확인
+    request_id = message.get('id')
+    start_background_reader()
     try:
-        result = subprocess.run([path, '-help'], 
-                              capture_output=True, 
-                              timeout=5)
-        return True
-    except:
-        return False
+        yield from run_stat(paths, workers=load_config().get('stat_workers'),
+                            is_cancelled=lambda: is_cancelled(request_id))
+    finally:
+        _cancelled_ids.discard(request_id)
 
-def search_in_everything(query):
-    """Everything에서 검색 실행"""
-    everything_exe = find_everything_exe()
+def search_in_everything(query, preprocess=None, input_truncated=False):
+    """Everything에서 검색 실행
+    
+    Everything.exe가 없거나 설정에서 다른 백엔드를 고르면
+    결과 백엔드(es/locate/index)의 첫 페이지를 직접 반환한다.
+    큰 선택(또는 preprocess=True)은 파일 이름/경로/해시 토큰의 OR 검색어로 바꿔서
+    명령줄 길이 제한 안에서 검색하고, 응답의 preprocessed에 버린 토큰 수를 보고한다.
+    """
+    from discovery import load_config, find_everything_exe, get_potential_everything_paths
+    from backends import configured_backend
+    
+    config = load_config()
+    everything_exe = None
+    if configured_backend(config) in ('auto', 'everything'):
+        everything_exe = find_everything_exe()
+    
+    report = None
+    if preprocess is not False:
+        from query_prep import needs_preprocessing, prepare_query, query_budget, DEFAULT_QUERY_BYTES
+        if preprocess or needs_preprocessing(query):
+            from launcher import command
+            # launcher의 두 옵션 중 긴 쪽(-existingwindow) 기준
+            budget = query_budget(command(everything_exe, '', existing=True)[:-1]) if everything_exe else DEFAULT_QUERY_BYTES
+            report = prepare_query(query, budget)
+            report['input_truncated'] = bool(input_truncated)
+            query = report.pop('query')
     
     if not everything_exe:
+        from backends import resolve_query_backend
+        backend, run = resolve_query_backend(config)
+        if run is not None:
+            return with_preprocess_report(search_inline(backend, run, query), query, report)
+        
         return {
             'success': False,
             'error': 'Everything.exe not found',
-            'available_paths': get_potential_everything_paths()
+            'available_paths': get_potential_everything_paths(everything_exe)
         }
     
     try:
-        # Everything 명령줄 옵션:
-        # -s : 검색어 지정
-        # -newwindow : 새 창에서 열기
-        cmd = [everything_exe, '-newwindow', '-s', query]
-        
-        logging.info(f"Executing: {' '.join(cmd)}")
+        from launcher import launch
         
-        # Everything 실행
-        subprocess.Popen(cmd, shell=False)
+        # 떠 있는 Everything이 있으면 검색어만 넘기고, 같은 검색어 연속 실행은 합친다
+        launched = launch(everything_exe, query, config)
         
-        return {
+        return with_preprocess_report(dict({
             'success': True,
             'message': f'Searching for: {query}',
             'everything_path': everything_exe
-        }
+        }, **launched), query, report)
         
     except Exception as e:
-        logging.error(f"Error launching Everything: {str(e)}")
+        log.error(f"Error launching Everything: {str(e)}")
         return {
             'success': False,
             'error': str(e)
         }
 
-def get_potential_everything_paths():
-    """잠재적인 Everything 경로들을 반환 (진단용)"""
-    everything_exe = find_everything_exe()
-    if everything_exe:
-        return [everything_exe]
-    
-    # 존재하지 않는 경로들도 포함해서 반환 (사용자 참고용)
-    potential_paths = [
-        r"C:\Program Files\Everything\Everything.exe",
-        r"C:\Program Files (x86)\Everything\Everything.exe",
-        r"C:\Everything\Everything.exe",
-        os.path.expandvars(r"%LOCALAPPDATA%\Everything\Everything.exe"),
-    ]
-    
-    return [p for p in potential_paths if os.path.exists(p)]
+def remember(query, backend, result):
+    """검색 기록 대기열에 추가 (응답을 보낸 뒤 flush_history()에서 기록)"""
+    import history
+    if not result.get('success'):
+        outcome, count = 'error', None
+    elif 'results' in result or 'count' in result:
+        count = len(result['results']) if 'results' in result else result['count']
+        outcome = 'found' if count else 'empty'
+    else:
+        outcome, count = 'launched', None
+    if result.get('cancelled'):
+        outcome = 'cancelled'
+    history.record(query, backend, outcome, count)
+
+def start_profile(message):
+    """EE_PROFILE 또는 메시지의 profile 값이 켜져 있으면 프로파일링 시작 (아니면 None)"""
+    import profiling
+    modes = profiling.parse_modes(message.get('profile', PROFILE_ENV))
+    if not modes:
+        return None
+    return profiling.start(message.get('action'), modes)
+
+def stop_profile(capture, final):
+    """프로파일링을 끝내고 저장한 프로필을 로그에 남김"""
+    summary = capture.stop(final)
+    if summary.get('error'):
+        log.warning(f"Failed to save profile: {summary['error']}", action=capture.action)
+    else:
+        log.info("Profile captured", action=capture.action, profile=summary.get('name'),
+                 elapsed_ms=summary['elapsed_ms'])
+
+def wants_profile(message):
+    """프로파일링할 요청인지 (환경 변수와 메시지 키만 확인, profiling 모듈은 로드하지 않음)"""
+    return bool(PROFILE_ENV) or 'profile' in message
+
+def handle_profiled(message, send):
+    """프로파일링할 요청을 이 스레드에서 처리와 응답 전송(스트리밍은 마지막 청크까지)까지 끝냄
+    
+    비동기/데몬 모드용. cProfile은 이 스레드를, tracemalloc은 프로세스 전체를 재므로
+    프로파일링하는 요청은 한 번에 하나씩 처리한다 (그동안 다른 요청의 할당도 함께 잡힐 수 있음).
+    send(result)는 쓰는 데 걸린 시간(ms)을 반환, (마지막 응답, 응답 수, 쓰기 시간 ms) 반환.
+    """
+    with _profile_lock:
+        capture = start_profile(message)
+        final = None
+        chunks = 0
+        write_ms = 0.0
+        try:
+            result = handle_message(message)
+            for final in ((result,) if isinstance(result, dict) else result):
+                write_ms += send(final)
+                chunks += 1
+        except Exception:
+            if capture:
+                stop_profile(capture, None)
+            raise
+        if capture:
+            stop_profile(capture, final)
+    return final, chunks, write_ms
+
+def flush_history():
+    """대기 중인 검색 기록을 DB에 쓰기 (기록한 적이 없으면 sqlite3도 로드하지 않음)"""
+    history = sys.modules.get('history')
+    if history is not None:
+        history.flush()
+
+def with_preprocess_report(result, query, report):
+    """전처리한 검색이면 실제 검색어와 전처리 보고서를 응답에 붙임"""
+    if report is not None:
+        result['query'] = query
+        result['preprocessed'] = report
+    return result
+
+def search_inline(backend, run, query, limit=100):
+    """결과 백엔드의 첫 페이지를 응답 하나로 모아서 반환 (search 액션용)"""
+    results = []
+    final = {}
+    for part in run(query, 0, limit, None):
+        if part.get('partial'):
+            results.extend(part['results'])
+        else:
+            final = part
+    
+    if not final.get('success'):
+        return final
+    
+    more = '+' if final.get('has_more') else ''
+    return {
+        'success': True,
+        'backend': backend,
+        'message': f'Found {len(results)}{more} files for: {query}',
+        'results': results,
+        'has_more': final.get('has_more', False)
+    }
+
+def handle_message(message):
+    """메시지 하나를 처리하고 응답 dict 반환"""
+    action = message.get('action')
+    
+    if action == 'search':
+        query = message.get('query', '')
+        if query:
+            # preprocess: true면 길이와 관계없이 토큰 추출, truncated: 확장 프로그램이 선택을 잘라서 보냄
+            result = search_in_everything(query, message.get('preprocess'), message.get('truncated', False))
+            remember(query, result.get('backend', 'everything'), result)
+            return result
+        return {
+            'success': False,
+            'error': 'No search query provided'
+        }
+    
+    if action == 'get_status':
+        # 입력(설정 파일, Everything.exe stat)이 바뀐 부분만 다시 계산한 스냅샷,
+        # version이 확장 프로그램의 캐시와 같으면 unchanged만 보낸다
+        import status
+        return status.get_status(message.get('version'))
+    
+    if action == 'set_path':
+        from discovery import validate_everything_path, save_everything_path
+        path = message.get('path', '')
+        if not validate_everything_path(path):
+            return {
+                'success': False,
+                'error': 'Invalid Everything.exe path'
+            }
+        if save_everything_path(path):
+            return {
+                'success': True,
+                'message': 'Everything path saved successfully'
+            }
+        return {
+            'success': False,
+            'error': 'Failed to save path'
+        }
+    
+    if action == 'validate_path':
+        from discovery import validation_result
+        path = message.get('path', '')
+        return validate_path_response(path, validation_result(path))
+    
+    if action == 'query':
+        return query_everything(message)
+    
+    if action == 'search_batch':
+        return search_batch(message)
+    
+    if action == 'stat_paths':
+        return stat_paths(message)
+    
+    if action == 'cancel':
+        # 스트리밍 중인 요청은 리더 스레드에서 이미 취소 표시됨
+        target = message.get('target')
+        _cancelled_ids.discard(target)
+        return {
+            'success': True,
+            'target': target
+        }
+    
+    if action == 'update_index':
+        from filename_index import update_index
+        try:
+            stats = update_index(full=bool(message.get('full')))
+        except ValueError as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+        return dict(stats, success=True)
+    
+    if action == 'get_metrics':
+        # aggregate: 종료한 호스트들이 남긴 스냅샷까지 합친 결과
+        return {
+            'success': True,
+            'metrics': metrics.aggregate() if message.get('aggregate') else metrics.snapshot()
+        }
+    
+    if action == 'get_profiles':
+        # 프로파일링(EE_PROFILE, 메시지의 profile)으로 저장한 프로필 요약 (최근 것부터)
+        import profiling
+        limit = message.get('limit', 20)
+        return {
+            'success': True,
+            'directory': profiling.PROFILE_DIR,
+            'profiles': profiling.list_profiles(max(1, min(int(limit), profiling.MAX_PROFILES)))
+        }
+    
+    if action == 'suggest':
+        # 검색 기록 자동 완성 (prefix가 비어 있으면 최근 검색어)
+        import history
+        started = time.perf_counter()
+        try:
+            suggestions = history.suggest(message.get('prefix', ''), message.get('limit'))
+        except (TypeError, ValueError) as e:
+            return {
+                'success': False,
+                'error': f'Invalid suggest request: {e}'
+            }
+        return {
+            'success': True,
+            'suggestions': suggestions,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
+    
+    if action == 'ping':
+        # 세션 연결 확인용 (connectNative 포트 keep-alive)
+        return {
+            'success': True,
+            'pid': os.getpid()
+        }
+    
+    return {
+        'success': False,
+        'error': f'Unknown action: {action}'
+    }
+
+def record_metrics(action, started, write_ms, final):
+    """요청 하나의 dispatch/write 시간과 오류 기록 (dispatch는 전송 시간을 뺀 처리 시간)"""
+    total_ms = (time.perf_counter() - started) * 1000
+    metrics.observe(action, 'dispatch', total_ms - write_ms)
+    metrics.observe(action, 'write', write_ms)
+    if isinstance(final, dict) and final.get('success') is False:
+        metrics.error(action, final.get('error', 'unknown error'))
+
+def validate_path_response(path, result):
+    """validate_path 응답 (버전 리소스를 읽었으면 제품 이름과 버전 포함)"""
+    response = {
+        'success': True,
+        'valid': result['valid'],
+        'path': path
+    }
+    if result.get('version'):
+        response['product'] = result.get('product')
+        response['version'] = result['version']
+    return response
+
+def with_request_id(message, result):
+    """요청에 id가 있으면 응답에 그대로 붙여서 반환 (파이프라인 요청 매칭용)"""
+    if isinstance(message, dict) and 'id' in message:
+        result['id'] = message['id']
+    return result
 
 def main():
-    """메인 함수"""
-    logging.info("Native host started")
+    """메인 함수
+    
+    sendNativeMessage 호출 시에는 메시지 하나만 처리하고 종료되지만,
+    connectNative 포트로 연결되면 포트가 닫힐 때까지 같은 프로세스에서
+    여러 메시지를 순서대로 처리한다 (세션 모드).
+    --async 인자나 EE_HOST_LOOP=async면 asyncio 루프(async_host)로 동시에 처리한다.
+    --relay(EE_HOST_LOOP=relay)면 메시지를 공유 데몬으로 중계하고 (데몬이 없으면 띄움),
+    --daemon(EE_HOST_LOOP=daemon)은 그 데몬으로 실행한다 (daemon 모듈).
+    """
+    args = sys.argv[1:]
+    loop = os.environ.get('EE_HOST_LOOP')
+    if '--daemon' in args or loop == 'daemon':
+        import daemon
+        return daemon.serve(sys.modules[__name__])
+    if '--relay' in args or loop == 'relay':
+        import daemon
+        relayed = daemon.relay()
+        log.start()
+        log.stop()
+        if relayed:
+            return
+        # 데몬을 띄우지 못하면 이 프로세스에서 직접 처리
+    if '--async' in args or loop == 'async':
+        import async_host
+        return async_host.run(sys.modules[__name__])
+    
+    log.info("Native host started")
+    handled = 0
     
     while True:
+        message = None
+        capture = None
         try:
             # 크롬에서 메시지 읽기
-            message = read_message()
+            message = next_message()
             if not message:
                 break
             
-            logging.info(f"Received message: {message}")
-            
-            # 메시지 처리
+            logged = log.request(message)
             action = message.get('action')
             
-            if action == 'search':
-                query = message.get('query', '')
-                if query:
-                    result = search_in_everything(query)
-                else:
-                    result = {
-                        'success': False,
-                        'error': 'No search query provided'
-                    }
+            # 프로파일링이 꺼져 있으면 profiling 모듈을 로드하지 않는다
+            if PROFILE_ENV or 'profile' in message:
+                capture = start_profile(message)
             
-            elif action == 'get_status':
-                everything_exe = find_everything_exe()
-                result = {
-                    'success': True,
-                    'everything_found': everything_exe is not None,
-                    'everything_path': everything_exe,
-                    'available_paths': get_potential_everything_paths()
-                }
-            
-            elif action == 'set_path':
-                path = message.get('path', '')
-                if validate_everything_path(path):
-                    if save_everything_path(path):
-                        result = {
-                            'success': True,
-                            'message': 'Everything path saved successfully'
-                        }
-                    else:
-                        result = {
-                            'success': False,
-                            'error': 'Failed to save path'
-                        }
-                else:
-                    result = {
-                        'success': False,
-                        'error': 'Invalid Everything.exe path'
-                    }
-            
-            elif action == 'validate_path':
-                path = message.get('path', '')
-                is_valid = validate_everything_path(path)
-                result = {
-                    'success': True,
-                    'valid': is_valid,
-                    'path': path
-                }
+            # 메시지 처리
+            started = time.perf_counter()
+            result = handle_message(message)
             
+            # 응답 전송 (스트리밍 액션은 partial 응답 여러 개 + 마지막 응답)
+            if isinstance(result, dict):
+                dispatched = time.perf_counter()
+                send_message(with_request_id(message, result))
+                write_ms = (time.perf_counter() - dispatched) * 1000
+                final = result
+                log.response(message, result, logged)
             else:
-                result = {
-                    'success': False,
-                    'error': f'Unknown action: {action}'
-                }
+                chunks = 0
+                final = None
+                write_ms = 0.0
+                for final in result:
+                    written = time.perf_counter()
+                    send_message(with_request_id(message, final))
+                    write_ms += (time.perf_counter() - written) * 1000
+                    chunks += 1
+                log.response(message, final, logged, chunks=chunks)
+            if capture:
+                stop_profile(capture, final)
+                capture = None
+            record_metrics(action, started, write_ms, final)
+            flush_history()
+            handled += 1
             
-            # 응답 전송
-            send_message(result)
-            logging.info(f"Sent response: {result}")
+            # 첫 응답을 보낸 뒤에야 로그 파일을 열고 orjson을 로드한다 (응답 경로에서 제외)
+            if handled == 1:
+                log.start()
+                use_fast_json()
             
         except Exception as e:
-            logging.error(f"Error in main loop: {str(e)}")
-            send_message({
+            action = message.get('action') if isinstance(message, dict) else None
+            log.error(f"Error in main loop: {str(e)}", action=action)
+            metrics.error(action, str(e))
+            if capture:
+                stop_profile(capture, None)
+            send_message(with_request_id(message, {
                 'success': False,
                 'error': str(e)
-            })
+            }))
     
-    logging.info("Native host ended")
+    log.info(f"Native host ended ({handled} messages handled)")
+    flush_history()
+    log.start()
+    log.stop()
+    metrics.flush()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""stat_paths 액션: 경로 수천 개의 존재 여부/크기/수정 시각을 메시지 하나로 확인
+
+- 경로를 부모 디렉토리별로 묶고, Windows는 디렉토리마다 os.scandir 한 번으로 이름을 찾는다
+  (디렉토리 목록에 크기/시각이 들어 있어 파일마다 핸들을 열지 않는다).
+  찾는 이름이 적은 디렉토리는 scandir 대신 경로마다 stat (큰 디렉토리 전체를 훑지 않도록).
+  목록에 없는 이름(8.3 짧은 이름 PROGRA~1 등)은 없다고 하기 전에 경로마다 stat으로 다시 확인.
+  POSIX는 scandir로도 파일마다 stat해야 해서 목록을 읽는 만큼 손해라 이름마다 stat
+- 디렉토리 묶음은 스레드 풀에서 동시에 처리하고, 끝나는 순서대로 partial 청크로 보낸다
+- 결과는 디렉토리 mtime을 키로 STAT_CACHE_TTL초 동안 메모리에 캐시한다.
+  파일을 만들거나 지우면 디렉토리 mtime이 바뀌어 바로 다시 읽고,
+  파일 내용만 바뀐 경우(크기/시각)는 TTL이 지나면 반영된다
+
+결과 항목: path, exists, is_dir, size, mtime (초), 읽을 수 없으면 error
+설정(everything_config.json): stat_workers (기본 batch.default_workers())
+"""
+
+import os
+import stat
+import time
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 락 사용
+import _thread
+
+import host_log as log
+
+# 한 메시지에서 받는 최대 경로 수
+MAX_PATHS = 100000
+# scandir 결과에 stat 정보가 들어 있는 플랫폼 (Windows)
+SCANDIR_HAS_STAT = os.name == 'nt'
+# 디렉토리에서 찾는 이름이 이보다 적으면 경로마다 stat
+SCANDIR_MIN_NAMES = 4
+# 디렉토리별 결과 캐시 유지 시간 (초)과 최대 디렉토리 수
+STAT_CACHE_TTL = 2.0
+STAT_CACHE_MAX_DIRS = 2048
+# 청크 하나의 최대 결과 수와 JSON 크기 (results.py의 스트리밍 기준과 같음)
+MAX_CHUNK_RESULTS = 500
+MAX_CHUNK_BYTES = 256 * 1024
+
+_cache_lock = _thread.allocate_lock()
+# 디렉토리 → (디렉토리 mtime_ns, 확인 시각, {normcase 이름: (is_dir, size, mtime) 또는 None})
+_cache = {}
+
+def parse_paths(message):
+    """paths 목록 또는 text(줄 단위)를 중복 없는 경로 목록으로"""
+    raw = message.get('paths')
+    if raw is None:
+        raw = (message.get('text') or '').splitlines()
+    if not isinstance(raw, list):
+        raise ValueError('paths must be a list')
+
+    paths = []
+    seen = set()
+    for entry in raw:
+        path = str(entry).strip()
+        if path and path not in seen:
+            seen.add(path)
+            paths.append(path)
+    if len(paths) > MAX_PATHS:
+        raise ValueError(f'Too many paths ({len(paths)} > {MAX_PATHS})')
+    return paths
+
+def group_by_directory(paths):
+    """{부모 디렉토리: {normcase 이름: [원래 경로, ...]}}와 절대 경로가 아닌 경로 목록"""
+    groups = {}
+    invalid = []
+    normcase = os.path.normcase
+    normpath = os.path.normpath
+    isabs = os.path.isabs
+    sep = os.sep
+    for path in paths:
+        if not isabs(path):
+            invalid.append(path)
+            continue
+        # os.path.split보다 싸다 (normpath 뒤라 구분자는 os.sep 하나뿐)
+        directory, _, name = normpath(path).rpartition(sep)
+        if not name:
+            # 드라이브 루트나 / 자체
+            directory, name = path, ''
+        elif not directory or directory.endswith(':'):
+            # /a → /, C:\a → C:\
+            directory += sep
+        groups.setdefault(directory, {}).setdefault(normcase(name), []).append(path)
+    return groups, invalid
+
+def _info(st):
+    return (stat.S_ISDIR(st.st_mode), st.st_size, st.st_mtime)
+
+def _stat_each(directory, names):
+    """경로마다 stat (찾는 이름이 적은 디렉토리)"""
+    found = {}
+    for key, originals in names.items():
+        try:
+            found[key] = _info(os.stat(originals[0]))
+        except FileNotFoundError:
+            found[key] = None
+        except OSError as e:
+            found[key] = e
+    return found
+
+def _scan(directory, names):
+    """scandir 한 번으로 찾는 이름들의 정보 ({이름: 정보 또는 None})"""
+    found = dict.fromkeys(names)
+    normcase = os.path.normcase
+    remaining = len(names)
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            key = normcase(entry.name)
+            if key not in found:
+                continue
+            try:
+                found[key] = _info(entry.stat())
+            except FileNotFoundError:
+                found[key] = None
+            except OSError as e:
+                found[key] = e
+            remaining -= 1
+            if not remaining:
+                break
+    if remaining:
+        # 디렉토리 목록에는 긴 이름만 나오므로 짧은 이름 등은 stat으로 확인
+        missing = {key: names[key] for key, value in found.items() if value is None}
+        found.update(_stat_each(directory, missing))
+    return found
+
+def _cached(directory, names, now):
+    """캐시가 유효하고 찾는 이름이 모두 있으면 (디렉토리 mtime, 결과), 아니면 (mtime, None)"""
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return None, None
+    with _cache_lock:
+        entry = _cache.get(directory)
+    if entry is None or entry[0] != mtime_ns or now - entry[1] > STAT_CACHE_TTL:
+        return mtime_ns, None
+    known = entry[2]
+    if any(key not in known for key in names):
+        return mtime_ns, None
+    return mtime_ns, {key: known[key] for key in names}
+
+def _remember(directory, mtime_ns, now, found):
+    with _cache_lock:
+        entry = _cache.get(directory)
+        if entry is not None and entry[0] == mtime_ns and now - entry[1] <= STAT_CACHE_TTL:
+            # 같은 디렉토리의 다른 이름들을 이미 캐시했으면 합친다
+            known = dict(entry[2])
+            known.update(found)
+            found = known
+            now = entry[1]
+        elif len(_cache) >= STAT_CACHE_MAX_DIRS:
+            # 가장 오래 전에 확인한 디렉토리부터 버린다
+            for old in sorted(_cache, key=lambda d: _cache[d][1])[:STAT_CACHE_MAX_DIRS // 4]:
+                del _cache[old]
+        _cache[directory] = (mtime_ns, now, found)
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+def stat_directory(directory, names, now=None):
+    """디렉토리 하나의 이름들 확인 → ({이름: 정보, None(없음) 또는 OSError}, 캐시 사용 여부)"""
+    now = time.monotonic() if now is None else now
+    mtime_ns, found = _cached(directory, names, now)
+    if found is not None:
+        return found, True
+    if mtime_ns is None:
+        # 디렉토리가 없으면 안의 경로도 모두 없음
+        return dict.fromkeys(names), False
+
+    try:
+        if not SCANDIR_HAS_STAT or len(names) < SCANDIR_MIN_NAMES:
+            found = _stat_each(directory, names)
+        else:
+            found = _scan(directory, names)
+    except FileNotFoundError:
+        return dict.fromkeys(names), False
+    except OSError as e:
+        return dict.fromkeys(names, e), False
+    # 읽기 오류는 캐시하지 않는다
+    if not any(isinstance(value, OSError) for value in found.values()):
+        _remember(directory, mtime_ns, now, found)
+    return found, False
+
+def _entries(names, found):
+    """디렉토리 결과 → 응답 항목 목록 (원래 경로마다 하나)"""
+    entries = []
+    for key, originals in names.items():
+        value = found.get(key)
+        for path in originals:
+            if value is None:
+                entries.append({'path': path, 'exists': False})
+            elif isinstance(value, OSError):
+                entries.append({'path': path, 'exists': False, 'error': value.strerror or str(value)})
+            else:
+                is_dir, size, mtime = value
+                entries.append({'path': path, 'exists': True, 'is_dir': is_dir,
+                                'size': size, 'mtime': mtime})
+    return entries
+
+def _stat_group(directory, names):
+    """스레드에서 실행: 디렉토리 하나의 응답 항목과 캐시 사용 여부"""
+    found, cached = stat_directory(directory, names)
+    return _entries(names, found), cached
+
+def _root_group(names):
+    """드라이브 루트나 / 같이 부모가 없는 경로 (경로마다 stat)"""
+    return _entries(names, _stat_each(None, names)), False
+
+class _Chunks:
+    """응답 항목을 청크 크기 제한(결과 수, JSON 크기)에 맞게 모음"""
+
+    def __init__(self):
+        self.chunk = []
+        self.size = 0
+
+    def add(self, entry):
+        """항목 추가, 가득 차서 내보낼 청크가 있으면 반환"""
+        # ensure_ascii 인코딩에서 한 글자가 최대 6바이트
+        size = 6 * len(entry['path']) + 96
+        full = None
+        if self.chunk and (self.size + size > MAX_CHUNK_BYTES or len(self.chunk) >= MAX_CHUNK_RESULTS):
+            full = self.chunk
+            self.chunk = []
+            self.size = 0
+        self.chunk.append(entry)
+        self.size += size
+        return full
+
+def run_stat(paths, workers=None, is_cancelled=None):
+    """경로들을 디렉토리별로 스레드 풀에서 확인하며 partial 청크 yield, 마지막에 요약"""
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    from batch import default_workers
+
+    started = time.perf_counter()
+    groups, invalid = group_by_directory(paths)
+    workers = max(1, int(workers or default_workers()))
+
+    chunks = _Chunks()
+    count = 0
+    found = 0
+    cached_dirs = 0
+    cancelled = False
+    for path in invalid:
+        count += 1
+        full = chunks.add({'path': path, 'exists': False, 'error': 'Not an absolute path'})
+        if full:
+            yield {'partial': True, 'results': full}
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='stat')
+    pending = set()
+    try:
+        for directory, names in groups.items():
+            if '' in names:
+                pending.add(pool.submit(_root_group, {'': names.pop('')}))
+            if names:
+                pending.add(pool.submit(_stat_group, directory, names))
+        while pending:
+            # 취소를 확인할 수 있도록 짧게 나눠서 기다린다
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            if is_cancelled and is_cancelled():
+                cancelled = True
+                break
+            for future in done:
+                try:
+                    entries, cached = future.result()
+                except Exception as e:
+                    log.warning(f"stat_paths group failed: {e}")
+                    continue
+                cached_dirs += cached
+                for entry in entries:
+                    count += 1
+                    found += entry['exists']
+                    full = chunks.add(entry)
+                    if full:
+                        yield {'partial': True, 'results': full}
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=not cancelled)
+
+    if chunks.chunk and not cancelled:
+        yield {'partial': True, 'results': chunks.chunk}
+    yield {
+        'success': True,
+        'done': True,
+        'count': count,
+        'found': found,
+        'directories': len(groups),
+        'cached_directories': cached_dirs,
+        'cancelled': cancelled,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""PE 파일의 버전 리소스(VS_VERSIONINFO) 읽기 (실행하지 않고 파일만 파싱)
+
+헤더에서 리소스 디렉토리 위치를 찾고, RT_VERSION 리소스 하나만 읽어서
+고정 버전 정보(VS_FIXEDFILEINFO)와 StringFileInfo 문자열(ProductName 등)을 꺼낸다.
+"""
+
+import struct
+
+# 헤더 파싱에 읽는 파일 앞부분 크기 (검증 캐시의 헤더 해시도 이 범위로 계산)
+HEADER_SIZE = 4096
+
+RT_VERSION = 16
+_FIXED_SIGNATURE = 0xFEEF04BD
+# 리소스 하나의 최대 크기 (깨진 파일에서 큰 읽기를 막기 위함)
+_MAX_RESOURCE_SIZE = 1024 * 1024
+
+class PEFormatError(ValueError):
+    """PE 파일이 아니거나 구조가 깨졌을 때"""
+
+def _sections(header):
+    """(리소스 디렉토리 RVA, 섹션 목록 [(RVA, 가상 크기, 파일 위치, 파일 크기)])"""
+    if header[:2] != b'MZ' or len(header) < 0x40:
+        raise PEFormatError('Not an MZ executable')
+    pe = struct.unpack_from('<I', header, 0x3C)[0]
+    if header[pe:pe + 4] != b'PE\x00\x00':
+        raise PEFormatError('No PE signature')
+    try:
+        section_count, = struct.unpack_from('<H', header, pe + 6)
+        optional_size, = struct.unpack_from('<H', header, pe + 20)
+        optional = pe + 24
+        magic, = struct.unpack_from('<H', header, optional)
+        if magic == 0x10B:
+            dirs_at = optional + 96
+        elif magic == 0x20B:
+            dirs_at = optional + 112
+        else:
+            raise PEFormatError(f'Unknown optional header magic: {magic:#x}')
+        dir_count, = struct.unpack_from('<I', header, dirs_at - 4)
+        if dir_count <= 2:
+            return None, []
+        resource_rva, _ = struct.unpack_from('<II', header, dirs_at + 2 * 8)
+
+        sections = []
+        table = optional + optional_size
+        for i in range(section_count):
+            vsize, rva, raw_size, raw_ptr = struct.unpack_from('<IIII', header, table + i * 40 + 8)
+            sections.append((rva, max(vsize, raw_size), raw_ptr, raw_size))
+    except struct.error:
+        raise PEFormatError('Truncated PE header') from None
+    return resource_rva or None, sections
+
+def _rva_to_offset(sections, rva):
+    for start, size, raw_ptr, raw_size in sections:
+        if start <= rva < start + size and rva - start < raw_size:
+            return raw_ptr + rva - start
+    raise PEFormatError(f'RVA {rva:#x} is outside sections')
+
+def _first_entry(rsrc, offset, wanted=None):
+    """리소스 디렉토리에서 id가 wanted인 (없으면 첫) 항목의 (데이터 오프셋, 하위 디렉토리 여부)"""
+    named, ids = struct.unpack_from('<HH', rsrc, offset + 12)
+    for i in range(named + ids):
+        name, target = struct.unpack_from('<II', rsrc, offset + 16 + i * 8)
+        if wanted is None or (not name & 0x80000000 and name == wanted):
+            return target & 0x7FFFFFFF, bool(target & 0x80000000)
+    return None, False
+
+def _read_block(data, offset):
+    """버전 정보 블록 하나: (key, 값 bytes, wType, 자식 시작, 블록 끝)"""
+    length, value_length, value_type = struct.unpack_from('<HHH', data, offset)
+    end = min(offset + length, len(data))
+    key_start = offset + 6
+    key_end = key_start
+    while key_end + 1 < end and data[key_end:key_end + 2] != b'\x00\x00':
+        key_end += 2
+    key = data[key_start:key_end].decode('utf-16-le', errors='replace')
+    value_start = (key_end + 2 + 3) & ~3
+    # 문자열 값(wType 1)은 wValueLength가 글자 수
+    value_size = value_length * 2 if value_type == 1 else value_length
+    value = data[value_start:min(value_start + value_size, end)]
+    children = (value_start + value_size + 3) & ~3
+    return key, value, value_type, children, end
+
+def _iter_children(data, start, end):
+    while start + 6 <= end:
+        block = _read_block(data, start)
+        if block[4] <= start:
+            return
+        yield block
+        start = (block[4] + 3) & ~3
+
+def parse_version_info(data):
+    """VS_VERSIONINFO 리소스 bytes → {'file_version', 'product_version', 'strings'}"""
+    key, value, _, children, end = _read_block(data, 0)
+    if key != 'VS_VERSION_INFO':
+        raise PEFormatError('Invalid version resource')
+
+    info = {'strings': {}}
+    if len(value) >= 52:
+        fields = struct.unpack_from('<13I', value)
+        if fields[0] == _FIXED_SIGNATURE:
+            file_ms, file_ls, product_ms, product_ls = fields[2:6]
+            info['file_version'] = '%d.%d.%d.%d' % (file_ms >> 16, file_ms & 0xFFFF,
+                                                    file_ls >> 16, file_ls & 0xFFFF)
+            info['product_version'] = '%d.%d.%d.%d' % (product_ms >> 16, product_ms & 0xFFFF,
+                                                       product_ls >> 16, product_ls & 0xFFFF)
+
+    for child_key, _, _, table_start, table_end in _iter_children(data, children, end):
+        if child_key != 'StringFileInfo':
+            continue
+        # 언어별 StringTable 중 첫 번째만 사용
+        for _, _, _, string_start, string_end in _iter_children(data, table_start, table_end):
+            for name, text, _, _, _ in _iter_children(data, string_start, string_end):
+                info['strings'][name] = text.decode('utf-16-le', errors='replace').rstrip('\x00')
+            break
+    return info
+
+def read_version_info(path, header=None):
+    """PE 파일의 버전 정보 dict 반환, 버전 리소스가 없으면 None
+
+    header: 이미 읽은 파일 앞부분 (HEADER_SIZE 바이트), 없으면 여기서 읽는다.
+    PE 파일이 아니면 PEFormatError.
+    """
+    with open(path, 'rb') as f:
+        if header is None:
+            header = f.read(HEADER_SIZE)
+        resource_rva, sections = _sections(header)
+        if resource_rva is None:
+            return None
+
+        def read_at(offset, size):
+            f.seek(offset)
+            data = f.read(size)
+            if len(data) < size:
+                raise PEFormatError('Truncated resource data')
+            return data
+
+        base = _rva_to_offset(sections, resource_rva)
+        section = next((s for s in sections if s[0] <= resource_rva < s[0] + s[1]), None)
+        rsrc = read_at(base, min(section[3] - (resource_rva - section[0]), _MAX_RESOURCE_SIZE))
+        try:
+            # 종류(RT_VERSION) → 이름 → 언어 3단계 디렉토리
+            offset, is_dir = _first_entry(rsrc, 0, RT_VERSION)
+            for _ in range(2):
+                if offset is None or not is_dir:
+                    return None
+                offset, is_dir = _first_entry(rsrc, offset)
+            if offset is None or is_dir:
+                return None
+            data_rva, size = struct.unpack_from('<II', rsrc, offset)
+        except struct.error:
+            raise PEFormatError('Truncated resource directory') from None
+        if size > _MAX_RESOURCE_SIZE:
+            raise PEFormatError('Version resource too large')
+        try:
+            return parse_version_info(read_at(_rva_to_offset(sections, data_rva), size))
+        except struct.error:
+            raise PEFormatError('Truncated version resource') from None
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""요청별 프로파일링 (cProfile / tracemalloc, get_profiles 액션)
+
+EE_PROFILE 환경 변수나 메시지의 profile 값으로 켠다.
+- 'cpu' (true, '1'도 같음): cProfile로 처리와 응답 전송(스트리밍은 마지막 청크까지)을 감싸서
+  .prof 파일로 저장 (python -m pstats, snakeviz 등으로 열기)
+- 'mem': tracemalloc으로 요청 전후 스냅샷을 비교해서 할당이 많이 늘어난 위치 TOP_ALLOCATIONS개와 최대 사용량
+- 'all': 둘 다 ('cpu,mem'처럼 쉼표로 나열해도 됨)
+
+요청마다 <시각>-<pid>-<액션>.json(요약)과 .prof를 PROFILE_DIR에 남기고,
+MAX_PROFILES개를 넘으면 오래된 것부터 지운다. 꺼져 있을 때 메시지 루프는 이 모듈을 로드하지 않는다
+(native_host가 환경 변수와 메시지 키만 확인).
+"""
+
+import os
+import time
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_DIR = os.environ.get('EE_PROFILE_DIR') or os.path.join(HOST_DIR, "profiles")
+# 보관할 최대 프로필 수 (요약 json 기준, 같은 이름의 .prof도 함께 지움)
+MAX_PROFILES = 50
+# 요약에 넣는 할당 위치 / 함수 수
+TOP_ALLOCATIONS = 20
+TOP_FUNCTIONS = 15
+# tracemalloc이 위치마다 저장하는 호출 스택 깊이
+TRACE_FRAMES = 10
+
+MODES = ('cpu', 'mem')
+
+def parse_modes(value):
+    """profile 값(환경 변수 또는 메시지) → 켜진 모드 집합 (꺼져 있으면 빈 집합)"""
+    if value is None or value is False:
+        return frozenset()
+    if value is True:
+        return frozenset(('cpu',))
+    if isinstance(value, (list, tuple)):
+        names = [str(name) for name in value]
+    else:
+        names = str(value).replace(' ', '').lower().split(',')
+    modes = set()
+    for name in names:
+        if name in ('1', 'true', 'yes', 'on'):
+            modes.add('cpu')
+        elif name == 'all':
+            modes.update(MODES)
+        elif name in MODES:
+            modes.add(name)
+    return frozenset(modes)
+
+def _safe_name(action):
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(action or 'unknown'))[:40]
+
+class Capture:
+    """요청 하나의 프로파일링 (start → stop)"""
+
+    def __init__(self, action, modes):
+        self.action = action
+        self.modes = modes
+        self.profiler = None
+        self.before = None
+        self.started_tracing = False
+        self.started = None
+        self.started_at = None
+
+    def start(self):
+        if 'mem' in self.modes:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+                self.started_tracing = True
+            tracemalloc.reset_peak()
+            self.before = tracemalloc.take_snapshot()
+        if 'cpu' in self.modes:
+            import cProfile
+            self.profiler = cProfile.Profile()
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        if self.profiler:
+            self.profiler.enable()
+        return self
+
+    def stop(self, final=None):
+        """측정을 끝내고 파일로 저장, 요약 dict 반환 (저장 실패는 error로 보고)"""
+        if self.profiler:
+            self.profiler.disable()
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        summary = {
+            'action': self.action,
+            'modes': sorted(self.modes),
+            'started_at': self.started_at,
+            'elapsed_ms': round(elapsed_ms, 3),
+            'pid': os.getpid(),
+            'success': final.get('success') if isinstance(final, dict) else None,
+        }
+        if self.before is not None:
+            summary.update(self._allocations())
+
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))
+        millis = int(self.started_at * 1000) % 1000
+        base = os.path.join(PROFILE_DIR, f"{stamp}-{millis:03d}-{os.getpid()}-{_safe_name(self.action)}")
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            if self.profiler:
+                self.profiler.dump_stats(base + '.prof')
+                summary['prof_file'] = base + '.prof'
+                summary['top_functions'] = self._top_functions()
+            summary['name'] = os.path.basename(base)
+            import json
+            with open(base + '.json', 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+            rotate()
+        except OSError as e:
+            summary['error'] = str(e)
+        return summary
+
+    def _allocations(self):
+        import tracemalloc
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self.started_tracing:
+            tracemalloc.stop()
+        # 프로파일링 자신(tracemalloc, 이 모듈)의 할당은 뺀다
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        diff = after.filter_traces(ignore).compare_to(self.before.filter_traces(ignore), 'lineno')
+        top = []
+        for stat in diff[:TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            top.append({
+                'location': f"{frame.filename}:{frame.lineno}",
+                'size_diff_kb': round(stat.size_diff / 1024, 1),
+                'size_kb': round(stat.size / 1024, 1),
+                'count_diff': stat.count_diff,
+            })
+        return {
+            'traced_kb': round(current / 1024, 1),
+            'peak_kb': round(peak / 1024, 1),
+            'allocations': top,
+        }
+
+    def _top_functions(self):
+        """누적 시간 상위 함수 (pstats 없이 Profile.getstats()로)"""
+        rows = []
+        for entry in self.profiler.getstats():
+            code = entry.code
+            if isinstance(code, str):
+                name = code
+            else:
+                name = f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})"
+            rows.append((entry.totaltime, entry.inlinetime, entry.callcount, name))
+        rows.sort(reverse=True)
+        return [{'function': name, 'cumulative_ms': round(total * 1000, 3),
+                 'self_ms': round(inline * 1000, 3), 'calls': calls}
+                for total, inline, calls, name in rows[:TOP_FUNCTIONS]]
+
+def start(action, modes):
+    return Capture(action, modes).start()
+
+def _summaries(directory=None):
+    """요약 json 파일 이름 목록 (오래된 것부터, 이름이 시각으로 시작)"""
+    try:
+        return sorted(name for name in os.listdir(directory or PROFILE_DIR) if name.endswith('.json'))
+    except OSError:
+        return []
+
+def rotate(directory=None, keep=MAX_PROFILES):
+    """keep개를 넘는 오래된 프로필 (요약 json과 .prof) 삭제"""
+    directory = directory or PROFILE_DIR
+    names = _summaries(directory)
+    for name in names[:max(0, len(names) - keep)]:
+        stem = name[:-len('.json')]
+        for suffix in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(directory, stem + suffix))
+            except OSError:
+                pass
+
+def list_profiles(limit=None, directory=None):
+    """저장된 프로필 요약 목록 (최근 것부터)"""
+    import json
+    directory = directory or PROFILE_DIR
+    profiles = []
+    for name in reversed(_summaries(directory)):
+        if limit is not None and len(profiles) >= limit:
+            break
+        try:
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""큰 선택 영역 전처리: 파일 이름/경로/해시 토큰을 뽑아 명령줄 길이 안의 OR 검색어로
+
+로그 페이지 전체 같은 선택을 그대로 -s 인자로 넘기면 Windows 명령줄 제한(32767자)을 넘는다.
+- 선택 텍스트를 구분자(공백, 따옴표, <>|*?,;=[]{})로 나눈 조각을 미리 컴파일한 패턴으로 분류
+  (경로 / 해시 / 파일 이름, URL은 마지막 경로 조각의 파일 이름)
+- 대소문자 구분 없이 중복 제거, 처음 나온 순서 유지
+- Everything OR 검색어(a | b | c)를 바이트 예산 안에서 만들고, 버린 토큰 수를 보고
+입력은 조각 단위로 나눠 훑으므로 입력 크기에 선형이고, 토큰 목록 전체를 한 번에 만들지 않는다.
+"""
+
+import re
+import subprocess
+
+# 이보다 짧은 한 줄 검색어는 그대로 사용
+PREPROCESS_MIN_CHARS = 1024
+# Windows CreateProcess 명령줄 최대 길이 (UTF-16 글자 수)
+COMMAND_LINE_LIMIT = 32767
+# 실행 파일 경로와 옵션을 빼고 남길 여유
+COMMAND_LINE_RESERVE = 1024
+DEFAULT_QUERY_BYTES = COMMAND_LINE_LIMIT - COMMAND_LINE_RESERVE
+# 한 번에 훑는 입력 조각 크기 (글자 수)
+SCAN_CHUNK_CHARS = 1024 * 1024
+# 이보다 긴 조각은 파일 이름/경로로 보지 않음 (Windows 긴 경로 최대 길이 수준)
+MAX_TOKEN_CHARS = 4096
+# 응답에 넣는 버린 토큰 예시 수
+DROPPED_SAMPLES = 5
+
+OR_SEPARATOR = ' | '
+# Everything은 공백을 AND, '|'를 OR로 해석하므로 이런 글자가 있는 검색어는 따옴표로 묶는다
+_NEEDS_QUOTES = re.compile(r'[\s|]')
+
+_SEPARATORS = '"\'<>|*?,;=[]{}'
+_CANDIDATE = re.compile(r'[^\s"\'<>|*?,;=\[\]{}]+')
+# ASCII 조각은 구분자를 공백으로 바꾼 뒤 str.split으로 (정규식보다 조각당 비용이 작음)
+_TO_SPACE = str.maketrans(dict.fromkeys(_SEPARATORS, ' '))
+_URL = re.compile(r'[A-Za-z][A-Za-z0-9+.\-]*://')
+_WINDOWS_PATH = re.compile(r'(?:[A-Za-z]:|\\\\[^\\/:]+)\\[^:]*')
+_POSIX_PATH = re.compile(r'(?:~|\.{1,2})?/[^/\\:]+(?:/[^/\\:]*)+|/[^/\\:]+')
+_HASH = re.compile(r'[0-9A-Fa-f]{32}|[0-9A-Fa-f]{40}|[0-9A-Fa-f]{64}|[0-9A-Fa-f]{128}')
+# 확장자는 영문자로 시작 (1.2.3 같은 버전 번호 제외)
+_FILENAME = re.compile(r'[^\\/:]+\.[A-Za-z][A-Za-z0-9_]{0,7}')
+# 토큰 앞뒤에 붙은 문장 부호
+_STRIP_CHARS = '.,:;!?()\'"`'
+
+KINDS = ('path', 'hash', 'filename')
+
+def classify(candidate):
+    """조각 하나 → (종류, 토큰), 해당 없으면 None"""
+    token = candidate.strip(_STRIP_CHARS)
+    if len(token) < 3:
+        return None
+    if '/' in token or '\\' in token:
+        url = _URL.match(token)
+        if url:
+            # URL은 경로 마지막 조각이 파일 이름일 때만 (쿼리/프래그먼트 제외)
+            name = token[url.end():].split('?', 1)[0].split('#', 1)[0].rstrip('/').rpartition('/')[2]
+            if name and _FILENAME.fullmatch(name):
+                return 'filename', name
+            return None
+        if _WINDOWS_PATH.fullmatch(token):
+            return 'path', token.rstrip('\\')
+        if _POSIX_PATH.fullmatch(token) and token.count('/') >= 2:
+            return 'path', token.rstrip('/')
+        return None
+    if len(token) >= 32 and _HASH.fullmatch(token):
+        return 'hash', token
+    if '.' in token and _FILENAME.fullmatch(token):
+        return 'filename', token
+    return None
+
+def _chunks(text, size=SCAN_CHUNK_CHARS):
+    """text를 공백에서 끊어 size 안팎의 조각으로 (토큰이 조각 경계에서 잘리지 않도록)"""
+    start = 0
+    length = len(text)
+    while start < length:
+        end = start + size
+        if end >= length:
+            yield text[start:]
+            return
+        # 조각 끝 근처의 공백을 찾는다 (없으면 그냥 자름)
+        cut = -1
+        for separator in ('\n', ' ', '\t'):
+            cut = max(cut, text.rfind(separator, end - 4096, end))
+        if cut <= start:
+            cut = end
+        yield text[start:cut]
+        start = cut
+
+def iter_tokens(text):
+    """(종류, 토큰)을 처음 나온 순서대로 yield (중복 포함)"""
+    for chunk in _chunks(text):
+        if chunk.isascii():
+            candidates = chunk.translate(_TO_SPACE).split()
+        else:
+            candidates = _CANDIDATE.findall(chunk)
+        for candidate in candidates:
+            # 대부분의 조각(일반 단어, 숫자)은 여기서 걸러진다
+            if len(candidate) > MAX_TOKEN_CHARS:
+                continue
+            if len(candidate) < 32 and '/' not in candidate and '\\' not in candidate:
+                # 해시도 경로도 아니면 파일 이름만 남는데, 파일 이름은 마지막 '.' 뒤가 영문자로
+                # 시작하므로 버전 번호나 소수 같은 숫자 조각은 classify 없이 거른다
+                name = candidate.rstrip(_STRIP_CHARS)
+                dot = name.rfind('.')
+                if dot < 0 or not name[dot + 1:dot + 2].isalpha():
+                    continue
+            found = classify(candidate)
+            if found:
+                yield found
+
+def quote_term(term):
+    """공백이나 '|'가 있는 검색어를 큰따옴표로 묶음 (C:\\Program Files\\a.txt가 AND 조건으로 나뉘지 않도록)
+
+    Everything 검색어에는 따옴표 이스케이프가 없으므로 안의 따옴표는 뺀다 (Windows 경로에는 없는 글자).
+    """
+    if not _NEEDS_QUOTES.search(term):
+        return term
+    return '"' + term.replace('"', '') + '"'
+
+def build_or_query(tokens, max_bytes=DEFAULT_QUERY_BYTES):
+    """검색어들을 OR 검색어 하나로 (예산을 넘는 검색어는 버림)
+
+    공백이나 '|'가 있는 검색어는 따옴표로 묶고, 크기는 따옴표를 포함한 UTF-8 바이트로 센다
+    (명령줄의 UTF-16 글자 수보다 항상 크거나 같음).
+    (검색어, 사용한 개수, 버린 검색어 목록) 반환.
+    """
+    parts = []
+    used = 0
+    dropped = []
+    separator_bytes = len(OR_SEPARATOR)
+    for token in tokens:
+        term = quote_term(token)
+        size = len(term.encode('utf-8')) + (separator_bytes if parts else 0)
+        if used + size > max_bytes:
+            dropped.append(token)
+            continue
+        parts.append(term)
+        used += size
+    return OR_SEPARATOR.join(parts), len(parts), dropped
+
+def prepare_query(text, max_bytes=DEFAULT_QUERY_BYTES):
+    """큰 선택 텍스트 → OR 검색어와 전처리 보고서 dict
+
+    query: 검색어 (토큰이 하나도 없으면 텍스트 앞부분을 예산만큼 자른 것)
+    kept / kinds: 사용한 토큰 수와 종류별 수
+    dropped: duplicates (중복), over_budget (예산 초과), samples (예산 초과 예시)
+    """
+    seen = set()
+    kinds = dict.fromkeys(KINDS, 0)
+    parts = []
+    used = 0
+    duplicates = 0
+    over_budget = 0
+    samples = []
+    separator_bytes = len(OR_SEPARATOR)
+
+    for kind, token in iter_tokens(text):
+        key = token.lower()
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        size = len(token.encode('utf-8')) + (separator_bytes if parts else 0)
+        if used + size > max_bytes:
+            over_budget += 1
+            if len(samples) < DROPPED_SAMPLES:
+                samples.append(token)
+            continue
+        parts.append(token)
+        used += size
+        kinds[kind] += 1
+
+    report = {
+        'input_chars': len(text),
+        'kept': len(parts),
+        'kinds': kinds,
+        'dropped': {'duplicates': duplicates, 'over_budget': over_budget, 'samples': samples},
+    }
+    if parts:
+        report['query'] = OR_SEPARATOR.join(parts)
+    else:
+        # 파일 이름 같은 토큰이 없는 일반 문장은 앞부분만 그대로 검색
+        report['query'] = truncate_utf8(' '.join(text[:max_bytes].split()), max_bytes)
+        report['truncated'] = len(report['query']) < len(text.strip())
+    report['query_bytes'] = len(report['query'].encode('utf-8'))
+    return report
+
+def truncate_utf8(text, max_bytes):
+    """UTF-8로 max_bytes를 넘지 않게 자름 (가능하면 공백에서)"""
+    encoded = text.encode('utf-8')
+    if len(encoded) <= max_bytes:
+        return text
+    cut = encoded[:max_bytes].decode('utf-8', errors='ignore')
+    space = cut.rfind(' ')
+    return cut[:space] if space > 0 else cut
+
+def needs_preprocessing(query):
+    """그대로 명령줄에 넘기기에 큰 검색어인지"""
+    return len(query) >= PREPROCESS_MIN_CHARS
+
+def query_budget(command_prefix):
+    """실행 파일 경로와 옵션을 뺀 검색어 바이트 예산 (command_prefix: 검색어 앞의 인자들)"""
+    # subprocess가 CreateProcess에 넘기는 것과 같은 방식으로 만든 명령줄 길이,
+    # 검색어 인자의 앞 공백과 따옴표 두 개, 여유 64
+    prefix = len(subprocess.list2cmdline([str(arg) for arg in command_prefix])) + 3
+    return max(1024, min(DEFAULT_QUERY_BYTES, COMMAND_LINE_LIMIT - prefix - 64))
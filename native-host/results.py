@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""검색 결과 스트리밍 공통 처리
+
+백엔드가 만든 경로 iterator를 크롬 메시지 크기 제한에 맞는 partial 청크로 나누고,
+마지막 요약 응답을 만든다. 결과 전체를 메모리에 모으지 않는다.
+"""
+
+import json
+
+# 청크 하나의 최대 JSON 크기 (크롬 제한 1MB보다 여유 있게)
+MAX_CHUNK_BYTES = 256 * 1024
+# 첫 결과를 빨리 보여주기 위한 청크당 최대 결과 수
+MAX_CHUNK_RESULTS = 500
+
+DEFAULT_QUERY_LIMIT = 1000
+MAX_QUERY_LIMIT = 1000000
+
+def parse_paging(message):
+    """요청의 offset/limit 검증 후 (offset, limit) 반환"""
+    offset = int(message.get('offset', 0) or 0)
+    limit = int(message.get('limit', DEFAULT_QUERY_LIMIT) or DEFAULT_QUERY_LIMIT)
+    if offset < 0:
+        raise ValueError('offset must be >= 0')
+    if limit <= 0:
+        raise ValueError('limit must be > 0')
+    return offset, min(limit, MAX_QUERY_LIMIT)
+
+def stream_paths(paths, offset, limit, is_cancelled=None, state=None):
+    """paths에서 최대 limit개를 partial 청크로 yield
+    
+    paths는 이미 offset이 적용된 iterator여야 한다 (청크 offset 표시에만 사용).
+    state dict에 count/has_more/cancelled를 기록한다.
+    """
+    if state is None:
+        state = {}
+    state.update(count=0, has_more=False, cancelled=False)
+    
+    chunk = []
+    chunk_bytes = 0
+    chunk_offset = offset
+    count = 0
+    
+    for path in paths:
+        if is_cancelled and is_cancelled():
+            state['cancelled'] = True
+            break
+        if count >= limit:
+            state['has_more'] = True
+            break
+        
+        # 기본 send_message와 같은 ensure_ascii 인코딩 기준 크기
+        size = len(json.dumps(path)) + 1
+        if chunk and (chunk_bytes + size > MAX_CHUNK_BYTES or len(chunk) >= MAX_CHUNK_RESULTS):
+            yield {'partial': True, 'offset': chunk_offset, 'results': chunk}
+            chunk_offset += len(chunk)
+            chunk = []
+            chunk_bytes = 0
+        
+        chunk.append(path)
+        chunk_bytes += size
+        count += 1
+        state['count'] = count
+    
+    if chunk and not state['cancelled']:
+        yield {'partial': True, 'offset': chunk_offset, 'results': chunk}
+
+def done_response(query, offset, limit, state, **extra):
+    """스트리밍 마지막 요약 응답"""
+    response = {
+        'success': True,
+        'done': True,
+        'query': query,
+        'offset': offset,
+        'limit': limit,
+        'count': state.get('count', 0),
+        'has_more': state.get('has_more', False),
+        'cancelled': state.get('cancelled', False)
+    }
+    response.update(extra)
+    return response
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""get_status 스냅샷 (버전이 붙은 상태, 입력이 바뀐 부분만 다시 계산)
+
+상태는 두 부분으로 나눠 각자의 입력과 함께 저장한다.
+- everything (everything_found, everything_path): 설정 파일 signature, EVERYTHING_PATH,
+  찾은 Everything.exe의 stat (mtime_ns, 크기), 찾지 못했을 때는 후보 경로들의 존재 여부.
+  찾지 못한 결과는 discovery와 같이 NEGATIVE_CACHE_TTL이 지나면 다시 계산한다
+- available_paths: everything 결과, 찾지 못했을 때는 후보 경로들의 존재 여부
+
+get_status마다 입력만 확인하고 (stat 몇 번), 바뀐 부분만 discovery로 다시 계산한다.
+결과 내용이 바뀌면 version을 올리고, 입력이나 내용이 바뀌었을 때만 STATUS_FILE에 원자적으로 쓴다
+(메시지마다 새로 뜨는 호스트끼리도 공유). 확장 프로그램은 스냅샷을 chrome.storage.local에
+보관했다가 팝업을 열 때 바로 그리고, get_status에 자신의 version을 보내서
+바뀌지 않았으면 unchanged 응답만 받는다.
+"""
+
+import os
+import json
+import time
+# threading 모듈 로드 비용(콜드 스타트)을 피하려고 저수준 락 사용
+import _thread
+
+import host_log as log
+import config as host_config
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+STATUS_FILE = os.environ.get('EE_STATUS_FILE') or os.path.join(HOST_DIR, "status_snapshot.json")
+STATUS_FORMAT = 1
+
+# 세션 모드에서 스냅샷 파일을 매번 읽지 않도록 메모리에도 보관
+_snapshot = None
+# 데몬은 요청을 여러 스레드에서 처리하므로 스냅샷 계산/저장을 한 번에 하나씩
+_lock = _thread.allocate_lock()
+
+def _stat_signature(path):
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def _load():
+    """메모리 또는 디스크의 마지막 스냅샷 (형식이 다르거나 없으면 None)"""
+    global _snapshot
+    if _snapshot is None:
+        try:
+            with open(STATUS_FILE, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if snapshot.get('format') == STATUS_FORMAT:
+                _snapshot = snapshot
+        except (OSError, ValueError, AttributeError):
+            pass
+    return _snapshot
+
+def _store(snapshot):
+    global _snapshot
+    _snapshot = snapshot
+    tmp_file = f"{STATUS_FILE}.{os.getpid()}.{_thread.get_ident()}.tmp"
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_file, STATUS_FILE)
+    except OSError as e:
+        log.warning(f"Failed to write status snapshot: {e}")
+
+def invalidate():
+    """스냅샷 삭제 (다음 get_status에서 모두 다시 계산)"""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+        try:
+            os.remove(STATUS_FILE)
+        except OSError:
+            pass
+
+def _candidates():
+    from discovery import potential_everything_paths
+    return [os.path.exists(path) for path in potential_everything_paths()]
+
+def _everything_inputs(previous_path):
+    inputs = {
+        'config': host_config.signature(),
+        'env_path': os.environ.get('EVERYTHING_PATH'),
+        'exe': _stat_signature(previous_path) if previous_path else None,
+    }
+    if not previous_path:
+        # 찾지 못했을 때: 일반 설치 경로에 새로 설치되면 바로 다시 찾도록
+        inputs['candidates'] = _candidates()
+    return inputs
+
+def _expired(everything):
+    """찾지 못한 결과가 NEGATIVE_CACHE_TTL보다 오래됐으면 True (일반 경로가 아닌 곳에 설치된 경우)"""
+    from discovery import NEGATIVE_CACHE_TTL
+    if everything['value']['everything_found']:
+        return False
+    return time.time() - everything.get('checked_at', 0) >= NEGATIVE_CACHE_TTL
+
+def _available_inputs(everything_path):
+    if everything_path:
+        return {'everything_path': everything_path}
+    return {'everything_path': None, 'candidates': _candidates()}
+
+def snapshot():
+    """입력이 바뀐 부분만 다시 계산한 현재 스냅샷과 다시 계산한 부분 이름 목록"""
+    previous = _load() or {}
+    parts = dict(previous.get('parts') or {})
+    recomputed = []
+
+    everything = parts.get('everything')
+    inputs = _everything_inputs(everything['value']['everything_path'] if everything else None)
+    if not everything or everything['inputs'] != inputs or _expired(everything):
+        from discovery import find_everything_exe, invalidate_discovery_cache
+        if everything and everything['inputs'].get('candidates') != inputs.get('candidates'):
+            # 새로 설치된 경로는 discovery의 '찾지 못함' 캐시(NEGATIVE_CACHE_TTL)를 기다리지 않고 찾는다
+            invalidate_discovery_cache()
+        path = find_everything_exe()
+        # 찾은 경로 기준의 입력으로 (찾기 전 경로와 다를 수 있음)
+        inputs = _everything_inputs(path)
+        everything = {'inputs': inputs, 'checked_at': time.time(),
+                      'value': {'everything_found': path is not None, 'everything_path': path}}
+        parts['everything'] = everything
+        recomputed.append('everything')
+
+    everything_path = everything['value']['everything_path']
+    available = parts.get('available_paths')
+    inputs = _available_inputs(everything_path)
+    if not available or available['inputs'] != inputs:
+        from discovery import get_potential_everything_paths
+        available = {'inputs': inputs, 'value': {'available_paths': get_potential_everything_paths(everything_path)}}
+        parts['available_paths'] = available
+        recomputed.append('available_paths')
+
+    if not recomputed:
+        return previous, recomputed
+
+    values = {}
+    for part in parts.values():
+        values.update(part['value'])
+    version = previous.get('version')
+    if version is None:
+        # 스냅샷 파일을 지운 뒤에도 확장 프로그램이 가진 예전 version과 겹치지 않도록 현재 시각(초)부터
+        version = int(time.time())
+    elif values != previous.get('values'):
+        version += 1
+    current = {
+        'format': STATUS_FORMAT,
+        'version': version,
+        'computed_at': time.time(),
+        'values': values,
+        'parts': parts,
+    }
+    _store(current)
+    return current, recomputed
+
+def get_status(known_version=None):
+    """get_status 응답 (known_version이 현재 version과 같으면 unchanged 응답만)"""
+    with _lock:
+        current, recomputed = snapshot()
+    response = {
+        'success': True,
+        'version': current['version'],
+        'computed_at': current['computed_at'],
+        'recomputed': recomputed,
+    }
+    if known_version is not None and known_version == current['version']:
+        response['unchanged'] = True
+        return response
+    response.update(current['values'])
+    return response